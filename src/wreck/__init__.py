@@ -1,9 +1,13 @@
 """
 .. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
 
+``acompile`` and ``afix`` are imported on first access. Otherwise
+``import wreck`` would pull in asyncio, sqlite3 and the compile stack
+
 .. py:data:: __all__
-   :type: tuple[str, str]
-   :value: ("MissingPackageBaseFolder", "MissingRequirementsFoldersFiles")
+   :type: tuple[str, str, str, str]
+   :value: ("MissingPackageBaseFolder", "MissingRequirementsFoldersFiles", \
+   "acompile", "afix")
 
 """
 
@@ -15,4 +19,33 @@ from .exceptions import (
 __all__ = (
     "MissingPackageBaseFolder",
     "MissingRequirementsFoldersFiles",
+    "acompile",
+    "afix",
 )
+
+_LAZY = ("acompile", "afix")
+
+
+def __getattr__(name):
+    """Import the asyncio API on first access.
+
+    :param name: module attribute name
+    :type name: str
+    :returns: ``acompile`` or ``afix``
+    :rtype: typing.Any
+    :raises:
+
+       - :py:exc:`AttributeError` -- no such attribute
+
+    """
+    if name in _LAZY:
+        from . import lock_async
+
+        ret = getattr(lock_async, name)
+        # Next access skips __getattr__
+        globals()[name] = ret
+    else:
+        msg_exc = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg_exc)
+
+    return ret
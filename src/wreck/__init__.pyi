@@ -0,0 +1,15 @@
+from .exceptions import (
+    MissingPackageBaseFolder,
+    MissingRequirementsFoldersFiles,
+)
+from .lock_async import (
+    acompile,
+    afix,
+)
+
+__all__ = (
+    "MissingPackageBaseFolder",
+    "MissingRequirementsFoldersFiles",
+    "acompile",
+    "afix",
+)
@@ -0,0 +1,222 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Long-lived :command:`pip-compile` worker. pip, pip-tools and click are
+imported once, then many compiles are run in-process.
+
+Protocol is one json object per line. stdin receives requests, the
+original stdout sends responses.
+
+Request
+
+.. code-block:: text
+
+   {"args": ["--no-header", ..., "-o", "prod.lock", "prod.in"], "cwd": "/abs/path", "cpu": null}
+
+``cpu`` is an optional per compile CPU seconds budget. Exceeding it,
+the kernel sends SIGXCPU, which ends the worker. Requires
+:py:mod:`resource`, so ignored on Windows
+
+Response. Same meaning as :py:func:`wreck._run_cmd.run_cmd_rusage` return value
+
+.. code-block:: text
+
+   {"out": null, "err": "...", "exit_code": 0, "exc": null, "rusage": {"utime": 1.2, "stime": 0.1, "maxrss": 81234}}
+
+``rusage`` is this compile's user and system CPU seconds. ``maxrss``,
+in KiB, is the worker's high-water mark
+
+Anything else writing to file descriptor 1, e.g. a pip build backend
+subprocess, is redirected to stderr so the protocol stream stays clean.
+
+Usage
+
+.. code-block:: shell
+
+   python -m wreck._compile_worker
+
+.. py:data:: __all__
+   :type: tuple[str, str]
+   :value: ("compile_in_process", "main")
+
+   Module exports
+
+"""
+
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Windows
+    resource = None  # type: ignore[assignment]
+
+__all__ = (
+    "compile_in_process",
+    "main",
+)
+
+
+@contextlib.contextmanager
+def _cpu_limit(cpu):
+    """CPU seconds limit, only while compiling. The limit is on the
+    whole process, so add the CPU seconds already used. Afterwards
+    restore the previous soft limit
+
+    :param cpu: CPU seconds budget. None unlimited
+    :type cpu: int | None
+    """
+    if cpu is None or resource is None:  # pragma: no cover
+        yield
+    else:
+        soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        limit = math.ceil(usage.ru_utime + usage.ru_stime) + cpu
+        if hard != resource.RLIM_INFINITY:  # pragma: no cover
+            limit = min(limit, hard)
+        else:  # pragma: no cover
+            pass
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+        try:
+            yield
+        finally:
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def compile_in_process(args, cwd, cpu=None):
+    """Run pip-compile, in-process.
+
+    :param args: pip-compile command line arguments, without the executable
+    :type args: collections.abc.Sequence[str]
+    :param cwd: Working directory. Relative paths are relative to this folder
+    :type cwd: str
+    :param cpu: Default None. CPU seconds budget. None unlimited
+    :type cpu: int | None
+    :returns: log messages, exception messages, return code, failure message
+    :rtype: tuple[str | None, str | None, int | None, str | None]
+    """
+    import click
+    from piptools.scripts.compile import cli
+
+    os.chdir(cwd)
+
+    f_out = io.StringIO()
+    f_err = io.StringIO()
+    with (
+        _cpu_limit(cpu),
+        contextlib.redirect_stdout(f_out),
+        contextlib.redirect_stderr(f_err),
+    ):
+        try:
+            ret_main = cli.main(list(args), standalone_mode=False)
+        except SystemExit as exc:
+            exit_code = exc.code if isinstance(exc.code, int) else 1
+        except click.exceptions.ClickException as exc:
+            exc.show()
+            exit_code = exc.exit_code
+        except click.exceptions.Abort:  # pragma: no cover
+            exit_code = 1
+        except Exception:
+            # As if the subprocess crashed. Traceback goes to stderr
+            sys.stderr.write(traceback.format_exc())
+            exit_code = 1
+        else:
+            # standalone_mode=False, ctx.exit(code) returns the exit code
+            exit_code = ret_main if isinstance(ret_main, int) else 0
+
+    str_out = f_out.getvalue().rstrip()
+    str_err = f_err.getvalue().rstrip()
+    ret = (
+        str_out if len(str_out) != 0 else None,
+        str_err if len(str_err) != 0 else None,
+        exit_code,
+        None,
+    )
+
+    return ret
+
+
+def _usage():
+    """Resource usage so far, of this worker and it's reaped children,
+    e.g. build backends
+
+    :returns: user and system CPU seconds, max resident set size in KiB. None on Windows
+    :rtype: dict[str, float | int] | None
+    """
+    if resource is None:  # pragma: no cover
+        ret = None
+    else:
+        ru_self = resource.getrusage(resource.RUSAGE_SELF)
+        ru_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        maxrss = max(ru_self.ru_maxrss, ru_children.ru_maxrss)
+        # macOS ru_maxrss is bytes. Linux KiB
+        if sys.platform == "darwin":  # pragma: no cover
+            maxrss = maxrss // 1024
+        else:  # pragma: no cover
+            pass
+        ret = {
+            "utime": ru_self.ru_utime + ru_children.ru_utime,
+            "stime": ru_self.ru_stime + ru_children.ru_stime,
+            "maxrss": maxrss,
+        }
+
+    return ret
+
+
+def _usage_since(d_before):
+    """Resource usage of one compile. max RSS is the worker's high-water
+    mark, not per compile
+
+    :param d_before: :py:func:`_usage` before the compile
+    :type d_before: dict[str, float | int] | None
+    :returns: user and system CPU seconds, max resident set size in KiB
+    :rtype: dict[str, float | int] | None
+    """
+    d_after = _usage()
+    if d_before is None or d_after is None:  # pragma: no cover
+        ret = None
+    else:
+        ret = {
+            "utime": d_after["utime"] - d_before["utime"],
+            "stime": d_after["stime"] - d_before["stime"],
+            "maxrss": d_after["maxrss"],
+        }
+
+    return ret
+
+
+def main():
+    """Serve requests until stdin closes."""
+    # Protocol stream is a copy of fd 1. Then fd 1 --> stderr
+    f_proto = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    for line in sys.stdin:
+        if len(line.strip()) == 0:  # pragma: no cover
+            continue
+        d_request = json.loads(line)
+        d_before = _usage()
+        out, err, exit_code, exc = compile_in_process(
+            d_request["args"],
+            d_request["cwd"],
+            cpu=d_request.get("cpu", None),
+        )
+        d_response = {
+            "out": out,
+            "err": err,
+            "exit_code": exit_code,
+            "exc": exc,
+            "rusage": _usage_since(d_before),
+        }
+        f_proto.write(f"{json.dumps(d_response)}\n")
+        f_proto.flush()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,23 @@
+from collections.abc import (
+    Iterator,
+    Sequence,
+)
+from contextlib import contextmanager
+
+__all__ = (
+    "compile_in_process",
+    "main",
+)
+
+@contextmanager
+def _cpu_limit(cpu: int | None) -> Iterator[None]: ...
+def compile_in_process(
+    args: Sequence[str],
+    cwd: str,
+    cpu: int | None = None,
+) -> tuple[str | None, str | None, int | None, str | None]: ...
+def _usage() -> dict[str, float | int] | None: ...
+def _usage_since(
+    d_before: dict[str, float | int] | None,
+) -> dict[str, float | int] | None: ...
+def main() -> None: ...
@@ -3,9 +3,40 @@
 
 Wrapper for :py:func:`subprocess.run` calls. Blocking and not multiprocessing
 
+:py:func:`~wreck._run_cmd.arun_cmd` is the asyncio equivalent. Does not
+block the event loop. Same arguments, same return value
+
+Optionally a budget. Exceeding either the wall-clock or CPU seconds
+budget kills the subprocess, and it's process group. The failure
+message starts with :py:data:`wreck._run_cmd.BUDGET_EXCEEDED`. The CPU
+budget requires :py:func:`resource.prlimit`, so Linux only. Elsewhere
+it's ignored
+
+:py:func:`~wreck._run_cmd.run_cmd_rusage` also returns the subprocess
+resource usage: user and system CPU seconds and max resident set size.
+From :py:func:`os.wait4`, so not on Windows
+
+Optionally a cancel event. Once set, the subprocess, and it's process
+group, is killed. Not yet started, it's not started. The failure
+message is :py:data:`wreck._run_cmd.CANCELLED`
+
+.. py:data:: BUDGET_EXCEEDED
+   :type: str
+   :value: "budget exceeded"
+
+   Failure message prefix. Subprocess killed, ran out of time
+
+.. py:data:: CANCELLED
+   :type: str
+   :value: "cancelled"
+
+   Failure message prefix. Subprocess killed or not started, cancel event set
+
 .. py:data:: __all__
-   :type: tuple[str]
-   :value: ("run_cmd",)
+   :type: tuple[str, str, str, str, str, str, str, str, str, str]
+   :value: ("BUDGET_EXCEEDED", "CANCELLED", "arun_cmd", "budget_msg", \
+   "is_cpu_exceeded", "kill_process_group", "limit_cpu", "run_cmd", \
+   "run_cmd_rusage", "rusage_dict")
 
    Module exports
 
@@ -22,10 +53,18 @@ Wrapper for :py:func:`subprocess.run` calls. Blocking and not multiprocessing
 
 """
 
+import asyncio
 import os
 import shlex
+import signal
 import subprocess
-from collections.abc import Sequence
+import sys
+import threading
+import time
+from collections.abc import (
+    Mapping,
+    Sequence,
+)
 from pathlib import (
     Path,
     PurePath,
@@ -33,23 +72,41 @@ from pathlib import (
 
 from ._safe_path import is_win
 
-__all__ = ("run_cmd",)
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Windows
+    resource = None  # type: ignore[assignment]
 
+__all__ = (
+    "BUDGET_EXCEEDED",
+    "CANCELLED",
+    "arun_cmd",
+    "budget_msg",
+    "is_cpu_exceeded",
+    "kill_process_group",
+    "limit_cpu",
+    "run_cmd",
+    "run_cmd_rusage",
+    "rusage_dict",
+)
+
+BUDGET_EXCEEDED = "budget exceeded"
+CANCELLED = "cancelled"
+# seconds between budget checks
+_BUDGET_POLL = 0.5
 
-def run_cmd(cmd, cwd=None, env=None):
-    """Run cmd in subprocess, capture both stdout and stderr
+
+def _split_cmd(cmd):
+    """Coerce cmd into a str, then split into args.
 
     :param cmd: command to run in a subprocess
     :type cmd: collections.abc.Sequence[str]
-    :param cwd: Default None
-    :type cwd: pathlib.Path | None
-    :param env: Default None. Expecting an :py:class:`os._Environ`
-    :type env: typing.Any | None
-    :returns: log messages, exception messages, return code, subprocess failure message
-    :rtype: tuple[str | None, str | None, int | None, str | None]
+    :returns: command args
+    :rtype: list[str]
     :raises:
 
-        - :py:exc:`TypeError` -- Unsupported type for 1st arg cmd
+        - :py:exc:`TypeError` -- Unsupported type for cmd
 
     """
     # Coerce into a str. Use shlex.split on the str
@@ -65,63 +122,592 @@ def run_cmd(cmd, cwd=None, env=None):
 
     # splitting Windows path will remove all path separators
     # https://ss64.com/nt/syntax-esc.html
-    cmd_2 = shlex.split(cmd_1, posix=not is_win)
+    ret = shlex.split(cmd_1, posix=not is_win)
+
+    return ret
 
+
+def _cwd_env(cwd, env):
+    """Unsupported cwd --> current working directory. Unsupported env --> None.
+
+    :param cwd: Working directory
+    :type cwd: typing.Any
+    :param env: Expecting an :py:class:`os._Environ` or a mapping
+    :type env: typing.Any
+    :returns: working directory and environment
+    :rtype: tuple[pathlib.Path, collections.abc.Mapping[str, str] | None]
+    """
     if cwd is None or not issubclass(type(cwd), PurePath):
         path_cwd = Path.cwd()
     else:  # pragma: no cover
         path_cwd = cwd
 
-    is_not_env = env is None or not isinstance(env, os._Environ)
+    is_not_env = env is None or not isinstance(env, (os._Environ, Mapping))
     if is_not_env:
         opt_env = None
     else:  # pragma: no cover
         opt_env = env
 
+    return path_cwd, opt_env
+
+
+def _output_or_none(str_out):
+    """Trailing whitespace removed. Empty --> None.
+
+    :param str_out: stdout or stderr
+    :type str_out: str | None
+    :returns: stdout or stderr or None
+    :rtype: str | None
+    """
+    is_empty = str_out is None or len(str_out.rstrip()) == 0
+    if is_empty:
+        ret = None
+    else:
+        ret = str_out.rstrip()
+
+    return ret
+
+
+def budget_msg(kind, seconds):
+    """Failure message. Subprocess killed for exceeding a budget.
+
+    :param kind: ``wall`` or ``cpu``
+    :type kind: str
+    :param seconds: the budget
+    :type seconds: int
+    :returns: failure message. Starts with BUDGET_EXCEEDED
+    :rtype: str
+    """
+    ret = f"{BUDGET_EXCEEDED} ({kind} {seconds!s}s)"
+
+    return ret
+
+
+def _check_budget(seconds):
+    """Budget must be a positive int. Otherwise no budget.
+
+    :param seconds: wall-clock or CPU seconds
+    :type seconds: typing.Any
+    :returns: positive int or None
+    :rtype: int | None
+    """
+    is_ng = (
+        seconds is None
+        or isinstance(seconds, bool)
+        or not isinstance(seconds, int)
+        or seconds < 1
+    )
+    if is_ng:
+        ret = None
+    else:
+        ret = seconds
+
+    return ret
+
+
+def limit_cpu(pid, cpu):
+    """Limit a process's CPU time. On exceeding, the kernel sends
+    ``SIGXCPU``. Then ``SIGKILL`` a second later
+
+    :param pid: process id
+    :type pid: int
+    :param cpu: CPU seconds. None for no limit
+    :type cpu: int | None
+    """
+    is_supported = resource is not None and hasattr(resource, "prlimit")
+    if cpu is not None and is_supported:
+        try:
+            resource.prlimit(pid, resource.RLIMIT_CPU, (cpu, cpu + 1))
+        except OSError:  # pragma: no cover
+            # Process already exited
+            pass
+    else:  # pragma: no cover
+        pass
+
+
+def is_cpu_exceeded(returncode, cpu, rusage=None):
+    """Detect process killed by the CPU limit. Exceeding the soft limit
+    sends ``SIGXCPU``. ``SIGKILL`` could be from anywhere, so only if
+    the measured CPU time reached the budget
+
+    :param returncode: process return code. Negative is killed by signal
+    :type returncode: int | None
+    :param cpu: CPU seconds. None for no limit
+    :type cpu: int | None
+    :param rusage:
+
+       Default None. Resource usage, from
+       :py:func:`wreck._run_cmd.rusage_dict`. None if unavailable
+
+    :type rusage: collections.abc.Mapping[str, float | int] | None
+    :returns: True if killed by the CPU limit
+    :rtype: bool
+    """
+    sig_xcpu = getattr(signal, "SIGXCPU", None)
+    sig_kill = getattr(signal, "SIGKILL", None)
+    if cpu is None or returncode is None or sig_xcpu is None:
+        ret = False
+    elif returncode == -sig_xcpu:
+        ret = True
+    elif returncode == -sig_kill and rusage is not None:
+        ret = rusage["utime"] + rusage["stime"] >= cpu
+    else:
+        ret = False
+
+    return ret
+
+
+def kill_process_group(proc):
+    """Kill the process and it's descendants. pip-compile may have
+    started a build backend subprocess
+
+    Process must have been started with ``start_new_session=True``
+
+    :param proc: process. Either subprocess or asyncio subprocess
+    :type proc: subprocess.Popen[str] | asyncio.subprocess.Process
+    """
+    if is_win():  # pragma: no cover
+        proc.kill()
+    else:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:  # pragma: no cover
+            # Already gone
+            pass
+
+
+def _budget_step(time_start, wall, is_budget):
+    """How long to wait for output before checking the budget again.
+
+    :param time_start: :py:func:`time.monotonic` when the subprocess started
+    :type time_start: float
+    :param wall: Wall-clock seconds budget. None for no limit
+    :type wall: int | None
+    :param is_budget: False no budget. Wait until done
+    :type is_budget: bool
+    :returns: seconds. None to wait until done
+    :rtype: float | None
+    """
+    if not is_budget:
+        ret = None
+    elif wall is None:
+        ret = _BUDGET_POLL
+    else:
+        remaining = wall - (time.monotonic() - time_start)
+        # Zero would time out before reading any output
+        ret = max(min(remaining, _BUDGET_POLL), 0.05)
+
+    return ret
+
+
+def rusage_dict(ru):
+    """From a :py:func:`os.wait4` or :py:func:`resource.getrusage`
+    result, the fields telemetry keeps
+
+    :param ru: resource usage
+    :type ru: resource.struct_rusage
+    :returns: user and system CPU seconds, max resident set size in KiB
+    :rtype: dict[str, float | int]
+    """
+    # macOS ru_maxrss is bytes. Linux KiB
+    if sys.platform == "darwin":  # pragma: no cover
+        maxrss = ru.ru_maxrss // 1024
+    else:  # pragma: no cover
+        maxrss = ru.ru_maxrss
+
+    ret = {"utime": ru.ru_utime, "stime": ru.ru_stime, "maxrss": maxrss}
+
+    return ret
+
+
+def _read_pipe(stream, outputs, idx):
+    """Thread. Read a subprocess output pipe until closed. Both pipes
+    are read at once, so neither fills and blocks the subprocess
+
+    :param stream: subprocess stdout or stderr
+    :type stream: typing.IO[str]
+    :param outputs: stdout and stderr contents. None until closed
+    :type outputs: list[str | None]
+    :param idx: 0 stdout, 1 stderr
+    :type idx: int
+    """
     try:
-        proc = subprocess.run(
-            cmd_2,
-            shell=False,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+        outputs[idx] = stream.read()
+    except (OSError, ValueError):  # pragma: no cover
+        # Closed by the main thread. e.g. KeyboardInterrupt
+        pass
+
+
+def _start_readers(proc):
+    """Start reading the subprocess stdout and stderr.
+
+    :param proc: subprocess. stdout and stderr are pipes
+    :type proc: subprocess.Popen[str]
+    :returns: reader threads and stdout and stderr contents, once closed
+    :rtype: tuple[list[threading.Thread], list[str | None]]
+    """
+    outputs = [None, None]
+    threads = []
+    for idx, stream in enumerate((proc.stdout, proc.stderr)):
+        thread = threading.Thread(
+            target=_read_pipe,
+            args=(stream, outputs, idx),
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+
+    ret = (threads, outputs)
+
+    return ret
+
+
+def _is_finished(proc, threads, timeout, is_budget):
+    """Wait, at most timeout, for the output pipes to close. Within a
+    budget, the process must also have exited. Not reaped
+
+    :param proc: subprocess
+    :type proc: subprocess.Popen[str]
+    :param threads: output pipe reader threads
+    :type threads: collections.abc.Sequence[threading.Thread]
+    :param timeout: seconds. None to wait until closed
+    :type timeout: float | None
+    :param is_budget: True process started within it's own process group
+    :type is_budget: bool
+    :returns: True if output closed and, within a budget, exited
+    :rtype: bool
+    """
+    if timeout is None:
+        deadline = None
+    else:
+        deadline = time.monotonic() + timeout
+
+    for thread in threads:
+        if deadline is None:
+            thread.join()
+        else:
+            thread.join(max(deadline - time.monotonic(), 0))
+    is_closed = not any(thread.is_alive() for thread in threads)
+
+    if not is_closed or not is_budget:
+        ret = is_closed
+    else:
+        # Output closed, but the process could still be running
+        ret = _has_exited(proc)
+        if not ret and deadline is not None:  # pragma: no cover
+            time.sleep(max(deadline - time.monotonic(), 0))
+        else:  # pragma: no cover
+            pass
+
+    return ret
+
+
+def _wait_rusage(proc):
+    """Reap the subprocess, keeping it's resource usage. Output pipes
+    should already be closed. :py:func:`os.wait4` rather than
+    :py:meth:`subprocess.Popen.wait`. Sets the return code. Elsewhere,
+    e.g. Windows, no resource usage
+
+    :param proc: subprocess
+    :type proc: subprocess.Popen[str]
+    :returns: user and system CPU seconds, max resident set size in KiB. None if unavailable
+    :rtype: dict[str, float | int] | None
+    """
+    if not hasattr(os, "wait4"):  # pragma: no cover
+        proc.wait()
+        ret = None
+    else:
+        try:
+            _, sts, ru = os.wait4(proc.pid, 0)
+        except ChildProcessError:  # pragma: no cover
+            # Reaped elsewhere, e.g. SIGCLD set to SIG_IGN. Same as Popen
+            proc.returncode = 0
+            ret = None
+        else:
+            proc.returncode = os.waitstatus_to_exitcode(sts)
+            ret = rusage_dict(ru)
+
+    return ret
+
+
+def _has_exited(proc):
+    """Without reaping, whether the process exited. Reaping is left to
+    :py:func:`wreck._run_cmd._wait_rusage`, which keeps the resource usage
+
+    :param proc: process. Either subprocess or asyncio subprocess
+    :type proc: subprocess.Popen[str] | asyncio.subprocess.Process
+    :returns: True if exited
+    :rtype: bool
+    """
+    is_waitid = hasattr(os, "waitid") and hasattr(os, "WNOWAIT")
+    if not isinstance(proc, subprocess.Popen):
+        ret = proc.returncode is not None
+    elif proc.returncode is not None or not is_waitid:  # pragma: no cover
+        ret = proc.poll() is not None
+    else:
+        try:
+            result = os.waitid(
+                os.P_PID,
+                proc.pid,
+                os.WEXITED | os.WNOHANG | os.WNOWAIT,
+            )
+        except ChildProcessError:  # pragma: no cover
+            ret = True
+        else:
+            ret = result is not None
+
+    return ret
+
+
+def _budget_check(proc, time_start, wall, is_budget, cancel=None):
+    """Output not finished. If over the wall-clock budget or cancelled,
+    kill the process group. If the process exited, but descendants still
+    hold stdout or stderr open, kill them too
+
+    :param proc: process. Either subprocess or asyncio subprocess
+    :type proc: subprocess.Popen[str] | asyncio.subprocess.Process
+    :param time_start: :py:func:`time.monotonic` when the subprocess started
+    :type time_start: float
+    :param wall: Wall-clock seconds budget. None for no limit
+    :type wall: int | None
+    :param is_budget: True process started within it's own process group
+    :type is_budget: bool
+    :param cancel: Default None. Once set, kill. None never cancelled
+    :type cancel: threading.Event | None
+    :returns: failure message if the wall-clock budget was exceeded or cancelled
+    :rtype: str | None
+    """
+    is_over = wall is not None and time.monotonic() - time_start >= wall
+
+    if cancel is not None and cancel.is_set():
+        kill_process_group(proc)
+        ret = CANCELLED
+    elif is_over:
+        kill_process_group(proc)
+        ret = budget_msg("wall", wall)
+    elif is_budget and _has_exited(proc):
+        kill_process_group(proc)
+        ret = None
+    else:
+        ret = None
+
+    return ret
+
+
+def run_cmd(cmd, cwd=None, env=None, wall=None, cpu=None, cancel=None):
+    """Run cmd in subprocess, capture both stdout and stderr
+
+    For the subprocess resource usage, See
+    :py:func:`wreck._run_cmd.run_cmd_rusage`
+
+    :param cmd: command to run in a subprocess
+    :type cmd: collections.abc.Sequence[str]
+    :param cwd: Default None
+    :type cwd: pathlib.Path | None
+    :param env:
+
+       Default None. Expecting an :py:class:`os._Environ` or a mapping,
+       e.g. a modified copy of it
+
+    :type env: typing.Any | None
+    :param wall: Default None. Wall-clock seconds budget. None for no limit
+    :type wall: typing.Any | None
+    :param cpu: Default None. CPU seconds budget. None for no limit
+    :type cpu: typing.Any | None
+    :param cancel:
+
+       Default None. Once set, the subprocess is killed. Polled with
+       the budget. None never cancelled
+
+    :type cancel: threading.Event | None
+    :returns: log messages, exception messages, return code, subprocess failure message
+    :rtype: tuple[str | None, str | None, int | None, str | None]
+    :raises:
+
+        - :py:exc:`TypeError` -- Unsupported type for 1st arg cmd
+
+    """
+    ret = run_cmd_rusage(cmd, cwd=cwd, env=env, wall=wall, cpu=cpu, cancel=cancel)[:4]
+
+    return ret
+
+
+def run_cmd_rusage(cmd, cwd=None, env=None, wall=None, cpu=None, cancel=None):
+    """Same as :py:func:`wreck._run_cmd.run_cmd`. Also the subprocess
+    resource usage, from :py:func:`os.wait4`
+
+    For parameters See :py:func:`wreck._run_cmd.run_cmd`
+
+    :returns:
+
+       log messages, exception messages, return code, subprocess
+       failure message, resource usage. Resource usage is user and
+       system CPU seconds and max resident set size in KiB. None if
+       unavailable
+
+    :rtype: tuple[str | None, str | None, int | None, str | None, dict[str, float | int] | None]
+    :raises:
+
+        - :py:exc:`TypeError` -- Unsupported type for 1st arg cmd
+
+    """
+    cmd_2 = _split_cmd(cmd)
+    path_cwd, opt_env = _cwd_env(cwd, env)
+    int_wall = _check_budget(wall)
+    int_cpu = _check_budget(cpu)
+    # Own process group, so all descendants can be killed
+    is_budget = int_wall is not None or int_cpu is not None or cancel is not None
+
+    if cancel is not None and cancel.is_set():
+        # Already cancelled. Not started
+        ret = (None, None, None, CANCELLED, None)
+    else:
+        try:
+            proc = subprocess.Popen(
+                cmd_2,
+                shell=False,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=path_cwd,
+                env=opt_env,
+                text=True,
+                start_new_session=is_budget,
+            )
+        except OSError as e:
+            # e.g. cmd=("bin/true",)
+            str_err = str(f"{e.strerror} {e.filename}")
+            ret = (None, None, None, str_err, None)
+        else:
+            limit_cpu(proc.pid, int_cpu)
+            time_start = time.monotonic()
+            str_exc = None
+            with proc:
+                try:
+                    threads, outputs = _start_readers(proc)
+                    while not _is_finished(
+                        proc,
+                        threads,
+                        _budget_step(time_start, int_wall, is_budget),
+                        is_budget,
+                    ):
+                        str_exc = _budget_check(
+                            proc,
+                            time_start,
+                            int_wall,
+                            is_budget,
+                            cancel=cancel,
+                        )
+                    # Pipes closed. Reap, keeping the resource usage
+                    rusage = _wait_rusage(proc)
+                except BaseException:  # pragma: no cover
+                    # e.g. KeyboardInterrupt. Same as subprocess.run
+                    proc.kill()
+                    raise
+            str_out, str_err = outputs
+
+            if str_exc is None and is_cpu_exceeded(
+                proc.returncode,
+                int_cpu,
+                rusage=rusage,
+            ):
+                str_exc = budget_msg("cpu", int_cpu)
+            else:  # pragma: no cover
+                pass
+
+            # warning level log messages bleed to stdout
+            str_out = _output_or_none(str_out)
+            # Exception details written to stderr
+            str_err = _output_or_none(str_err)
+
+            # str_out is only Warning level log messages
+            if str_exc is None:
+                ret = (str_out, str_err, proc.returncode, None, rusage)
+            else:
+                ret = (str_out, str_err, None, str_exc, rusage)
+
+    return ret
+
+
+async def arun_cmd(cmd, cwd=None, env=None, wall=None, cpu=None):
+    """Run cmd in subprocess, capture both stdout and stderr. Does not
+    block the event loop.
+
+    If cancelled, the subprocess is killed, then
+    :py:exc:`asyncio.CancelledError` is re-raised
+
+    :param cmd: command to run in a subprocess
+    :type cmd: collections.abc.Sequence[str]
+    :param cwd: Default None
+    :type cwd: pathlib.Path | None
+    :param env:
+
+       Default None. Expecting an :py:class:`os._Environ` or a mapping,
+       e.g. a modified copy of it
+
+    :type env: typing.Any | None
+    :param wall: Default None. Wall-clock seconds budget. None for no limit
+    :type wall: typing.Any | None
+    :param cpu: Default None. CPU seconds budget. None for no limit
+    :type cpu: typing.Any | None
+    :returns: log messages, exception messages, return code, subprocess failure message
+    :rtype: tuple[str | None, str | None, int | None, str | None]
+    :raises:
+
+        - :py:exc:`TypeError` -- Unsupported type for 1st arg cmd
+
+    """
+    cmd_2 = _split_cmd(cmd)
+    path_cwd, opt_env = _cwd_env(cwd, env)
+    int_wall = _check_budget(wall)
+    int_cpu = _check_budget(cpu)
+    is_budget = int_wall is not None or int_cpu is not None
+
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd_2,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
             cwd=path_cwd,
             env=opt_env,
-            text=True,
+            start_new_session=is_budget,
         )
     except OSError as e:
-        # e.g. cmd=("bin/true",)
         str_err = str(f"{e.strerror} {e.filename}")
         ret = (None, None, None, str_err)
-    except (
-        subprocess.CalledProcessError,
-        subprocess.TimeoutExpired,
-    ) as e:  # pragma: no cover
-        """setuptools-scm requires at least one commit. Could not get
-        semantic version"""
-        # DO NOT USE proc.stdout, differing meaning
-        str_err = str(e.stderr)
-        str_out = None
-        exit_code = None
-        ret = (str_out, None, exit_code, str_err)
     else:
-        # warning level log messages bleed to stdout
-        str_out = proc.stdout
-        str_err = proc.stderr
-        is_empty_stdout = str_out is None or len(str_out.rstrip()) == 0
-        is_empty_stderr = str_err is None or len(str_err.rstrip()) == 0
-
-        if is_empty_stdout:
-            str_out = None
-        else:
-            str_out = str_out.rstrip()
+        limit_cpu(proc.pid, int_cpu)
+        time_start = time.monotonic()
+        str_exc = None
+        # asyncio.wait does not cancel communicate. On cancel, still collect output
+        fut_communicate = asyncio.ensure_future(proc.communicate())
+        try:
+            while not fut_communicate.done():
+                step = _budget_step(time_start, int_wall, is_budget)
+                await asyncio.wait((fut_communicate,), timeout=step)
+                if not fut_communicate.done():
+                    str_exc = _budget_check(proc, time_start, int_wall, is_budget)
+                else:  # pragma: no cover
+                    pass
+        except asyncio.CancelledError:
+            # Do not leave an orphan subprocess
+            if is_budget:
+                kill_process_group(proc)
+            elif proc.returncode is None:  # pragma: no branch
+                proc.kill()
+            await asyncio.shield(fut_communicate)
+            raise
+        bytes_out, bytes_err = fut_communicate.result()
 
-        # Exception details written to stderr
-        if is_empty_stderr:
-            str_err = None
-        else:
-            str_err = str_err.rstrip()
+        if str_exc is None and is_cpu_exceeded(proc.returncode, int_cpu):
+            str_exc = budget_msg("cpu", int_cpu)
+        else:  # pragma: no cover
+            pass
 
-        # str_out is only Warning level log messages
-        ret = (str_out, str_err, proc.returncode, None)
+        str_out = _output_or_none(bytes_out.decode())
+        str_err = _output_or_none(bytes_err.decode())
+        if str_exc is None:
+            ret = (str_out, str_err, proc.returncode, None)
+        else:
+            ret = (str_out, str_err, None, str_exc)
 
     return ret
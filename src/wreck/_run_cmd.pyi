@@ -1,11 +1,107 @@
+import asyncio
 import os
-from collections.abc import Sequence
+import resource
+import subprocess
+import threading
+from collections.abc import (
+    Mapping,
+    Sequence,
+)
 from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Final,
+)
 
-__all__ = ("run_cmd",)
+__all__ = (
+    "BUDGET_EXCEEDED",
+    "CANCELLED",
+    "arun_cmd",
+    "budget_msg",
+    "is_cpu_exceeded",
+    "kill_process_group",
+    "limit_cpu",
+    "run_cmd",
+    "run_cmd_rusage",
+    "rusage_dict",
+)
 
+BUDGET_EXCEEDED: Final[str]
+CANCELLED: Final[str]
+_BUDGET_POLL: Final[float]
+
+def _split_cmd(cmd: Sequence[str]) -> list[str]: ...
+def _cwd_env(cwd: Any, env: Any) -> tuple[Path, Mapping[str, str] | None]: ...
+def _output_or_none(str_out: str | None) -> str | None: ...
+def budget_msg(kind: str, seconds: int | None) -> str: ...
+def _check_budget(seconds: Any) -> int | None: ...
+def _budget_step(
+    time_start: float,
+    wall: int | None,
+    is_budget: bool,
+) -> float | None: ...
+def rusage_dict(ru: resource.struct_rusage) -> dict[str, float | int]: ...
+def _read_pipe(
+    stream: IO[str],
+    outputs: list[str | None],
+    idx: int,
+) -> None: ...
+def _start_readers(
+    proc: subprocess.Popen[str],
+) -> tuple[list[threading.Thread], list[str | None]]: ...
+def _is_finished(
+    proc: subprocess.Popen[str],
+    threads: Sequence[threading.Thread],
+    timeout: float | None,
+    is_budget: bool,
+) -> bool: ...
+def _wait_rusage(proc: subprocess.Popen[str]) -> dict[str, float | int] | None: ...
+def _has_exited(
+    proc: subprocess.Popen[str] | asyncio.subprocess.Process,
+) -> bool: ...
+def _budget_check(
+    proc: subprocess.Popen[str] | asyncio.subprocess.Process,
+    time_start: float,
+    wall: int | None,
+    is_budget: bool,
+    cancel: threading.Event | None = None,
+) -> str | None: ...
+def limit_cpu(pid: int, cpu: int | None) -> None: ...
+def is_cpu_exceeded(
+    returncode: int | None,
+    cpu: int | None,
+    rusage: Mapping[str, float | int] | None = None,
+) -> bool: ...
+def kill_process_group(
+    proc: subprocess.Popen[str] | asyncio.subprocess.Process,
+) -> None: ...
 def run_cmd(
     cmd: Sequence[str],
     cwd: Path | None = None,
-    env: os._Environ[str] | None = None,
+    env: os._Environ[str] | Mapping[str, str] | None = None,
+    wall: Any | None = None,
+    cpu: Any | None = None,
+    cancel: threading.Event | None = None,
+) -> tuple[str | None, str | None, int | None, str | None]: ...
+def run_cmd_rusage(
+    cmd: Sequence[str],
+    cwd: Path | None = None,
+    env: os._Environ[str] | Mapping[str, str] | None = None,
+    wall: Any | None = None,
+    cpu: Any | None = None,
+    cancel: threading.Event | None = None,
+) -> tuple[
+    str | None,
+    str | None,
+    int | None,
+    str | None,
+    dict[str, float | int] | None,
+]: ...
+async def arun_cmd(
+    cmd: Sequence[str],
+    cwd: Path | None = None,
+    env: os._Environ[str] | Mapping[str, str] | None = None,
+    wall: Any | None = None,
+    cpu: Any | None = None,
 ) -> tuple[str | None, str | None, int | None, str | None]: ...
@@ -3,11 +3,17 @@
 
 Portions of a Path take into account platform must be dealt withpSafely deal with paths.
 
+.. py:data:: PYVENV_CFG
+   :type: str
+   :value: "pyvenv.cfg"
+
+   Within venv folder, file recording the base interpreter and it's version
+
 .. py:data:: __all__
-   :type: tuple[str, str, str, str, str, str, str, str]
-   :value: ("fix_relpath", "is_linux", "is_macos", "is_win", \
-   "replace_suffixes", "resolve_path", "resolve_joinpath", \
-   "get_venv_python_abspath")
+   :type: tuple[str, str, str, str, str, str, str, str, str, str]
+   :value: ("PYVENV_CFG", "fix_relpath", "is_linux", "is_macos", \
+   "is_win", "replace_suffixes", "resolve_path", "resolve_joinpath", \
+   "get_venv_python_abspath", "read_pyvenv_cfg")
 
    Module exports
 
@@ -23,7 +29,10 @@ from pathlib import (
 )
 from typing import cast
 
+PYVENV_CFG = "pyvenv.cfg"
+
 __all__ = (
+    "PYVENV_CFG",
     "fix_relpath",
     "is_linux",
     "is_macos",
@@ -32,6 +41,7 @@ __all__ = (
     "resolve_path",
     "resolve_joinpath",
     "get_venv_python_abspath",
+    "read_pyvenv_cfg",
 )
 
 
@@ -176,6 +186,57 @@ def replace_suffixes(abspath_a, suffixes):
     return ret
 
 
+def read_pyvenv_cfg(abspath_venv):
+    """Read a venv's ``pyvenv.cfg``. ``key = value`` lines.
+
+    :param abspath_venv: venv folder absolute path
+    :type abspath_venv: pathlib.Path
+    :returns: key, lower case --> value. Empty if no ``pyvenv.cfg``
+    :rtype: dict[str, str]
+    """
+    try:
+        contents = Path(abspath_venv).joinpath(PYVENV_CFG).read_text()
+    except (OSError, UnicodeDecodeError):
+        contents = ""
+
+    ret = {}
+    for line in contents.splitlines():
+        key, sep, val = line.partition("=")
+        if len(sep) != 0:
+            ret[key.strip().lower()] = val.strip()
+        else:  # pragma: no cover
+            pass
+
+    return ret
+
+
+def _venv_python_candidates(abspath_venv):
+    """Posix style relative paths to the venv python executable, most
+    likely first. Interpreter version, from ``pyvenv.cfg``, adds
+    versioned names e.g. ``bin/python3.12``
+
+    :param abspath_venv: venv folder absolute path
+    :type abspath_venv: pathlib.Path
+    :returns: relative paths
+    :rtype: list[str]
+    """
+    d_cfg = read_pyvenv_cfg(abspath_venv)
+    # 3.11+ version_info. Earlier, version
+    str_version = d_cfg.get("version_info", d_cfg.get("version", ""))
+    major_minor = ".".join(str_version.split(".")[:2])
+
+    if is_win():  # pragma: no cover
+        ret = ["Scripts/python.exe"]
+    else:  # pragma: no cover
+        ret = ["bin/python", "bin/python3"]
+        if len(major_minor) != 0:
+            ret.append(f"bin/python{major_minor}")
+        else:  # pragma: no cover
+            pass
+
+    return ret
+
+
 def get_venv_python_abspath(path_cwd, venv_relpath):
     """Within the package base folder, venv(s) should have been created
     within subfolder(s).
@@ -183,6 +244,9 @@ def get_venv_python_abspath(path_cwd, venv_relpath):
     Given the package base folder and the venv relative path, get the
     platform specific python executable absolute path
 
+    ``bin/python``, else ``bin/python3``, else the versioned name from
+    the venv's ``pyvenv.cfg``. If none exist, ``bin/python``
+
     :param path_cwd: package base folder absolute path
     :type path_cwd: pathlib.Path | pathlib.PurePath
     :param venv_relpath:
@@ -211,16 +275,6 @@ def get_venv_python_abspath(path_cwd, venv_relpath):
     else:  # pragma: no cover
         pass
 
-    """Guessing path to python executable.
-    :code:`sys.executable` or :code:`sys._base_executable` are for the
-    current venv. Which is unhelpful.
-    """
-    if is_win():  # pragma: no cover
-        # Should be posix path. Even for Windows
-        binary_posix_relpath = "Scripts/python.exe"
-    else:  # pragma: no cover
-        binary_posix_relpath = "bin/python"
-
     abspath_venv = cast("Path", resolve_joinpath(path_cwd, venv_relpath))
     is_venv_folder_exists = not abspath_venv.exists() and not abspath_venv.is_dir()
 
@@ -231,12 +285,17 @@ def get_venv_python_abspath(path_cwd, venv_relpath):
         reason = "venv relative path did not find a folder containing a venv"
         raise NotADirectoryError(reason)
     else:
-        abspath_venv_python = cast(
-            "Path",
-            resolve_joinpath(
-                abspath_venv,
-                binary_posix_relpath,
-            ),
+        """:code:`sys.executable` or :code:`sys._base_executable` are
+        for the current venv. Which is unhelpful. First which exists,
+        otherwise the most likely. Should be posix path. Even for Windows
+        """
+        abspaths = [
+            cast("Path", resolve_joinpath(abspath_venv, binary_posix_relpath))
+            for binary_posix_relpath in _venv_python_candidates(abspath_venv)
+        ]
+        abspath_venv_python = next(
+            (abspath_f for abspath_f in abspaths if abspath_f.is_file()),
+            abspaths[0],
         )
         venv_python_abspath = str(abspath_venv_python)
 
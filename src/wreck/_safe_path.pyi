@@ -4,8 +4,12 @@ from pathlib import (
     PurePosixPath,
     PureWindowsPath,
 )
+from typing import Final
+
+PYVENV_CFG: Final[str]
 
 __all__ = (
+    "PYVENV_CFG",
     "fix_relpath",
     "is_linux",
     "is_macos",
@@ -14,6 +18,7 @@ __all__ = (
     "resolve_path",
     "resolve_joinpath",
     "get_venv_python_abspath",
+    "read_pyvenv_cfg",
 )
 
 def is_linux() -> bool: ...
@@ -36,3 +41,5 @@ def get_venv_python_abspath(
     path_cwd: Path | PurePath,
     venv_relpath: str,
 ) -> str: ...
+def read_pyvenv_cfg(abspath_venv: Path) -> dict[str, str]: ...
+def _venv_python_candidates(abspath_venv: Path) -> list[str]: ...
@@ -7,6 +7,7 @@ Commands:
 
 - fix
 - unlock
+- stats
 
 Has pep366 support, without installing the package, can call the
 source code, as long has has required dependencies installed
@@ -108,14 +109,28 @@ else:
 
 # pep366 ...done
 
+from ._run_cmd import CANCELLED
 from .constants import g_app_name
 from .exceptions import MissingRequirementsFoldersFiles
+from .lock_autojobs import JOBS_AUTO
+from .lock_backend import BACKENDS
 from .lock_collections import unlock_compile
 from .lock_compile import (
+    is_budget_exceeded,
+    is_cancelled,
     is_timeout,
     lock_compile,
 )
 from .lock_fixing import Fixing
+from .lock_interpreter import (
+    MarkerCache,
+    venv_interpreters,
+)
+from .lock_parse import (
+    ParseStore,
+    set_parse_store,
+)
+from .lock_telemetry import CompileTelemetry
 from .pep518_venvs import VenvMapLoader
 
 # Use package logger, not module logger
@@ -126,9 +141,81 @@ _logger = logging.getLogger(g_logger_dotted_path)
 # taken from pyproject.toml
 entrypoint_name = "reqs"  # noqa: F401
 
+
+class JobsParamType(click.ParamType):
+    """``--jobs`` value. A positive int or ``auto``"""
+
+    name = "jobs"
+
+    def convert(self, value, param, ctx):
+        """From the command line or the default.
+
+        :param value: Could be anything
+        :type value: typing.Any
+        :param param: the option
+        :type param: click.Parameter | None
+        :param ctx: click context
+        :type ctx: click.Context | None
+        :returns: positive int or ``auto``
+        :rtype: int | str
+        """
+        if value == JOBS_AUTO:
+            ret = value
+        else:
+            try:
+                ret = int(value)
+            except (TypeError, ValueError):
+                ret = 0
+            if ret < 1:
+                msg_fail = f"{value!r} is neither a positive int nor {JOBS_AUTO}"
+                self.fail(msg_fail, param, ctx)
+            else:  # pragma: no cover
+                pass
+
+        return ret
+
+
 help_path = "The root directory [default: pyproject.toml directory]"
 help_venv_path = "Limit call to one venv. Supply posix style relative path"
+help_all_venvs = (
+    "All venvs in one go. Grouped by python interpreter version. "
+    "Groups compile at once, each venv with it's own python interpreter"
+)
 help_timeout = "Web connection time out in seconds"
+help_jobs = (
+    "Maximum number of pip-compile subprocesses running at once. auto sizes "
+    "from CPU count, available memory and per job max RSS, then adjusts"
+)
+help_cache = (
+    "Skip pip-compile when a .lock inputs are unchanged. Reuse parse results "
+    "of unchanged requirements files. Cache in .wreck_cache"
+)
+help_backend = "Compile backend. Overrides [tool.wreck] backend. Default pip-compile"
+help_wall_budget = (
+    "Per job wall-clock seconds. Exceeding kills the job. Overrides "
+    "[tool.wreck] wall_budget"
+)
+help_cpu_budget = (
+    "Per job CPU seconds. Exceeding kills the job. Linux only. Overrides "
+    "[tool.wreck] cpu_budget"
+)
+help_retries = (
+    "Jobs failing to connect to the package index are retried, with backoff, "
+    "at most this many times. Overrides [tool.wreck] retries. Default 3"
+)
+help_unified = (
+    "Per venv, resolve all .in files in one run then split into .lock "
+    "files. Overrides [tool.wreck] unified. Default off"
+)
+help_warm_start = (
+    "Seed the resolver with existing .lock pins, of the venv, as preferred "
+    "versions. If that fails, resolve cold. Overrides [tool.wreck] "
+    "warm_start. Default off"
+)
+help_fail_fast = (
+    "On the first failure, skip jobs not yet started and kill running "
+    "pip-compile. Overrides [tool.wreck] fail_fast. Default off"
+)
 help_is_dry_run = "Do not apply changes, merely report what would have occurred"
 help_show_unresolvables = (
     "Show unresolvable dependency conflicts. Needs manual intervention"
@@ -137,6 +224,7 @@ help_show_fixed = "Show fixed dependency issues"
 help_show_resolvable_shared = (
     "Show shared resolvable dependency conflicts. Needs manual intervention"
 )
+help_stats_limit = "How many of the slowest .in files to show. Default 10"
 help_verbose = "For main logger, increase logging granularity"
 
 EPILOG_FIX_V2 = """
@@ -144,7 +232,7 @@ EXIT CODES
 
 0 -- Evidently sufficient effort put into unittesting. Job well done, beer on me!
 
-1 -- Failures occurred. failed compiles report onto stderr
+1 -- Failures occurred. failed compiles report onto stderr. With --fail-fast, also skipped jobs
 
 2 -- entrypoint incorrect usage
 
@@ -152,21 +240,24 @@ EXIT CODES
 
 4 -- pyproject.toml config file parse issue. Expecting [[tool.wreck.venvs]] sections
 
-5 -- package pip-tools is required to lock package dependencies. Install it
+5 -- compile backend, pip-tools or uv, is required to lock package dependencies. Install it
 
 6 -- Missing some .in files. Support file(s) not checked
 
 7 -- venv base folder does not exist. Create it
 
-8 -- expecting [[tool.wreck.venvs]] field reqs to be a sequence
+8 -- expecting [[tool.wreck.venvs]] field reqs to be a sequence. Or no such [tool.wreck] backend
 
 9 -- No such venv found
 
-10 -- timeout occurred. Check web connection
+10 -- timeout occurred, even after retries. Check web connection. Compiled .lock files are kept
 
 11 -- YAML validation unsuccessful for either registry or logging config YAML file
 
-12 -- venv relpath not provided. Be conscious of venv and python interpreter version
+12 -- venv relpath not provided. Be conscious of venv and python interpreter version.
+Or choose --all-venvs, which compiles each venv with it's own python interpreter
+
+13 -- job(s) exceeded wall-clock or CPU budget and were killed. Other jobs completed
 
 """
 
@@ -192,6 +283,20 @@ EXIT CODES
 """
 
 
+EPILOG_STATS = """
+EXIT CODES
+
+0 -- Evidently sufficient effort put into unittesting. Job well done, beer on me!
+
+2 -- entrypoint incorrect usage
+
+3 -- path given for config file reverse search cannot find a pyproject.toml file
+
+4 -- pyproject.toml config file parse issue. Expecting [[tool.wreck.venvs]] sections
+
+"""
+
+
 def present_results(
     fcn,
     venv_relpath,
@@ -299,6 +404,14 @@ def main():
     default=None,
     help=help_venv_path,
 )
+@click.option(
+    "-a",
+    "--all-venvs",
+    "all_venvs",
+    default=False,
+    is_flag=True,
+    help=help_all_venvs,
+)
 @click.option(
     "-t",
     "--timeout",
@@ -306,6 +419,66 @@ def main():
     type=click.INT,
     help=help_timeout,
 )
+@click.option(
+    "-j",
+    "--jobs",
+    default=1,
+    type=JobsParamType(),
+    help=help_jobs,
+)
+@click.option(
+    "--cache / --no-cache",
+    "use_cache",
+    default=True,
+    help=help_cache,
+    is_flag=True,
+)
+@click.option(
+    "--backend",
+    "backend",
+    default=None,
+    type=click.Choice(sorted(BACKENDS.keys())),
+    help=help_backend,
+)
+@click.option(
+    "--wall-budget",
+    "wall_budget",
+    default=None,
+    type=click.IntRange(min=1),
+    help=help_wall_budget,
+)
+@click.option(
+    "--cpu-budget",
+    "cpu_budget",
+    default=None,
+    type=click.IntRange(min=1),
+    help=help_cpu_budget,
+)
+@click.option(
+    "--retries",
+    "retries",
+    default=None,
+    type=click.IntRange(min=0),
+    help=help_retries,
+)
+@click.option(
+    "--unified / --no-unified",
+    "unified",
+    default=None,
+    help=help_unified,
+)
+@click.option(
+    "--warm-start / --no-warm-start",
+    "warm_start",
+    default=None,
+    help=help_warm_start,
+)
+@click.option(
+    "--fail-fast / --no-fail-fast",
+    "fail_fast",
+    default=None,
+    help=help_fail_fast,
+)
 @click.option(
     "--show-unresolvables / --hide-unresolvables",
     "show_unresolvables",
@@ -336,7 +509,17 @@ def main():
 def requirements_fix_v2(
     path,
     venv_relpath,
+    all_venvs,
     timeout,
+    jobs,
+    use_cache,
+    backend,
+    wall_budget,
+    cpu_budget,
+    retries,
+    unified,
+    warm_start,
+    fail_fast,
     show_unresolvables,
     show_fixed,
     show_resolvable_shared,
@@ -379,11 +562,15 @@ def requirements_fix_v2(
 
     Usage
 
-    reqs fix
+    reqs fix --venv-relpath='.venv'
 
     or
 
-    python src/wreck/cli_dependencies.py fix
+    reqs fix --all-venvs --jobs=4
+
+    or
+
+    python src/wreck/cli_dependencies.py fix --venv-relpath='.venv'
 
     \f
 
@@ -394,8 +581,81 @@ def requirements_fix_v2(
     :type path: pathlib.Path
     :param venv_relpath: Filter by venv relative path
     :type venv_relpath: pathlib.Path
+    :param all_venvs:
+
+       Default False. All venvs in one invocation. venvs are grouped by
+       python interpreter version. Each group has it's own worker pool.
+       Groups compile at once, together at most ``jobs`` workers. Each
+       venv's python interpreter is passed to pip. Results are grouped
+       by venv
+
+    :type all_venvs: bool
     :param timeout: Default 15. Web connection time out in seconds
     :type timeout: int
+    :param jobs:
+
+       Default 1. Maximum number of pip-compile subprocesses running at
+       once. ``auto`` sizes from CPU count, available memory and per
+       job max RSS, then adjusts while compiling
+
+    :type jobs: int | str
+    :param use_cache:
+
+       Default True. Skip pip-compile when none of a ``.lock`` inputs
+       changed. Compile cache is within ``.wreck_cache/compile`` folder.
+       Reuse parse results of unchanged requirements files, within
+       ``.wreck_cache/parse`` folder
+
+    :type use_cache: bool
+    :param backend:
+
+       Default None. Compile backend name. None for ``[tool.wreck]``
+       field ``backend``, if absent ``pip-compile``. ``uv`` does not
+       require pip-tools
+
+    :type backend: str | None
+    :param wall_budget:
+
+       Default None. Per job wall-clock seconds. None for
+       ``[tool.wreck]`` field ``wall_budget``, if absent unlimited
+
+    :type wall_budget: int | None
+    :param cpu_budget:
+
+       Default None. Per job CPU seconds. Linux only. None for
+       ``[tool.wreck]`` field ``cpu_budget``, if absent unlimited
+
+    :type cpu_budget: int | None
+    :param retries:
+
+       Default None. Jobs which failed to connect to the package index
+       are retried, with exponential backoff, at most this many times.
+       None for ``[tool.wreck]`` field ``retries``, if absent 3
+
+    :type retries: int | None
+    :param unified:
+
+       Default None. Per venv, resolve all ``.in`` files in one resolver
+       run, then split into per ``.in`` ``.lock`` files. None for
+       ``[tool.wreck]`` field ``unified``, if absent False
+
+    :type unified: bool | None
+    :param warm_start:
+
+       Default None. Seed the resolver with the existing ``.lock``, and
+       the venv's other ``.lock`` pins, as preferred versions. If that
+       resolve fails, resolve cold. None for ``[tool.wreck]`` field
+       ``warm_start``, if absent False
+
+    :type warm_start: bool | None
+    :param fail_fast:
+
+       Default None. On the first failure, other than a connection
+       error, jobs not yet started are skipped and running pip-compile
+       are killed. Skipped jobs are reported. None for ``[tool.wreck]``
+       field ``fail_fast``, if absent False
+
+    :type fail_fast: bool | None
     :param show_unresolvables: Default True. Report unresolvable dependency conflicts
     :type show_unresolvables: bool
     :param show_fixed: Default True. Report fixed issues
@@ -414,13 +674,20 @@ def requirements_fix_v2(
 
     # Running all venv with the same python interpreter is a bad idea
     # lock_compile allows, but Fixing.fix_requirements_lock and present_results does not
-    if venv_relpath is None:  # pragma: no branch
+    if venv_relpath is None and not all_venvs:  # pragma: no branch
         msg_warn = (
             "venv relpath not provided. Be conscious of venv and python "
-            "interpreter version"
+            "interpreter version. Or choose --all-venvs, which compiles "
+            "each venv with it's own python interpreter"
         )
         fcn(msg_warn, fg="red", err=True)
         sys.exit(12)
+    elif venv_relpath is not None and all_venvs:
+        msg_warn = "Choose either --venv-relpath or --all-venvs, not both"
+        fcn(msg_warn, fg="red", err=True)
+        sys.exit(2)
+    else:  # pragma: no cover
+        pass
 
     _genre = "mp"
     _flavor = "asz"
@@ -492,90 +759,181 @@ def requirements_fix_v2(
         msg_info = f"{dotted_path} loader.project_base {loader.project_base}"
         _logger.info(msg_info)
 
-    # compile .lock files
-    try:
-        t_status = lock_compile(loader, venv_relpath, timeout)
-    except (MissingRequirementsFoldersFiles, AssertionError) as exc:
-        # Careful MissingRequirementsFoldersFiles is a subclass of AssertionError
-        # Missing ``.in`` files. Support file(s) not checked
-        if isinstance(exc, MissingRequirementsFoldersFiles):
-            fcn(str(exc), fg="red", err=True)
-            sys.exit(6)
-        else:
-            msg_exc = (
-                "pip-tools is required to lock package dependencies. Install "
-                f"it. {traceback.format_exc()}"
-            )
-            # raise click.ClickException(msg_exc)
-            fcn(msg_exc, fg="red", err=True)
-            sys.exit(5)
-    except NotADirectoryError as exc:
-        # venv folder needs to exist
-        fcn(str(exc), fg="red", err=True)
-        sys.exit(7)
-    except ValueError as exc:
-        # expecting ``[[tool.wreck.venvs]]`` field reqs to be a sequence
-        fcn(str(exc), fg="red", err=True)
-        sys.exit(8)
-    except KeyError as exc:
-        # No such venv found
-        fcn(str(exc), fg="red", err=True)
-        sys.exit(9)
-
-    is_tuple_two_items = (
-        t_status is not None and isinstance(t_status, tuple) and len(t_status) == 2
-    )
-    assert is_tuple_two_items
-    t_compiled, t_failures = t_status
-    assert isinstance(t_failures, Iterable)
-    assert isinstance(t_compiled, tuple)
-    if is_timeout(t_failures):  # pyright: ignore[reportArgumentType]
-        fcn("Timeout occurred. Check web connection", err=True)
-        sys.exit(10)
+    if all_venvs:
+        venv_relpaths = loader.venv_relpaths
     else:
-        is_failures = len(t_failures) != 0
-        if is_failures:
-            """To cause a failure, an ``.in`` would have to: be
-            wrong file format or contain invalid entries"""
-            fcn(f"failures {t_failures}", err=True)
-            sys.exit(1)
-        else:  # pragma: no cover
-            # 2nd pass. Fixes locked, creates unlock, fixes unlock
-            try:
-                fixing = Fixing.fix_requirements_lock(loader, venv_relpath)
-            except MissingRequirementsFoldersFiles as exc:
-                fcn(str(exc), fg="red", err=True)
-                sys.exit(6)
+        venv_relpaths = [venv_relpath]
 
-            """Present results.
+    # Parse results of unchanged requirements files, reused across runs
+    # Process wide. --no-cache, none, even if an earlier call set one
+    if use_cache is not False:
+        parse_store = ParseStore.from_loader(loader)
+    else:
+        parse_store = None
+    set_parse_store(parse_store)
 
-            Only deals with one venv at a time cuz environments and venv
-            required python interpreter version could and most likely will differ
-            """
-            lock_msgs_for_venv = fixing._out_lock_messages.fixed_issues
-            lock_unresolvables_for_venv = fixing._out_lock_messages.unresolvables
-            lock_applies_to_shared_for_venv = (
-                fixing._out_lock_messages.resolvable_shared
-            )
-            unlock_msgs_for_venv = fixing._out_unlock_messages.fixed_issues
-            unlock_applies_to_shared_for_venv = (
-                fixing._out_unlock_messages.resolvable_shared
+    try:
+        # Per (venv, .lock), retry count
+        d_retries = {}
+
+        def on_retry(venv_relpath_tmp, lock_abspath, attempt, delay):
+            """Report each retry as it's scheduled."""
+            d_retries[(venv_relpath_tmp, lock_abspath)] = attempt
+            fcn(
+                f"Retry {attempt} in {delay}s ({venv_relpath_tmp}) {lock_abspath}",
+                err=True,
             )
 
-            present_results(
-                fcn,
+        # compile .lock files. all_venvs --> venv_relpath None --> all venvs
+        try:
+            t_status = lock_compile(
+                loader,
                 venv_relpath,
-                lock_msgs_for_venv,
-                lock_unresolvables_for_venv,
-                lock_applies_to_shared_for_venv,
-                unlock_msgs_for_venv,
-                unlock_applies_to_shared_for_venv,
-                show_unresolvables,
-                show_fixed,
-                show_resolvable_shared,
+                timeout,
+                jobs=jobs,
+                use_cache=use_cache,
+                backend=backend,
+                wall_budget=wall_budget,
+                cpu_budget=cpu_budget,
+                retries=retries,
+                on_retry=on_retry,
+                unified=unified,
+                warm_start=warm_start,
+                fail_fast=fail_fast,
             )
+        except (MissingRequirementsFoldersFiles, AssertionError) as exc:
+            # Careful MissingRequirementsFoldersFiles is a subclass of AssertionError
+            # Missing ``.in`` files. Support file(s) not checked
+            if isinstance(exc, MissingRequirementsFoldersFiles):
+                fcn(str(exc), fg="red", err=True)
+                sys.exit(6)
+            else:
+                msg_exc = (
+                    "Compile backend, pip-tools or uv, is required to lock package "
+                    f"dependencies. Install it. {traceback.format_exc()}"
+                )
+                # raise click.ClickException(msg_exc)
+                fcn(msg_exc, fg="red", err=True)
+                sys.exit(5)
+        except NotADirectoryError as exc:
+            # venv folder needs to exist
+            fcn(str(exc), fg="red", err=True)
+            sys.exit(7)
+        except ValueError as exc:
+            # expecting ``[[tool.wreck.venvs]]`` field reqs to be a sequence
+            # or no such ``[tool.wreck]`` backend
+            fcn(str(exc), fg="red", err=True)
+            sys.exit(8)
+        except KeyError as exc:
+            # No such venv found
+            fcn(str(exc), fg="red", err=True)
+            sys.exit(9)
 
-            sys.exit(0)
+        is_tuple_two_items = (
+            t_status is not None and isinstance(t_status, tuple) and len(t_status) == 2
+        )
+        assert is_tuple_two_items
+        t_compiled, t_failures = t_status
+        assert isinstance(t_failures, Iterable)
+        assert isinstance(t_compiled, tuple)
+        if len(d_retries) != 0:
+            msg_retries = (
+                f"Retried {len(d_retries)} job(s), {sum(d_retries.values())} "
+                f"retries. Compiled {len(t_compiled)}, failed {len(t_failures)}"
+            )
+            fcn(msg_retries, err=True)
+        else:  # pragma: no cover
+            pass
+
+        if is_timeout(t_failures):  # pyright: ignore[reportArgumentType]
+            fcn("Timeout occurred. Check web connection", err=True)
+            sys.exit(10)
+        elif is_budget_exceeded(t_failures):  # pyright: ignore[reportArgumentType]
+            fcn(f"Budget exceeded. Job(s) killed {t_failures}", err=True)
+            sys.exit(13)
+        else:
+            is_failures = len(t_failures) != 0
+            if is_failures:
+                """To cause a failure, an ``.in`` would have to: be
+                wrong file format or contain invalid entries"""
+                if is_cancelled(t_failures):
+                    # fail-fast. Report skipped jobs apart from the cause
+                    t_cancelled = tuple(
+                        t_three
+                        for t_three in t_failures
+                        if str(t_three[2]).startswith(CANCELLED)
+                    )
+                    t_failures = tuple(
+                        t_three for t_three in t_failures if t_three not in t_cancelled
+                    )
+                    fcn(f"fail-fast. Skipped {len(t_cancelled)} job(s)", err=True)
+                    for venv_relpath_tmp, abspath_lock, _ in t_cancelled:
+                        fcn(f"  ({venv_relpath_tmp}) {abspath_lock!s}", err=True)
+                else:  # pragma: no cover
+                    pass
+                fcn(f"failures {t_failures}", err=True)
+                sys.exit(1)
+            else:  # pragma: no cover
+                """2nd pass. Fixes locked, creates unlock, fixes unlock.
+
+                One venv at a time. venvs share ``.shared`` requirements files
+                and fixing rewrites files in place. Fixing is in-process and
+                bound by the GIL, the pip-compile subprocesses are not
+                """
+                # Markers cached by lock_compile. No interpreter is started
+                interpreters = venv_interpreters(
+                    loader.project_base,
+                    venv_relpaths,
+                    marker_cache=MarkerCache.from_loader(loader),
+                )
+                for venv_relpath_tmp in venv_relpaths:
+                    interpreter = interpreters[venv_relpath_tmp]
+                    fcn(f"({venv_relpath_tmp}) {interpreter.describe()}", err=True)
+                    try:
+                        fixing = Fixing.fix_requirements_lock(loader, venv_relpath_tmp)
+                    except MissingRequirementsFoldersFiles as exc:
+                        fcn(str(exc), fg="red", err=True)
+                        sys.exit(6)
+
+                    """Present results.
+
+                    Only deals with one venv at a time cuz environments and venv
+                    required python interpreter version could and most likely will differ
+                    """
+                    lock_msgs_for_venv = fixing._out_lock_messages.fixed_issues
+                    lock_unresolvables_for_venv = (
+                        fixing._out_lock_messages.unresolvables
+                    )
+                    lock_applies_to_shared_for_venv = (
+                        fixing._out_lock_messages.resolvable_shared
+                    )
+                    unlock_msgs_for_venv = fixing._out_unlock_messages.fixed_issues
+                    unlock_applies_to_shared_for_venv = (
+                        fixing._out_unlock_messages.resolvable_shared
+                    )
+
+                    present_results(
+                        fcn,
+                        venv_relpath_tmp,
+                        lock_msgs_for_venv,
+                        lock_unresolvables_for_venv,
+                        lock_applies_to_shared_for_venv,
+                        unlock_msgs_for_venv,
+                        unlock_applies_to_shared_for_venv,
+                        show_unresolvables,
+                        show_fixed,
+                        show_resolvable_shared,
+                    )
+
+                if parse_store is not None:
+                    parse_store.evict()
+                else:  # pragma: no cover
+                    pass
+
+                sys.exit(0)
+    finally:
+        # In-process callers. Store not left behind
+        set_parse_store(None)
 
 
 @main.command(
@@ -673,5 +1031,114 @@ def requirements_unlock(path, venv_relpath):
         sys.exit(0)
 
 
+@main.command(
+    "stats",
+    context_settings={"ignore_unknown_options": True},
+    epilog=EPILOG_STATS,
+)
+@click.option(
+    "-p",
+    "--path",
+    default=Path.cwd(),
+    type=click.Path(
+        exists=False,
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+        path_type=Path,
+    ),
+    help=help_path,
+)
+@click.option(
+    "-e",
+    "--venv-relpath",
+    default=None,
+    help=help_venv_path,
+)
+@click.option(
+    "-n",
+    "--limit",
+    "limit",
+    default=10,
+    type=click.IntRange(min=1),
+    help=help_stats_limit,
+)
+def requirements_stats(path, venv_relpath, limit):
+    """Slowest ``.in`` files to compile, from compile telemetry
+
+    Per ``.in``, the most recent compile wall time versus the mean of
+    earlier runs. Then user and system CPU seconds, max RSS, and
+    seconds waiting on the package index limiter. Telemetry is recorded by :command:`reqs fix`
+
+    Usage
+
+    reqs stats
+
+    or
+
+    python src/wreck/cli_dependencies.py stats
+
+    \f
+
+    :param path:
+
+       The root directory [default: pyproject.toml directory]
+
+    :type path: pathlib.Path
+    :param venv_relpath: Filter by venv relative path
+    :type venv_relpath: str | None
+    :param limit: How many of the slowest ``.in`` files to show
+    :type limit: int
+    """
+    str_path = path.as_posix()
+
+    try:
+        loader = VenvMapLoader(str_path)
+    except FileNotFoundError:
+        # Couldn't find the pyproject.toml file
+        msg_exc = (
+            f"Reverse search lookup from {path!r} could not "
+            f"find a pyproject.toml file. {traceback.format_exc()}"
+        )
+        click.secho(msg_exc, fg="red", err=True)
+        sys.exit(3)
+    except LookupError:
+        msg_exc = (
+            "In pyproject.toml, expecting sections [[tool.wreck.venvs]]. Create them"
+        )
+        click.secho(msg_exc, fg="red", err=True)
+        sys.exit(4)
+
+    telemetry = CompileTelemetry.from_loader(loader)
+    stats = telemetry.slowest(limit=limit, venv_relpath=venv_relpath)
+    if len(stats) == 0:
+        click.secho("No compile telemetry recorded. Run reqs fix", err=True)
+    else:
+        header = (
+            f"{'venv':<16} {'file':<32} {'runs':>4} {'last s':>8} "
+            f"{'mean s':>8} {'trend':>7} {'user s':>8} {'sys s':>8} "
+            f"{'RSS MiB':>8} {'wait s':>8}"
+        )
+        click.echo(header)
+        for job_stats in stats:
+            mean = "-" if job_stats.wall_mean is None else f"{job_stats.wall_mean:.2f}"
+            trend = "-" if job_stats.trend is None else f"{job_stats.trend:+.0%}"
+            utime = "-" if job_stats.utime is None else f"{job_stats.utime:.2f}"
+            stime = "-" if job_stats.stime is None else f"{job_stats.stime:.2f}"
+            if job_stats.maxrss is None:
+                rss = "-"
+            else:
+                rss = f"{job_stats.maxrss / 1024:.1f}"
+            wait = "-" if job_stats.wait is None else f"{job_stats.wait:.2f}"
+            row = (
+                f"{job_stats.venv_relpath:<16} {job_stats.in_relpath:<32} "
+                f"{job_stats.runs:>4} {job_stats.wall:>8.2f} {mean:>8} "
+                f"{trend:>7} {utime:>8} {stime:>8} {rss:>8} {wait:>8}"
+            )
+            click.echo(row)
+
+    sys.exit(0)
+
+
 if __name__ == "__main__":  # pragma: no cover
     main()
@@ -1,7 +1,12 @@
 import logging
 from collections.abc import Callable
 from pathlib import Path
-from typing import Final
+from typing import (
+    Any,
+    Final,
+)
+
+import click
 
 from .lock_datum import PinDatum
 from .lock_discrepancy import (
@@ -16,17 +21,39 @@ is_module_debug: Final[bool]
 g_logger_dotted_path: Final[str]
 _logger: logging.Logger
 
+class JobsParamType(click.ParamType[int | str]):
+    name: str
+
+    def convert(
+        self,
+        value: Any,
+        param: click.Parameter | None,
+        ctx: click.Context | None,
+    ) -> int | str: ...
+
 help_path: Final[str]
 help_venv_path: Final[str]
+help_all_venvs: Final[str]
 help_timeout: Final[str]
+help_jobs: Final[str]
+help_cache: Final[str]
+help_backend: Final[str]
+help_wall_budget: Final[str]
+help_cpu_budget: Final[str]
+help_retries: Final[str]
+help_unified: Final[str]
+help_warm_start: Final[str]
+help_fail_fast: Final[str]
 help_is_dry_run: Final[str]
 help_show_unresolvables: Final[str]
 help_show_fixed: Final[str]
 help_show_resolvable_shared: Final[str]
+help_stats_limit: Final[str]
 help_verbose: Final[str]
 
 EPILOG_FIX_V2: Final[str]
 EPILOG_UNLOCK: Final[str]
+EPILOG_STATS: Final[str]
 
 def present_results(
     fcn: Callable[[str, dict[str, bool]], None],
@@ -44,7 +71,17 @@ def main() -> None: ...
 def requirements_fix_v2(
     path: Path,
     venv_relpath: str,
+    all_venvs: bool,
     timeout: int,
+    jobs: int | str,
+    use_cache: bool,
+    backend: str | None,
+    wall_budget: int | None,
+    cpu_budget: int | None,
+    retries: int | None,
+    unified: bool | None,
+    warm_start: bool | None,
+    fail_fast: bool | None,
     show_unresolvables: bool,
     show_fixed: bool,
     show_resolvable_shared: bool,
@@ -53,3 +90,8 @@ def requirements_unlock(
     path: Path,
     venv_relpath: str,
 ) -> None: ...
+def requirements_stats(
+    path: Path,
+    venv_relpath: str | None,
+    limit: int,
+) -> None: ...
@@ -0,0 +1,529 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+asyncio API. For embedding wreck within an event loop, e.g. a service.
+
+Same as :py:func:`wreck.lock_compile.lock_compile` then
+:py:meth:`wreck.lock_fixing.Fixing.fix_requirements_lock`, without
+blocking the event loop.
+
+- resolver subprocesses are :py:func:`asyncio.create_subprocess_exec`
+
+- per ``.lock`` results are yielded as each completes
+
+- cancelling kills running resolver subprocesses. Temp files removed.
+  Compile cache and manifest keep what completed
+
+- a job which failed to connect to the package index is retried after
+  a backoff. See :py:mod:`wreck.lock_retry`
+
+- longest predicted job starts first. See :py:mod:`wreck.lock_schedule`
+
+- compile wall time is recorded. asyncio reaps the resolver, so not
+  CPU or memory. See :py:mod:`wreck.lock_telemetry`
+
+- ``jobs="auto"`` is the start size only, not adjusted while
+  compiling. See :py:mod:`wreck.lock_autojobs`
+
+Cache keys, manifest reads and writes, ``.lock`` staging and the
+telemetry database are file I/O, so run in a thread, as is fixing.
+Cancelling waits for the current venv fix to finish
+
+.. code-block:: python
+
+   from wreck import afix
+   from wreck.pep518_venvs import VenvMapLoader
+
+   loader = VenvMapLoader("pyproject.toml")
+   t_compiled, t_failures, fixings = await afix(loader, ".venv", jobs=4)
+
+Stream results
+
+.. code-block:: python
+
+   from wreck import acompile
+
+   async for venv_relpath, lock_abspath, optabspath_lock, err_details, cache_status in acompile(
+       loader, None, jobs=4
+   ):
+       ...
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str]
+   :value: ("acompile", "afix")
+
+   Module exports
+
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+from .check_type import is_ok
+from .constants import g_app_name
+from .lock_compile import (
+    _check_jobs,
+    _check_timeout,
+    _compile_after,
+    _compile_before,
+    _gather_jobs,
+    _get_auto_jobs,
+    _get_backend,
+    _get_caches,
+    _get_telemetry,
+    _job_lookup,
+    _job_store,
+    _lock_compile_results,
+    _log_compile_start,
+    _log_retries,
+    _plan_jobs,
+    _record_telemetry,
+    _save_caches,
+)
+from .lock_fixing import Fixing
+from .lock_interpreter import venv_python
+from .lock_retry import (
+    RetryPolicy,
+    aretry_job,
+)
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_async")
+
+__all__ = (
+    "acompile",
+    "afix",
+)
+
+
+async def _acompile_one(
+    in_abspath,
+    lock_abspath,
+    path_cwd,
+    venv_relpath,
+    timeout,
+    backend,
+    telemetry=None,
+):
+    """Compile ``.in`` --> ``.lock``. Does not block the event loop.
+
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str
+    :param lock_abspath: output absolute path. Should have ``.lock`` last suffix
+    :type lock_abspath: str
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param venv_relpath: venv relative path
+    :type venv_relpath: str
+    :param timeout: web connection timeout in seconds
+    :type timeout: int
+    :param backend: Runs the resolver
+    :type backend: wreck.lock_backend.CompileBackend
+    :param telemetry: Default None. Records compile wall time. None disables
+    :type telemetry: wreck.lock_telemetry.CompileTelemetry | None
+    :returns:
+
+       On success, Path to ``.lock`` file otherwise None. 2nd is error
+       and exception details
+
+    :rtype: tuple[pathlib.Path | None, None | str]
+    """
+    venv_python_abspath = venv_python(path_cwd, venv_relpath)
+    _log_compile_start(in_abspath, lock_abspath, venv_relpath, backend)
+
+    # Shielded. Cancelled, the staging file is still removed
+    fut_before = asyncio.ensure_future(asyncio.to_thread(_compile_before, lock_abspath))
+    try:
+        staging_abspath, digest_old = await asyncio.shield(fut_before)
+    except asyncio.CancelledError:
+        staging_abspath, _ = await fut_before
+        os.unlink(staging_abspath)
+        raise
+
+    time_start = time.monotonic()
+    try:
+        t_ret = await backend.acompile(
+            in_abspath,
+            staging_abspath,
+            path_cwd,
+            venv_python_abspath,
+            timeout,
+        )
+    except asyncio.CancelledError:
+        # .lock untouched
+        os.unlink(staging_abspath)
+        raise
+
+    _record_telemetry(
+        telemetry,
+        path_cwd,
+        venv_relpath,
+        in_abspath,
+        backend,
+        time.monotonic() - time_start,
+        t_ret,
+    )
+    ret = await asyncio.to_thread(
+        _compile_after,
+        t_ret,
+        in_abspath,
+        lock_abspath,
+        path_cwd,
+        venv_relpath,
+        timeout,
+        backend,
+        staging_abspath,
+        digest_old,
+    )
+
+    return ret
+
+
+async def _alock_compile_job(
+    t_job,
+    path_cwd,
+    timeout,
+    path_locks,
+    semaphore,
+    cache=None,
+    manifest=None,
+    backend=None,
+    telemetry=None,
+):
+    """Compile one ``.in`` --> ``.lock`` pair. Same as
+    :py:func:`wreck.lock_compile._lock_compile_job`, within an event loop
+
+    :param t_job: venv relative path, ``.in`` and ``.lock`` absolute paths
+    :type t_job: tuple[str, str, str]
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param timeout: web connection timeout in seconds
+    :type timeout: int
+    :param path_locks: Per ``.lock`` file, a lock
+    :type path_locks: dict[str, asyncio.Lock]
+    :param semaphore: Limits jobs running at once
+    :type semaphore: asyncio.Semaphore
+    :param cache: Default None. None disables the compile cache
+    :type cache: wreck.lock_cache.CompileCache | None
+    :param manifest: Default None. None disables skipping up to date ``.lock``
+    :type manifest: wreck.lock_cache.CompileManifest | None
+    :param backend: Default None. Runs the resolver
+    :type backend: wreck.lock_backend.CompileBackend | None
+    :param telemetry: Default None. Records compile wall time. None disables
+    :type telemetry: wreck.lock_telemetry.CompileTelemetry | None
+    :returns:
+
+       venv relative path, ``.lock`` absolute path, ``.lock`` Path on
+       success otherwise None, error details, ``fresh`` ``hit`` or
+       ``miss`` or None if neither cache nor manifest applicable
+
+    :rtype: tuple[str, str, pathlib.Path | None, str | None, str | None]
+    """
+    venv_relpath, in_abspath, lock_abspath = t_job
+    async with semaphore, path_locks[lock_abspath]:
+        t_lookup = await asyncio.to_thread(
+            _job_lookup,
+            t_job,
+            path_cwd,
+            cache=cache,
+            manifest=manifest,
+            backend=backend,
+        )
+        is_compile, optabspath_lock, err_details, cache_status = t_lookup[:4]
+        if is_compile:
+            assert backend is not None
+            optabspath_lock, err_details = await _acompile_one(
+                in_abspath,
+                lock_abspath,
+                path_cwd,
+                venv_relpath,
+                timeout,
+                backend,
+                telemetry=telemetry,
+            )
+        else:  # pragma: no cover
+            pass
+
+        await asyncio.to_thread(
+            _job_store,
+            t_job,
+            path_cwd,
+            t_lookup,
+            optabspath_lock,
+            err_details,
+            cache=cache,
+            manifest=manifest,
+            backend=backend,
+        )
+
+    ret = (venv_relpath, lock_abspath, optabspath_lock, err_details, cache_status)
+
+    return ret
+
+
+async def _acompile(
+    loader,
+    venv_relpath,
+    timeout=15,
+    jobs=1,
+    use_cache=True,
+    backend=None,
+    wall_budget=None,
+    cpu_budget=None,
+    retries=None,
+    on_retry=None,
+):
+    """Run compile jobs. Yield each result, with it's submission
+    index, as it completes
+
+    For parameters See :py:func:`wreck.lock_async.acompile`
+
+    :returns: submission index and job result
+    :rtype: collections.abc.AsyncGenerator[tuple[int, tuple[str, str, pathlib.Path | None, str | None, str | None]], None]
+    """
+    dotted_path = f"{g_app_name}.lock_async._acompile"
+    compile_backend, _ = _get_backend(
+        loader,
+        backend,
+        wall_budget=wall_budget,
+        cpu_budget=cpu_budget,
+    )
+    int_timeout = _check_timeout(timeout)
+    path_cwd = loader.project_base
+    t_jobs = _gather_jobs(loader, venv_relpath)
+    path_locks = {t_job[2]: asyncio.Lock() for t_job in t_jobs}
+    cache, manifest = await asyncio.to_thread(_get_caches, loader, use_cache)
+    policy = RetryPolicy.from_loader(loader, retries=retries)
+    telemetry = _get_telemetry(loader)
+    # jobs auto. Start size only, not adjusted
+    auto = await asyncio.to_thread(_get_auto_jobs, jobs, len(t_jobs), telemetry, None)
+    int_jobs = _check_jobs(jobs) if auto is None else auto.limit
+    semaphore = asyncio.Semaphore(int_jobs)
+    schedule = await asyncio.to_thread(
+        _plan_jobs,
+        t_jobs,
+        path_cwd,
+        int_jobs,
+        telemetry,
+    )
+    results = {}
+    retry_counts = {}
+
+    async def indexed(idx, t_job):
+        """Result and which job it's from. Retry waits release the job slot"""
+
+        async def fcn_job():
+            """One attempt."""
+            ret = await _alock_compile_job(
+                t_job,
+                path_cwd,
+                int_timeout,
+                path_locks,
+                semaphore,
+                cache=cache,
+                manifest=manifest,
+                backend=compile_backend,
+                telemetry=telemetry,
+            )
+            return ret
+
+        t_result, retry_count = await aretry_job(fcn_job, policy, on_retry=on_retry)
+        results[idx] = t_result
+        if retry_count != 0:
+            retry_counts[idx] = retry_count
+        else:  # pragma: no cover
+            pass
+        return idx, t_result
+
+    # Longest job first. Semaphore is first come first served
+    time_start = time.monotonic()
+    with compile_backend:
+        tasks = [
+            asyncio.ensure_future(indexed(idx, t_jobs[idx])) for idx in schedule.order
+        ]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            # Cancelled or consumer stopped early. Kill what's running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            schedule.log_makespan(time.monotonic() - time_start)
+            await asyncio.to_thread(
+                _save_caches,
+                cache,
+                manifest,
+                telemetry=telemetry,
+            )
+            _log_retries(retry_counts, results, policy)
+
+            if is_module_debug:  # pragma: no cover
+                msg_info = f"{dotted_path} {len(t_jobs)} jobs done"
+                _logger.info(msg_info)
+
+
+async def acompile(
+    loader,
+    venv_relpath,
+    timeout=15,
+    jobs=1,
+    use_cache=True,
+    backend=None,
+    wall_budget=None,
+    cpu_budget=None,
+    retries=None,
+    on_retry=None,
+):
+    """Create ``.lock`` files. Async generator, yields per ``.lock``
+    results in completion order.
+
+    For parameters See :py:func:`wreck.lock_compile.lock_compile`
+
+    :returns:
+
+       Per job: venv relative path, ``.lock`` absolute path, ``.lock``
+       Path on success otherwise None, error details, ``fresh`` ``hit``
+       or ``miss`` or None if neither cache nor manifest applicable
+
+    :rtype: collections.abc.AsyncGenerator[tuple[str, str, pathlib.Path | None, str | None, str | None], None]
+    :raises:
+
+       - :py:exc:`AssertionError` -- package pip-tools or uv is not installed
+
+       - :py:exc:`ValueError` -- No such compile backend
+
+       - :py:exc:`NotADirectoryError` -- venv folder does not exist
+
+       - :py:exc:`KeyError` -- No such venv found
+
+       - :py:exc:`wreck.exceptions.MissingRequirementsFoldersFiles` --
+         missing requirements file(s)
+
+    """
+    agen = _acompile(
+        loader,
+        venv_relpath,
+        timeout=timeout,
+        jobs=jobs,
+        use_cache=use_cache,
+        backend=backend,
+        wall_budget=wall_budget,
+        cpu_budget=cpu_budget,
+        retries=retries,
+        on_retry=on_retry,
+    )
+    try:
+        async for _, t_result in agen:
+            yield t_result
+    finally:
+        await agen.aclose()
+
+
+async def afix(
+    loader,
+    venv_relpath,
+    timeout=15,
+    jobs=1,
+    use_cache=True,
+    backend=None,
+    wall_budget=None,
+    cpu_budget=None,
+    retries=None,
+    on_retry=None,
+    on_result=None,
+):
+    """Create ``.lock`` files then, if no failures, fix each venv. Same
+    as :command:`reqs fix`
+
+    For other parameters See :py:func:`wreck.lock_compile.lock_compile`
+
+    :param on_result:
+
+       Default None. Called with each per ``.lock`` result as it
+       completes. See :py:func:`wreck.lock_async.acompile`
+
+    :type on_result: collections.abc.Callable[[tuple[str, str, pathlib.Path | None, str | None, str | None]], typing.Any] | None
+    :returns:
+
+       compiled ``.lock`` absolute paths, failures, and per venv
+       Fixing. If any failures, no fixing is done. Check
+       :py:func:`wreck.lock_compile.is_timeout` and
+       :py:func:`wreck.lock_compile.is_budget_exceeded`
+
+    :rtype: tuple[tuple[str, ...], tuple[tuple[str, pathlib.Path, str], ...], tuple[wreck.lock_fixing.Fixing, ...]]
+    :raises:
+
+       - :py:exc:`AssertionError` -- package pip-tools or uv is not installed
+
+       - :py:exc:`ValueError` -- No such compile backend
+
+       - :py:exc:`NotADirectoryError` -- venv folder does not exist
+
+       - :py:exc:`KeyError` -- No such venv found
+
+       - :py:exc:`wreck.exceptions.MissingRequirementsFoldersFiles` --
+         missing requirements file(s)
+
+    """
+    d_results = {}
+    agen = _acompile(
+        loader,
+        venv_relpath,
+        timeout=timeout,
+        jobs=jobs,
+        use_cache=use_cache,
+        backend=backend,
+        wall_budget=wall_budget,
+        cpu_budget=cpu_budget,
+        retries=retries,
+        on_retry=on_retry,
+    )
+    try:
+        async for idx, t_result in agen:
+            d_results[idx] = t_result
+            if on_result is not None:
+                on_result(t_result)
+            else:  # pragma: no cover
+                pass
+    finally:
+        await agen.aclose()
+
+    # Submission order. Same as lock_compile
+    results = [d_results[idx] for idx in sorted(d_results.keys())]
+    t_compiled, t_failures = _lock_compile_results(results, use_cache is not False)
+
+    fixings = []
+    if len(t_failures) == 0:
+        if is_ok(venv_relpath):
+            venv_relpaths = [venv_relpath]
+        else:
+            venv_relpaths = loader.venv_relpaths
+
+        # venvs share .shared files. One venv at a time
+        for venv_relpath_tmp in venv_relpaths:
+            fixing = await asyncio.to_thread(
+                Fixing.fix_requirements_lock,
+                loader,
+                venv_relpath_tmp,
+            )
+            fixings.append(fixing)
+    else:  # pragma: no cover
+        pass
+
+    ret = (t_compiled, t_failures, tuple(fixings))
+
+    return ret
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from collections.abc import (
+    AsyncGenerator,
+    Callable,
+)
+from pathlib import Path
+from typing import (
+    Any,
+    Final,
+)
+
+from .lock_backend import CompileBackend
+from .lock_cache import (
+    CompileCache,
+    CompileManifest,
+)
+from .lock_fixing import Fixing
+from .lock_telemetry import CompileTelemetry
+from .pep518_venvs import VenvMapLoader
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+__all__ = (
+    "acompile",
+    "afix",
+)
+
+async def _acompile_one(
+    in_abspath: str,
+    lock_abspath: str,
+    path_cwd: Path,
+    venv_relpath: str,
+    timeout: int,
+    backend: CompileBackend,
+    telemetry: CompileTelemetry | None = None,
+) -> tuple[Path | None, None | str]: ...
+async def _alock_compile_job(
+    t_job: tuple[str, str, str],
+    path_cwd: Path,
+    timeout: int,
+    path_locks: dict[str, asyncio.Lock],
+    semaphore: asyncio.Semaphore,
+    cache: CompileCache | None = None,
+    manifest: CompileManifest | None = None,
+    backend: CompileBackend | None = None,
+    telemetry: CompileTelemetry | None = None,
+) -> tuple[str, str, Path | None, str | None, str | None]: ...
+def _acompile(
+    loader: VenvMapLoader,
+    venv_relpath: str | None,
+    timeout: Any = 15,
+    jobs: Any = 1,
+    use_cache: Any = True,
+    backend: str | None = None,
+    wall_budget: Any = None,
+    cpu_budget: Any = None,
+    retries: Any = None,
+    on_retry: Callable[[str, str, int, int | float], Any] | None = None,
+) -> AsyncGenerator[
+    tuple[int, tuple[str, str, Path | None, str | None, str | None]], None
+]: ...
+def acompile(
+    loader: VenvMapLoader,
+    venv_relpath: str | None,
+    timeout: Any = 15,
+    jobs: Any = 1,
+    use_cache: Any = True,
+    backend: str | None = None,
+    wall_budget: Any = None,
+    cpu_budget: Any = None,
+    retries: Any = None,
+    on_retry: Callable[[str, str, int, int | float], Any] | None = None,
+) -> AsyncGenerator[tuple[str, str, Path | None, str | None, str | None], None]: ...
+async def afix(
+    loader: VenvMapLoader,
+    venv_relpath: str | None,
+    timeout: Any = 15,
+    jobs: Any = 1,
+    use_cache: Any = True,
+    backend: str | None = None,
+    wall_budget: Any = None,
+    cpu_budget: Any = None,
+    retries: Any = None,
+    on_retry: Callable[[str, str, int, int | float], Any] | None = None,
+    on_result: (
+        Callable[[tuple[str, str, Path | None, str | None, str | None]], Any] | None
+    ) = None,
+) -> tuple[tuple[str, ...], tuple[tuple[str, Path, str], ...], tuple[Fixing, ...]]: ...
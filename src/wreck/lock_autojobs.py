@@ -0,0 +1,296 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+``--jobs auto``. Size the compile worker pool from the machine, then
+adjust it while compiling.
+
+A fixed jobs count is wrong on both a laptop and a 64 core CI runner.
+Each pip-compile can use hundreds of MiB. The start size is the
+smallest of:
+
+- usable CPU count
+
+- available memory divided by the per job max RSS. Per job max RSS is
+  the largest of each ``.in`` most recent run, from telemetry, see
+  :py:mod:`wreck.lock_telemetry`. No telemetry,
+  :py:data:`wreck.lock_autojobs.RSS_DEFAULT`
+
+- job count
+
+The worker pool is sized for the CPU count, the ceiling. How many of
+those workers may run is adjusted after each job completes. Lowered by
+one if the system is swapping, available memory is below one job's max
+RSS, or jobs are waiting on the package index limiter, see
+:py:mod:`wreck.lock_ratelimit`. Otherwise, while available memory
+allows two more jobs, raised by one. Never below one
+
+Swapping and available memory are read from ``/proc``, so are Linux
+only. Elsewhere only the CPU count and the index limiter apply
+
+.. py:data:: JOBS_AUTO
+   :type: str
+   :value: "auto"
+
+   jobs value which turns on auto sizing
+
+.. py:data:: RSS_DEFAULT
+   :type: int
+   :value: 262144
+
+   Per job max RSS in KiB, when telemetry has none. 256 MiB
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str, str, str, str]
+   :value: ("JOBS_AUTO", "RSS_DEFAULT", "AutoJobs", "cpu_count", \
+   "job_rss", "mem_available")
+
+   Module exports
+
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+
+from .constants import g_app_name
+
+JOBS_AUTO = "auto"
+RSS_DEFAULT = 262144
+_PATH_MEMINFO = "/proc/meminfo"
+_PATH_VMSTAT = "/proc/vmstat"
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_autojobs")
+
+__all__ = (
+    "JOBS_AUTO",
+    "RSS_DEFAULT",
+    "AutoJobs",
+    "cpu_count",
+    "job_rss",
+    "mem_available",
+)
+
+
+def _read_fields(path_f):
+    """``/proc`` style ``name value`` lines.
+
+    :param path_f: file absolute path
+    :type path_f: str
+    :returns: name --> first number. Empty if unreadable
+    :rtype: dict[str, int]
+    """
+    try:
+        contents = Path(path_f).read_text()
+    except OSError:
+        contents = ""
+
+    ret = {}
+    for line in contents.splitlines():
+        parts = line.replace(":", " ").split()
+        if len(parts) >= 2 and parts[1].isdigit():
+            ret[parts[0]] = int(parts[1])
+        else:  # pragma: no cover
+            pass
+
+    return ret
+
+
+def cpu_count():
+    """CPUs this process may run on.
+
+    :returns: usable CPU count. At least 1
+    :rtype: int
+    """
+    try:
+        ret = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):  # pragma: no cover
+        ret = os.cpu_count() or 1
+
+    return max(1, ret)
+
+
+def mem_available():
+    """Memory available to start new processes, without swapping.
+
+    :returns: KiB. None if unknown, i.e. not Linux
+    :rtype: int | None
+    """
+    ret = _read_fields(_PATH_MEMINFO).get("MemAvailable", None)
+
+    return ret
+
+
+def _swap_pages():
+    """Pages swapped in and out, since boot.
+
+    :returns: page count. None if unknown, i.e. not Linux
+    :rtype: int | None
+    """
+    d_vmstat = _read_fields(_PATH_VMSTAT)
+    if "pswpin" in d_vmstat and "pswpout" in d_vmstat:
+        ret = d_vmstat["pswpin"] + d_vmstat["pswpout"]
+    else:  # pragma: no cover
+        ret = None
+
+    return ret
+
+
+def job_rss(d_history):
+    """Per job max RSS, the largest of each ``.in`` most recent run.
+
+    :param d_history:
+
+       From :py:meth:`wreck.lock_telemetry.CompileTelemetry.history`.
+       Per run, 4th item is max RSS in KiB
+
+    :type d_history: collections.abc.Mapping[tuple[str, str], collections.abc.Sequence[tuple[typing.Any, ...]]]
+    :returns: KiB. No max RSS recorded, :py:data:`wreck.lock_autojobs.RSS_DEFAULT`
+    :rtype: int
+    """
+    rsses = [
+        runs[-1][3]
+        for runs in d_history.values()
+        if len(runs) != 0 and runs[-1][3] is not None
+    ]
+    ret = max(rsses) if len(rsses) != 0 else RSS_DEFAULT
+
+    return ret
+
+
+class AutoJobs:
+    """How many compile jobs may run at once. Adjusted as jobs complete.
+
+    Thread safe. Wraps each job, see
+    :py:meth:`~wreck.lock_autojobs.AutoJobs.run`
+
+    :ivar limit: jobs which may run at once, now
+    :vartype limit: int
+    :ivar ceiling: most jobs which may ever run at once. Worker pool size
+    :vartype ceiling: int
+    :ivar rss: per job max RSS in KiB
+    :vartype rss: int
+    :ivar limiter: package index limiter. None if not limited
+    :vartype limiter: wreck.lock_ratelimit.IndexLimiter | None
+    """
+
+    __slots__ = ("limit", "ceiling", "rss", "limiter", "_cond", "_running", "_swap")
+
+    def __init__(self, limit, ceiling, rss, limiter=None):
+        """Class constructor."""
+        self.limit = limit
+        self.ceiling = ceiling
+        self.rss = rss
+        self.limiter = limiter
+        self._cond = threading.Condition()
+        self._running = 0
+        self._swap = _swap_pages()
+
+    @classmethod
+    def plan(cls, job_count, d_history=None, limiter=None):
+        """Start size from CPU count, available memory, and per job max RSS.
+
+        :param job_count: how many jobs
+        :type job_count: int
+        :param d_history:
+
+           Default None. From
+           :py:meth:`wreck.lock_telemetry.CompileTelemetry.history`.
+           None if telemetry disabled
+
+        :type d_history: collections.abc.Mapping[tuple[str, str], collections.abc.Sequence[tuple[typing.Any, ...]]] | None
+        :param limiter: Default None. package index limiter. None if not limited
+        :type limiter: wreck.lock_ratelimit.IndexLimiter | None
+        :returns: auto jobs
+        :rtype: wreck.lock_autojobs.AutoJobs
+        """
+        dotted_path = f"{g_app_name}.lock_autojobs.AutoJobs.plan"
+        ceiling = max(1, min(cpu_count(), job_count))
+        rss = job_rss({} if d_history is None else d_history)
+        mem = mem_available()
+        if mem is None:
+            limit = ceiling
+        else:
+            limit = max(1, min(ceiling, mem // rss))
+
+        msg_info = (
+            f"{dotted_path} jobs auto. Start {limit}, at most {ceiling}. "
+            f"Per job max RSS {rss / 1024:.0f} MiB"
+        )
+        _logger.info(msg_info)
+
+        return cls(limit, ceiling, rss, limiter=limiter)
+
+    def run(self, fcn, t_job):
+        """Wait until fewer than limit jobs are running. Run one job.
+        Then adjust the limit.
+
+        :param fcn: runs one job
+        :type fcn: collections.abc.Callable[[typing.Any], typing.Any]
+        :param t_job: one job
+        :type t_job: typing.Any
+        :returns: job result
+        :rtype: typing.Any
+        """
+        with self._cond:
+            while self._running >= self.limit:
+                self._cond.wait()
+            self._running += 1
+
+        try:
+            ret = fcn(t_job)
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._adjust()
+                self._cond.notify_all()
+
+        return ret
+
+    def _adjust(self):
+        """After a job completes, raise or lower the limit by one.
+        Caller holds the condition.
+        """
+        dotted_path = f"{g_app_name}.lock_autojobs.AutoJobs._adjust"
+        swap = _swap_pages()
+        is_swapping = swap is not None and self._swap is not None and swap > self._swap
+        self._swap = swap
+        mem = mem_available()
+        is_mem_low = mem is not None and mem < self.rss
+        is_saturated = self.limiter is not None and self.limiter.waiting > 0
+
+        if is_swapping:
+            reason = "swapping"
+        elif is_mem_low:
+            reason = "available memory low"
+        elif is_saturated:
+            reason = "index limiter saturated"
+        else:
+            reason = None
+
+        limit_old = self.limit
+        if reason is not None:
+            self.limit = max(1, self.limit - 1)
+        elif mem is None or mem >= 2 * self.rss:
+            self.limit = min(self.ceiling, self.limit + 1)
+            reason = "headroom"
+        else:  # pragma: no cover
+            pass
+
+        if self.limit != limit_old:
+            msg_info = f"{dotted_path} jobs {limit_old} --> {self.limit}. {reason}"
+            _logger.info(msg_info)
+        else:  # pragma: no cover
+            pass
@@ -0,0 +1,66 @@
+import logging
+import threading
+from collections.abc import (
+    Callable,
+    Mapping,
+    Sequence,
+)
+from typing import (
+    Any,
+    Final,
+)
+
+from typing_extensions import Self
+
+from .lock_ratelimit import IndexLimiter
+
+__all__ = (
+    "JOBS_AUTO",
+    "RSS_DEFAULT",
+    "AutoJobs",
+    "cpu_count",
+    "job_rss",
+    "mem_available",
+)
+
+JOBS_AUTO: Final[str]
+RSS_DEFAULT: Final[int]
+_PATH_MEMINFO: Final[str]
+_PATH_VMSTAT: Final[str]
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+def _read_fields(path_f: str) -> dict[str, int]: ...
+def cpu_count() -> int: ...
+def mem_available() -> int | None: ...
+def _swap_pages() -> int | None: ...
+def job_rss(d_history: Mapping[tuple[str, str], Sequence[tuple[Any, ...]]]) -> int: ...
+
+class AutoJobs:
+    __slots__ = ("limit", "ceiling", "rss", "limiter", "_cond", "_running", "_swap")
+
+    limit: int
+    ceiling: int
+    rss: int
+    limiter: IndexLimiter | None
+    _cond: threading.Condition
+    _running: int
+    _swap: int | None
+
+    def __init__(
+        self,
+        limit: int,
+        ceiling: int,
+        rss: int,
+        limiter: IndexLimiter | None = None,
+    ) -> None: ...
+    @classmethod
+    def plan(
+        cls,
+        job_count: int,
+        d_history: Mapping[tuple[str, str], Sequence[tuple[Any, ...]]] | None = None,
+        limiter: IndexLimiter | None = None,
+    ) -> Self: ...
+    def run(self, fcn: Callable[[Any], Any], t_job: Any) -> Any: ...
+    def _adjust(self) -> None: ...
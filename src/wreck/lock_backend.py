@@ -0,0 +1,871 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Compile backends. ``.in`` --> ``.lock``. Refactor **priority** is on
+support for **multiple implementations**.
+
+A backend only runs the resolver. Reading existing pins, comparing,
+and post-processing the ``.lock`` is done by
+:py:func:`wreck.lock_compile._compile_one` regardless of backend, so
+downstream sees the same file format.
+
+.. csv-table:: Backends
+   :header: name, class, description
+   :widths: auto
+
+   "pip-compile", "PipCompileBackend", "default. One pip-compile subprocess per ``.in``"
+   "pip-compile-worker", "PipCompileWorkerBackend", "long-lived worker processes. pip-tools imported once per worker"
+   "uv", "UvBackend", "One ``uv pip compile`` subprocess per ``.in``. pip-tools not required"
+
+Each pip-compile subprocess re-imports pip, pip-tools, and click. For
+small resolves, that import dominates. A worker imports once then
+compiles many ``.in`` files, in-process. Output is the same, so both
+share compile cache entries.
+
+uv is a much faster resolver. Its output differs from pip-compile, e.g.
+no trailing unsafe packages comment, so uv has separate compile cache
+entries. Choose a backend either in ``pyproject.toml``
+
+.. code-block:: text
+
+   [tool.wreck]
+   backend = "uv"
+
+or on the command line, :code:`reqs fix --backend=uv`, which takes
+precedence.
+
+:py:meth:`CompileBackend.cancel` stops a run early. Jobs not yet started
+are not started. Running resolvers, and their process groups, are
+killed. Either way the failure message starts with
+:py:data:`wreck._run_cmd.CANCELLED`
+
+.. py:data:: BACKENDS
+   :type: dict[str, type[wreck.lock_backend.CompileBackend]]
+
+   Backend name --> implementation
+
+.. py:data:: BACKEND_DEFAULT
+   :type: str
+   :value: "pip-compile"
+
+   Backend when none is chosen
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str, str, str, str, str, str]
+   :value: ("BACKENDS", "BACKEND_DEFAULT", "CompileBackend", \
+   "PipCompileBackend", "PipCompileWorkerBackend", "UvBackend", \
+   "get_backend", "get_backend_class")
+
+   Module exports
+
+"""
+
+import abc
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+from importlib.metadata import (
+    PackageNotFoundError,
+    version,
+)
+
+from ._run_cmd import (
+    CANCELLED,
+    _check_budget,
+    arun_cmd,
+    budget_msg,
+    is_cpu_exceeded,
+    kill_process_group,
+    run_cmd,
+    run_cmd_rusage,
+)
+from ._safe_path import resolve_path
+from .constants import g_app_name
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_backend")
+
+_PIP_COMPILE_OPTIONS = (
+    "--no-allow-unsafe",
+    "--no-header",
+    "--resolver",
+    "backtracking",
+    "--pip-args='--isolated'",
+    "--no-emit-options",
+)
+_WORKER_MODULE = f"{g_app_name}._compile_worker"
+_UV_OPTIONS = (
+    "--no-header",
+    "--no-progress",
+    "--no-config",
+    "--no-emit-package",
+    "pip",
+    "--no-emit-package",
+    "setuptools",
+    "--no-emit-package",
+    "distribute",
+)
+
+__all__ = (
+    "BACKENDS",
+    "BACKEND_DEFAULT",
+    "CompileBackend",
+    "PipCompileBackend",
+    "PipCompileWorkerBackend",
+    "UvBackend",
+    "get_backend",
+    "get_backend_class",
+)
+
+
+def _package_version(app_name):
+    """Installed package version.
+
+    :param app_name: package name
+    :type app_name: str
+    :returns: version. Empty str if not installed
+    :rtype: str
+    """
+    try:
+        ret = version(app_name)
+    except PackageNotFoundError:  # pragma: no cover
+        ret = ""
+
+    return ret
+
+
+class CompileBackend(abc.ABC):
+    """Compile backend base type. Also a context manager, on exit
+    releases resources, e.g. worker processes
+
+    A job exceeding its budget has its whole process group killed. The
+    failure message starts with
+    :py:data:`wreck._run_cmd.BUDGET_EXCEEDED`
+
+    Once cancelled, stays cancelled. Create another backend for another run
+
+    :param wall_budget:
+
+       Default None. Per job wall-clock seconds. None or not a positive
+       int is unlimited
+
+    :type wall_budget: typing.Any
+    :param cpu_budget:
+
+       Default None. Per job CPU seconds. None or not a positive int is
+       unlimited
+
+    :type cpu_budget: typing.Any
+
+    .. py:attribute:: name
+       :type: str
+
+       Backend name. Choose by this name
+
+    .. py:attribute:: executable
+       :type: str
+
+       Resolver executable name. Searched for on the ``PATH``
+
+    """
+
+    name = ""
+    executable = ""
+
+    def __init__(self, wall_budget=None, cpu_budget=None):
+        """Class constructor."""
+        self._wall_budget = _check_budget(wall_budget)
+        self._cpu_budget = _check_budget(cpu_budget)
+        self._cancel = threading.Event()
+
+    def __enter__(self):
+        """Context manager enter.
+
+        :returns: this backend
+        :rtype: typing_extensions.Self
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        """Context manager exit. Release resources."""
+        self.close()
+
+    def close(self):
+        """Release resources. Nothing to release by default."""
+        pass
+
+    def cancel(self):
+        """Jobs not yet started, are not started. Running jobs are killed.
+        Thread safe
+        """
+        self._cancel.set()
+
+    @property
+    def is_cancelled(self):
+        """Whether :py:meth:`cancel` was called.
+
+        :returns: True if cancelled
+        :rtype: bool
+        """
+        ret = self._cancel.is_set()
+
+        return ret
+
+    def is_connection_error(self, exit_code, err):
+        """Detect web connection failure. pip retries then gives up.
+
+        .. code-block:: text
+
+           WARNING: Retrying (Retry(total=4, connect=None, read=None, redirect=None,
+           status=None)) after connection broken by 'NewConnectionError('
+           <pip._vendor.urllib3.connection.HTTPSConnection object at 0x7fe86a05d670>:
+           Failed to establish a new connection: [Errno -3] Temporary failure
+           in name resolution')': /simple/pip-tools/
+
+        :param exit_code: resolver exit code
+        :type exit_code: int | None
+        :param err: resolver stderr
+        :type err: str
+        :returns: True if failed to connect to the package index
+        :rtype: bool
+        """
+        ret = exit_code == 1 and "Failed to establish a new connection" in err
+
+        return ret
+
+    @abc.abstractmethod
+    def options(self):
+        """Identifies the resolver, its version, and options. Part of
+        the compile cache key. Backends producing the same output
+        should return the same options
+
+        :returns: resolver version and options
+        :rtype: tuple[str, ...]
+        """
+        ...
+
+    @abc.abstractmethod
+    def compile(self, in_abspath, lock_abspath, path_cwd, venv_python, timeout):
+        """Resolve ``.in`` and write ``.lock``. Thread safe
+
+        :param in_abspath: ``.in`` file absolute path
+        :type in_abspath: str
+        :param lock_abspath: output absolute path. Should have ``.lock`` last suffix
+        :type lock_abspath: str
+        :param path_cwd: package base folder absolute Path
+        :type path_cwd: pathlib.Path
+        :param venv_python:
+
+           venv python interpreter absolute path. Empty str to use the
+           current interpreter
+
+        :type venv_python: str
+        :param timeout: Give ``pip --timeout`` in seconds
+        :type timeout: int
+        :returns:
+
+           log messages, exception messages, return code, failure
+           message, resource usage. Same as
+           :py:func:`wreck._run_cmd.run_cmd_rusage`. Resource usage None
+           if unavailable
+
+        :rtype: tuple[str | None, str | None, int | None, str | None, dict[str, float | int] | None]
+        """
+        ...
+
+    async def acompile(self, in_abspath, lock_abspath, path_cwd, venv_python, timeout):
+        """Same as :py:meth:`~wreck.lock_backend.CompileBackend.compile`,
+        without blocking the event loop. By default, compile runs in a
+        thread. Cancelling waits for that compile to finish
+
+        For signature See
+        :py:meth:`wreck.lock_backend.CompileBackend.compile`
+        """
+        ret = await asyncio.to_thread(
+            self.compile,
+            in_abspath,
+            lock_abspath,
+            path_cwd,
+            venv_python,
+            timeout,
+        )
+
+        return ret
+
+
+class PipCompileBackend(CompileBackend):
+    """One :command:`pip-compile` subprocess per ``.in`` file.
+
+    :param ep_path:
+
+       Default None. Absolute path to pip-compile executable. None
+       searches for it
+
+    :type ep_path: str | None
+    :param wall_budget: Default None. Per job wall-clock seconds. None unlimited
+    :type wall_budget: int | None
+    :param cpu_budget: Default None. Per job CPU seconds. None unlimited
+    :type cpu_budget: int | None
+    :raises:
+
+       - :py:exc:`AssertionError` -- pip-compile executable not found
+
+    """
+
+    name = "pip-compile"
+    executable = "pip-compile"
+
+    def __init__(self, ep_path=None, wall_budget=None, cpu_budget=None):
+        """Class constructor."""
+        super().__init__(wall_budget=wall_budget, cpu_budget=cpu_budget)
+        if ep_path is None:
+            path_ep = resolve_path("pip-compile")
+            assert path_ep is not None
+            self._ep_path = str(path_ep)
+        else:
+            self._ep_path = ep_path
+
+    def options(self):
+        """pip-tools version and the pip-compile options.
+
+        :returns: resolver version and options
+        :rtype: tuple[str, ...]
+        """
+        pip_tools_version = _package_version("pip-tools")
+        ret = (f"pip-tools=={pip_tools_version}",) + _PIP_COMPILE_OPTIONS
+
+        return ret
+
+    def _args(self, in_abspath, lock_abspath, venv_python, timeout):
+        """pip-compile command line arguments, without the executable.
+
+        :param in_abspath: ``.in`` file absolute path
+        :type in_abspath: str
+        :param lock_abspath: output absolute path
+        :type lock_abspath: str
+        :param venv_python: venv python interpreter absolute path or empty str
+        :type venv_python: str
+        :param timeout: Give ``pip --timeout`` in seconds
+        :type timeout: int
+        :returns: pip-compile arguments
+        :rtype: tuple[str, ...]
+        """
+        if len(venv_python) != 0:  # pragma: no cover
+            line_python = f"--pip-args='--python={venv_python!s}'"
+        else:  # pragma: no cover
+            line_python = ""
+
+        ret = (
+            *_PIP_COMPILE_OPTIONS,
+            f"--pip-args='--timeout={timeout!s}'",
+            f"{line_python}",
+            "-o",
+            lock_abspath,
+            in_abspath,
+        )
+
+        return ret
+
+    def _cmd_env(self, in_abspath, lock_abspath, venv_python, timeout):
+        """pip-compile command and environment.
+
+        :param in_abspath: ``.in`` file absolute path
+        :type in_abspath: str
+        :param lock_abspath: output absolute path
+        :type lock_abspath: str
+        :param venv_python: venv python interpreter absolute path or empty str
+        :type venv_python: str
+        :param timeout: Give ``pip --timeout`` in seconds
+        :type timeout: int
+        :returns: command and environment. None inherits the environment
+        :rtype: tuple[tuple[str, ...], dict[str, str] | None]
+        """
+        dotted_path = f"{g_app_name}.lock_backend.PipCompileBackend._cmd_env"
+        cmd = (
+            self._ep_path,
+            *self._args(in_abspath, lock_abspath, venv_python, timeout),
+        )
+
+        if is_module_debug:  # pragma: no cover
+            msg_info = f"{dotted_path} cmd: {cmd}"
+            _logger.info(msg_info)
+
+        return cmd, None
+
+    def compile(self, in_abspath, lock_abspath, path_cwd, venv_python, timeout):
+        """In a subprocess, run pip-compile. For signature See the abc"""
+        cmd, env = self._cmd_env(in_abspath, lock_abspath, venv_python, timeout)
+        ret = run_cmd_rusage(
+            cmd,
+            cwd=path_cwd,
+            env=env,
+            wall=self._wall_budget,
+            cpu=self._cpu_budget,
+            cancel=self._cancel,
+        )
+
+        return ret
+
+    async def acompile(self, in_abspath, lock_abspath, path_cwd, venv_python, timeout):
+        """In an asyncio subprocess, run pip-compile. Cancelling kills
+        the subprocess. No resource usage. For signature See the abc"""
+        cmd, env = self._cmd_env(in_abspath, lock_abspath, venv_python, timeout)
+        t_ret = await arun_cmd(
+            cmd,
+            cwd=path_cwd,
+            env=env,
+            wall=self._wall_budget,
+            cpu=self._cpu_budget,
+        )
+        # asyncio reaps the child. Resource usage unavailable
+        ret = (*t_ret, None)
+
+        return ret
+
+
+class PipCompileWorkerBackend(PipCompileBackend):
+    """Long-lived worker processes, each runs pip-compile in-process.
+
+    Workers are started on demand, at most one per concurrent job, and
+    reused across jobs. Same arguments and same output as
+    :py:class:`~wreck.lock_backend.PipCompileBackend`
+
+    Workers run with the current interpreter, the one pip-tools is
+    installed into
+
+    A wall-clock budget kills the worker, and it's process group. CPU
+    budget is enforced within the worker. Either way, that worker is
+    discarded. Next job starts a fresh worker
+
+    :param ep_path: Default None. Unused. Signature compatibility
+    :type ep_path: str | None
+    :param wall_budget: Default None. Per job wall-clock seconds. None unlimited
+    :type wall_budget: int | None
+    :param cpu_budget: Default None. Per job CPU seconds. None unlimited
+    :type cpu_budget: int | None
+    """
+
+    name = "pip-compile-worker"
+
+    def __init__(self, ep_path=None, wall_budget=None, cpu_budget=None):
+        """Class constructor."""
+        CompileBackend.__init__(
+            self,
+            wall_budget=wall_budget,
+            cpu_budget=cpu_budget,
+        )
+        self._ep_path = ep_path
+        self._mutex = threading.Lock()
+        self._idle = []
+        self._workers = []
+
+    def _acquire(self):
+        """Take an idle worker. Otherwise start one.
+
+        :returns: worker process
+        :rtype: subprocess.Popen[str]
+        """
+        with self._mutex:
+            if len(self._idle) != 0:
+                ret = self._idle.pop()
+            else:
+                ret = subprocess.Popen(
+                    (sys.executable, "-m", _WORKER_MODULE),
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    start_new_session=self._wall_budget is not None,
+                )
+                self._workers.append(ret)
+
+        return ret
+
+    def _release(self, proc, is_ok):
+        """Return worker to the idle pool. A broken worker is discarded.
+
+        :param proc: worker process
+        :type proc: subprocess.Popen[str]
+        :param is_ok: False if worker misbehaved
+        :type is_ok: bool
+        """
+        if is_ok:
+            with self._mutex:
+                self._idle.append(proc)
+        else:
+            proc.kill()
+            proc.wait()
+
+    def compile(self, in_abspath, lock_abspath, path_cwd, venv_python, timeout):
+        """Send to a worker. For signature See the abc"""
+        dotted_path = f"{g_app_name}.lock_backend.PipCompileWorkerBackend.compile"
+        # run_cmd drops empty args. So does this
+        args = [
+            arg
+            for arg in self._args(in_abspath, lock_abspath, venv_python, timeout)
+            if len(arg) != 0
+        ]
+        d_request = {"args": args, "cwd": str(path_cwd), "cpu": self._cpu_budget}
+
+        if is_module_debug:  # pragma: no cover
+            msg_info = f"{dotted_path} args: {args}"
+            _logger.info(msg_info)
+
+        if self.is_cancelled:
+            # Not started
+            ret = (None, None, None, CANCELLED, None)
+        else:
+            ret = self._send(d_request)
+
+        return ret
+
+    def _send(self, d_request):
+        """Send one request to a worker, wait for the response.
+
+        :param d_request: pip-compile args, cwd, and CPU budget
+        :type d_request: dict[str, typing.Any]
+        :returns: Same as :py:func:`wreck._run_cmd.run_cmd_rusage`
+        :rtype: tuple[str | None, str | None, int | None, str | None, dict[str, float | int] | None]
+        """
+        proc = self._acquire()
+        assert proc.stdin is not None
+        assert proc.stdout is not None
+        if self._wall_budget is not None:
+            timer = threading.Timer(self._wall_budget, kill_process_group, (proc,))
+            timer.start()
+        else:  # pragma: no cover
+            timer = None
+        try:
+            proc.stdin.write(f"{json.dumps(d_request)}\n")
+            proc.stdin.flush()
+            line = proc.stdout.readline()
+            d_response = json.loads(line)
+        except (OSError, ValueError):
+            exit_code = proc.wait()
+            is_wall = timer is not None and timer.finished.is_set()
+            self._release(proc, False)
+            if self.is_cancelled:
+                str_err = CANCELLED
+            elif is_wall:
+                str_err = budget_msg("wall", self._wall_budget)
+            elif is_cpu_exceeded(exit_code, self._cpu_budget):
+                str_err = budget_msg("cpu", self._cpu_budget)
+            else:
+                str_err = (
+                    f"pip-compile worker exited unexpectedly. exit code {exit_code}"
+                )
+            ret = (None, None, None, str_err, None)
+        else:
+            self._release(proc, True)
+            ret = (
+                d_response["out"],
+                d_response["err"],
+                d_response["exit_code"],
+                d_response["exc"],
+                d_response.get("rusage", None),
+            )
+        finally:
+            if timer is not None:
+                timer.cancel()
+            else:  # pragma: no cover
+                pass
+
+        return ret
+
+    def cancel(self):
+        """Jobs not yet started, are not started. Busy workers are killed.
+        Thread safe
+        """
+        super().cancel()
+        with self._mutex:
+            busy = [proc for proc in self._workers if proc not in self._idle]
+        for proc in busy:
+            if self._wall_budget is not None:
+                # Own process group
+                kill_process_group(proc)
+            else:
+                proc.kill()
+
+    async def acompile(self, in_abspath, lock_abspath, path_cwd, venv_python, timeout):
+        """Send to a worker, from a thread. For signature See the abc"""
+        ret = await CompileBackend.acompile(
+            self,
+            in_abspath,
+            lock_abspath,
+            path_cwd,
+            venv_python,
+            timeout,
+        )
+
+        return ret
+
+    def close(self):
+        """Stop all workers. Closing stdin ends the worker's serve loop."""
+        with self._mutex:
+            workers = self._workers
+            self._workers = []
+            self._idle = []
+
+        for proc in workers:
+            if proc.stdin is not None:  # pragma: no branch
+                try:
+                    proc.stdin.close()
+                except OSError:  # pragma: no cover
+                    pass
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:  # pragma: no cover
+                proc.kill()
+                proc.wait()
+            if proc.stdout is not None:  # pragma: no branch
+                proc.stdout.close()
+
+
+class UvBackend(CompileBackend):
+    """One :command:`uv pip compile` subprocess per ``.in`` file.
+
+    pip-tools is not required. The ``.lock`` is post-processed the
+    same as pip-compile output, absolute paths --> relative paths
+
+    Without a venv, uv would search for an interpreter. Instead
+    resolve with the current interpreter, same as pip-compile
+
+    :param ep_path:
+
+       Default None. Absolute path to uv executable. None searches for it
+
+    :type ep_path: str | None
+    :param wall_budget: Default None. Per job wall-clock seconds. None unlimited
+    :type wall_budget: int | None
+    :param cpu_budget: Default None. Per job CPU seconds. None unlimited
+    :type cpu_budget: int | None
+    :raises:
+
+       - :py:exc:`AssertionError` -- uv executable not found
+
+    """
+
+    name = "uv"
+    executable = "uv"
+
+    def __init__(self, ep_path=None, wall_budget=None, cpu_budget=None):
+        """Class constructor."""
+        super().__init__(wall_budget=wall_budget, cpu_budget=cpu_budget)
+        if ep_path is None:
+            path_ep = resolve_path(self.executable)
+            assert path_ep is not None
+            self._ep_path = str(path_ep)
+        else:
+            self._ep_path = ep_path
+        self._version = None
+
+    def _uv_version(self):
+        """uv version. Asked once, then remembered.
+
+        :returns: version e.g. ``0.5.1``. Empty str if uv did not say
+        :rtype: str
+        """
+        if self._version is None:
+            out, _, exit_code, _ = run_cmd((self._ep_path, "--version"))
+            # uv 0.5.1 (f399a5271 2024-11-08)
+            if exit_code == 0 and out is not None and len(out.split()) >= 2:
+                self._version = out.split()[1]
+            else:  # pragma: no cover
+                self._version = ""
+        else:  # pragma: no cover
+            pass
+
+        return self._version
+
+    def options(self):
+        """uv version and the uv pip compile options.
+
+        :returns: resolver version and options
+        :rtype: tuple[str, ...]
+        """
+        ret = (f"uv=={self._uv_version()}",) + _UV_OPTIONS
+
+        return ret
+
+    def is_connection_error(self, exit_code, err):
+        """uv retries then gives up.
+
+        .. code-block:: text
+
+           error: Request failed after 3 retries in 9.7s
+             cause: Failed to fetch: https://pypi.org/simple/click/
+             cause: error sending request for url (https://pypi.org/simple/click/)
+             cause: client error (Connect)
+
+        For signature See
+        :py:meth:`wreck.lock_backend.CompileBackend.is_connection_error`
+        """
+        ret = (
+            exit_code is not None and exit_code != 0 and "client error (Connect)" in err
+        )
+
+        return ret
+
+    def _args(self, in_abspath, lock_abspath, venv_python):
+        """uv command line arguments, without the executable.
+
+        :param in_abspath: ``.in`` file absolute path
+        :type in_abspath: str
+        :param lock_abspath: output absolute path
+        :type lock_abspath: str
+        :param venv_python: venv python interpreter absolute path or empty str
+        :type venv_python: str
+        :returns: uv arguments
+        :rtype: tuple[str, ...]
+        """
+        if len(venv_python) != 0:  # pragma: no cover
+            python_abspath = venv_python
+        else:  # pragma: no cover
+            python_abspath = sys.executable
+
+        ret = (
+            "pip",
+            "compile",
+            *_UV_OPTIONS,
+            "--python",
+            python_abspath,
+            "-o",
+            lock_abspath,
+            in_abspath,
+        )
+
+        return ret
+
+    def _cmd_env(self, in_abspath, lock_abspath, venv_python, timeout):
+        """uv command and environment. uv has no timeout option, instead
+        environment variable ``UV_HTTP_TIMEOUT``
+
+        :param in_abspath: ``.in`` file absolute path
+        :type in_abspath: str
+        :param lock_abspath: output absolute path
+        :type lock_abspath: str
+        :param venv_python: venv python interpreter absolute path or empty str
+        :type venv_python: str
+        :param timeout: web connection timeout in seconds
+        :type timeout: int
+        :returns: command and environment
+        :rtype: tuple[tuple[str, ...], dict[str, str] | None]
+        """
+        dotted_path = f"{g_app_name}.lock_backend.UvBackend._cmd_env"
+        cmd = (
+            self._ep_path,
+            *self._args(in_abspath, lock_abspath, venv_python),
+        )
+        env = os.environ.copy()
+        env["UV_HTTP_TIMEOUT"] = str(timeout)
+
+        if is_module_debug:  # pragma: no cover
+            msg_info = f"{dotted_path} cmd: {cmd}"
+            _logger.info(msg_info)
+
+        return cmd, env
+
+    def compile(self, in_abspath, lock_abspath, path_cwd, venv_python, timeout):
+        """In a subprocess, run uv pip compile. For signature See the abc"""
+        cmd, env = self._cmd_env(in_abspath, lock_abspath, venv_python, timeout)
+        ret = run_cmd_rusage(
+            cmd,
+            cwd=path_cwd,
+            env=env,
+            wall=self._wall_budget,
+            cpu=self._cpu_budget,
+            cancel=self._cancel,
+        )
+
+        return ret
+
+    async def acompile(self, in_abspath, lock_abspath, path_cwd, venv_python, timeout):
+        """In an asyncio subprocess, run uv pip compile. Cancelling kills
+        the subprocess. No resource usage. For signature See the abc"""
+        cmd, env = self._cmd_env(in_abspath, lock_abspath, venv_python, timeout)
+        t_ret = await arun_cmd(
+            cmd,
+            cwd=path_cwd,
+            env=env,
+            wall=self._wall_budget,
+            cpu=self._cpu_budget,
+        )
+        # asyncio reaps the child. Resource usage unavailable
+        ret = (*t_ret, None)
+
+        return ret
+
+
+BACKENDS = {
+    PipCompileBackend.name: PipCompileBackend,
+    PipCompileWorkerBackend.name: PipCompileWorkerBackend,
+    UvBackend.name: UvBackend,
+}
+BACKEND_DEFAULT = PipCompileBackend.name
+
+
+def get_backend_class(name):
+    """From a backend name, get the backend class. Not instantiated, so
+    which executable is required can be checked first
+
+    :param name: Backend name. None for the default backend
+    :type name: typing.Any
+    :returns: backend class
+    :rtype: type[wreck.lock_backend.CompileBackend]
+    :raises:
+
+       - :py:exc:`ValueError` -- No such backend
+
+    """
+    str_name = BACKEND_DEFAULT if name is None else name
+    if not isinstance(str_name, str) or str_name not in BACKENDS.keys():
+        msg_warn = (
+            f"No such compile backend {str_name!r}. Choose one of "
+            f"{sorted(BACKENDS.keys())!r}"
+        )
+        raise ValueError(msg_warn)
+
+    ret = BACKENDS[str_name]
+
+    return ret
+
+
+def get_backend(name, ep_path=None, wall_budget=None, cpu_budget=None):
+    """Factory. From a backend name, get a backend.
+
+    :param name: Backend name. None for the default backend
+    :type name: typing.Any
+    :param ep_path: Default None. Absolute path to the resolver executable
+    :type ep_path: str | None
+    :param wall_budget: Default None. Per job wall-clock seconds. None unlimited
+    :type wall_budget: int | None
+    :param cpu_budget: Default None. Per job CPU seconds. None unlimited
+    :type cpu_budget: int | None
+    :returns: backend instance
+    :rtype: wreck.lock_backend.CompileBackend
+    :raises:
+
+       - :py:exc:`ValueError` -- No such backend
+
+       - :py:exc:`AssertionError` -- Resolver executable not found
+
+    """
+    cls = get_backend_class(name)
+    ret = cls(ep_path=ep_path, wall_budget=wall_budget, cpu_budget=cpu_budget)
+
+    return ret
@@ -0,0 +1,262 @@
+import abc
+import logging
+import subprocess
+import threading
+from pathlib import Path
+from types import TracebackType
+from typing import (
+    Any,
+    ClassVar,
+    Final,
+)
+
+from typing_extensions import Self
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+_PIP_COMPILE_OPTIONS: Final[tuple[str, ...]]
+_WORKER_MODULE: Final[str]
+_UV_OPTIONS: Final[tuple[str, ...]]
+
+__all__ = (
+    "BACKENDS",
+    "BACKEND_DEFAULT",
+    "CompileBackend",
+    "PipCompileBackend",
+    "PipCompileWorkerBackend",
+    "UvBackend",
+    "get_backend",
+    "get_backend_class",
+)
+
+def _package_version(app_name: str) -> str: ...
+
+class CompileBackend(abc.ABC):
+    name: ClassVar[str]
+    executable: ClassVar[str]
+    _wall_budget: int | None
+    _cpu_budget: int | None
+    _cancel: threading.Event
+
+    def __init__(
+        self,
+        wall_budget: int | None = None,
+        cpu_budget: int | None = None,
+    ) -> None: ...
+    def __enter__(self) -> Self: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None: ...
+    def close(self) -> None: ...
+    def cancel(self) -> None: ...
+    @property
+    def is_cancelled(self) -> bool: ...
+    def is_connection_error(self, exit_code: int | None, err: str) -> bool: ...
+    @abc.abstractmethod
+    def options(self) -> tuple[str, ...]: ...
+    @abc.abstractmethod
+    def compile(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: Path,
+        venv_python: str,
+        timeout: int,
+    ) -> tuple[
+        str | None,
+        str | None,
+        int | None,
+        str | None,
+        dict[str, float | int] | None,
+    ]: ...
+    async def acompile(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: Path,
+        venv_python: str,
+        timeout: int,
+    ) -> tuple[
+        str | None,
+        str | None,
+        int | None,
+        str | None,
+        dict[str, float | int] | None,
+    ]: ...
+
+class PipCompileBackend(CompileBackend):
+    _ep_path: str | None
+
+    def __init__(
+        self,
+        ep_path: str | None = None,
+        wall_budget: int | None = None,
+        cpu_budget: int | None = None,
+    ) -> None: ...
+    def options(self) -> tuple[str, ...]: ...
+    def _args(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        venv_python: str,
+        timeout: int,
+    ) -> tuple[str, ...]: ...
+    def _cmd_env(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        venv_python: str,
+        timeout: int,
+    ) -> tuple[tuple[str, ...], dict[str, str] | None]: ...
+    def compile(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: Path,
+        venv_python: str,
+        timeout: int,
+    ) -> tuple[
+        str | None,
+        str | None,
+        int | None,
+        str | None,
+        dict[str, float | int] | None,
+    ]: ...
+    async def acompile(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: Path,
+        venv_python: str,
+        timeout: int,
+    ) -> tuple[
+        str | None,
+        str | None,
+        int | None,
+        str | None,
+        dict[str, float | int] | None,
+    ]: ...
+
+class PipCompileWorkerBackend(PipCompileBackend):
+    _mutex: threading.Lock
+    _idle: list[subprocess.Popen[str]]
+    _workers: list[subprocess.Popen[str]]
+
+    def __init__(
+        self,
+        ep_path: str | None = None,
+        wall_budget: int | None = None,
+        cpu_budget: int | None = None,
+    ) -> None: ...
+    def _acquire(self) -> subprocess.Popen[str]: ...
+    def _release(self, proc: subprocess.Popen[str], is_ok: bool) -> None: ...
+    def _send(
+        self,
+        d_request: dict[str, Any],
+    ) -> tuple[
+        str | None,
+        str | None,
+        int | None,
+        str | None,
+        dict[str, float | int] | None,
+    ]: ...
+    def cancel(self) -> None: ...
+    def compile(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: Path,
+        venv_python: str,
+        timeout: int,
+    ) -> tuple[
+        str | None,
+        str | None,
+        int | None,
+        str | None,
+        dict[str, float | int] | None,
+    ]: ...
+    async def acompile(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: Path,
+        venv_python: str,
+        timeout: int,
+    ) -> tuple[
+        str | None,
+        str | None,
+        int | None,
+        str | None,
+        dict[str, float | int] | None,
+    ]: ...
+    def close(self) -> None: ...
+
+class UvBackend(CompileBackend):
+    _ep_path: str
+    _version: str | None
+
+    def __init__(
+        self,
+        ep_path: str | None = None,
+        wall_budget: int | None = None,
+        cpu_budget: int | None = None,
+    ) -> None: ...
+    def _uv_version(self) -> str: ...
+    def options(self) -> tuple[str, ...]: ...
+    def is_connection_error(self, exit_code: int | None, err: str) -> bool: ...
+    def _args(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        venv_python: str,
+    ) -> tuple[str, ...]: ...
+    def _cmd_env(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        venv_python: str,
+        timeout: int,
+    ) -> tuple[tuple[str, ...], dict[str, str] | None]: ...
+    def compile(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: Path,
+        venv_python: str,
+        timeout: int,
+    ) -> tuple[
+        str | None,
+        str | None,
+        int | None,
+        str | None,
+        dict[str, float | int] | None,
+    ]: ...
+    async def acompile(
+        self,
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: Path,
+        venv_python: str,
+        timeout: int,
+    ) -> tuple[
+        str | None,
+        str | None,
+        int | None,
+        str | None,
+        dict[str, float | int] | None,
+    ]: ...
+
+BACKENDS: Final[dict[str, type[CompileBackend]]]
+BACKEND_DEFAULT: Final[str]
+
+def get_backend_class(name: Any) -> type[CompileBackend]: ...
+def get_backend(
+    name: Any,
+    ep_path: str | None = None,
+    wall_budget: int | None = None,
+    cpu_budget: int | None = None,
+) -> CompileBackend: ...
@@ -0,0 +1,556 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Content addressed cache of :command:`pip-compile` results.
+
+A ``.lock`` is a function of: the ``.in`` file, every ``-c`` and ``-r``
+file it transitively includes, the existing ``.lock`` (pip-compile
+prefers existing pins), the venv python interpreter, and the
+pip-compile options. Digest all of those and the digest is the key.
+
+On a hit, the cached ``.lock`` contents are written, skipping
+pip-compile and the network resolve.
+
+Entries are plain files within ``.wreck_cache/compile``. Eviction is by
+age then by total size, least recently used first.
+
+Before even looking in the cache,
+:py:class:`~wreck.lock_cache.CompileManifest` records, per venv and
+``.lock``, the key the ``.lock`` was last written with and the digest of
+each file in the include closure. When the key is unchanged, the
+``.lock`` is up to date. Nothing to compile, nothing to write.
+
+.. py:data:: CACHE_FOLDER
+   :type: str
+   :value: ".wreck_cache"
+
+   Within package base folder, folder containing all wreck caches
+
+.. py:data:: CACHE_MAX_SIZE
+   :type: int
+   :value: 50
+
+   Default compile cache total size limit in MiB. Override in
+   ``[tool.wreck]`` with ``compile_cache_max_size``
+
+.. py:data:: CACHE_MAX_AGE
+   :type: int
+   :value: 14
+
+   Default compile cache entry age limit in days. Override in
+   ``[tool.wreck]`` with ``compile_cache_max_age``
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str, str, str, str]
+   :value: ("CACHE_FOLDER", "CompileCache", "CompileManifest", \
+   "closure_digests", "compile_key", "include_closure")
+
+   Module exports
+
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from .constants import g_app_name
+
+CACHE_FOLDER = ".wreck_cache"
+CACHE_MAX_SIZE = 50
+CACHE_MAX_AGE = 14
+_SUFFIX_ENTRY = ".lock"
+_MANIFEST_NAME = "manifest.json"
+_MANIFEST_VERSION = 1
+# -c pins.in  -r prod.in  --constraint=pins.in  --requirement prod.in
+_PROG_INCLUDE = re.compile(
+    r"^\s*(?:-c|-r|--constraint|--requirement)(?:\s*=\s*|\s*)(?P<relpath>\S+)"
+)
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_cache")
+
+__all__ = (
+    "CACHE_FOLDER",
+    "CompileCache",
+    "CompileManifest",
+    "closure_digests",
+    "compile_key",
+    "include_closure",
+)
+
+
+def _digest_file(abspath_f):
+    """sha256 of a file contents.
+
+    :param abspath_f: file absolute path
+    :type abspath_f: pathlib.Path
+    :returns: hex digest. None if file does not exist
+    :rtype: str | None
+    """
+    try:
+        ret = hashlib.sha256(Path(abspath_f).read_bytes()).hexdigest()
+    except OSError:
+        ret = None
+
+    return ret
+
+
+def include_closure(in_abspath):
+    """From a requirements file, follow ``-c`` and ``-r`` lines,
+    transitively. Relative paths are relative to the including file's folder.
+
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str | pathlib.Path
+    :returns:
+
+       The ``.in`` file and all included files, in discovery order.
+       Includes missing files; a missing file is still an input
+
+    :rtype: tuple[pathlib.Path, ...]
+    """
+    abspath_in = Path(in_abspath).resolve()
+    seen = {abspath_in}
+    ret = []
+    stack = [abspath_in]
+    while len(stack) != 0:
+        abspath_f = stack.pop(0)
+        ret.append(abspath_f)
+        try:
+            contents = abspath_f.read_text()
+        except OSError:
+            continue
+
+        for line in contents.splitlines():
+            match = _PROG_INCLUDE.match(line)
+            if match is None:
+                continue
+            abspath_include = abspath_f.parent.joinpath(match["relpath"]).resolve()
+            if abspath_include not in seen:
+                seen.add(abspath_include)
+                stack.append(abspath_include)
+
+    return tuple(ret)
+
+
+def _relpath(path_cwd, abspath_f):
+    """Keys shouldn't depend on where the package base folder is.
+
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param abspath_f: file absolute path
+    :type abspath_f: pathlib.Path
+    :returns: posix relative path. If not within package base folder, absolute path
+    :rtype: str
+    """
+    try:
+        ret = abspath_f.relative_to(Path(path_cwd)).as_posix()
+    except ValueError:
+        ret = abspath_f.as_posix()
+
+    return ret
+
+
+def closure_digests(path_cwd, in_abspath):
+    """Digest of each file within a ``.in`` file's include closure.
+
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str | pathlib.Path
+    :returns: relative path and sha256 hex digest. None if file is missing
+    :rtype: dict[str, str | None]
+    """
+    ret = {
+        _relpath(path_cwd, abspath_f): _digest_file(abspath_f)
+        for abspath_f in include_closure(in_abspath)
+    }
+
+    return ret
+
+
+def compile_key(path_cwd, in_abspath, lock_abspath, venv_python, options, seed=None):
+    """Digest of every input which affects pip-compile output.
+
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str
+    :param lock_abspath: ``.lock`` file absolute path
+    :type lock_abspath: str
+    :param venv_python:
+
+       venv python interpreter absolute path. Empty str or None if
+       pip-compile runs with the current interpreter
+
+    :type venv_python: str | None
+    :param options: pip-compile options and anything else identifying the resolver
+    :type options: collections.abc.Sequence[str]
+    :param seed:
+
+       Default None. Warm start. Staging file contents, the preferred
+       versions, including pins from the venv's other ``.lock`` files.
+       None cold, seeded only by the existing ``.lock``
+
+    :type seed: str | None
+    :returns: sha256 hex digest
+    :rtype: str
+    """
+    lines = []
+    lines.append(f"options\t{' '.join(options)}")
+    if venv_python is None or len(venv_python) == 0:
+        lines.append("python\t")
+    else:
+        # venv python is usually a symlink to a versioned interpreter
+        abspath_python = Path(os.path.realpath(venv_python))
+        try:
+            st = abspath_python.stat()
+        except OSError:
+            str_stat = ""
+        else:
+            str_stat = f"{st.st_size}:{st.st_mtime_ns}"
+        lines.append(f"python\t{abspath_python.as_posix()}\t{str_stat}")
+
+    abspath_lock = Path(lock_abspath).resolve()
+    lock_relpath = _relpath(path_cwd, abspath_lock)
+    lines.append(f"lock\t{lock_relpath}\t{_digest_file(abspath_lock)}")
+    for relpath_f, digest in closure_digests(path_cwd, in_abspath).items():
+        lines.append(f"in\t{relpath_f}\t{digest}")
+    if seed is not None:
+        lines.append(f"seed\t{hashlib.sha256(seed.encode()).hexdigest()}")
+    else:  # pragma: no cover
+        pass
+
+    blob = "\n".join(lines).encode()
+    ret = hashlib.sha256(blob).hexdigest()
+
+    return ret
+
+
+def _write_text_atomic(abspath_f, contents):
+    """Write to a sibling temp file then replace.
+
+    :param abspath_f: file absolute path
+    :type abspath_f: pathlib.Path
+    :param contents: file contents
+    :type contents: str
+    """
+    abspath_f.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        mode="w",
+        dir=abspath_f.parent,
+        prefix=".tmp-",
+        delete=False,
+    ) as fp:
+        fp.write(contents)
+        fp_name = fp.name
+    os.replace(fp_name, abspath_f)
+
+
+def _check_positive_int(val, default):
+    """Config value should be a positive int.
+
+    :param val: From ``[tool.wreck]``. Could be anything
+    :type val: typing.Any
+    :param default: Fallback
+    :type default: int
+    :returns: positive int
+    :rtype: int
+    """
+    is_ng = val is None or isinstance(val, bool) or not isinstance(val, int) or val < 1
+    ret = default if is_ng else val
+
+    return ret
+
+
+class CompileCache:
+    """Store of ``.lock`` contents keyed by :py:func:`compile_key`.
+
+    Thread safe. Writes are atomic, concurrent puts of the same key
+    store identical contents.
+
+    :param path_dir: Cache folder absolute path. Created on first put
+    :type path_dir: pathlib.Path
+    :param max_size: Default 50. Total size limit in MiB
+    :type max_size: typing.Any
+    :param max_age: Default 14. Entry age limit in days
+    :type max_age: typing.Any
+
+    .. py:attribute:: path_dir
+       :type: pathlib.Path
+
+       Cache folder absolute path
+
+    .. py:attribute:: max_bytes
+       :type: int
+
+       Total size limit in bytes
+
+    .. py:attribute:: max_seconds
+       :type: int
+
+       Entry age limit in seconds
+
+    """
+
+    __slots__ = ("path_dir", "max_bytes", "max_seconds")
+
+    def __init__(self, path_dir, max_size=CACHE_MAX_SIZE, max_age=CACHE_MAX_AGE):
+        """Class constructor."""
+        self.path_dir = Path(path_dir)
+        int_max_size = _check_positive_int(max_size, CACHE_MAX_SIZE)
+        int_max_age = _check_positive_int(max_age, CACHE_MAX_AGE)
+        self.max_bytes = int_max_size * 1024 * 1024
+        self.max_seconds = int_max_age * 24 * 60 * 60
+
+    @classmethod
+    def from_loader(cls, loader):
+        """Cache folder within package base folder. Limits from ``[tool.wreck]``.
+
+        :param loader: Contains some paths and loaded unparsed mappings
+        :type loader: wreck.pep518_venvs.VenvMapLoader
+        :returns: compile cache
+        :rtype: wreck.lock_cache.CompileCache
+        """
+        d_parent = loader.section_parent
+        path_dir = loader.project_base.joinpath(CACHE_FOLDER, "compile")
+        max_size = d_parent.get("compile_cache_max_size", CACHE_MAX_SIZE)
+        max_age = d_parent.get("compile_cache_max_age", CACHE_MAX_AGE)
+
+        return cls(path_dir, max_size=max_size, max_age=max_age)
+
+    def _entry(self, key):
+        """Cache entry absolute path.
+
+        :param key: sha256 hex digest
+        :type key: str
+        :returns: cache entry absolute path
+        :rtype: pathlib.Path
+        """
+        return self.path_dir.joinpath(f"{key}{_SUFFIX_ENTRY}")
+
+    def get(self, key):
+        """Get cached ``.lock`` contents. A hit refreshes the entry's age.
+
+        :param key: sha256 hex digest
+        :type key: str
+        :returns: ``.lock`` contents. None on a miss
+        :rtype: str | None
+        """
+        path_entry = self._entry(key)
+        try:
+            ret = path_entry.read_text()
+        except OSError:
+            ret = None
+        else:
+            try:
+                os.utime(path_entry)
+            except OSError:  # pragma: no cover
+                pass
+
+        return ret
+
+    def put(self, key, contents):
+        """Store ``.lock`` contents.
+
+        :param key: sha256 hex digest
+        :type key: str
+        :param contents: ``.lock`` contents
+        :type contents: str
+        """
+        _write_text_atomic(self._entry(key), contents)
+
+    def evict(self):
+        """Remove entries older than max age. Then least recently used
+        entries until total size is within max size.
+
+        :returns: Count of removed entries
+        :rtype: int
+        """
+        dotted_path = f"{g_app_name}.lock_cache.CompileCache.evict"
+        if not self.path_dir.is_dir():
+            return 0
+
+        entries = []
+        for path_entry in self.path_dir.glob(f"*{_SUFFIX_ENTRY}"):
+            try:
+                st = path_entry.stat()
+            except OSError:  # pragma: no cover
+                continue
+            entries.append((st.st_mtime, st.st_size, path_entry))
+        # oldest first
+        entries.sort(key=lambda t_entry: t_entry[0])
+
+        oldest_allowed = time.time() - self.max_seconds
+        total = sum(t_entry[1] for t_entry in entries)
+        removed = 0
+        for mtime, size, path_entry in entries:
+            is_too_old = mtime < oldest_allowed
+            is_too_big = total > self.max_bytes
+            if not is_too_old and not is_too_big:
+                break
+            path_entry.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        if is_module_debug:  # pragma: no cover
+            msg_info = f"{dotted_path} removed {removed} remaining {total} bytes"
+            _logger.info(msg_info)
+
+        return removed
+
+
+class CompileManifest:
+    """Per venv and ``.lock``, the key the ``.lock`` was last written
+    with and the digests of the include closure files.
+
+    Thread safe. Persisted, as json, by :py:meth:`save`
+
+    :param path_f: manifest file absolute path. Need not exist
+    :type path_f: pathlib.Path
+    """
+
+    __slots__ = ("path_f", "_data", "_mutex", "_is_dirty")
+
+    def __init__(self, path_f):
+        """Class constructor. Unreadable or other version manifest, start empty."""
+        self.path_f = Path(path_f)
+        self._mutex = threading.Lock()
+        self._is_dirty = False
+        try:
+            d_manifest = json.loads(self.path_f.read_text())
+        except (OSError, ValueError):
+            d_manifest = {}
+
+        is_ok = (
+            isinstance(d_manifest, dict)
+            and d_manifest.get("version", None) == _MANIFEST_VERSION
+            and isinstance(d_manifest.get("venvs", None), dict)
+        )
+        self._data = d_manifest["venvs"] if is_ok else {}
+
+    @classmethod
+    def from_loader(cls, loader):
+        """Manifest file within package base folder.
+
+        :param loader: Contains some paths and loaded unparsed mappings
+        :type loader: wreck.pep518_venvs.VenvMapLoader
+        :returns: compile manifest
+        :rtype: wreck.lock_cache.CompileManifest
+        """
+        path_f = loader.project_base.joinpath(CACHE_FOLDER, _MANIFEST_NAME)
+
+        return cls(path_f)
+
+    def _get(self, venv_relpath, lock_relpath):
+        """Get one entry.
+
+        :param venv_relpath: venv relative path
+        :type venv_relpath: str
+        :param lock_relpath: ``.lock`` relative path
+        :type lock_relpath: str
+        :returns: entry. Contains keys: ``key`` and ``inputs``
+        :rtype: dict[str, typing.Any] | None
+        """
+        with self._mutex:
+            ret = self._data.get(str(venv_relpath), {}).get(lock_relpath, None)
+
+        return ret
+
+    def is_fresh(self, venv_relpath, lock_relpath, key):
+        """Is ``.lock`` up to date.
+
+        :param venv_relpath: venv relative path
+        :type venv_relpath: str
+        :param lock_relpath: ``.lock`` relative path
+        :type lock_relpath: str
+        :param key: :py:func:`compile_key` as of now
+        :type key: str
+        :returns: True if ``.lock`` was last written with this key
+        :rtype: bool
+        """
+        d_entry = self._get(venv_relpath, lock_relpath)
+        ret = d_entry is not None and d_entry.get("key", None) == key
+
+        return ret
+
+    def changed(self, venv_relpath, lock_relpath, inputs):
+        """Which include closure files changed, were added or removed.
+
+        :param venv_relpath: venv relative path
+        :type venv_relpath: str
+        :param lock_relpath: ``.lock`` relative path
+        :type lock_relpath: str
+        :param inputs: :py:func:`closure_digests` as of now
+        :type inputs: dict[str, str | None]
+        :returns: relative paths. None if no entry
+        :rtype: list[str] | None
+        """
+        d_entry = self._get(venv_relpath, lock_relpath)
+        if d_entry is None:
+            ret = None
+        else:
+            d_before = d_entry.get("inputs", {})
+            relpaths = sorted(set(d_before.keys()) | set(inputs.keys()))
+            ret = [
+                relpath_f
+                for relpath_f in relpaths
+                if d_before.get(relpath_f, None) != inputs.get(relpath_f, None)
+            ]
+
+        return ret
+
+    def record(self, venv_relpath, lock_relpath, key, inputs):
+        """Record ``.lock`` was just written.
+
+        :param venv_relpath: venv relative path
+        :type venv_relpath: str
+        :param lock_relpath: ``.lock`` relative path
+        :type lock_relpath: str
+        :param key: :py:func:`compile_key` after ``.lock`` written
+        :type key: str
+        :param inputs: :py:func:`closure_digests`
+        :type inputs: dict[str, str | None]
+        """
+        d_entry = {"key": key, "inputs": dict(inputs)}
+        with self._mutex:
+            d_venv = self._data.setdefault(str(venv_relpath), {})
+            if d_venv.get(lock_relpath, None) != d_entry:
+                d_venv[lock_relpath] = d_entry
+                self._is_dirty = True
+            else:  # pragma: no cover
+                pass
+
+    def save(self):
+        """If changed, atomically write manifest file.
+
+        :returns: True if written otherwise False
+        :rtype: bool
+        """
+        with self._mutex:
+            if self._is_dirty:
+                d_manifest = {"version": _MANIFEST_VERSION, "venvs": self._data}
+                contents = json.dumps(d_manifest, indent=2, sort_keys=True)
+                _write_text_atomic(self.path_f, contents)
+                self._is_dirty = False
+                ret = True
+            else:
+                ret = False
+
+        return ret
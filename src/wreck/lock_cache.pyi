@@ -0,0 +1,98 @@
+import logging
+import re
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+from typing import (
+    Any,
+    Final,
+)
+
+from typing_extensions import Self
+
+from .pep518_venvs import VenvMapLoader
+
+__all__ = (
+    "CACHE_FOLDER",
+    "CompileCache",
+    "CompileManifest",
+    "closure_digests",
+    "compile_key",
+    "include_closure",
+)
+
+CACHE_FOLDER: Final[str]
+CACHE_MAX_SIZE: Final[int]
+CACHE_MAX_AGE: Final[int]
+_SUFFIX_ENTRY: Final[str]
+_MANIFEST_NAME: Final[str]
+_MANIFEST_VERSION: Final[int]
+_PROG_INCLUDE: Final[re.Pattern[str]]
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+def _digest_file(abspath_f: Path) -> str | None: ...
+def include_closure(in_abspath: str | Path) -> tuple[Path, ...]: ...
+def _relpath(path_cwd: Path, abspath_f: Path) -> str: ...
+def closure_digests(
+    path_cwd: Path, in_abspath: str | Path
+) -> dict[str, str | None]: ...
+def compile_key(
+    path_cwd: Path,
+    in_abspath: str,
+    lock_abspath: str,
+    venv_python: str | None,
+    options: Sequence[str],
+    seed: str | None = None,
+) -> str: ...
+def _write_text_atomic(abspath_f: Path, contents: str) -> None: ...
+def _check_positive_int(val: Any, default: int) -> int: ...
+
+class CompileCache:
+    __slots__ = ("path_dir", "max_bytes", "max_seconds")
+
+    path_dir: Path
+    max_bytes: int
+    max_seconds: int
+
+    def __init__(
+        self,
+        path_dir: Path,
+        max_size: Any = ...,
+        max_age: Any = ...,
+    ) -> None: ...
+    @classmethod
+    def from_loader(cls, loader: VenvMapLoader) -> Self: ...
+    def _entry(self, key: str) -> Path: ...
+    def get(self, key: str) -> str | None: ...
+    def put(self, key: str, contents: str) -> None: ...
+    def evict(self) -> int: ...
+
+class CompileManifest:
+    __slots__ = ("path_f", "_data", "_mutex", "_is_dirty")
+
+    path_f: Path
+    _data: dict[str, dict[str, dict[str, Any]]]
+    _mutex: threading.Lock
+    _is_dirty: bool
+
+    def __init__(self, path_f: Path) -> None: ...
+    @classmethod
+    def from_loader(cls, loader: VenvMapLoader) -> Self: ...
+    def _get(self, venv_relpath: str, lock_relpath: str) -> dict[str, Any] | None: ...
+    def is_fresh(self, venv_relpath: str, lock_relpath: str, key: str) -> bool: ...
+    def changed(
+        self,
+        venv_relpath: str,
+        lock_relpath: str,
+        inputs: dict[str, str | None],
+    ) -> list[str] | None: ...
+    def record(
+        self,
+        venv_relpath: str,
+        lock_relpath: str,
+        key: str,
+        inputs: dict[str, str | None],
+    ) -> None: ...
+    def save(self) -> bool: ...
@@ -13,6 +13,26 @@ how best to resolve the issue.
 
 KISS principle applies. Keep it simple
 
+Each ``.in`` --> ``.lock`` is an independent :command:`pip-compile`
+subprocess. Most of the wall time is spent waiting on those subprocesses,
+so a bounded thread pool runs them concurrently. Results are gathered in
+submission order, so output does not depend on which job finishes first.
+
+When none of a job's inputs changed since the ``.lock`` was last
+written, :py:class:`wreck.lock_cache.CompileManifest` says it's up to
+date. Otherwise, for inputs seen before, the ``.lock`` contents come
+from :py:class:`wreck.lock_cache.CompileCache` rather than pip-compile.
+
+The resolver writes to a staging file beside the ``.lock``, seeded with
+the existing ``.lock`` so existing pins are kept. Its output is read
+once, absolute paths stripped line by line, then compared by digest
+with the previous ``.lock``. Only a changed ``.lock`` is replaced,
+atomically. A killed or failed resolver never leaves a partial ``.lock``
+
+All jobs share one package index limiter, see
+:py:mod:`wreck.lock_ratelimit`. Off unless limits are set in
+``[tool.wreck]``
+
 .. py:data:: is_module_debug
    :type: bool
    :value: False
@@ -25,44 +45,91 @@ KISS principle applies. Keep it simple
    Module level logger
 
 .. py:data:: __all__
-   :type: tuple[str, str]
-   :value: ("is_timeout", "lock_compile")
+   :type: tuple[str, str, str, str]
+   :value: ("is_budget_exceeded", "is_cancelled", "is_timeout", "lock_compile")
 
    Module exports
 
 """
 
-import filecmp
-import fileinput
+import hashlib
 import logging
 import os
-import shutil
-import sys
+import stat
 import tempfile
+import threading
+import time
 from pathlib import (
     Path,
     PurePath,
 )
 
 from ._package_installed import is_package_installed
-from ._run_cmd import run_cmd
-from ._safe_path import (
-    get_venv_python_abspath,
-    resolve_path,
+from ._run_cmd import (
+    BUDGET_EXCEEDED,
+    CANCELLED,
 )
+from ._safe_path import resolve_path
 from .check_type import is_ok
 from .constants import (
     SUFFIX_LOCKED,
     g_app_name,
 )
 from .exceptions import MissingRequirementsFoldersFiles
+from .lock_autojobs import (
+    JOBS_AUTO,
+    AutoJobs,
+)
+from .lock_backend import (
+    PipCompileBackend,
+    get_backend_class,
+)
+from .lock_cache import (
+    CompileCache,
+    CompileManifest,
+    closure_digests,
+    compile_key,
+)
+from .lock_dedupe import (
+    JobDedupe,
+    job_key,
+)
+from .lock_groups import InterpreterGroups
+from .lock_interpreter import (
+    MarkerCache,
+    venv_interpreters,
+    venv_python,
+)
+from .lock_ratelimit import (
+    IndexLimiter,
+    index_host,
+)
+from .lock_retry import (
+    RetryPolicy,
+    retry_jobs,
+)
+from .lock_schedule import JobSchedule
+from .lock_telemetry import CompileTelemetry
+from .lock_unified import (
+    split_lock,
+    unified_units,
+)
 from .lock_util import replace_suffixes_last
+from .lock_warm import (
+    venv_preferences,
+    warm_seed,
+)
 from .pep518_venvs import get_reqs
 
+# New .lock file permissions. rw-r--r--
+_LOCK_MODE = 0o644
+
 is_module_debug = False
 _logger = logging.getLogger(f"{g_app_name}.lock_compile")
 
 __all__ = (
+    "is_budget_exceeded",
+    "is_cancelled",
     "is_timeout",
     "lock_compile",
 )
@@ -82,6 +149,45 @@ def prepare_pairs(t_ins):
         yield str(abspath_in), str(abspath_locked)
 
 
+def _relpath_lines(lines, path_parent):
+    """Within lock file lines, if an absolute path make relative by
+    removing parent path. Line by line, so streams
+
+    :param lines: lock file lines, with line endings
+    :type lines: collections.abc.Iterable[str]
+    :param path_parent: Absolute path to the package base folder
+    :type path_parent: pathlib.Path
+    :returns: Yields lines. Only ``# via`` comment lines are modified
+    :rtype: collections.abc.Generator[str, None, None]
+    """
+    str_parent = f"{path_parent!s}/"
+    for line in lines:
+        is_lock_requirement_line = line.startswith("    # ")
+        if is_lock_requirement_line:
+            # process line
+            yield line.replace(str_parent, "")
+        else:  # pragma: no cover
+            # do not modify line
+            yield line
+
+
+def _read_relpath(path_out, path_parent):
+    """Read a lock file, absolute paths --> relative paths. One pass.
+
+    :param path_out: Absolute path of the requirements file
+    :type path_out: pathlib.Path | str
+    :param path_parent: Absolute path to the package base folder
+    :type path_parent: pathlib.Path
+    :returns: lock file contents
+    :rtype: str
+    """
+    # py310 encoding="utf-8"
+    with open(path_out) as f:
+        ret = "".join(_relpath_lines(f, path_parent))
+
+    return ret
+
+
 def _postprocess_abspath_to_relpath(path_out, path_parent):
     """Within a lock file (contents), if an absolute path make relative
     by removing parent path
@@ -97,48 +203,117 @@ def _postprocess_abspath_to_relpath(path_out, path_parent):
     :param path_parent: Absolute path to the parent folder of the requirements file
     :type path_parent: pathlib.Path
     """
-    files = (path_out,)
-    # py310 encoding="utf-8"
-    with fileinput.input(files, inplace=True) as f:
-        for line in f:
-            is_lock_requirement_line = line.startswith("    # ")
-            if is_lock_requirement_line:
-                # process line
-                line_modified = line.replace(f"{path_parent!s}/", "")
-                sys.stdout.write(line_modified)
-            else:  # pragma: no cover
-                # do not modify line
-                sys.stdout.write(line)
+    contents = _read_relpath(path_out, path_parent)
+    with open(path_out, "w") as f:
+        f.write(contents)
 
 
-def _compile_one(
+def _write_lock(lock_abspath, contents):
+    """Atomically replace ``.lock`` contents. Skip if unchanged.
+
+    :param lock_abspath: ``.lock`` file absolute path
+    :type lock_abspath: str
+    :param contents: ``.lock`` file contents
+    :type contents: str
+    """
+    abspath_lock = Path(lock_abspath)
+    try:
+        is_same = abspath_lock.read_text() == contents
+    except OSError:
+        is_same = False
+
+    if not is_same:
+        with tempfile.NamedTemporaryFile(
+            mode="w",
+            dir=abspath_lock.parent,
+            prefix=f".{abspath_lock.name}.",
+            delete=False,
+        ) as fp:
+            fp.write(contents)
+            fp_name = fp.name
+        os.replace(fp_name, abspath_lock)
+    else:  # pragma: no cover
+        pass
+
+
+def _compile_before(lock_abspath, seed=None):
+    """Before compiling. Create the staging file the resolver writes
+    to, next to the ``.lock``. Seeded with the existing ``.lock``, so
+    the resolver keeps existing pins
+
+    :param lock_abspath: output absolute path. Should have ``.lock`` last suffix
+    :type lock_abspath: str
+    :param seed:
+
+       Default None. Staging file contents, the resolver's preferred
+       versions. None for the existing ``.lock``. Empty str for none
+
+    :type seed: str | None
+    :returns:
+
+       staging file absolute path and digest of the existing ``.lock``.
+       Digest None if a new file will be created
+
+    :rtype: tuple[str, str | None]
+    """
+    abspath_lock = Path(lock_abspath)
+    # Same folder, so os.replace is atomic. Same last suffix, same format
+    fd, staging_abspath = tempfile.mkstemp(
+        suffix=SUFFIX_LOCKED,
+        prefix=f".{abspath_lock.stem}.",
+        dir=abspath_lock.parent,
+    )
+    try:
+        contents_old = abspath_lock.read_bytes()
+        mode = stat.S_IMODE(abspath_lock.stat().st_mode)
+    except OSError:
+        # new file will be created. mkstemp is owner only
+        digest_old = None
+        contents_old = b""
+        mode = _LOCK_MODE
+    else:
+        digest_old = hashlib.sha256(contents_old).hexdigest()
+
+    os.chmod(staging_abspath, mode)
+    with os.fdopen(fd, "wb") as f:
+        f.write(contents_old if seed is None else seed.encode())
+
+    return staging_abspath, digest_old
+
+
+def _compile_after(
+    t_ret,
     in_abspath,
     lock_abspath,
-    ep_path,
     path_cwd,
     venv_relpath,
-    timeout=15,
+    int_timeout,
+    backend,
+    staging_abspath,
+    digest_old,
 ):
-    """Run subprocess to compile ``.in`` --> ``.lock``.
-
-    Serial, it's what's for breakfast
+    """After compiling. Interpret the backend result. On success, strip
+    absolute paths. If changed, replace the ``.lock``. Remove the staging
+    file
 
+    :param t_ret: backend compile result. Same as :py:func:`wreck._run_cmd.run_cmd_rusage`
+    :type t_ret: tuple[str | None, str | None, int | None, str | None, dict[str, float | int] | None]
     :param in_abspath: ``.in`` file absolute path
     :type in_abspath: str
     :param lock_abspath: output absolute path. Should have ``.lock`` last suffix
     :type lock_abspath: str
-    :param ep_path: Absolute path to binary executable
-    :type ep_path: str
     :param path_cwd: package base folder absolute Path
     :type path_cwd: pathlib.Path
-    :param venv_relpath:
-
-       From the venv relative path, get the Python interpreter absolute path
-       and pass thru to pip.
-
+    :param venv_relpath: venv relative path
     :type venv_relpath: str
-    :param timeout: Default 15. Give ``pip --timeout`` in seconds
-    :type timeout: typing.Any
+    :param int_timeout: web connection timeout in seconds
+    :type int_timeout: int
+    :param backend: Ran the resolver
+    :type backend: wreck.lock_backend.CompileBackend
+    :param staging_abspath: resolver output file absolute path
+    :type staging_abspath: str
+    :param digest_old: Previous ``.lock`` sha256 hex digest. None if there was none
+    :type digest_old: str | None
     :returns:
 
        On success, Path to ``.lock`` file otherwise None. 2nd is error
@@ -147,102 +322,32 @@ def _compile_one(
     :rtype: tuple[pathlib.Path | None, None | str]
     """
     dotted_path = f"{g_app_name}.lock_compile._compile_one"
-
-    if timeout is None or not isinstance(timeout, int):
-        int_timeout = 15
-    else:
-        int_timeout = timeout
-
-    """pip-compile runs with Python interpreter A.
-    pip runs against Python interpreter B.
-
-    Do not know whether or not Python interpreter B is setup in venv
-    relative path folder
-    """
-    try:
-        venv_python_abspath = get_venv_python_abspath(path_cwd, venv_relpath)
-    except NotADirectoryError:  # pragma: no cover
-        # venv not setup with appropriate python interpreter version.
-        # pip-compile results will be wrong, but **might** still run
-        line_python = ""
-        msg_warn = (
-            f"venv not setup under folder, {venv_relpath} "
-            "with the appropriate python interpreter version. "
-            "Running pip-compile with current python executable. "
-            "pip-compile results will be wrong, but might still run."
-        )
-        _logger.warning(msg_warn)
-    else:  # pragma: no cover
-        # venv found. Hopefully with the correct Python interpreter version
-        is_file = (
-            Path(venv_python_abspath).exists() and Path(venv_python_abspath).is_file()
-        )
-        if is_file:
-            line_python = f"--pip-args='--python={venv_python_abspath!s}'"
-        else:
-            """Couldn't find Python interpreter, fallback to current one
-            In tests, base folder is tmp_path, not path_cwd. Needs a
-            *parent_dir* override param
-            """
-            line_python = ""
-
-    cmd = (
-        ep_path,
-        "--no-allow-unsafe",
-        "--no-header",
-        "--resolver",
-        "backtracking",
-        "--pip-args='--isolated'",
-        "--no-emit-options",
-        f"--pip-args='--timeout={int_timeout!s}'",
-        f"{line_python}",
-        "-o",
-        lock_abspath,
-        in_abspath,
-    )
-
-    if is_module_debug:  # pragma: no branch  # pragma: no cover
-        msg_info = f"{dotted_path} ({venv_relpath}) cmd: {cmd}"
-        _logger.info(msg_info)
-
-    abspath_lock = Path(lock_abspath)
-    if not abspath_lock.exists() or not abspath_lock.is_file():
-        # new file will be created
-        is_do_compare = False
-        fp_name = None
-    else:  # pragma: no cover
-        # Copy existing .lock to a temp file. Str path :code:`fp.name`
-        is_do_compare = True
-        with tempfile.NamedTemporaryFile(delete=False) as fp:
-            shutil.copy2(lock_abspath, fp.name)
-            fp_name = fp.name
-
-    t_ret = run_cmd(cmd, cwd=path_cwd)
-    _, err, exit_code, exc = t_ret
-
-    if exit_code != 0:  # pragma: no cover
-        """timeout error message
-
-        WARNING: Retrying (Retry(total=4, connect=None, read=None, redirect=None,
-        status=None)) after connection broken by 'NewConnectionError('
-        <pip._vendor.urllib3.connection.HTTPSConnection object at 0x7fe86a05d670>:
-        Failed to establish a new connection: [Errno -3] Temporary failure
-        in name resolution')': /simple/pip-tools/
-
-        Search for ``Failed to establish a new connection`` to detect timeouts
+    _, err, exit_code, exc = t_ret[:4]
+    # Killed within budget or cancelled, exit code is None
+    is_failed = exit_code != 0 or exc is not None
+
+    if is_failed:  # pragma: no cover
+        """timeout error message differs by backend. The backend
+        recognizes it's own. See
+        :py:meth:`wreck.lock_backend.CompileBackend.is_connection_error`
         """
         if err is None:
             str_err = ""
         else:
             str_err = err.lstrip()
 
-        if exit_code == 1 and "Failed to establish a new connection" in str_err:
+        if exc is not None and exc.startswith((BUDGET_EXCEEDED, CANCELLED)):
+            # Killed. Not a connection timeout. Partial output is noise
+            err_details = exc
+            msg_warn = f"{dotted_path} ({venv_relpath}) {in_abspath} {exc}"
+            _logger.warning(msg_warn)
+        elif backend.is_connection_error(exit_code, str_err):
             str_err = f"timeout ({int_timeout!s}s)"
             err_details = str_err
         else:
             err_details = f"{str_err}{os.linesep}{exc}"
             msg_warn = (
-                f"{dotted_path} ({venv_relpath}) {cmd!r} exit code "
+                f"{dotted_path} ({venv_relpath}) {backend.name} {in_abspath} exit code "
                 f"{exit_code} {str_err} {exc}"
             )
             _logger.warning(msg_warn)
@@ -250,32 +355,51 @@ def _compile_one(
         err_details = None
 
     path_out = Path(lock_abspath)
-    is_confirm = path_out.exists() and path_out.is_file()
+    path_staging = Path(staging_abspath)
+    if not is_failed and path_staging.exists():
+        # abspath --> relpath. In memory
+        contents = _read_relpath(path_staging, path_cwd)
+        digest_new = hashlib.sha256(contents.encode()).hexdigest()
+        if digest_new != digest_old:
+            if digest_old is None:
+                msg_warn = f"{dotted_path} {venv_relpath} (new) {path_out!s}"
+            else:
+                msg_warn = (
+                    f"{dotted_path} {venv_relpath} "
+                    f"(overwrite previous fix or file changed) {path_out!s}"
+                )
+            _logger.warning(msg_warn)
+
+            with open(path_staging, "w") as f:
+                f.write(contents)
+            os.replace(path_staging, path_out)
+        else:  # pragma: no cover
+            # Unchanged. .lock not touched
+            pass
+    else:  # pragma: no cover
+        pass
+
+    # Remove staging file, unless it replaced the .lock
+    try:
+        os.unlink(path_staging)
+    except FileNotFoundError:
+        pass
+
+    """A previous ``.lock`` may remain on disk. It's stale. Success is
+    decided by the backend result, not whether the file exists"""
+    is_confirm = not is_failed and path_out.exists() and path_out.is_file()
     if is_confirm:
         if is_module_debug:  # pragma: no cover
             msg_info = f"{dotted_path} ({venv_relpath}) yield: {path_out!s}"
             _logger.info(msg_info)
         else:  # pragma: no cover
-            if not is_do_compare:
-                msg_warn = f"{dotted_path} {venv_relpath} (new) {path_out!s}"
-                _logger.warning(msg_warn)
-            else:
-                assert fp_name is not None
-                is_same = filecmp.cmp(fp_name, lock_abspath)
-                if not is_same:  # pragma: no branch
-                    msg_warn = (
-                        f"{dotted_path} {venv_relpath} "
-                        f"(overwrite previous fix or file changed) {path_out!s}"
-                    )
-                    _logger.warning(msg_warn)
-
-        # abspath --> relpath
-        _postprocess_abspath_to_relpath(path_out, path_cwd)
+            pass
 
         ret = path_out, err_details
     else:
-        """File not created. ``.in`` file contained errors that needs
-        to be fixed. Log info adds context. Gives explanation about consequences
+        """File not created or not refreshed. ``.in`` file contained
+        errors that needs to be fixed or resolver killed. Log info adds
+        context. Gives explanation about consequences
         """
         if is_module_debug:  # pragma: no branch  # pragma: no cover
             msg_info = (
@@ -286,9 +410,299 @@ def _compile_one(
 
         ret = None, err_details
 
-    # Remove tempfile
-    if is_do_compare and fp_name is not None:  # pragma: no branch
-        os.unlink(fp_name)
+    return ret
+
+
+def _is_resolve_failure(t_ret, backend):
+    """Resolver ran and failed. Not killed, not a connection error.
+
+    :param t_ret: backend compile result. Same as :py:func:`wreck._run_cmd.run_cmd_rusage`
+    :type t_ret: tuple[str | None, str | None, int | None, str | None, dict[str, float | int] | None]
+    :param backend: Ran the resolver
+    :type backend: wreck.lock_backend.CompileBackend
+    :returns: True if redoing the resolve, differently, might succeed
+    :rtype: bool
+    """
+    _, err, exit_code, exc = t_ret[:4]
+    str_err = "" if err is None else err.lstrip()
+    is_killed = exc is not None and exc.startswith((BUDGET_EXCEEDED, CANCELLED))
+    ret = (
+        exit_code != 0
+        and not is_killed
+        and not backend.is_connection_error(exit_code, str_err)
+    )
+
+    return ret
+
+
+def _log_compile_start(in_abspath, lock_abspath, venv_relpath, backend):
+    """Debug log, before compiling.
+
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str
+    :param lock_abspath: output absolute path
+    :type lock_abspath: str
+    :param venv_relpath: venv relative path
+    :type venv_relpath: str
+    :param backend: Runs the resolver
+    :type backend: wreck.lock_backend.CompileBackend
+    """
+    dotted_path = f"{g_app_name}.lock_compile._compile_one"
+    if is_module_debug:  # pragma: no branch  # pragma: no cover
+        msg_info = (
+            f"{dotted_path} ({venv_relpath}) backend {backend.name} "
+            f"{in_abspath} --> {lock_abspath}"
+        )
+        _logger.info(msg_info)
+
+
+def _record_telemetry(
+    telemetry,
+    path_cwd,
+    venv_relpath,
+    in_abspath,
+    backend,
+    wall,
+    t_ret,
+    wait=None,
+):
+    """Record one compile's wall time and resource usage.
+
+    :param telemetry: None if telemetry disabled
+    :type telemetry: wreck.lock_telemetry.CompileTelemetry | None
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param venv_relpath: venv relative path
+    :type venv_relpath: str
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str
+    :param backend: Ran the resolver
+    :type backend: wreck.lock_backend.CompileBackend
+    :param wall: wall time in seconds
+    :type wall: float
+    :param t_ret: backend compile result. Same as :py:func:`wreck._run_cmd.run_cmd_rusage`
+    :type t_ret: tuple[str | None, str | None, int | None, str | None, dict[str, float | int] | None]
+    :param wait:
+
+       Default None. Seconds waiting on the package index limiter. None
+       if not limited
+
+    :type wait: float | None
+    """
+    # Cancelled. Wall time says nothing about the next run
+    exc = t_ret[3]
+    is_cancelled = exc is not None and exc.startswith(CANCELLED)
+    if telemetry is not None and not is_cancelled:
+        telemetry.record(
+            venv_relpath,
+            _lock_relpath(path_cwd, in_abspath),
+            backend.name,
+            wall,
+            t_ret[2],
+            rusage=t_ret[4],
+            wait=wait,
+        )
+    else:  # pragma: no cover
+        pass
+
+
+def _compile_limited(
+    backend,
+    limiter,
+    in_abspath,
+    staging_abspath,
+    path_cwd,
+    venv_python_abspath,
+    timeout,
+):
+    """Run the resolver. If limited, first wait on the package index limiter.
+
+    :param backend: Runs the resolver
+    :type backend: wreck.lock_backend.CompileBackend
+    :param limiter: None if not limited
+    :type limiter: wreck.lock_ratelimit.IndexLimiter | None
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str
+    :param staging_abspath: resolver output absolute path
+    :type staging_abspath: str
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param venv_python_abspath: venv python interpreter absolute path
+    :type venv_python_abspath: str
+    :param timeout: Give ``pip --timeout`` in seconds
+    :type timeout: int
+    :returns: backend compile result. Seconds waited, None if not limited
+    :rtype: tuple[tuple[str | None, str | None, int | None, str | None, dict[str, float | int] | None], float | None]
+    """
+    if limiter is None:
+        waited = None
+        t_ret = backend.compile(
+            in_abspath,
+            staging_abspath,
+            path_cwd,
+            venv_python_abspath,
+            timeout,
+        )
+    else:
+        with limiter.acquire(index_host(in_abspath)) as waited:
+            t_ret = backend.compile(
+                in_abspath,
+                staging_abspath,
+                path_cwd,
+                venv_python_abspath,
+                timeout,
+            )
+
+    ret = (t_ret, waited)
+
+    return ret
+
+
+def _compile_one(
+    in_abspath,
+    lock_abspath,
+    ep_path,
+    path_cwd,
+    venv_relpath,
+    timeout=15,
+    backend=None,
+    telemetry=None,
+    prefer=None,
+    limiter=None,
+    on_result=None,
+):
+    """Run subprocess to compile ``.in`` --> ``.lock``.
+
+    One job. Thread safe, so many can run concurrently. See
+    :py:func:`wreck.lock_compile.lock_compile` param ``jobs``
+
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str
+    :param lock_abspath: output absolute path. Should have ``.lock`` last suffix
+    :type lock_abspath: str
+    :param ep_path: Absolute path to binary executable
+    :type ep_path: str
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param venv_relpath:
+
+       From the venv relative path, get the Python interpreter absolute path
+       and pass thru to pip.
+
+    :type venv_relpath: str
+    :param timeout: Default 15. Give ``pip --timeout`` in seconds
+    :type timeout: typing.Any
+    :param backend:
+
+       Default None. Runs the resolver. None for one pip-compile
+       subprocess, ``ep_path``
+
+    :type backend: wreck.lock_backend.CompileBackend | None
+    :param telemetry:
+
+       Default None. Records wall time, user and system CPU, and max
+       RSS. None disables
+
+    :type telemetry: wreck.lock_telemetry.CompileTelemetry | None
+    :param prefer:
+
+       Default None. Warm start. Staging file contents, the preferred
+       versions. If the resolve fails, redone cold. None seeds with the
+       existing ``.lock``. See :py:mod:`wreck.lock_warm`
+
+    :type prefer: str | None
+    :param limiter:
+
+       Default None. Shared by all jobs. Before the resolver starts,
+       wait for the package index limiter. Time waited is not wall
+       time. None not limited. See :py:mod:`wreck.lock_ratelimit`
+
+    :type limiter: wreck.lock_ratelimit.IndexLimiter | None
+    :param on_result:
+
+       Default None. Called with the backend compile result. If warm
+       start was redone cold, only the cold result. None not called
+
+    :type on_result: collections.abc.Callable[[tuple[str | None, str | None, int | None, str | None, dict[str, float | int] | None]], typing.Any] | None
+    :returns:
+
+       On success, Path to ``.lock`` file otherwise None. 2nd is error
+       and exception details
+
+    :rtype: tuple[pathlib.Path | None, None | str]
+    """
+    dotted_path = f"{g_app_name}.lock_compile._compile_one"
+    int_timeout = _check_timeout(timeout)
+
+    if backend is None:
+        backend = PipCompileBackend(ep_path)
+    else:  # pragma: no cover
+        pass
+
+    venv_python_abspath = venv_python(path_cwd, venv_relpath)
+    _log_compile_start(in_abspath, lock_abspath, venv_relpath, backend)
+
+    staging_abspath, digest_old = _compile_before(lock_abspath, seed=prefer)
+    time_start = time.monotonic()
+    t_ret, waited = _compile_limited(
+        backend,
+        limiter,
+        in_abspath,
+        staging_abspath,
+        path_cwd,
+        venv_python_abspath,
+        int_timeout,
+    )
+    if prefer is not None and _is_resolve_failure(t_ret, backend):
+        # Warm start failed. Cold, no preferred versions
+        msg_warn = (
+            f"{dotted_path} ({venv_relpath}) {in_abspath} warm start failed. "
+            "Resolving cold"
+        )
+        _logger.warning(msg_warn)
+        os.unlink(staging_abspath)
+        staging_abspath, digest_old = _compile_before(lock_abspath, seed="")
+        t_ret, waited_cold = _compile_limited(
+            backend,
+            limiter,
+            in_abspath,
+            staging_abspath,
+            path_cwd,
+            venv_python_abspath,
+            int_timeout,
+        )
+        if waited is not None and waited_cold is not None:
+            waited += waited_cold
+        else:  # pragma: no cover
+            pass
+    else:  # pragma: no cover
+        pass
+    wall = time.monotonic() - time_start
+    if on_result is not None:
+        on_result(t_ret)
+    else:  # pragma: no cover
+        pass
+    _record_telemetry(
+        telemetry,
+        path_cwd,
+        venv_relpath,
+        in_abspath,
+        backend,
+        wall if waited is None else wall - waited,
+        t_ret,
+        wait=waited,
+    )
+    ret = _compile_after(
+        t_ret,
+        in_abspath,
+        lock_abspath,
+        path_cwd,
+        venv_relpath,
+        int_timeout,
+        backend,
+        staging_abspath,
+        digest_old,
+    )
 
     return ret
 
@@ -339,42 +753,455 @@ def _empty_in_empty_out(in_abspath, lock_abspath):
     return ret
 
 
-def lock_compile(loader, venv_relpath, timeout=15):
-    """In a subprocess, call :command:`pip-compile` to create ``.lock`` files
+def _check_timeout(timeout, default=15):
+    """Coerce into an int. Web connection timeout in seconds
 
-    :param loader: Contains some paths and loaded unparsed mappings
-    :type loader: wreck.pep518_venvs.VenvMapLoader
-    :param venv_relpath: venv relative path is a key. To choose a tools.wreck.venvs.req
-    :type venv_relpath: str
-    :param timeout: Default 15. Give ``pip --timeout`` in seconds
+    :param timeout: Should be an int
     :type timeout: typing.Any
-    :returns: Generator of abs path to .lock files
-    :rtype: tuple[tuple[str, ...], tuple[tuple[str, pathlib.Path, str]]]
-    :raises:
-
-       - :py:exc:`AssertionError` -- package pip-tools is not installed
-
+    :param default: Default 15. Seconds
+    :type default: int
+    :returns: timeout in seconds
+    :rtype: int
     """
-    dotted_path = f"{g_app_name}.lock_compile.lock_compile"
-    is_installed = is_package_installed("pip-tools")
-    path_ep = resolve_path("pip-compile")
-    assert is_installed is True and path_ep is not None
-    ep_path = str(path_ep)
-
     if timeout is None or not isinstance(timeout, int):  # pragma: no branch
-        int_timeout = 15
+        ret = default
     else:
-        int_timeout = timeout
+        ret = timeout
 
-    # TODO: during testing, this is tmp_path, not package base folder
-    if is_module_debug:  # pragma: no branch  # pragma: no cover
-        msg_info = f"{dotted_path} path_cwd (loader.project_base) {loader.project_base}"
-        _logger.info(msg_info)
+    return ret
 
-    path_cwd = loader.project_base
 
-    compiled = []
-    failures = []
+def _check_jobs(jobs, default=1):
+    """Coerce into a positive int. Worker count for the compile thread pool
+
+    :param jobs: Should be a positive int
+    :type jobs: typing.Any
+    :param default: Default 1. Serial
+    :type default: int
+    :returns: positive int
+    :rtype: int
+    """
+    is_jobs_ng = (
+        jobs is None or isinstance(jobs, bool) or not isinstance(jobs, int) or jobs < 1
+    )
+    if is_jobs_ng:
+        ret = default
+    else:
+        ret = jobs
+
+    return ret
+
+
+def _lock_relpath(path_cwd, lock_abspath):
+    """``.lock`` path relative to package base folder. Manifest key.
+
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param lock_abspath: ``.lock`` absolute path
+    :type lock_abspath: str
+    :returns: posix relative path. If not within package base folder, absolute path
+    :rtype: str
+    """
+    try:
+        ret = Path(lock_abspath).relative_to(path_cwd).as_posix()
+    except ValueError:  # pragma: no cover
+        ret = Path(lock_abspath).as_posix()
+
+    return ret
+
+
+def _job_lookup(t_job, path_cwd, cache=None, manifest=None, backend=None, seed=None):
+    """Before compiling. Empty ``.in``, an up to date ``.lock``, or a
+    compile cache hit, need no compile. Caller holds the ``.lock`` lock
+
+    :param t_job: venv relative path, ``.in`` and ``.lock`` absolute paths
+    :type t_job: tuple[str, str, str]
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param cache: Default None. None disables the compile cache
+    :type cache: wreck.lock_cache.CompileCache | None
+    :param manifest: Default None. None disables skipping up to date ``.lock``
+    :type manifest: wreck.lock_cache.CompileManifest | None
+    :param backend: Default None. Runs the resolver. None for pip-compile subprocess
+    :type backend: wreck.lock_backend.CompileBackend | None
+    :param seed:
+
+       Default None. Warm start. Staging file contents, the preferred
+       versions. Part of the key. None cold
+
+    :type seed: str | None
+    :returns:
+
+       whether or not to compile, ``.lock`` Path or None, error details,
+       cache status, key, venv python interpreter absolute path
+
+    :rtype: tuple[bool, pathlib.Path | None, str | None, str | None, str | None, str]
+    """
+    dotted_path = f"{g_app_name}.lock_compile._job_lookup"
+    venv_relpath, in_abspath, lock_abspath = t_job
+    if backend is None:
+        backend = PipCompileBackend()
+    else:  # pragma: no cover
+        pass
+    lock_relpath = _lock_relpath(path_cwd, lock_abspath)
+
+    # If empty, create an empty .lock and skip pip-compile
+    is_empty = _empty_in_empty_out(in_abspath, lock_abspath)
+    is_keyed = not is_empty and (cache is not None or manifest is not None)
+    if is_keyed:
+        python_abspath = venv_python(path_cwd, venv_relpath)
+        options = backend.options()
+        key = compile_key(
+            path_cwd,
+            in_abspath,
+            lock_abspath,
+            python_abspath,
+            options,
+            seed=seed,
+        )
+    else:
+        python_abspath = ""
+        key = None
+
+    is_compile = False
+    optabspath_lock = None
+    err_details = None
+    if is_empty:  # pragma: no cover
+        optabspath_lock = Path(lock_abspath)
+        cache_status = None
+    elif (
+        key is not None
+        and manifest is not None
+        and manifest.is_fresh(venv_relpath, lock_relpath, key)
+    ):
+        optabspath_lock = Path(lock_abspath)
+        cache_status = "fresh"
+    else:
+        if manifest is not None and is_module_debug:  # pragma: no cover
+            inputs = closure_digests(path_cwd, in_abspath)
+            changed = manifest.changed(venv_relpath, lock_relpath, inputs)
+            msg_info = f"{dotted_path} ({venv_relpath}) {lock_relpath} {changed!r}"
+            _logger.info(msg_info)
+
+        if key is not None and cache is not None:
+            contents = cache.get(key)
+            cache_status = "miss" if contents is None else "hit"
+        else:
+            contents = None
+            cache_status = None if key is None else "miss"
+
+        if contents is not None:
+            _write_lock(lock_abspath, contents)
+            optabspath_lock = Path(lock_abspath)
+        else:
+            is_compile = True
+
+    ret = (is_compile, optabspath_lock, err_details, cache_status, key, python_abspath)
+
+    return ret
+
+
+def _job_store(
+    t_job,
+    path_cwd,
+    t_lookup,
+    optabspath_lock,
+    err_details,
+    cache=None,
+    manifest=None,
+    backend=None,
+    prefer_pins=None,
+):
+    """After compiling. On success, store the result in the compile
+    cache and record in the manifest. Caller holds the ``.lock`` lock
+
+    On a cache miss, the result is stored under two keys: the inputs
+    before and the inputs after. After, the ``.lock`` is the output.
+    So an immediate rerun, with no changes, is a hit
+
+    :param t_job: venv relative path, ``.in`` and ``.lock`` absolute paths
+    :type t_job: tuple[str, str, str]
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param t_lookup: :py:func:`wreck.lock_compile._job_lookup` return value
+    :type t_lookup: tuple[bool, pathlib.Path | None, str | None, str | None, str | None, str]
+    :param optabspath_lock: ``.lock`` Path on success otherwise None
+    :type optabspath_lock: pathlib.Path | None
+    :param err_details: error details. None on success
+    :type err_details: str | None
+    :param cache: Default None. None disables the compile cache
+    :type cache: wreck.lock_cache.CompileCache | None
+    :param manifest: Default None. None disables skipping up to date ``.lock``
+    :type manifest: wreck.lock_cache.CompileManifest | None
+    :param backend: Default None. Runs the resolver. None for pip-compile subprocess
+    :type backend: wreck.lock_backend.CompileBackend | None
+    :param prefer_pins:
+
+       Default None. Warm start. venv's union of pins. The key after is
+       seeded from the written ``.lock``. None cold
+
+    :type prefer_pins: collections.abc.Mapping[str, str] | None
+    """
+    venv_relpath, in_abspath, lock_abspath = t_job
+    _, _, _, cache_status, key, python_abspath = t_lookup
+    if backend is None:
+        backend = PipCompileBackend()
+    else:  # pragma: no cover
+        pass
+
+    is_store = (
+        key is not None
+        and cache_status != "fresh"
+        and optabspath_lock is not None
+        and err_details is None
+    )
+    if is_store:
+        options = backend.options()
+        if prefer_pins is None:
+            seed_after = None
+        else:
+            seed_after = warm_seed(lock_abspath, prefer_pins)
+        key_after = compile_key(
+            path_cwd,
+            in_abspath,
+            lock_abspath,
+            python_abspath,
+            options,
+            seed=seed_after,
+        )
+        if cache is not None and cache_status == "miss":
+            contents = Path(lock_abspath).read_text()
+            assert key is not None
+            cache.put(key, contents)
+            if key_after != key:
+                cache.put(key_after, contents)
+            else:  # pragma: no cover
+                pass
+        else:  # pragma: no cover
+            pass
+
+        if manifest is not None:
+            lock_relpath = _lock_relpath(path_cwd, lock_abspath)
+            inputs = closure_digests(path_cwd, in_abspath)
+            manifest.record(venv_relpath, lock_relpath, key_after, inputs)
+        else:  # pragma: no cover
+            pass
+    else:  # pragma: no cover
+        pass
+
+
+def _lock_compile_job(
+    t_job,
+    ep_path,
+    path_cwd,
+    timeout,
+    path_locks,
+    cache=None,
+    manifest=None,
+    backend=None,
+    telemetry=None,
+    preferences=None,
+    limiter=None,
+    on_result=None,
+):
+    """Worker. Compile one ``.in`` --> ``.lock`` pair.
+
+    The same ``.lock`` can appear in more than one venv. Those jobs
+    are serialized, so two pip-compile never write the same file at once
+
+    If the manifest says the ``.lock`` was last written with the current
+    key, the ``.lock`` is up to date. No cache lookup, no pip-compile.
+
+    :param t_job: venv relative path, ``.in`` and ``.lock`` absolute paths
+    :type t_job: tuple[str, str, str]
+    :param ep_path: Absolute path to pip-compile executable
+    :type ep_path: str
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param timeout: Give ``pip --timeout`` in seconds
+    :type timeout: int
+    :param path_locks: Per ``.lock`` file, a lock
+    :type path_locks: dict[str, threading.Lock]
+    :param cache: Default None. None disables the compile cache
+    :type cache: wreck.lock_cache.CompileCache | None
+    :param manifest: Default None. None disables skipping up to date ``.lock``
+    :type manifest: wreck.lock_cache.CompileManifest | None
+    :param backend: Default None. Runs the resolver. None for pip-compile subprocess
+    :type backend: wreck.lock_backend.CompileBackend | None
+    :param telemetry: Default None. Records compile resource usage. None disables
+    :type telemetry: wreck.lock_telemetry.CompileTelemetry | None
+    :param preferences:
+
+       Default None. Warm start. Per venv, the union of pins across
+       it's ``.lock`` files. None disables
+
+    :type preferences: collections.abc.Mapping[str, collections.abc.Mapping[str, str]] | None
+    :param limiter:
+
+       Default None. Package index limiter, shared by all jobs. None
+       not limited
+
+    :type limiter: wreck.lock_ratelimit.IndexLimiter | None
+    :param on_result:
+
+       Default None. Called with the backend compile result. Not
+       called if the ``.lock`` is up to date or a cache hit. See
+       :py:func:`wreck.lock_compile._compile_one`
+
+    :type on_result: collections.abc.Callable[[tuple[str | None, str | None, int | None, str | None, dict[str, float | int] | None]], typing.Any] | None
+    :returns:
+
+       venv relative path, ``.lock`` absolute path, ``.lock`` Path on
+       success otherwise None, error details, ``fresh`` ``hit`` or
+       ``miss`` or None if neither cache nor manifest applicable
+
+    :rtype: tuple[str, str, pathlib.Path | None, str | None, str | None]
+    """
+    venv_relpath, in_abspath, lock_abspath = t_job
+    if backend is None:
+        backend = PipCompileBackend(ep_path)
+    else:  # pragma: no cover
+        pass
+
+    with path_locks[lock_abspath]:
+        # warm start seed is part of the key
+        if preferences is None:
+            prefer_pins = None
+            prefer = None
+        else:
+            prefer_pins = preferences[venv_relpath]
+            prefer = warm_seed(lock_abspath, prefer_pins)
+        t_lookup = _job_lookup(
+            t_job,
+            path_cwd,
+            cache=cache,
+            manifest=manifest,
+            backend=backend,
+            seed=prefer,
+        )
+        is_compile, optabspath_lock, err_details, cache_status = t_lookup[:4]
+        if is_compile:
+            optabspath_lock, err_details = _compile_one(
+                in_abspath,
+                lock_abspath,
+                ep_path,
+                path_cwd,
+                venv_relpath,
+                timeout=timeout,
+                backend=backend,
+                telemetry=telemetry,
+                prefer=prefer,
+                limiter=limiter,
+                on_result=on_result,
+            )
+        else:  # pragma: no cover
+            pass
+
+        _job_store(
+            t_job,
+            path_cwd,
+            t_lookup,
+            optabspath_lock,
+            err_details,
+            cache=cache,
+            manifest=manifest,
+            backend=backend,
+            prefer_pins=prefer_pins,
+        )
+
+    ret = (venv_relpath, lock_abspath, optabspath_lock, err_details, cache_status)
+
+    return ret
+
+
+def _get_backend(loader, backend, wall_budget=None, cpu_budget=None):
+    """Choose the compile backend. Check it's executable is installed.
+
+    :param loader: Contains some paths and loaded unparsed mappings
+    :type loader: wreck.pep518_venvs.VenvMapLoader
+    :param backend: Compile backend name. None for ``[tool.wreck]`` field ``backend``
+    :type backend: str | None
+    :param wall_budget:
+
+       Default None. Per job wall-clock seconds. None for
+       ``[tool.wreck]`` field ``wall_budget``
+
+    :type wall_budget: typing.Any
+    :param cpu_budget:
+
+       Default None. Per job CPU seconds. None for ``[tool.wreck]``
+       field ``cpu_budget``
+
+    :type cpu_budget: typing.Any
+    :returns: backend and resolver executable absolute path
+    :rtype: tuple[wreck.lock_backend.CompileBackend, str]
+    :raises:
+
+       - :py:exc:`AssertionError` -- package pip-tools or uv is not installed
+
+       - :py:exc:`ValueError` -- No such compile backend
+
+    """
+    # cli overrides [tool.wreck] backend. may raise ValueError
+    if backend is None:
+        backend_name = loader.section_parent.get("backend", None)
+    else:
+        backend_name = backend
+    cls_backend = get_backend_class(backend_name)
+
+    # uv does not need pip-tools
+    if cls_backend.executable == "pip-compile":
+        is_installed = is_package_installed("pip-tools")
+    else:
+        is_installed = True
+    path_ep = resolve_path(cls_backend.executable)
+    assert is_installed is True and path_ep is not None
+    ep_path = str(path_ep)
+
+    # cli overrides [tool.wreck] budgets
+    if wall_budget is None:
+        wall_budget = loader.section_parent.get("wall_budget", None)
+    else:  # pragma: no cover
+        pass
+    if cpu_budget is None:
+        cpu_budget = loader.section_parent.get("cpu_budget", None)
+    else:  # pragma: no cover
+        pass
+
+    compile_backend = cls_backend(
+        ep_path=ep_path,
+        wall_budget=wall_budget,
+        cpu_budget=cpu_budget,
+    )
+
+    return compile_backend, ep_path
+
+
+def _gather_jobs(loader, venv_relpath):
+    """Gather all jobs before compiling any. Missing files fail fast
+
+    :param loader: Contains some paths and loaded unparsed mappings
+    :type loader: wreck.pep518_venvs.VenvMapLoader
+    :param venv_relpath: venv relative path. None for all venvs
+    :type venv_relpath: str | None
+    :returns: jobs. venv relative path, ``.in`` and ``.lock`` absolute paths
+    :rtype: list[tuple[str, str, str]]
+    :raises:
+
+       - :py:exc:`NotADirectoryError` -- venv relative paths do not
+         correspond to actual venv folders
+
+       - :py:exc:`ValueError` -- expecting [[tool.wreck.venvs]] field
+         reqs to be a sequence
+
+       - :py:exc:`KeyError` -- No such venv found
+
+       - :py:exc:`wreck.exceptions.MissingRequirementsFoldersFiles` --
+         missing requirements file(s)
+
+    """
+    dotted_path = f"{g_app_name}.lock_compile._gather_jobs"
+    path_cwd = loader.project_base
 
     if is_ok(venv_relpath):
         # One
@@ -383,6 +1210,7 @@ def lock_compile(loader, venv_relpath, timeout=15):
         # All
         venv_relpaths = loader.venv_relpaths
 
+    t_jobs = []
     for venv_relpath_tmp in venv_relpaths:
         try:
             t_abspath_in = get_reqs(loader, venv_path=venv_relpath_tmp)
@@ -404,7 +1232,6 @@ def lock_compile(loader, venv_relpath, timeout=15):
             msg_info = f"{dotted_path} pairs {pairs!r}"
             _logger.info(msg_info)
 
-        assert isinstance(ep_path, str)
         assert issubclass(type(path_cwd), PurePath)
         assert venv_relpath_tmp is not None or isinstance(venv_relpath_tmp, str)
         for in_abspath, lock_abspath in pairs:
@@ -413,55 +1240,643 @@ def lock_compile(loader, venv_relpath, timeout=15):
             assert isinstance(lock_abspath, str)
 
             if is_module_debug:  # pragma: no branch  # pragma: no cover
-                msg_info = (
-                    f"{dotted_path} (before _compile_one) cwd {path_cwd} "
-                    f"binary {ep_path} {in_abspath} {lock_abspath}"
-                )
+                msg_info = f"{dotted_path} cwd {path_cwd} {in_abspath} {lock_abspath}"
                 _logger.info(msg_info)
 
-            # If empty, create an empty .lock and skip pip-compile
-            is_empty = _empty_in_empty_out(in_abspath, lock_abspath)
-
-            # Not DRY cuz coverage objected
-            if not is_empty:
-                optabspath_lock, err_details = _compile_one(
-                    in_abspath,
-                    lock_abspath,
-                    ep_path,
-                    path_cwd,
-                    venv_relpath_tmp,
-                    timeout=int_timeout,
-                )
-                # if timeout cannot add to compiled. If no timeout, maybe failures empty
-                if optabspath_lock is None:  # pragma: no cover
-                    # is_fail = True
-                    if err_details is None:  # pragma: no cover
-                        pass
-                    else:
-                        if "pip._internal.exceptions.InstallationError" in err_details:
-                            # pip-tools#2139 reproduce .in file contents ``>=24pip\n``
-                            msg_info = (
-                                "pip-tools#2139 malformed .in file uncaught exception. "
-                                f"{err_details}"
-                            )
-                        else:
-                            msg_info = err_details
-                        # To be converted into wreck.lock_discrepancy.ResolvedMsg
-                        t_three = (venv_relpath_tmp, Path(lock_abspath), msg_info)
-                        failures.append(t_three)
-                else:  # pragma: no cover
-                    # defaults already set
-                    msg = lock_abspath
-                    compiled.append(msg)
+            t_jobs.append((venv_relpath_tmp, in_abspath, lock_abspath))
+
+    return t_jobs
+
+
+def _get_caches(loader, use_cache):
+    """Compile cache and manifest. Both within ``.wreck_cache`` folder
+
+    :param loader: Contains some paths and loaded unparsed mappings
+    :type loader: wreck.pep518_venvs.VenvMapLoader
+    :param use_cache: Only an explicit False disables both
+    :type use_cache: typing.Any
+    :returns: compile cache and manifest. Or both None
+    :rtype: tuple[wreck.lock_cache.CompileCache | None, wreck.lock_cache.CompileManifest | None]
+    """
+    if use_cache is False:
+        cache = None
+        manifest = None
+    else:
+        cache = CompileCache.from_loader(loader)
+        manifest = CompileManifest.from_loader(loader)
+
+    return cache, manifest
+
+
+def _get_telemetry(loader):
+    """Compile telemetry database, within ``.wreck_cache`` folder
+
+    :param loader: Contains some paths and loaded unparsed mappings
+    :type loader: wreck.pep518_venvs.VenvMapLoader
+    :returns: None if ``[tool.wreck]`` field ``telemetry`` is false
+    :rtype: wreck.lock_telemetry.CompileTelemetry | None
+    """
+    if loader.section_parent.get("telemetry", True) is False:
+        ret = None
+    else:
+        ret = CompileTelemetry.from_loader(loader)
+
+    return ret
+
+
+def _get_auto_jobs(jobs, job_count, telemetry, limiter):
+    """``jobs`` auto. Sized from the machine and telemetry, adjusted
+    while compiling
+
+    :param jobs: ``auto`` or a jobs count
+    :type jobs: typing.Any
+    :param job_count: how many jobs
+    :type job_count: int
+    :param telemetry:
+
+       None if telemetry disabled. Then no per job max RSS. Database
+       unreadable, also none
+
+    :type telemetry: wreck.lock_telemetry.CompileTelemetry | None
+    :param limiter: None if the package index is not limited
+    :type limiter: wreck.lock_ratelimit.IndexLimiter | None
+    :returns: None unless jobs is ``auto``
+    :rtype: wreck.lock_autojobs.AutoJobs | None
+    """
+    if jobs != JOBS_AUTO:
+        ret = None
+    else:
+        if telemetry is None:
+            d_history = None
+        else:
+            d_history = telemetry.history()
+        if d_history is not None and len(d_history) == 0:
+            # No history or unavailable. Default plan
+            d_history = None
+        else:  # pragma: no cover
+            pass
+        ret = AutoJobs.plan(job_count, d_history=d_history, limiter=limiter)
+
+    return ret
+
+
+def _get_limiter(loader):
+    """Package index limiter, shared by all jobs. Limits from ``[tool.wreck]``
+
+    :param loader: Contains some paths and loaded unparsed mappings
+    :type loader: wreck.pep518_venvs.VenvMapLoader
+    :returns: None if no limits are set
+    :rtype: wreck.lock_ratelimit.IndexLimiter | None
+    """
+    limiter = IndexLimiter.from_loader(loader)
+    ret = limiter if limiter.is_limited else None
+
+    return ret
+
+
+def _is_opted_in(loader, field, val):
+    """Opt-in mode, e.g. ``unified`` or ``warm_start``. On?
+
+    :param loader: Contains some paths and loaded unparsed mappings
+    :type loader: wreck.pep518_venvs.VenvMapLoader
+    :param field: ``[tool.wreck]`` field name
+    :type field: str
+    :param val: None for ``[tool.wreck]`` field
+    :type val: typing.Any
+    :returns: True only if explicitly True
+    :rtype: bool
+    """
+    # cli overrides [tool.wreck] field
+    if val is None:
+        val = loader.section_parent.get(field, False)
+    else:  # pragma: no cover
+        pass
+    ret = val is True
+
+    return ret
+
+
+def _split_unified(path_cwd, t_jobs, results_units):
+    """Per venv unified ``.lock`` --> per ``.in`` ``.lock``. Each
+    ``.lock`` is written only if changed
+
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param t_jobs: venv relative path, ``.in`` and ``.lock`` absolute paths
+    :type t_jobs: collections.abc.Sequence[tuple[str, str, str]]
+    :param results_units: per venv unified job results
+    :type results_units: collections.abc.Iterable[tuple[str, str, pathlib.Path | None, str | None, str | None]]
+    :returns: per ``.in`` job results, in submission order
+    :rtype: list[tuple[str, str, pathlib.Path | None, str | None, str | None]]
+    """
+    d_units = {t_result[0]: t_result for t_result in results_units}
+    d_contents = {}
+    ret = []
+    for venv_relpath, in_abspath, lock_abspath in t_jobs:
+        optabspath_unified, err_details, cache_status = d_units[venv_relpath][2:5]
+        if optabspath_unified is None or err_details is not None:
+            # unified resolve failed. A unified lock on disk is stale
+            # Every .lock of that venv fails
+            optabspath_lock = None
+        else:
+            if venv_relpath not in d_contents:
+                d_contents[venv_relpath] = optabspath_unified.read_text()
             else:  # pragma: no cover
-                msg = lock_abspath
-                compiled.append(msg)
+                pass
+            contents = split_lock(d_contents[venv_relpath], path_cwd, in_abspath)
+            _write_lock(lock_abspath, contents)
+            optabspath_lock = Path(lock_abspath)
+
+        t_result = (
+            venv_relpath,
+            lock_abspath,
+            optabspath_lock,
+            err_details,
+            cache_status,
+        )
+        ret.append(t_result)
+
+    return ret
+
+
+def _plan_jobs(t_jobs, path_cwd, workers, telemetry):
+    """Longest job first. Predicted from compile telemetry history, else
+    from include closure size. No history at all, submission order
+
+    :param t_jobs: venv relative path, ``.in`` and ``.lock`` absolute paths
+    :type t_jobs: collections.abc.Sequence[tuple[str, str, str]]
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param workers: jobs running at once
+    :type workers: int
+    :param telemetry:
+
+       None if telemetry disabled. Then no history. Database unreadable,
+       also no history
+
+    :type telemetry: wreck.lock_telemetry.CompileTelemetry | None
+    :returns: job start order and predicted makespan
+    :rtype: wreck.lock_schedule.JobSchedule
+    """
+    if telemetry is None:
+        d_history = {}
+    else:
+        d_history = telemetry.history()
+
+    if len(d_history) == 0:
+        # Scheduling is only an optimization
+        ret = JobSchedule.in_order(len(t_jobs))
+    else:
+        ret = JobSchedule.plan(t_jobs, path_cwd, workers, d_history)
+
+    return ret
+
+
+def _dedupe_jobs(t_jobs, path_cwd, backend, interpreters):
+    """Identical jobs, from different venvs, run once. Same include
+    closure, same ``.lock``, same interpreter markers, same resolver options
+
+    :param t_jobs: venv relative path, ``.in`` and ``.lock`` absolute paths
+    :type t_jobs: collections.abc.Sequence[tuple[str, str, str]]
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param backend: Runs the resolver
+    :type backend: wreck.lock_backend.CompileBackend
+    :param interpreters: per venv, interpreter and it's markers
+    :type interpreters: collections.abc.Mapping[str, wreck.lock_interpreter.VenvInterpreter]
+    :returns: which jobs run and whose result the others reuse
+    :rtype: wreck.lock_dedupe.JobDedupe
+    """
+    dotted_path = f"{g_app_name}.lock_compile.lock_compile"
+    options = backend.options()
+    keys = [
+        job_key(
+            path_cwd,
+            in_abspath,
+            lock_abspath,
+            interpreters[venv_relpath].markers,
+            options,
+        )
+        for venv_relpath, in_abspath, lock_abspath in t_jobs
+    ]
+
+    ret = JobDedupe.plan(keys)
+    if ret.duplicates != 0:
+        msg_info = (
+            f"{dotted_path} {len(t_jobs)} jobs, {ret.duplicates} identical "
+            f"across venvs. Running {len(ret.unique)}"
+        )
+        _logger.info(msg_info)
+    else:  # pragma: no cover
+        pass
+
+    return ret
+
+
+def _save_caches(cache, manifest, telemetry=None, marker_cache=None):
+    """Evict old compile cache entries. Persist the manifest, telemetry
+    and interpreter markers
+
+    :param cache: None if compile cache disabled
+    :type cache: wreck.lock_cache.CompileCache | None
+    :param manifest: None if compile cache disabled
+    :type manifest: wreck.lock_cache.CompileManifest | None
+    :param telemetry: Default None. None if telemetry disabled
+    :type telemetry: wreck.lock_telemetry.CompileTelemetry | None
+    :param marker_cache: Default None. Interpreter markers cache
+    :type marker_cache: wreck.lock_interpreter.MarkerCache | None
+    """
+    if cache is not None and manifest is not None:
+        cache.evict()
+        manifest.save()
+    else:  # pragma: no cover
+        pass
+
+    if telemetry is not None:
+        telemetry.save()
+    else:  # pragma: no cover
+        pass
+
+    if marker_cache is not None:
+        marker_cache.save()
+    else:  # pragma: no cover
+        pass
+
+
+def _log_retries(retry_counts, results, policy):
+    """Summarize retries. Jobs retried, total retries, and jobs still
+    failing to connect after the retry cap
+
+    :param retry_counts: per job index, retry count
+    :type retry_counts: collections.abc.Mapping[int, int]
+    :param results: per job results, in submission order
+    :type results: collections.abc.Sequence[tuple[str, str, pathlib.Path | None, str | None, str | None]]
+    :param policy: retry cap and backoff
+    :type policy: wreck.lock_retry.RetryPolicy
+    """
+    dotted_path = f"{g_app_name}.lock_compile.lock_compile"
+    if len(retry_counts) != 0:
+        retries_total = sum(retry_counts.values())
+        gave_up = [
+            idx for idx in retry_counts.keys() if policy.is_retryable(results[idx])
+        ]
+        msg_warn = (
+            f"{dotted_path} retried {len(retry_counts)} jobs, {retries_total} "
+            f"retries. Recovered {len(retry_counts) - len(gave_up)}. Gave up "
+            f"{len(gave_up)}"
+        )
+        _logger.warning(msg_warn)
+    else:  # pragma: no cover
+        pass
+
+
+def _is_cancelled_msg(msg):
+    """Failure message of a job cancelled by fail-fast.
+
+    :param msg: error details
+    :type msg: typing.Any
+    :returns: True if skipped or killed by fail-fast
+    :rtype: bool
+    """
+    ret = msg is not None and isinstance(msg, str) and msg.startswith(CANCELLED)
+
+    return ret
+
+
+def _fail_fast_job(t_job, fcn, backend):
+    """fail-fast. Once a job fails to resolve, cancel the others. Jobs
+    not yet started are skipped. Running resolvers are killed.
+    Connection errors are left to retries. Decided by the backend
+    result, not whether a previous ``.lock`` is on disk
+
+    :param t_job: venv relative path, ``.in`` and ``.lock`` absolute paths
+    :type t_job: tuple[str, str, str]
+    :param fcn: runs one job. Keyword ``on_result`` gets the backend compile result
+    :type fcn: collections.abc.Callable[..., tuple[str, str, pathlib.Path | None, str | None, str | None]]
+    :param backend: Runs the resolver. Cancelled on the first failure
+    :type backend: wreck.lock_backend.CompileBackend
+    :returns: job result. Error details start with CANCELLED if skipped or killed
+    :rtype: tuple[str, str, pathlib.Path | None, str | None, str | None]
+    """
+    dotted_path = f"{g_app_name}.lock_compile.lock_compile"
+    venv_relpath, _, lock_abspath = t_job
+    if backend.is_cancelled:
+        ret = (venv_relpath, lock_abspath, None, f"{CANCELLED} (not started)", None)
+    else:
+        # Up to date or a cache hit, the resolver did not run
+        t_rets = []
+        ret = fcn(t_job, on_result=t_rets.append)
+        is_fatal = len(t_rets) != 0 and _is_resolve_failure(t_rets[-1], backend)
+        if is_fatal and not backend.is_cancelled:
+            msg_warn = (
+                f"{dotted_path} ({venv_relpath}) {lock_abspath} failed. "
+                "fail-fast, cancelling the other jobs"
+            )
+            _logger.warning(msg_warn)
+            backend.cancel()
+        else:  # pragma: no cover
+            pass
+
+    return ret
+
+
+def _lock_compile_results(results, is_cache):
+    """From per job results, get compiled and failures
+
+    :param results: per job results, in submission order
+    :type results: collections.abc.Iterable[tuple[str, str, pathlib.Path | None, str | None, str | None]]
+    :param is_cache: True log a compile cache summary
+    :type is_cache: bool
+    :returns: compiled ``.lock`` absolute paths and failures
+    :rtype: tuple[tuple[str, ...], tuple[tuple[str, pathlib.Path, str], ...]]
+    """
+    dotted_path = f"{g_app_name}.lock_compile.lock_compile"
+    compiled = []
+    failures = []
+
+    d_cache_counts = {"fresh": 0, "hit": 0, "miss": 0, "dedup": 0}
+    for t_result in results:
+        venv_relpath_tmp, lock_abspath, optabspath_lock, err_details = t_result[:4]
+        cache_status = t_result[4]
+        if cache_status is not None:
+            d_cache_counts[cache_status] += 1
+            msg_info = (
+                f"{dotted_path} ({venv_relpath_tmp}) {cache_status} {lock_abspath}"
+            )
+            _logger.info(msg_info)
+        else:  # pragma: no cover
+            pass
+
+        # if timeout cannot add to compiled. If no timeout, maybe failures empty
+        if optabspath_lock is None or err_details is not None:  # pragma: no cover
+            # is_fail = True
+            if err_details is None:  # pragma: no cover
+                pass
+            else:
+                if "pip._internal.exceptions.InstallationError" in err_details:
+                    # pip-tools#2139 reproduce .in file contents ``>=24pip\n``
+                    msg_info = (
+                        "pip-tools#2139 malformed .in file uncaught exception. "
+                        f"{err_details}"
+                    )
+                else:
+                    msg_info = err_details
+                # To be converted into wreck.lock_discrepancy.ResolvedMsg
+                t_three = (venv_relpath_tmp, Path(lock_abspath), msg_info)
+                failures.append(t_three)
+        else:  # pragma: no cover
+            # defaults already set
+            msg = lock_abspath
+            compiled.append(msg)
+
+    if is_cache:
+        msg_info = (
+            f"{dotted_path} up to date {d_cache_counts['fresh']} "
+            f"cache hits {d_cache_counts['hit']} misses {d_cache_counts['miss']} "
+            f"reused {d_cache_counts['dedup']}"
+        )
+        _logger.info(msg_info)
+    else:  # pragma: no cover
+        pass
 
     ret = (tuple(compiled), tuple(failures))
 
     return ret
 
 
+def lock_compile(
+    loader,
+    venv_relpath,
+    timeout=15,
+    jobs=1,
+    use_cache=True,
+    backend=None,
+    wall_budget=None,
+    cpu_budget=None,
+    retries=None,
+    on_retry=None,
+    unified=None,
+    warm_start=None,
+    fail_fast=None,
+):
+    """In a subprocess, call :command:`pip-compile` to create ``.lock`` files
+
+    :param loader: Contains some paths and loaded unparsed mappings
+    :type loader: wreck.pep518_venvs.VenvMapLoader
+    :param venv_relpath: venv relative path is a key. To choose a tools.wreck.venvs.req
+    :type venv_relpath: str
+    :param timeout: Default 15. Give ``pip --timeout`` in seconds
+    :type timeout: typing.Any
+    :param jobs:
+
+       Default 1. Maximum number of :command:`pip-compile` subprocesses
+       running at once. venvs are grouped by python interpreter version,
+       each group with it's own worker pool, see
+       :py:mod:`wreck.lock_groups`. Longest predicted job starts first,
+       see :py:mod:`wreck.lock_schedule`. Results order does not depend
+       on jobs count. ``auto`` sizes from CPU count, available memory and
+       per job max RSS, then adjusts while compiling, see
+       :py:mod:`wreck.lock_autojobs`
+
+    :type jobs: typing.Any
+    :param use_cache:
+
+       Default True. Skip ``.lock`` whose include closure, interpreter
+       and options are unchanged since last written. Otherwise skip
+       pip-compile for inputs seen before. Both are within
+       ``.wreck_cache`` folder, within the package base folder. Limits,
+       in ``[tool.wreck]``, ``compile_cache_max_size`` (MiB) and
+       ``compile_cache_max_age`` (days)
+
+    :type use_cache: typing.Any
+    :param backend:
+
+       Default None. Compile backend name. None for ``[tool.wreck]``
+       field ``backend``, if absent ``pip-compile``, one subprocess
+       per ``.in``. ``pip-compile-worker`` for long-lived workers.
+       ``uv`` for :command:`uv pip compile`. See
+       :py:data:`wreck.lock_backend.BACKENDS`
+
+    :type backend: str | None
+    :param wall_budget:
+
+       Default None. Per job wall-clock seconds. Exceeding it kills the
+       resolver and it's process group. Other jobs continue. None for
+       ``[tool.wreck]`` field ``wall_budget``, if absent unlimited. Check
+       :py:func:`wreck.lock_compile.is_budget_exceeded`
+
+    :type wall_budget: typing.Any
+    :param cpu_budget:
+
+       Default None. Per job CPU seconds. Linux only. None for
+       ``[tool.wreck]`` field ``cpu_budget``, if absent unlimited
+
+    :type cpu_budget: typing.Any
+    :param retries:
+
+       Default None. Jobs which failed to connect to the package index
+       are re-queued, with exponential backoff, at most this many
+       times. Successful results are kept. None for ``[tool.wreck]``
+       field ``retries``, if absent 3. 0 disables. See
+       :py:class:`wreck.lock_retry.RetryPolicy`
+
+    :type retries: typing.Any
+    :param on_retry:
+
+       Default None. Called before each retry with venv relative path,
+       ``.lock`` absolute path, attempt, and delay in seconds
+
+    :type on_retry: collections.abc.Callable[[str, str, int, int | float], typing.Any] | None
+    :param unified:
+
+       Default None. True resolves all of a venv's ``.in`` files in one
+       resolver run, then splits the result into per ``.in`` ``.lock``
+       files. None for ``[tool.wreck]`` field ``unified``, if absent
+       False. See :py:mod:`wreck.lock_unified`
+
+    :type unified: typing.Any
+    :param warm_start:
+
+       Default None. Seed the resolver with the existing ``.lock`` and
+       the venv's other ``.lock`` pins, as preferred versions. If that
+       resolve fails, redone cold. None for ``[tool.wreck]`` field
+       ``warm_start``, if absent False. See :py:mod:`wreck.lock_warm`
+
+    :type warm_start: typing.Any
+    :param fail_fast:
+
+       Default None. On the first failure, other than a connection
+       error, cancel the other jobs. Jobs not yet started are skipped.
+       Running resolvers are killed. Their failure messages start with
+       :py:data:`wreck._run_cmd.CANCELLED`. None for ``[tool.wreck]``
+       field ``fail_fast``, if absent False. Check
+       :py:func:`wreck.lock_compile.is_cancelled`
+
+    :type fail_fast: typing.Any
+    :returns: Generator of abs path to .lock files
+    :rtype: tuple[tuple[str, ...], tuple[tuple[str, pathlib.Path, str]]]
+    :raises:
+
+       - :py:exc:`AssertionError` -- package pip-tools or uv is not installed
+
+       - :py:exc:`ValueError` -- No such compile backend
+
+    """
+    compile_backend, ep_path = _get_backend(
+        loader,
+        backend,
+        wall_budget=wall_budget,
+        cpu_budget=cpu_budget,
+    )
+
+    int_timeout = _check_timeout(timeout)
+    int_jobs = _check_jobs(jobs)
+    path_cwd = loader.project_base
+    t_jobs = _gather_jobs(loader, venv_relpath)
+    # unified. One job per venv
+    is_unified = _is_opted_in(loader, "unified", unified)
+    t_units = unified_units(path_cwd, t_jobs) if is_unified else t_jobs
+    # Each venv's interpreter markers, once. Identical jobs across venvs run once
+    marker_cache = MarkerCache.from_loader(loader)
+    interpreters = venv_interpreters(
+        path_cwd,
+        [t_job[0] for t_job in t_units],
+        marker_cache=marker_cache,
+    )
+    dedupe = _dedupe_jobs(t_units, path_cwd, compile_backend, interpreters)
+    t_unique = dedupe.apply(t_units)
+    groups = InterpreterGroups.plan(interpreters)
+    path_locks = {t_job[2]: threading.Lock() for t_job in t_unique}
+    # warm start. Pins as they were before any compiling
+    if _is_opted_in(loader, "warm_start", warm_start):
+        preferences = venv_preferences(t_units)
+    else:
+        preferences = None
+    cache, manifest = _get_caches(loader, use_cache)
+    policy = RetryPolicy.from_loader(loader, retries=retries)
+    telemetry = _get_telemetry(loader)
+    limiter = _get_limiter(loader)
+    auto = _get_auto_jobs(jobs, len(t_unique), telemetry, limiter)
+    if auto is not None:
+        # Pool sized for the ceiling. auto decides how many run
+        int_jobs = auto.ceiling
+        workers = auto.limit
+    else:
+        workers = int_jobs
+    schedule = _plan_jobs(t_unique, path_cwd, workers, telemetry)
+    is_fail_fast = _is_opted_in(loader, "fail_fast", fail_fast)
+
+    def fcn(t_job, on_result=None):
+        """Bind the arguments common to all jobs."""
+        return _lock_compile_job(
+            t_job,
+            ep_path,
+            path_cwd,
+            int_timeout,
+            path_locks,
+            cache=cache,
+            manifest=manifest,
+            backend=compile_backend,
+            telemetry=telemetry,
+            preferences=preferences,
+            limiter=limiter,
+            on_result=on_result,
+        )
+
+    def fcn_fail_fast(t_job):
+        """On failure, cancel the other jobs."""
+        return _fail_fast_job(t_job, fcn, compile_backend)
+
+    def fcn_one(t_job):
+        """One job. jobs auto, waits until the current limit allows."""
+        fcn_job = fcn_fail_fast if is_fail_fast else fcn
+        if auto is None:
+            ret = fcn_job(t_job)
+        else:
+            ret = auto.run(fcn_job, t_job)
+
+        return ret
+
+    def fcn_batch(t_batch):
+        """Run a batch of jobs. First all jobs, then the retries."""
+        # Per interpreter group, a pool. Results in submission order
+        ret = groups.run(t_batch, fcn_one, int_jobs)
+
+        return ret
+
+    # Longest job first. retry_counts indexes are start order
+    time_start = time.monotonic()
+    with compile_backend:
+        results_started, retry_counts = retry_jobs(
+            schedule.apply(t_unique),
+            fcn_batch,
+            policy,
+            on_retry=on_retry,
+        )
+    schedule.log_makespan(time.monotonic() - time_start)
+
+    _save_caches(cache, manifest, telemetry=telemetry, marker_cache=marker_cache)
+    _log_retries(retry_counts, results_started, policy)
+    results = dedupe.restore(t_units, schedule.restore(results_started))
+    if is_unified:
+        results = _split_unified(path_cwd, t_jobs, results)
+    else:  # pragma: no cover
+        pass
+    ret = _lock_compile_results(results, cache is not None)
+
+    cancelled = [t_three for t_three in ret[1] if _is_cancelled_msg(t_three[2])]
+    if len(cancelled) != 0:
+        msg_warn = (
+            f"{g_app_name}.lock_compile.lock_compile fail-fast. Cancelled "
+            f"{len(cancelled)} jobs"
+        )
+        _logger.warning(msg_warn)
+    else:  # pragma: no cover
+        pass
+
+    return ret
+
+
 def is_timeout(failures):
     """lock_compile returns both success and failures. Detect
     if the cause of the failure was timeout(s)
@@ -481,3 +1896,37 @@ def is_timeout(failures):
             ret = True
 
     return ret
+
+
+def is_budget_exceeded(failures):
+    """Detect if any job was killed for exceeding it's wall-clock or
+    CPU budget. Distinct from :py:func:`wreck.lock_compile.is_timeout`
+
+    :param failures: Sequence of verbose error message and traceback
+    :type failures: collections.abc.Iterable[tuple[str, pathlib.Path, str]]
+    :returns: True if a job exceeded it's budget
+    :rtype: bool
+    """
+    ret = False
+    for t_three in failures:
+        msg = t_three[2]
+        if (
+            msg is not None and isinstance(msg, str) and msg.startswith(BUDGET_EXCEEDED)
+        ):  # pragma: no branch
+            ret = True
+
+    return ret
+
+
+def is_cancelled(failures):
+    """Detect if any job was skipped or killed by fail-fast. These are
+    not the cause of the failure, another job is
+
+    :param failures: Sequence of verbose error message and traceback
+    :type failures: collections.abc.Iterable[tuple[str, pathlib.Path, str]]
+    :returns: True if a job was cancelled
+    :rtype: bool
+    """
+    ret = any(_is_cancelled_msg(t_three[2]) for t_three in failures)
+
+    return ret
@@ -1,7 +1,11 @@
 import logging
+import threading
 from collections.abc import (
+    Callable,
     Generator,
     Iterable,
+    Mapping,
+    Sequence,
 )
 from pathlib import Path
 from typing import (
@@ -9,18 +13,98 @@ from typing import (
     Final,
 )
 
+from .lock_autojobs import AutoJobs
+from .lock_backend import CompileBackend
+from .lock_cache import (
+    CompileCache,
+    CompileManifest,
+)
+from .lock_dedupe import JobDedupe
+from .lock_interpreter import (
+    MarkerCache,
+    VenvInterpreter,
+)
+from .lock_ratelimit import IndexLimiter
+from .lock_retry import RetryPolicy
+from .lock_schedule import JobSchedule
+from .lock_telemetry import CompileTelemetry
 from .pep518_venvs import VenvMapLoader
 
 __all__ = (
+    "is_budget_exceeded",
+    "is_cancelled",
     "is_timeout",
     "lock_compile",
 )
 
+_LOCK_MODE: Final[int]
+
 is_module_debug: Final[bool]
 _logger: logging.Logger
 
 def prepare_pairs(t_ins: tuple[Path]) -> Generator[tuple[str, str], None, None]: ...
+def _relpath_lines(
+    lines: Iterable[str],
+    path_parent: Path,
+) -> Generator[str, None, None]: ...
+def _read_relpath(path_out: Path | str, path_parent: Path) -> str: ...
 def _postprocess_abspath_to_relpath(path_out: Path, path_parent: Path) -> None: ...
+def _write_lock(lock_abspath: str, contents: str) -> None: ...
+def _compile_before(
+    lock_abspath: str,
+    seed: str | None = None,
+) -> tuple[str, str | None]: ...
+def _compile_after(
+    t_ret: tuple[
+        str | None, str | None, int | None, str | None, dict[str, float | int] | None
+    ],
+    in_abspath: str,
+    lock_abspath: str,
+    path_cwd: Path,
+    venv_relpath: str,
+    int_timeout: int,
+    backend: CompileBackend,
+    staging_abspath: str,
+    digest_old: str | None,
+) -> tuple[Path | None, None | str]: ...
+def _is_resolve_failure(
+    t_ret: tuple[
+        str | None, str | None, int | None, str | None, dict[str, float | int] | None
+    ],
+    backend: CompileBackend,
+) -> bool: ...
+def _log_compile_start(
+    in_abspath: str,
+    lock_abspath: str,
+    venv_relpath: str,
+    backend: CompileBackend,
+) -> None: ...
+def _record_telemetry(
+    telemetry: CompileTelemetry | None,
+    path_cwd: Path,
+    venv_relpath: str,
+    in_abspath: str,
+    backend: CompileBackend,
+    wall: float,
+    t_ret: tuple[
+        str | None, str | None, int | None, str | None, dict[str, float | int] | None
+    ],
+    wait: float | None = None,
+) -> None: ...
+def _compile_limited(
+    backend: CompileBackend,
+    limiter: IndexLimiter | None,
+    in_abspath: str,
+    staging_abspath: str,
+    path_cwd: Path,
+    venv_python_abspath: str,
+    timeout: int,
+) -> tuple[
+    tuple[
+        str | None, str | None, int | None, str | None, dict[str, float | int] | None
+    ],
+    float | None,
+]: ...
 def _compile_one(
     in_abspath: str,
     lock_abspath: str,
@@ -28,11 +112,153 @@ def _compile_one(
     path_cwd: Path,
     venv_relpath: str,
     timeout: Any = 15,
+    backend: CompileBackend | None = None,
+    telemetry: CompileTelemetry | None = None,
+    prefer: str | None = None,
+    limiter: IndexLimiter | None = None,
+    on_result: (
+        Callable[
+            [
+                tuple[
+                    str | None,
+                    str | None,
+                    int | None,
+                    str | None,
+                    dict[str, float | int] | None,
+                ]
+            ],
+            Any,
+        ]
+        | None
+    ) = None,
 ) -> tuple[Path | None, None | str]: ...
 def _empty_in_empty_out(in_abspath: str, lock_abspath: str) -> bool: ...
+def _check_timeout(timeout: Any, default: int = 15) -> int: ...
+def _check_jobs(jobs: Any, default: int = 1) -> int: ...
+def _lock_relpath(path_cwd: Path, lock_abspath: str) -> str: ...
+def _job_lookup(
+    t_job: tuple[str, str, str],
+    path_cwd: Path,
+    cache: CompileCache | None = None,
+    manifest: CompileManifest | None = None,
+    backend: CompileBackend | None = None,
+    seed: str | None = None,
+) -> tuple[bool, Path | None, str | None, str | None, str | None, str]: ...
+def _job_store(
+    t_job: tuple[str, str, str],
+    path_cwd: Path,
+    t_lookup: tuple[bool, Path | None, str | None, str | None, str | None, str],
+    optabspath_lock: Path | None,
+    err_details: str | None,
+    cache: CompileCache | None = None,
+    manifest: CompileManifest | None = None,
+    backend: CompileBackend | None = None,
+    prefer_pins: Mapping[str, str] | None = None,
+) -> None: ...
+def _lock_compile_job(
+    t_job: tuple[str, str, str],
+    ep_path: str,
+    path_cwd: Path,
+    timeout: int,
+    path_locks: dict[str, threading.Lock],
+    cache: CompileCache | None = None,
+    manifest: CompileManifest | None = None,
+    backend: CompileBackend | None = None,
+    telemetry: CompileTelemetry | None = None,
+    preferences: Mapping[str, Mapping[str, str]] | None = None,
+    limiter: IndexLimiter | None = None,
+    on_result: (
+        Callable[
+            [
+                tuple[
+                    str | None,
+                    str | None,
+                    int | None,
+                    str | None,
+                    dict[str, float | int] | None,
+                ]
+            ],
+            Any,
+        ]
+        | None
+    ) = None,
+) -> tuple[str, str, Path | None, str | None, str | None]: ...
+def _get_backend(
+    loader: VenvMapLoader,
+    backend: str | None,
+    wall_budget: Any = None,
+    cpu_budget: Any = None,
+) -> tuple[CompileBackend, str]: ...
+def _gather_jobs(
+    loader: VenvMapLoader,
+    venv_relpath: str | None,
+) -> list[tuple[str, str, str]]: ...
+def _get_caches(
+    loader: VenvMapLoader,
+    use_cache: Any,
+) -> tuple[CompileCache | None, CompileManifest | None]: ...
+def _get_telemetry(loader: VenvMapLoader) -> CompileTelemetry | None: ...
+def _get_auto_jobs(
+    jobs: Any,
+    job_count: int,
+    telemetry: CompileTelemetry | None,
+    limiter: IndexLimiter | None,
+) -> AutoJobs | None: ...
+def _get_limiter(loader: VenvMapLoader) -> IndexLimiter | None: ...
+def _is_opted_in(loader: VenvMapLoader, field: str, val: Any) -> bool: ...
+def _split_unified(
+    path_cwd: Path,
+    t_jobs: Sequence[tuple[str, str, str]],
+    results_units: Iterable[tuple[str, str, Path | None, str | None, str | None]],
+) -> list[tuple[str, str, Path | None, str | None, str | None]]: ...
+def _plan_jobs(
+    t_jobs: Sequence[tuple[str, str, str]],
+    path_cwd: Path,
+    workers: int,
+    telemetry: CompileTelemetry | None,
+) -> JobSchedule: ...
+def _dedupe_jobs(
+    t_jobs: Sequence[tuple[str, str, str]],
+    path_cwd: Path,
+    backend: CompileBackend,
+    interpreters: Mapping[str, VenvInterpreter],
+) -> JobDedupe: ...
+def _save_caches(
+    cache: CompileCache | None,
+    manifest: CompileManifest | None,
+    telemetry: CompileTelemetry | None = None,
+    marker_cache: MarkerCache | None = None,
+) -> None: ...
+def _log_retries(
+    retry_counts: Mapping[int, int],
+    results: Sequence[tuple[str, str, Path | None, str | None, str | None]],
+    policy: RetryPolicy,
+) -> None: ...
+def _is_cancelled_msg(msg: Any) -> bool: ...
+def _fail_fast_job(
+    t_job: tuple[str, str, str],
+    fcn: Callable[..., tuple[str, str, Path | None, str | None, str | None]],
+    backend: CompileBackend,
+) -> tuple[str, str, Path | None, str | None, str | None]: ...
+def _lock_compile_results(
+    results: Iterable[tuple[str, str, Path | None, str | None, str | None]],
+    is_cache: bool,
+) -> tuple[tuple[str, ...], tuple[tuple[str, Path, str], ...]]: ...
 def lock_compile(
     loader: VenvMapLoader,
     venv_relpath: str,
     timeout: Any = 15,
+    jobs: Any = 1,
+    use_cache: Any = True,
+    backend: str | None = None,
+    wall_budget: Any = None,
+    cpu_budget: Any = None,
+    retries: Any = None,
+    on_retry: Callable[[str, str, int, int | float], Any] | None = None,
+    unified: Any = None,
+    warm_start: Any = None,
+    fail_fast: Any = None,
 ) -> tuple[tuple[str, ...], tuple[str, ...]]: ...
 def is_timeout(failures: Iterable[tuple[Any, Any, str]]) -> bool: ...
+def is_budget_exceeded(failures: Iterable[tuple[Any, Any, str]]) -> bool: ...
+def is_cancelled(failures: Iterable[tuple[Any, Any, str]]) -> bool: ...
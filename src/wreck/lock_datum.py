@@ -35,8 +35,13 @@
 import enum
 import io
 import sys
+import threading
+from collections import OrderedDict
 from collections.abc import Hashable
-from dataclasses import dataclass
+from dataclasses import (
+    dataclass,
+    field,
+)
 from pathlib import (
     Path,
     PurePath,
@@ -71,7 +76,7 @@ def is_pin(specifiers):
     """From ``.in`` file, identify as a pin only if has specifiers.
 
     :param specifiers: package specifiers e.g. ``>=1.0.0``
-    :type specifiers: list[str]
+    :type specifiers: collections.abc.Sequence[str]
     :returns: True if has specifiers otherwise False
     :rtype: bool
     """
@@ -88,7 +93,7 @@ def has_qualifiers(qualifiers):
        package qualifiers e.g. ``platform_system=="Windows"``.
        Stored without ``;`` separator
 
-    :type qualifiers: list[str]
+    :type qualifiers: collections.abc.Sequence[str]
     :returns: True if has qualifiers otherwise False
     :rtype: bool
     """
@@ -134,6 +139,24 @@ def _parse_qualifiers(line):
     return qualifiers
 
 
+def _pindatum_key(file_abspath, pkg_name, qualifiers):
+    """Identity of a PinDatum. What hash, equality and sorting compare
+
+    :param file_abspath: Absolute path to ``.in`` file
+    :type file_abspath: pathlib.Path
+    :param pkg_name: Package name
+    :type pkg_name: str
+    :param qualifiers: qualifiers. May be empty
+    :type qualifiers: collections.abc.Sequence[str]
+    :returns: file absolute path, package name, and qualifiers joined
+    :rtype: tuple[str, str, str]
+    """
+    str_qualifiers = "; ".join(qualifiers)
+    ret = (file_abspath.as_posix(), pkg_name, str_qualifiers)
+
+    return ret
+
+
 def _hash_pindatum(file_abspath, pkg_name, qualifiers):
     """Determine hash support subclass as well
 
@@ -141,31 +164,90 @@ def _hash_pindatum(file_abspath, pkg_name, qualifiers):
     :type file_abspath: pathlib.Path
     :param pkg_name: Package name
     :type pkg_name: str
-    :param qualifiers: List of qualifiers. May
-    :type qualifiers: list[str]
+    :param qualifiers: qualifiers. May be empty
+    :type qualifiers: collections.abc.Sequence[str]
     :returns: hash of PinDatum or subclass
     :rtype: int
     """
-    str_qualifiers = "; ".join(qualifiers)
-    t_pieces = (file_abspath.as_posix(), pkg_name, str_qualifiers)
+    t_pieces = _pindatum_key(file_abspath, pkg_name, qualifiers)
 
     return hash(t_pieces)
 
 
-@dataclass(**DC_SLOTS)
+# One Path per requirements file, shared by all it's PinDatum. Least
+# recently used evicted. Evicted, equal pins no longer share a Path
+_FILES_MAX = 1024
+_files = OrderedDict()
+_files_mutex = threading.Lock()
+
+
+def _intern_path(file_abspath):
+    """Shared file handle. Pins from one file share one Path and one
+    posix str.
+
+    :param file_abspath: Absolute path to ``.in`` file
+    :type file_abspath: pathlib.Path
+    :returns: The first equal Path seen and it's posix str
+    :rtype: tuple[pathlib.Path, str]
+    """
+    str_posix = file_abspath.as_posix()
+    with _files_mutex:
+        ret = _files.get(str_posix, None)
+        if ret is None:
+            ret = (file_abspath, sys.intern(str_posix))
+            _files[str_posix] = ret
+            if len(_files) > _FILES_MAX:
+                _files.popitem(last=False)
+            else:  # pragma: no cover
+                pass
+        else:
+            _files.move_to_end(str_posix)
+
+    return ret
+
+
+def _clear_interned():
+    """Forget the shared file handles. e.g. between runs or tests."""
+    with _files_mutex:
+        _files.clear()
+
+
+@dataclass(frozen=True, init=False, **DC_SLOTS)
 class PinDatum(Hashable):
     """Qualifiers aware Pin. Use :py:class:`~wreck.lock_filepins.FilePins`
     to instantiate.
 
-    Hashable and Comparable
+    Hashable and Comparable. Immutable. Package name is interned,
+    specifiers and qualifiers are tuples, and pins from the same file
+    share one Path. Hash and sort key are computed once
 
     """
 
     file_abspath: Path
     pkg_name: str
     line: str
-    specifiers: list[str]
-    qualifiers: list[str]
+    specifiers: tuple[str, ...]
+    qualifiers: tuple[str, ...]
+    _key: tuple[str, str, str] = field(init=False, repr=False, compare=False)
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __init__(self, file_abspath, pkg_name, line, specifiers, qualifiers):
+        """Class constructor. Normalize fields. Key and hash computed once.
+
+        Frozen. Each field is set exactly once
+        """
+        file_abspath, str_posix = _intern_path(file_abspath)
+        pkg_name = sys.intern(pkg_name)
+        qualifiers = tuple(qualifiers)
+        key = (str_posix, pkg_name, "; ".join(qualifiers))
+        set_field = object.__setattr__
+        set_field(self, "file_abspath", file_abspath)
+        set_field(self, "pkg_name", pkg_name)
+        set_field(self, "line", line)
+        set_field(self, "specifiers", tuple(specifiers))
+        set_field(self, "qualifiers", qualifiers)
+        set_field(self, "_key", key)
+        set_field(self, "_hash", hash(key))
 
     def __hash__(self):
         """The file abspath and line are enough to produce a hash.
@@ -176,9 +258,7 @@ class PinDatum(Hashable):
         :returns: hash of Pin
         :rtype: int
         """
-        ret = _hash_pindatum(self.file_abspath, self.pkg_name, self.qualifiers)
-
-        return ret
+        return self._hash
 
     def __eq__(self, right):
         """Compares equality
@@ -191,18 +271,8 @@ class PinDatum(Hashable):
 
         :rtype: bool
         """
-        is_cls_similar = issubclass(type(right), PinDatum)
-
-        if is_cls_similar:
-            # Determine hash(right) without assuming identical fields
-            # Subclasses hash(right) might include additional fields. Recalculate
-            hash_right = _hash_pindatum(
-                right.file_abspath,
-                right.pkg_name,
-                right.qualifiers,
-            )
-            is_eq = self.__hash__() == hash_right
-            ret = is_eq
+        if isinstance(right, PinDatum):
+            ret = self._hash == right._hash and self._key == right._key
         else:
             ret = False
 
@@ -230,9 +300,7 @@ class PinDatum(Hashable):
 
         """For purposes of sorting, comparing PinDatum from different
         files is not allowed"""
-        is_different_file = (
-            self.file_abspath.as_posix() != right.file_abspath.as_posix()
-        )
+        is_different_file = self._key[0] != right._key[0]
         if is_different_file:  # pragma: no branch
             msg_warn = (
                 f"PinDatum from different files cannot be compared "
@@ -240,21 +308,8 @@ class PinDatum(Hashable):
             )
             raise TypeError(msg_warn)
 
-        # InFiles container stores InFile within a set. So no duplicates
-        # Compares tuple(stem_a, relpath_a) vs tuple(stem_b, relpath_b)
-        is_pkg_name_eq = self.pkg_name == right.pkg_name
-        if not is_pkg_name_eq:
-            is_lt = self.pkg_name < right.pkg_name
-        else:
-            # pkg_name equal. Compare qualifiers
-            left_qualifiers = "; ".join(self.qualifiers)
-            right_qualifiers = "; ".join(right.qualifiers)
-            is_qualifiers_eq = left_qualifiers == right_qualifiers
-            if not is_qualifiers_eq:
-                is_lt = left_qualifiers < right_qualifiers
-            else:
-                # qualifiers same. Cannot sort a dup
-                is_lt = False
+        # Compares tuple(pkg_name, qualifiers). Equal, cannot sort a dup
+        is_lt = self._key[1:] < right._key[1:]
 
         return is_lt
 
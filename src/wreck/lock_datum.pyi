@@ -1,13 +1,20 @@
 import enum
 import sys
+import threading
+from collections import OrderedDict
 from collections.abc import (
     Hashable,
     Iterable,
+    Sequence,
+)
+from dataclasses import (
+    dataclass,
+    field,
 )
-from dataclasses import dataclass
 from pathlib import Path
 from typing import (
     Any,
+    Final,
     TypeVar,
 )
 
@@ -35,18 +42,44 @@ __all__ = (
     "pprint_pins",
 )
 
-def is_pin(specifiers: list[str]) -> bool: ...
-def has_qualifiers(qualifiers: list[str]) -> bool: ...
+def is_pin(specifiers: Sequence[str]) -> bool: ...
+def has_qualifiers(qualifiers: Sequence[str]) -> bool: ...
 def _parse_qualifiers(line: str) -> list[str]: ...
-def _hash_pindatum(file_abspath: Path, pkg_name: str, qualifiers: list[str]) -> int: ...
-@dataclass(**DC_SLOTS)
+def _pindatum_key(
+    file_abspath: Path,
+    pkg_name: str,
+    qualifiers: Sequence[str],
+) -> tuple[str, str, str]: ...
+def _hash_pindatum(
+    file_abspath: Path,
+    pkg_name: str,
+    qualifiers: Sequence[str],
+) -> int: ...
+
+_FILES_MAX: Final[int]
+_files: OrderedDict[str, tuple[Path, str]]
+_files_mutex: threading.Lock
+
+def _intern_path(file_abspath: Path) -> tuple[Path, str]: ...
+def _clear_interned() -> None: ...
+@dataclass(frozen=True, init=False, **DC_SLOTS)
 class PinDatum(Hashable):
     file_abspath: Path
     pkg_name: str
     line: str
-    specifiers: list[str]
-    qualifiers: list[str]
+    specifiers: tuple[str, ...]
+    qualifiers: tuple[str, ...]
+    _key: tuple[str, str, str] = field(init=False, repr=False, compare=False)
+    _hash: int = field(init=False, repr=False, compare=False)
 
+    def __init__(
+        self,
+        file_abspath: Path,
+        pkg_name: str,
+        line: str,
+        specifiers: Iterable[str],
+        qualifiers: Iterable[str],
+    ) -> None: ...
     def __hash__(self) -> int: ...
     def __eq__(self, right: object) -> bool: ...
     def __lt__(self, right: object) -> bool: ...
@@ -0,0 +1,186 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Deduplicate compile jobs. The same ``.in``, resolved for the same
+environment, in more than one venv, is compiled once.
+
+``.shared.in`` files are shared across venvs by design. And a ``.in``
+can be listed under more than one venv. The ``.lock`` path is the same
+for every venv, so the result can be reused
+
+Jobs are keyed by:
+
+- the ``.in`` include closure. Each file's relative path and digest
+
+- the ``.lock`` relative path
+
+- the interpreter's :pep:`508` environment markers. Python version,
+  implementation and platform. From :py:mod:`wreck.lock_interpreter`
+
+- the resolver options
+
+Each unique job runs once. Every venv needing it gets that result. A
+job whose interpreter markers can't be determined is never deduplicated
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str]
+   :value: ("JobDedupe", "job_key")
+
+   Module exports
+
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from .constants import g_app_name
+from .lock_cache import (
+    _relpath,
+    closure_digests,
+)
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_dedupe")
+
+__all__ = (
+    "JobDedupe",
+    "job_key",
+)
+
+
+def job_key(path_cwd, in_abspath, lock_abspath, d_markers, options):
+    """Digest of what makes two compile jobs identical.
+
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str
+    :param lock_abspath: ``.lock`` file absolute path
+    :type lock_abspath: str
+    :param d_markers: interpreter environment markers. None if unknown
+    :type d_markers: collections.abc.Mapping[str, str] | None
+    :param options: resolver options
+    :type options: collections.abc.Sequence[str]
+    :returns: sha256 hex digest. None if markers unknown, never identical
+    :rtype: str | None
+    """
+    if d_markers is None:
+        ret = None
+    else:
+        lines = []
+        lines.append(f"options\t{' '.join(options)}")
+        lines.append(f"markers\t{json.dumps(dict(d_markers), sort_keys=True)}")
+        lock_relpath = _relpath(path_cwd, Path(lock_abspath).resolve())
+        lines.append(f"lock\t{lock_relpath}")
+        for relpath_f, digest in closure_digests(path_cwd, in_abspath).items():
+            lines.append(f"in\t{relpath_f}\t{digest}")
+
+        blob = "\n".join(lines).encode()
+        ret = hashlib.sha256(blob).hexdigest()
+
+    return ret
+
+
+class JobDedupe:
+    """Which compile jobs are identical. The first of each is run.
+
+    :ivar owner: per job, index of the job which runs in it's place
+    :vartype owner: list[int]
+    :ivar unique: indexes of the jobs which run
+    :vartype unique: list[int]
+    """
+
+    __slots__ = ("owner", "unique")
+
+    def __init__(self, owner, unique):
+        """Class constructor."""
+        self.owner = owner
+        self.unique = unique
+
+    @classmethod
+    def plan(cls, keys):
+        """Group jobs by key. Jobs without a key are never grouped.
+
+        :param keys: per job, :py:func:`wreck.lock_dedupe.job_key`. In submission order
+        :type keys: collections.abc.Sequence[str | None]
+        :returns: job groups
+        :rtype: wreck.lock_dedupe.JobDedupe
+        """
+        d_first = {}
+        owner = []
+        unique = []
+        for idx, key in enumerate(keys):
+            idx_owner = idx if key is None else d_first.setdefault(key, idx)
+            owner.append(idx_owner)
+            if idx_owner == idx:
+                unique.append(idx)
+            else:  # pragma: no cover
+                pass
+
+        return cls(owner, unique)
+
+    @property
+    def duplicates(self):
+        """How many jobs reuse another job's result.
+
+        :returns: job count
+        :rtype: int
+        """
+        ret = len(self.owner) - len(self.unique)
+
+        return ret
+
+    def apply(self, t_jobs):
+        """Only the jobs which run.
+
+        :param t_jobs: jobs in submission order
+        :type t_jobs: collections.abc.Sequence[typing.Any]
+        :returns: unique jobs, in submission order
+        :rtype: list[typing.Any]
+        """
+        ret = [t_jobs[idx] for idx in self.unique]
+
+        return ret
+
+    def restore(self, t_jobs, results):
+        """Every job gets a result. A duplicate gets it's owner's result,
+        with it's own venv and cache status ``dedup``
+
+        :param t_jobs: venv relative path, ``.in`` and ``.lock`` absolute paths
+        :type t_jobs: collections.abc.Sequence[tuple[str, str, str]]
+        :param results: per unique job results
+        :type results: collections.abc.Sequence[tuple[str, str, pathlib.Path | None, str | None, str | None]]
+        :returns: per job results, in submission order
+        :rtype: list[tuple[str, str, pathlib.Path | None, str | None, str | None]]
+        """
+        d_results = dict(zip(self.unique, results))
+        ret = []
+        for idx, t_job in enumerate(t_jobs):
+            idx_owner = self.owner[idx]
+            if idx_owner == idx:
+                t_result = d_results[idx]
+            else:
+                _, lock_abspath, optabspath_lock, err_details = d_results[idx_owner][:4]
+                t_result = (
+                    t_job[0],
+                    lock_abspath,
+                    optabspath_lock,
+                    err_details,
+                    "dedup",
+                )
+            ret.append(t_result)
+
+        return ret
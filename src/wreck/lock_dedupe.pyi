@@ -0,0 +1,46 @@
+import logging
+from collections.abc import (
+    Mapping,
+    Sequence,
+)
+from pathlib import Path
+from typing import (
+    Any,
+    Final,
+)
+
+from typing_extensions import Self
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+__all__ = (
+    "JobDedupe",
+    "job_key",
+)
+
+def job_key(
+    path_cwd: Path,
+    in_abspath: str,
+    lock_abspath: str,
+    d_markers: Mapping[str, str] | None,
+    options: Sequence[str],
+) -> str | None: ...
+
+class JobDedupe:
+    __slots__ = ("owner", "unique")
+
+    owner: list[int]
+    unique: list[int]
+
+    def __init__(self, owner: list[int], unique: list[int]) -> None: ...
+    @classmethod
+    def plan(cls, keys: Sequence[str | None]) -> Self: ...
+    @property
+    def duplicates(self) -> int: ...
+    def apply(self, t_jobs: Sequence[Any]) -> list[Any]: ...
+    def restore(
+        self,
+        t_jobs: Sequence[tuple[str, str, str]],
+        results: Sequence[tuple[str, str, Path | None, str | None, str | None]],
+    ) -> list[tuple[str, str, Path | None, str | None, str | None]]: ...
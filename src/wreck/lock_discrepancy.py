@@ -218,7 +218,7 @@ def _get_specifiers(set_pindatum):
     """
     lst = []
     for pin in set_pindatum:
-        lst.append(pin.specifiers)
+        lst.append(list(pin.specifiers))
 
     return lst
 
@@ -28,23 +28,15 @@ from pathlib import (
 )
 from typing import cast
 
-from pip_requirements_parser import (  # pyright: ignore[reportMissingTypeStubs]
-    InstallationError,
-    RequirementsFile,
-)
-
 from .check_type import is_ok
 from .constants import g_app_name
-from .exceptions import (
-    MissingPackageBaseFolder,
-    MissingRequirementsFoldersFiles,
-)
+from .exceptions import MissingPackageBaseFolder
 from .lock_datum import (
     PinDatum,
-    _parse_qualifiers,
     has_qualifiers,
     is_pin,
 )
+from .lock_parse import parse_file_cached
 from .lock_util import is_suffixes_ok
 from .pep518_venvs import check_loader
 
@@ -90,16 +82,32 @@ class FilePins(Collection[PinDatum], Hashable):
     :ivar file_abspath: ``.in`` file absolute Path
     :vartype: pathlib.Path
 
-    .. py:attribute:: _pins
-       :type: list[wreck.lock_datum.PinDatum]
+    .. py:attribute:: _pin_tuple
+       :type: tuple[wreck.lock_datum.PinDatum, ...]
 
-       Container of PinDatum
+       Container of PinDatum. Only changed by assigning ``_pins``, so
+       the indexes stay current
 
     .. py:attribute:: _iter
        :type: collections.abc.Iterator[wreck.lock_datum.PinDatum]
 
        Iterator of PinDatum
 
+    .. py:attribute:: _pin_set
+       :type: frozenset[wreck.lock_datum.PinDatum]
+
+       Index. Membership
+
+    .. py:attribute:: _by_pkg
+       :type: dict[str, tuple[wreck.lock_datum.PinDatum, ...]]
+
+       Index. Package name --> PinDatum. Differs by qualifiers
+
+    .. py:attribute:: _notable
+       :type: tuple[wreck.lock_datum.PinDatum, ...]
+
+       Index. PinDatum which are a pin or have qualifiers
+
     :raises:
 
        - :py:exc:`wreck.exceptions.MissingRequirementsFoldersFiles` --
@@ -110,8 +118,29 @@ class FilePins(Collection[PinDatum], Hashable):
     """
 
     file_abspath: Path
-    _pins: list[PinDatum] = dataclasses.field(init=False, default_factory=list)
+    _pin_tuple: tuple[PinDatum, ...] = dataclasses.field(
+        init=False,
+        default_factory=tuple,
+    )
     _iter: Iterator[PinDatum] = dataclasses.field(init=False)
+    _pin_set: frozenset[PinDatum] = dataclasses.field(
+        init=False,
+        default_factory=frozenset,
+        repr=False,
+        compare=False,
+    )
+    _by_pkg: dict[str, tuple[PinDatum, ...]] = dataclasses.field(
+        init=False,
+        default_factory=dict,
+        repr=False,
+        compare=False,
+    )
+    _notable: tuple[PinDatum, ...] = dataclasses.field(
+        init=False,
+        default_factory=tuple,
+        repr=False,
+        compare=False,
+    )
     constraints: set[str] = dataclasses.field(init=False, default_factory=set)
     requirements: set[str] = dataclasses.field(init=False, default_factory=set)
     pkgs_from_resolved: set[str] = dataclasses.field(init=False, default_factory=set)
@@ -119,110 +148,69 @@ class FilePins(Collection[PinDatum], Hashable):
     def __post_init__(self):
         """From the requirements file retrieve package requirements."""
 
-        try:
-            abspath_file = is_suffixes_ok(self.file_abspath)
-            rf = RequirementsFile.from_file(abspath_file.as_posix())
-        except InstallationError as exc:
-            if is_module_debug:  # pragma: no branch  # pragma: no cover
-                # msg_info = f"file_abspath(before): {self.file_abspath}"
-                # _logger.info(msg_info)
-                msg_info = f"file_abspath(after): {self.file_abspath!r}"
-                _logger.info(msg_info)
-
-            msg_exc = f"Requirements file not found {self.file_abspath!r}. Create it"
-            raise MissingRequirementsFoldersFiles(msg_exc) from exc
-        except ValueError:
-            raise
-
+        abspath_file = is_suffixes_ok(self.file_abspath)
         self.file_abspath = abspath_file
 
-        d_rf_all = rf.to_dict()
-        rf_reqs = d_rf_all["requirements"]
-
-        lst_tmp = []
-        for d_req in rf_reqs:
-            # fields: line, line_number
-            pkg_name: str = cast("str", d_req.get("name", ""))
+        # Parsed at most once per process, unless the file changes
+        pins, set_constraints, set_requirements = parse_file_cached(abspath_file)
 
-            # list[specifier]
-            specifiers: list[str] = cast("list[str]", d_req.get("specifier", []))
-
-            # line
-            d_req_line: dict[str, int | str] = cast(
-                "dict[str, int | str]",
-                d_req.get("requirement_line", {}),
-            )
-            is_line_str = "line" in d_req_line.keys() and isinstance(
-                d_req_line["line"], str
-            )
-            if is_line_str:
-                line: str = cast(str, d_req_line["line"])
-            else:  # pragma: no cover
-                line: str = ""
-
-            if len(line.strip()) != 0:  # pragma: no branch
-                qualifiers = _parse_qualifiers(line)
-
-                # Create Pin
-                pin = PinDatum(
-                    self.file_abspath, pkg_name, line, specifiers, qualifiers
-                )
-
-                # Filter out if an exact match
-                if pin not in lst_tmp:  # pragma: no branch
-                    lst_tmp.append(pin)
-
-        # List items must implement: __hash__, __eq__, and __lt__
-        self._pins = sorted(lst_tmp)
-
-        # initialize iterator
-        self._iter = iter(self._pins)
-
-        """Example options list[dict[str, int|list[str]]]
-        'options': [{'constraints': ['pins.shared.in'],
-              'line': '-c pins.shared.in',
-              'line_number': 4},
-             {'constraints': ['pins-cffi.in'],
-              'line': '-c pins-cffi.in',
-              'line_number': 5},
-             {'line': '-r prod.shared.in',
-              'line_number': 6,
-              'requirements': ['prod.shared.in']}],
-        """
-        rf_opts: list[dict[str, int | list[str]]] = d_rf_all["options"]
-        set_constraints = set()
-        set_requirements = set()
-        for d_opt in rf_opts:
-            # constraints|requirements, line, line_number
-            is_constraint = "constraints" in d_opt.keys()
-            is_requirements = "requirements" in d_opt.keys()
-            if is_constraint:  # pragma: no branch
-                # strip_inline_comments
-                constraints_relpath = cast("list[str]", d_opt["constraints"])
-                for constraint_relpath in constraints_relpath:  # pragma: no branch
-                    set_constraints.add(constraint_relpath)
-
-            if is_requirements:  # pragma: no branch
-                # strip_inline_comments
-                requirements_relpath = cast("list[str]", d_opt["requirements"])
-                for requirement_relpath in requirements_relpath:  # pragma: no branch
-                    set_requirements.add(requirement_relpath)
+        # Cached pins are shared and never modified. Also indexes and iterator
+        self._pins = pins
 
         # constraints and requirements are relpath. Existence not checked
         # lock_infile.InFile checked only the constraints and not the requirements
-        self.constraints = set_constraints
-        self.requirements = set_requirements
+        # Cached sets are frozen. Resolution discards from these copies
+        self.constraints = set(set_constraints)
+        self.requirements = set(set_requirements)
         """catalog of packages copied, into parent, from resolved
         constraints|requirements"""
         self.pkgs_from_resolved = set()
 
+    @property
+    def _pins(self):
+        """Get a copy of the pins. Caller owns the list. Changing it does
+        not change the pins. Assign to replace the pins
+
+        :returns: Container of PinDatum
+        :rtype: list[wreck.lock_datum.PinDatum]
+        """
+        ret = list(self._pin_tuple)
+
+        return ret
+
+    @_pins.setter
+    def _pins(self, pins):
+        """Replace the pins. The only way pins change. Rebuilds the
+        indexes and restarts the iterator
+
+        :param pins: Container of PinDatum
+        :type pins: collections.abc.Iterable[wreck.lock_datum.PinDatum]
+        """
+        t_pins = tuple(pins)
+        self._pin_tuple = t_pins
+        self._iter = iter(t_pins)
+
+        # Indexes. PinDatum are immutable, so only stale if pins replaced
+        self._pin_set = frozenset(t_pins)
+        d_by_pkg: dict[str, list[PinDatum]] = {}
+        for pin in t_pins:
+            d_by_pkg.setdefault(pin.pkg_name, []).append(pin)
+        self._by_pkg = {
+            pkg_name: tuple(pins_pkg) for pkg_name, pins_pkg in d_by_pkg.items()
+        }
+        self._notable = tuple(
+            pin
+            for pin in t_pins
+            if is_pin(pin.specifiers) or has_qualifiers(pin.qualifiers)
+        )
+
     def __len__(self):
         """Item count.
 
         :returns: Pin count
         :rtype: int
         """
-        ret = len(self._pins)
+        ret = len(self._pin_tuple)
 
         return ret
 
@@ -241,7 +229,7 @@ class FilePins(Collection[PinDatum], Hashable):
             return next(self._iter)
         except StopIteration:
             # Reinitialize iterator
-            self._iter = iter(self._pins)
+            self._iter = iter(self._pin_tuple)
             # signal end of iteration
             raise
 
@@ -264,8 +252,8 @@ class FilePins(Collection[PinDatum], Hashable):
         if item is None or not isinstance(item, PinDatum):
             ret = False
         else:
-            # Pin is a dataclass. Automagically has __eq__
-            ret = any([pin == item for pin in self._pins])
+            # PinDatum hash and key are precomputed
+            ret = item in self._pin_set
 
         return ret
 
@@ -457,7 +445,7 @@ class FilePins(Collection[PinDatum], Hashable):
         :rtype: list[wreck.lock_datum.PinDatum]
         """
         if is_ok(pkg_name):
-            ret = [pin for pin in self._pins if pin.pkg_name == pkg_name]
+            ret = list(self._by_pkg.get(pkg_name, ()))
         else:
             ret = []
 
@@ -468,7 +456,4 @@ class FilePins(Collection[PinDatum], Hashable):
 
         :returns: collections.abc.Generator[wreck.lock_datum.PinDatum, None, None]
         """
-        for pin in self._pins:
-            is_notable = is_pin(pin.specifiers) or has_qualifiers(pin.qualifiers)
-            if is_notable:  # pragma: no branch
-                yield pin
+        yield from self._notable
@@ -4,6 +4,7 @@ from collections.abc import (
     Collection,
     Generator,
     Hashable,
+    Iterable,
     Iterator,
 )
 from pathlib import Path
@@ -27,13 +28,20 @@ def get_path_cwd(loader: VenvMapLoader) -> Path: ...
 class FilePins(Collection[PinDatum], Hashable):
     file_abspath: Path
 
-    _pins: list[PinDatum] = dataclasses.field(init=False, default_factory=list)  # noqa: Y015  # fmt: skip
+    _pin_tuple: tuple[PinDatum, ...] = dataclasses.field(init=False, default_factory=tuple)  # noqa: Y015  # fmt: skip
     _iter: Iterator[PinDatum] = dataclasses.field(init=False)  # noqa: Y015
+    _pin_set: frozenset[PinDatum] = dataclasses.field(init=False, default_factory=frozenset, repr=False, compare=False)  # noqa: Y015  # fmt: skip
+    _by_pkg: dict[str, tuple[PinDatum, ...]] = dataclasses.field(init=False, default_factory=dict, repr=False, compare=False)  # noqa: Y015  # fmt: skip
+    _notable: tuple[PinDatum, ...] = dataclasses.field(init=False, default_factory=tuple, repr=False, compare=False)  # noqa: Y015  # fmt: skip
     constraints: set[str] = dataclasses.field(init=False, default_factory=set)  # noqa: Y015  # fmt: skip
     requirements: set[str] = dataclasses.field(init=False, default_factory=set)  # noqa: Y015  # fmt: skip
     pkgs_from_resolved: set[str] = dataclasses.field(init=False, default_factory=set)  # noqa: Y015  # fmt: skip
 
     def __post_init__(self) -> None: ...
+    @property
+    def _pins(self) -> list[PinDatum]: ...
+    @_pins.setter
+    def _pins(self, pins: Iterable[PinDatum]) -> None: ...
     def __len__(self) -> int: ...
     def __iter__(self) -> Self: ...
     def __next__(self) -> PinDatum: ...
@@ -0,0 +1,226 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Group venvs by python interpreter version. Each group's compile jobs
+share a worker pool. Groups run at once, all within the global jobs
+limit
+
+e.g. ``.venv`` and ``.doc/.venv`` on CPython 3.12 and ``.rst2html5``
+on CPython 3.9 are two groups. Both lock at once, each against it's
+own interpreter. A group which is waiting on the package index does
+not hold up the other
+
+The jobs limit is split between the groups with jobs, at least one
+worker each, the remainder going to the groups with the most jobs per
+worker. No group is given more workers than it has jobs. When there
+are more groups than the jobs limit, the limit still holds
+
+Interpreter versions come from :py:mod:`wreck.lock_interpreter`
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str]
+   :value: ("InterpreterGroups", "interpreter_key", "share_workers")
+
+   Module exports
+
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from .constants import g_app_name
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_groups")
+
+__all__ = (
+    "InterpreterGroups",
+    "interpreter_key",
+    "share_workers",
+)
+
+
+def interpreter_key(interpreter):
+    """Group key. Implementation and version, not the interpreter path.
+
+    :param interpreter: One venv's python interpreter
+    :type interpreter: wreck.lock_interpreter.VenvInterpreter
+    :returns: e.g. ``CPython 3.12.4``. ``unknown`` if version unknown
+    :rtype: str
+    """
+    d_markers = interpreter.markers if interpreter.markers is not None else {}
+    implementation = d_markers.get("platform_python_implementation", "")
+    str_version = interpreter.version
+    if len(str_version) == 0:
+        ret = "unknown"
+    else:
+        ret = f"{implementation} {str_version}".strip()
+
+    return ret
+
+
+def share_workers(sizes, jobs):
+    """Split the jobs limit between groups.
+
+    :param sizes: per group, job count
+    :type sizes: collections.abc.Sequence[int]
+    :param jobs: jobs running at once, across all groups
+    :type jobs: int
+    :returns:
+
+       per group, worker count. 0 for a group without jobs. Otherwise
+       at least 1, at most it's job count
+
+    :rtype: list[int]
+    """
+    ret = [1 if size > 0 else 0 for size in sizes]
+    spare = jobs - sum(ret)
+    while spare > 0:
+        candidates = [idx for idx, size in enumerate(sizes) if ret[idx] < size]
+        if len(candidates) == 0:
+            break
+        else:  # pragma: no cover
+            pass
+        # Most jobs per worker. Ties, first group
+        idx_most = max(candidates, key=lambda idx: sizes[idx] / ret[idx])
+        ret[idx_most] += 1
+        spare -= 1
+
+    return ret
+
+
+class InterpreterGroups:
+    """venvs grouped by python interpreter version.
+
+    :ivar keys: per group, key. In order of first appearance
+    :vartype keys: list[str]
+    :ivar venvs: venv relative path --> group index
+    :vartype venvs: dict[str, int]
+    """
+
+    __slots__ = ("keys", "venvs")
+
+    def __init__(self, keys, venvs):
+        """Class constructor."""
+        self.keys = keys
+        self.venvs = venvs
+
+    @classmethod
+    def plan(cls, interpreters):
+        """venvs with the same interpreter version share a group.
+
+        :param interpreters: venv relative path --> interpreter
+        :type interpreters: collections.abc.Mapping[str, wreck.lock_interpreter.VenvInterpreter]
+        :returns: groups
+        :rtype: wreck.lock_groups.InterpreterGroups
+        """
+        keys = []
+        d_venvs = {}
+        for venv_relpath, interpreter in interpreters.items():
+            key = interpreter_key(interpreter)
+            if key not in keys:
+                keys.append(key)
+            else:  # pragma: no cover
+                pass
+            d_venvs[venv_relpath] = keys.index(key)
+
+        ret = cls(keys, d_venvs)
+
+        if len(keys) > 1:
+            msg_info = f"interpreter groups: {ret!s}"
+            _logger.info(msg_info)
+        else:  # pragma: no cover
+            pass
+
+        return ret
+
+    def __str__(self):
+        """Each group's key and venvs.
+
+        :returns: e.g. ``CPython 3.12.4 (.venv, .doc/.venv); CPython 3.9.7 (.rst2html5)``
+        :rtype: str
+        """
+        groups = []
+        for idx, key in enumerate(self.keys):
+            venv_relpaths = [
+                venv_relpath
+                for venv_relpath, idx_group in self.venvs.items()
+                if idx_group == idx
+            ]
+            groups.append(f"{key} ({', '.join(venv_relpaths)})")
+        ret = "; ".join(groups)
+
+        return ret
+
+    def group_of(self, venv_relpath):
+        """Which group a venv is in.
+
+        :param venv_relpath: venv relative path
+        :type venv_relpath: str
+        :returns: group index. A venv not planned, a group of it's own
+        :rtype: int
+        """
+        ret = self.venvs.get(venv_relpath, len(self.keys))
+
+        return ret
+
+    def run(self, t_batch, fcn, jobs):
+        """Run a batch of jobs. Per group, a worker pool. Groups at once.
+
+        Within a group, jobs start in batch order. Across groups, at
+        most ``jobs`` run at once
+
+        :param t_batch: jobs. 1st item is the venv relative path
+        :type t_batch: collections.abc.Sequence[typing.Any]
+        :param fcn: runs one job
+        :type fcn: collections.abc.Callable[[typing.Any], typing.Any]
+        :param jobs: jobs running at once, across all groups
+        :type jobs: int
+        :returns: per job result, in batch order
+        :rtype: list[typing.Any]
+        """
+        d_group_idxs = {}
+        for idx, t_job in enumerate(t_batch):
+            idx_group = self.group_of(t_job[0])
+            d_group_idxs.setdefault(idx_group, []).append(idx)
+
+        group_idxs = list(d_group_idxs.values())
+        workers = share_workers([len(idxs) for idxs in group_idxs], jobs)
+        if jobs <= 1 or sum(workers) <= 1:
+            ret = list(map(fcn, t_batch))
+        else:
+            # More groups than jobs. Still at most jobs at once
+            semaphore = threading.BoundedSemaphore(jobs)
+
+            def gated(t_job):
+                """One job. Waits for a free slot."""
+                with semaphore:
+                    return fcn(t_job)
+
+            futures = {}
+            with ExitStack() as stack:
+                for idxs, max_workers in zip(group_idxs, workers):
+                    executor = stack.enter_context(
+                        ThreadPoolExecutor(
+                            max_workers=max_workers,
+                            thread_name_prefix=f"{g_app_name}-compile",
+                        )
+                    )
+                    for idx in idxs:
+                        futures[idx] = executor.submit(gated, t_batch[idx])
+                ret = [futures[idx].result() for idx in range(len(t_batch))]
+
+        return ret
@@ -0,0 +1,43 @@
+import logging
+from collections.abc import (
+    Callable,
+    Mapping,
+    Sequence,
+)
+from typing import (
+    Any,
+    Final,
+)
+
+from typing_extensions import Self
+
+from .lock_interpreter import VenvInterpreter
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+__all__ = (
+    "InterpreterGroups",
+    "interpreter_key",
+    "share_workers",
+)
+
+def interpreter_key(interpreter: VenvInterpreter) -> str: ...
+def share_workers(sizes: Sequence[int], jobs: int) -> list[int]: ...
+
+class InterpreterGroups:
+    __slots__ = ("keys", "venvs")
+
+    keys: list[str]
+    venvs: dict[str, int]
+
+    def __init__(self, keys: list[str], venvs: dict[str, int]) -> None: ...
+    @classmethod
+    def plan(cls, interpreters: Mapping[str, VenvInterpreter]) -> Self: ...
+    def group_of(self, venv_relpath: str) -> int: ...
+    def run(
+        self,
+        t_batch: Sequence[Any],
+        fcn: Callable[[Any], Any],
+        jobs: int,
+    ) -> list[Any]: ...
@@ -0,0 +1,419 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Per venv Python interpreter. Where it is, it's version, and it's
+:pep:`508` environment markers. Found once per venv.
+
+The interpreter is found with the help of the venv's ``pyvenv.cfg``,
+see :py:func:`wreck._safe_path.get_venv_python_abspath`. It's markers
+come from running it once, with a small script which does not need
+``packaging`` installed in the venv.
+
+Markers are cached in ``.wreck_cache/markers.json``, keyed by the
+interpreter binary's real path and mtime. Recreating or upgrading a
+venv's interpreter changes the mtime, so it's asked again. Otherwise
+no interpreter is started at all
+
+Used by compile job deduplication, :py:mod:`wreck.lock_dedupe`, by
+qualifier evaluation,
+:py:meth:`~wreck.lock_interpreter.VenvInterpreter.evaluate`, and by the
+:command:`reqs fix` run report
+
+.. py:data:: MARKERS_NAME
+   :type: str
+   :value: "markers.json"
+
+   Within ``.wreck_cache`` folder, interpreter markers cache file name
+
+.. py:data:: MARKER_TIMEOUT
+   :type: int
+   :value: 30
+
+   Seconds to wait on an interpreter to report it's environment markers
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str, str, str, str, str]
+   :value: ("MARKERS_NAME", "MARKER_TIMEOUT", "MarkerCache", \
+   "VenvInterpreter", "probe_markers", "venv_interpreters", "venv_python")
+
+   Module exports
+
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast
+
+from packaging.markers import (
+    InvalidMarker,
+    Marker,
+    UndefinedComparison,
+    UndefinedEnvironmentName,
+)
+
+from ._safe_path import (
+    get_venv_python_abspath,
+    read_pyvenv_cfg,
+    resolve_joinpath,
+)
+from .constants import g_app_name
+from .lock_cache import (
+    CACHE_FOLDER,
+    _write_text_atomic,
+)
+from .lock_datum import DC_SLOTS
+
+MARKERS_NAME = "markers.json"
+MARKER_TIMEOUT = 30
+_MARKERS_VERSION = 1
+# Same keys as packaging.markers.default_environment. venv may lack packaging
+_MARKER_SCRIPT = """\
+import json, os, platform, sys
+info = sys.implementation.version
+impl = f"{info.major}.{info.minor}.{info.micro}"
+if info.releaselevel != "final":
+    impl = f"{impl}{info.releaselevel[0]}{info.serial}"
+print(json.dumps({
+    "implementation_name": sys.implementation.name,
+    "implementation_version": impl,
+    "os_name": os.name,
+    "platform_machine": platform.machine(),
+    "platform_python_implementation": platform.python_implementation(),
+    "platform_release": platform.release(),
+    "platform_system": platform.system(),
+    "platform_version": platform.version(),
+    "python_full_version": platform.python_version(),
+    "python_version": ".".join(platform.python_version_tuple()[:2]),
+    "sys_platform": sys.platform,
+}, sort_keys=True))
+"""
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_interpreter")
+
+__all__ = (
+    "MARKERS_NAME",
+    "MARKER_TIMEOUT",
+    "MarkerCache",
+    "VenvInterpreter",
+    "probe_markers",
+    "venv_interpreters",
+    "venv_python",
+)
+
+
+def venv_python(path_cwd, venv_relpath):
+    """pip-compile runs with Python interpreter A.
+    pip runs against Python interpreter B.
+
+    Do not know whether or not Python interpreter B is setup in venv
+    relative path folder
+
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param venv_relpath: venv relative path
+    :type venv_relpath: str
+    :returns:
+
+       venv python interpreter absolute path. Empty str if not found,
+       pip-compile would run with the current interpreter
+
+    :rtype: str
+    """
+    try:
+        venv_python_abspath = get_venv_python_abspath(path_cwd, venv_relpath)
+    except NotADirectoryError:  # pragma: no cover
+        # venv not setup with appropriate python interpreter version.
+        # pip-compile results will be wrong, but **might** still run
+        ret = ""
+        msg_warn = (
+            f"venv not setup under folder, {venv_relpath} "
+            "with the appropriate python interpreter version. "
+            "Running pip-compile with current python executable. "
+            "pip-compile results will be wrong, but might still run."
+        )
+        _logger.warning(msg_warn)
+    else:  # pragma: no cover
+        # venv found. Hopefully with the correct Python interpreter version
+        is_file = (
+            Path(venv_python_abspath).exists() and Path(venv_python_abspath).is_file()
+        )
+        if is_file:
+            ret = str(venv_python_abspath)
+        else:
+            """Couldn't find Python interpreter, fallback to current one
+            In tests, base folder is tmp_path, not path_cwd. Needs a
+            *parent_dir* override param
+            """
+            ret = ""
+
+    return ret
+
+
+def probe_markers(python_abspath):
+    """Run an interpreter, ask for it's :pep:`508` environment markers.
+
+    :param python_abspath: python interpreter absolute path
+    :type python_abspath: str
+    :returns: marker name --> value. None if the interpreter failed to run
+    :rtype: dict[str, str] | None
+    """
+    dotted_path = f"{g_app_name}.lock_interpreter.probe_markers"
+    # Not run_cmd. It shlex splits, which would mangle the script
+    cmd = (python_abspath, "-I", "-c", _MARKER_SCRIPT)
+    try:
+        proc = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=MARKER_TIMEOUT,
+        )
+        d_markers = json.loads(proc.stdout) if proc.returncode == 0 else None
+        err = proc.stderr
+    except (OSError, subprocess.SubprocessError, ValueError) as exc:
+        d_markers = None
+        err = str(exc)
+
+    if isinstance(d_markers, dict):
+        ret = {str(key): str(val) for key, val in d_markers.items()}
+    else:
+        msg_warn = f"{dotted_path} {python_abspath} environment markers unknown. {err}"
+        _logger.warning(msg_warn)
+        ret = None
+
+    return ret
+
+
+class MarkerCache:
+    """Per interpreter binary, it's environment markers. Keyed by real
+    path, valid while the mtime is unchanged.
+
+    Thread safe. Persisted, as json, by :py:meth:`save`. Interpreters
+    which failed to run are remembered only for this process
+
+    :param path_f: Default None. cache file absolute path. Need not exist. None in memory only
+    :type path_f: pathlib.Path | None
+    """
+
+    __slots__ = ("path_f", "_data", "_failed", "_mutex", "_is_dirty")
+
+    def __init__(self, path_f=None):
+        """Class constructor. Unreadable or other version cache, start empty."""
+        self.path_f = None if path_f is None else Path(path_f)
+        self._mutex = threading.Lock()
+        self._is_dirty = False
+        self._failed = set()
+        if self.path_f is None:
+            d_cache = {}
+        else:
+            try:
+                d_cache = json.loads(self.path_f.read_text())
+            except (OSError, ValueError):
+                d_cache = {}
+
+        is_ok = (
+            isinstance(d_cache, dict)
+            and d_cache.get("version", None) == _MARKERS_VERSION
+            and isinstance(d_cache.get("interpreters", None), dict)
+        )
+        self._data = d_cache["interpreters"] if is_ok else {}
+
+    @classmethod
+    def from_loader(cls, loader):
+        """Cache file within ``.wreck_cache`` folder, within package base folder.
+
+        :param loader: Contains some paths and loaded unparsed mappings
+        :type loader: wreck.pep518_venvs.VenvMapLoader
+        :returns: markers cache
+        :rtype: wreck.lock_interpreter.MarkerCache
+        """
+        path_f = loader.project_base.joinpath(CACHE_FOLDER, MARKERS_NAME)
+
+        return cls(path_f)
+
+    def get(self, python_abspath):
+        """Environment markers of an interpreter. Asked only if not cached
+        or the binary changed since.
+
+        :param python_abspath:
+
+           python interpreter absolute path. Empty str or None for the
+           current interpreter
+
+        :type python_abspath: str | None
+        :returns: marker name --> value. None if the interpreter failed to run
+        :rtype: dict[str, str] | None
+        """
+        if python_abspath is None or len(python_abspath) == 0:
+            python_abspath = sys.executable
+        else:  # pragma: no cover
+            pass
+        # venv python is usually a symlink to a versioned interpreter
+        abspath_real = os.path.realpath(python_abspath)
+        try:
+            mtime_ns = os.stat(abspath_real).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        with self._mutex:
+            d_entry = self._data.get(abspath_real, None)
+            is_failed = (abspath_real, mtime_ns) in self._failed
+        is_hit = d_entry is not None and d_entry.get("mtime_ns", None) == mtime_ns
+
+        if is_hit:
+            ret = d_entry["markers"]
+        elif is_failed or mtime_ns is None:
+            ret = None
+        else:
+            ret = probe_markers(python_abspath)
+            with self._mutex:
+                if ret is None:
+                    self._failed.add((abspath_real, mtime_ns))
+                else:
+                    self._data[abspath_real] = {"mtime_ns": mtime_ns, "markers": ret}
+                    self._is_dirty = True
+
+        return ret
+
+    def save(self):
+        """If changed, atomically write the cache file.
+
+        :returns: True if written otherwise False
+        :rtype: bool
+        """
+        with self._mutex:
+            if self._is_dirty and self.path_f is not None:
+                d_cache = {"version": _MARKERS_VERSION, "interpreters": self._data}
+                contents = json.dumps(d_cache, indent=2, sort_keys=True)
+                _write_text_atomic(self.path_f, contents)
+                self._is_dirty = False
+                ret = True
+            else:
+                ret = False
+
+        return ret
+
+
+@dataclass(**DC_SLOTS)
+class VenvInterpreter:
+    """One venv's Python interpreter.
+
+    :ivar venv_relpath: venv relative path
+    :vartype venv_relpath: str
+    :ivar python: interpreter absolute path. Empty str, not found, the current interpreter
+    :vartype python: str
+    :ivar pyvenv_cfg: venv's ``pyvenv.cfg``. Empty if none
+    :vartype pyvenv_cfg: dict[str, str]
+    :ivar markers: :pep:`508` environment markers. None if unknown
+    :vartype markers: dict[str, str] | None
+    """
+
+    venv_relpath: str
+    python: str
+    pyvenv_cfg: dict[str, str]
+    markers: dict[str, str] | None
+
+    @property
+    def version(self):
+        """Interpreter version. From the markers, else ``pyvenv.cfg``.
+
+        :returns: e.g. ``3.12.4``. Empty str if unknown
+        :rtype: str
+        """
+        if self.markers is not None:
+            ret = self.markers.get("python_full_version", "")
+        else:
+            d_cfg = self.pyvenv_cfg
+            ret = d_cfg.get("version_info", d_cfg.get("version", ""))
+
+        return ret
+
+    def evaluate(self, qualifiers):
+        """Does a qualifier apply to this venv? e.g. ``; python_version<"3.11"``
+
+        :param qualifiers: environment marker. Leading semicolon allowed
+        :type qualifiers: str
+        :returns: True or False. None if markers unknown or qualifier invalid
+        :rtype: bool | None
+        """
+        str_marker = qualifiers.strip().lstrip(";").strip()
+        if self.markers is None:
+            ret = None
+        elif len(str_marker) == 0:
+            ret = True
+        else:
+            try:
+                marker = Marker(str_marker)
+                d_env = {"extra": "", **self.markers}
+                ret = marker.evaluate(d_env)
+            except (InvalidMarker, UndefinedComparison, UndefinedEnvironmentName):
+                ret = None
+
+        return ret
+
+    def describe(self):
+        """For the run report.
+
+        :returns: e.g. ``CPython 3.12.4 (.venv/bin/python)``
+        :rtype: str
+        """
+        if self.markers is None:
+            str_impl = "unknown interpreter"
+        else:
+            implementation = self.markers.get("platform_python_implementation", "")
+            str_impl = f"{implementation} {self.version}".strip()
+        str_python = "current interpreter" if len(self.python) == 0 else self.python
+        ret = f"{str_impl} ({str_python})"
+
+        return ret
+
+
+def venv_interpreters(path_cwd, venv_relpaths, marker_cache=None):
+    """Each venv's interpreter. Once per venv.
+
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param venv_relpaths: venv relative paths. Duplicates are ignored
+    :type venv_relpaths: collections.abc.Iterable[str]
+    :param marker_cache: Default None. None for an in memory only cache
+    :type marker_cache: wreck.lock_interpreter.MarkerCache | None
+    :returns: venv relative path --> interpreter. In order of first appearance
+    :rtype: dict[str, wreck.lock_interpreter.VenvInterpreter]
+    """
+    if marker_cache is None:
+        marker_cache = MarkerCache()
+    else:  # pragma: no cover
+        pass
+
+    ret = {}
+    for venv_relpath in venv_relpaths:
+        if venv_relpath not in ret:
+            python_abspath = venv_python(path_cwd, venv_relpath)
+            abspath_venv = cast("Path", resolve_joinpath(path_cwd, venv_relpath))
+            ret[venv_relpath] = VenvInterpreter(
+                venv_relpath=venv_relpath,
+                python=python_abspath,
+                pyvenv_cfg=read_pyvenv_cfg(abspath_venv),
+                markers=marker_cache.get(python_abspath),
+            )
+        else:  # pragma: no cover
+            pass
+
+    return ret
@@ -0,0 +1,68 @@
+import logging
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Any,
+    Final,
+)
+
+from typing_extensions import Self
+
+from .lock_datum import DC_SLOTS
+from .pep518_venvs import VenvMapLoader
+
+MARKERS_NAME: Final[str]
+MARKER_TIMEOUT: Final[int]
+_MARKERS_VERSION: Final[int]
+_MARKER_SCRIPT: Final[str]
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+__all__ = (
+    "MARKERS_NAME",
+    "MARKER_TIMEOUT",
+    "MarkerCache",
+    "VenvInterpreter",
+    "probe_markers",
+    "venv_interpreters",
+    "venv_python",
+)
+
+def venv_python(path_cwd: Path, venv_relpath: str) -> str: ...
+def probe_markers(python_abspath: str) -> dict[str, str] | None: ...
+
+class MarkerCache:
+    __slots__ = ("path_f", "_data", "_failed", "_mutex", "_is_dirty")
+
+    path_f: Path | None
+    _data: dict[str, dict[str, Any]]
+    _failed: set[tuple[str, int | None]]
+    _mutex: threading.Lock
+    _is_dirty: bool
+
+    def __init__(self, path_f: Path | None = None) -> None: ...
+    @classmethod
+    def from_loader(cls, loader: VenvMapLoader) -> Self: ...
+    def get(self, python_abspath: str | None) -> dict[str, str] | None: ...
+    def save(self) -> bool: ...
+
+@dataclass(**DC_SLOTS)
+class VenvInterpreter:
+    venv_relpath: str
+    python: str
+    pyvenv_cfg: dict[str, str]
+    markers: dict[str, str] | None
+
+    @property
+    def version(self) -> str: ...
+    def evaluate(self, qualifiers: str) -> bool | None: ...
+    def describe(self) -> str: ...
+
+def venv_interpreters(
+    path_cwd: Path,
+    venv_relpaths: Iterable[str],
+    marker_cache: MarkerCache | None = None,
+) -> dict[str, VenvInterpreter]: ...
@@ -0,0 +1,697 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Parse a requirements file into pins, constraints and requirements.
+
+``.in`` files are parsed by :py:mod:`pip_requirements_parser`.
+
+Compiled ``.lock`` and ``.unlock`` files are machine generated. Nearly
+every line is either a comment, e.g. ``# via``, or
+``name==version ; markers``. Those are parsed in one pass, building
+:py:class:`~wreck.lock_datum.PinDatum` directly. A file with a line
+not recognised, e.g. extras, a url, hashes or an option, or with no
+pins, is left entirely to :py:mod:`pip_requirements_parser`. Either way
+the result, and any error, is the same
+
+Within one run, the same files are parsed over and over. e.g.
+``pins.shared.in`` once per venv. Parse results are cached, process
+wide, see :py:func:`wreck.lock_parse.parse_file_cached`. Keyed by
+absolute path, size and mtime. A file modified within the last
+:py:data:`wreck.lock_parse._RACY_NS` nanoseconds could change again
+without the mtime changing, so it's contents digest is also checked.
+At most :py:data:`wreck.lock_parse._PARSE_MAX_ENTRIES` files are kept,
+least recently used evicted. A long lived process can
+:py:func:`wreck.lock_parse.clear_cache`
+
+Across runs, parse results can also be stored on disk, see
+:py:class:`wreck.lock_parse.ParseStore`. Entries are keyed by contents
+digest. A warm start skips parsing of unchanged files. The store is
+used by ``reqs fix``, unless ``--no-cache``
+
+.. py:data:: PARSE_FOLDER
+   :type: str
+   :value: "parse"
+
+   Within ``.wreck_cache``, folder containing parse results
+
+.. py:data:: _RACY_NS
+   :type: int
+   :value: 2000000000
+
+   mtime this recent, do not trust size and mtime alone. Covers coarse
+   file system timestamps
+
+.. py:data:: _PARSE_MAX_ENTRIES
+   :type: int
+   :value: 1024
+
+   In process parse results kept, at most. Least recently used evicted
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str, str, str, str, str]
+   :value: ("PARSE_FOLDER", "ParseStore", "clear_cache", "is_compiled", \
+   "parse_file", "parse_file_cached", "set_parse_store")
+
+   Module exports
+
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import cast
+
+from packaging.markers import (
+    InvalidMarker,
+    Marker,
+)
+from packaging.specifiers import (
+    InvalidSpecifier,
+    Specifier,
+)
+from pip_requirements_parser import (  # pyright: ignore[reportMissingTypeStubs]
+    InstallationError,
+    RequirementsFile,
+)
+
+from .constants import (
+    SUFFIX_LOCKED,
+    SUFFIX_UNLOCKED,
+    g_app_name,
+)
+from .exceptions import MissingRequirementsFoldersFiles
+from .lock_cache import (
+    CACHE_FOLDER,
+    CACHE_MAX_AGE,
+    _check_positive_int,
+    _digest_file,
+    _write_text_atomic,
+)
+from .lock_datum import (
+    PinDatum,
+    _clear_interned,
+    _parse_qualifiers,
+)
+
+# name  name==1.0  name >= 1.0 ; python_version < "3.11"
+_PROG_PIN = re.compile(
+    r"^(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*"
+    r"(?:(?P<op>===|==|!=|~=|>=|<=|>|<)\s*(?P<version>[^\s;,#\\]+))?\s*"
+    r"(?:;\s*(?P<marker>[^;#\\]*[^;#\\\s]))?\s*$"
+)
+
+_RACY_NS = 2_000_000_000
+_PARSE_MAX_ENTRIES = 1024
+PARSE_FOLDER = "parse"
+_SUFFIX_ENTRY = ".json"
+_STORE_VERSION = 1
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_parse")
+
+__all__ = (
+    "PARSE_FOLDER",
+    "ParseStore",
+    "clear_cache",
+    "is_compiled",
+    "parse_file",
+    "parse_file_cached",
+    "set_parse_store",
+)
+
+
+def is_compiled(abspath_f):
+    """Compiled formats, ``.lock`` and ``.unlock``, have a fast path.
+
+    :param abspath_f: requirements file path
+    :type abspath_f: pathlib.Path
+    :returns: True if last suffix is ``.lock`` or ``.unlock``
+    :rtype: bool
+    """
+    ret = abspath_f.suffix in (SUFFIX_LOCKED, SUFFIX_UNLOCKED)
+
+    return ret
+
+
+def _walk_rf(rf, abspath_f):
+    """From a parsed requirements file, pins, constraints and requirements.
+
+    :param rf: parsed requirements file
+    :type rf: pip_requirements_parser.RequirementsFile
+    :param abspath_f: requirements file absolute path. Pins belong to it
+    :type abspath_f: pathlib.Path
+    :returns:
+
+       line number and pin, in file order. constraints and requirements
+       relative paths. Existence not checked
+
+    :rtype: tuple[list[tuple[int, wreck.lock_datum.PinDatum]], set[str], set[str]]
+    """
+    d_rf_all = rf.to_dict()
+
+    pins = []
+    for d_req in d_rf_all["requirements"]:
+        # fields: line, line_number
+        pkg_name = cast("str", d_req.get("name", ""))
+
+        # list[specifier]
+        specifiers = cast("list[str]", d_req.get("specifier", []))
+
+        # line
+        d_req_line = cast("dict[str, int | str]", d_req.get("requirement_line", {}))
+        is_line_str = "line" in d_req_line.keys() and isinstance(
+            d_req_line["line"], str
+        )
+        if is_line_str:
+            line = cast("str", d_req_line["line"])
+        else:  # pragma: no cover
+            line = ""
+        line_number = cast("int", d_req_line.get("line_number", 0))
+
+        if len(line.strip()) != 0:  # pragma: no branch
+            qualifiers = _parse_qualifiers(line)
+            pin = PinDatum(abspath_f, pkg_name, line, specifiers, qualifiers)
+            pins.append((line_number, pin))
+
+    """Example options list[dict[str, int|list[str]]]
+    'options': [{'constraints': ['pins.shared.in'],
+          'line': '-c pins.shared.in',
+          'line_number': 4},
+         {'line': '-r prod.shared.in',
+          'line_number': 6,
+          'requirements': ['prod.shared.in']}],
+    """
+    set_constraints = set()
+    set_requirements = set()
+    for d_opt in d_rf_all["options"]:
+        # constraints|requirements, line, line_number
+        if "constraints" in d_opt.keys():  # pragma: no branch
+            set_constraints.update(cast("list[str]", d_opt["constraints"]))
+        else:  # pragma: no cover
+            pass
+        if "requirements" in d_opt.keys():  # pragma: no branch
+            set_requirements.update(cast("list[str]", d_opt["requirements"]))
+        else:  # pragma: no cover
+            pass
+
+    return pins, set_constraints, set_requirements
+
+
+def _parse_full(abspath_f):
+    """Parse with :py:mod:`pip_requirements_parser`.
+
+    :param abspath_f: requirements file absolute path
+    :type abspath_f: pathlib.Path
+    :returns: line number and pin, constraints, requirements
+    :rtype: tuple[list[tuple[int, wreck.lock_datum.PinDatum]], set[str], set[str]]
+    :raises:
+
+       - :py:exc:`wreck.exceptions.MissingRequirementsFoldersFiles` --
+         requirements file not found
+
+    """
+    try:
+        rf = RequirementsFile.from_file(abspath_f.as_posix())
+    except InstallationError as exc:
+        msg_exc = f"Requirements file not found {abspath_f!r}. Create it"
+        raise MissingRequirementsFoldersFiles(msg_exc) from exc
+
+    ret = _walk_rf(rf, abspath_f)
+
+    return ret
+
+
+def _parse_line(line, abspath_f):
+    """One compiled format line. Only the simple forms are recognised.
+
+    :param line: stripped line. Not empty, not a comment
+    :type line: str
+    :param abspath_f: requirements file absolute path. Pin belongs to it
+    :type abspath_f: pathlib.Path
+    :returns: pin. None if not recognised
+    :rtype: wreck.lock_datum.PinDatum | None
+    """
+    match = _PROG_PIN.match(line)
+    if match is None:
+        ret = None
+    else:
+        op = match["op"]
+        marker = match["marker"]
+        try:
+            if op is None:
+                specifiers = []
+            else:
+                # Normalized as pip_requirements_parser does, no whitespace
+                specifiers = [str(Specifier(f"{op}{match['version']}"))]
+            if marker is not None:
+                Marker(marker)
+            else:  # pragma: no cover
+                pass
+        except (InvalidSpecifier, InvalidMarker):
+            ret = None
+        else:
+            qualifiers = _parse_qualifiers(line)
+            ret = PinDatum(abspath_f, match["name"], line, specifiers, qualifiers)
+
+    return ret
+
+
+def _parse_compiled(abspath_f):
+    """One pass over a ``.lock`` or ``.unlock`` file. Any line not
+    recognised, or no pins at all, the whole file goes to
+    :py:mod:`pip_requirements_parser`. Same result, same errors.
+
+    :param abspath_f: requirements file absolute path
+    :type abspath_f: pathlib.Path
+    :returns: line number and pin, constraints, requirements
+    :rtype: tuple[list[tuple[int, wreck.lock_datum.PinDatum]], set[str], set[str]]
+    :raises:
+
+       - :py:exc:`wreck.exceptions.MissingRequirementsFoldersFiles` --
+         requirements file not found
+
+    """
+    dotted_path = f"{g_app_name}.lock_parse._parse_compiled"
+    try:
+        contents = Path(abspath_f).read_text()
+    except (OSError, UnicodeDecodeError) as exc:
+        msg_exc = f"Requirements file not found {abspath_f!r}. Create it"
+        raise MissingRequirementsFoldersFiles(msg_exc) from exc
+
+    pins = []
+    is_fallback = False
+    for idx, line_raw in enumerate(contents.splitlines()):
+        line = line_raw.strip()
+        if len(line) == 0 or line.startswith("#"):
+            continue
+        else:  # pragma: no cover
+            pass
+        # Line continuations, e.g. --hash, fail the match
+        pin = _parse_line(line, abspath_f)
+        if pin is None:
+            is_fallback = True
+            break
+        else:
+            pins.append((idx + 1, pin))
+
+    if is_fallback or len(pins) == 0:
+        # Options, urls, empty file. pip_requirements_parser decides
+        if is_module_debug:  # pragma: no cover
+            msg_info = f"{dotted_path} {abspath_f!s} parsed in full"
+            _logger.info(msg_info)
+        else:  # pragma: no cover
+            pass
+        ret = _parse_full(abspath_f)
+    else:
+        ret = (pins, set(), set())
+
+    return ret
+
+
+def parse_file(abspath_f):
+    """Parse a requirements file. ``.lock`` and ``.unlock``, fast path.
+
+    :param abspath_f: requirements file absolute path
+    :type abspath_f: pathlib.Path
+    :returns:
+
+       pins, in file order. constraints and requirements relative
+       paths, relative to the requirements file folder. Existence not
+       checked
+
+    :rtype: tuple[list[wreck.lock_datum.PinDatum], set[str], set[str]]
+    :raises:
+
+       - :py:exc:`wreck.exceptions.MissingRequirementsFoldersFiles` --
+         requirements file not found
+
+    """
+    if is_compiled(abspath_f):
+        t_parsed = _parse_compiled(abspath_f)
+    else:
+        t_parsed = _parse_full(abspath_f)
+    line_pins, set_constraints, set_requirements = t_parsed
+    pins = [pin for _, pin in line_pins]
+
+    return pins, set_constraints, set_requirements
+
+
+def _unique_sorted(pins):
+    """Drop exact duplicates, then sort.
+
+    :param pins: pins, in file order
+    :type pins: collections.abc.Sequence[wreck.lock_datum.PinDatum]
+    :returns: unique pins, sorted
+    :rtype: tuple[wreck.lock_datum.PinDatum, ...]
+    """
+    # Filter out if an exact match. First occurrence kept
+    lst_tmp = list(dict.fromkeys(pins))
+
+    # List items must implement: __hash__, __eq__, and __lt__
+    ret = tuple(sorted(lst_tmp))
+
+    return ret
+
+
+def _is_strs(val):
+    """Validate a deserialized field.
+
+    :param val: From a store entry. Could be anything
+    :type val: typing.Any
+    :returns: True if a list of str
+    :rtype: bool
+    """
+    ret = isinstance(val, list) and all(isinstance(item, str) for item in val)
+
+    return ret
+
+
+class ParseStore:
+    """On disk parse results, keyed by contents digest. Survives across runs.
+
+    Entries are compact json. Per pin: package name, line, specifiers,
+    and qualifiers. Then constraints and requirements relative paths.
+    An entry which fails validation is a miss. Entries not used within
+    max age days are evicted
+
+    Thread safe. Writes are atomic
+
+    :param path_dir: Store folder absolute path. Created on first put
+    :type path_dir: pathlib.Path
+    :param max_age: Default 14. Entry age limit in days
+    :type max_age: typing.Any
+
+    .. py:attribute:: path_dir
+       :type: pathlib.Path
+
+       Store folder absolute path
+
+    .. py:attribute:: max_seconds
+       :type: int
+
+       Entry age limit in seconds
+
+    """
+
+    __slots__ = ("path_dir", "max_seconds")
+
+    def __init__(self, path_dir, max_age=CACHE_MAX_AGE):
+        """Class constructor."""
+        self.path_dir = Path(path_dir)
+        int_max_age = _check_positive_int(max_age, CACHE_MAX_AGE)
+        self.max_seconds = int_max_age * 24 * 60 * 60
+
+    @classmethod
+    def from_loader(cls, loader):
+        """Store folder within package base folder.
+
+        :param loader: Contains some paths and loaded unparsed mappings
+        :type loader: wreck.pep518_venvs.VenvMapLoader
+        :returns: parse store
+        :rtype: wreck.lock_parse.ParseStore
+        """
+        path_dir = loader.project_base.joinpath(CACHE_FOLDER, PARSE_FOLDER)
+
+        return cls(path_dir)
+
+    def _entry(self, key):
+        """Store entry absolute path.
+
+        :param key: sha256 hex digest of requirements file contents
+        :type key: str
+        :returns: store entry absolute path
+        :rtype: pathlib.Path
+        """
+        return self.path_dir.joinpath(f"{key}{_SUFFIX_ENTRY}")
+
+    def get(self, key, abspath_f):
+        """Parse result of a requirements file with these contents.
+        A hit refreshes the entry's age.
+
+        :param key: sha256 hex digest of requirements file contents
+        :type key: str
+        :param abspath_f: requirements file absolute path. Pins belong to it
+        :type abspath_f: pathlib.Path
+        :returns: unique pins sorted, constraints, requirements. None on a miss
+        :rtype: tuple[tuple[wreck.lock_datum.PinDatum, ...], frozenset[str], frozenset[str]] | None
+        """
+        dotted_path = f"{g_app_name}.lock_parse.ParseStore.get"
+        path_entry = self._entry(key)
+        try:
+            d_entry = json.loads(path_entry.read_text())
+        except (OSError, ValueError):
+            d_entry = None
+
+        is_valid = (
+            isinstance(d_entry, dict)
+            and d_entry.get("v", None) == _STORE_VERSION
+            and d_entry.get("key", None) == key
+            and isinstance(d_entry.get("pins", None), list)
+            and all(
+                isinstance(rec, list)
+                and len(rec) == 4
+                and isinstance(rec[0], str)
+                and isinstance(rec[1], str)
+                and _is_strs(rec[2])
+                and _is_strs(rec[3])
+                for rec in d_entry["pins"]
+            )
+            and _is_strs(d_entry.get("c", None))
+            and _is_strs(d_entry.get("r", None))
+        )
+        if not is_valid:
+            if d_entry is not None and is_module_debug:  # pragma: no cover
+                _logger.info(f"{dotted_path} invalid entry {path_entry!s}")
+            else:  # pragma: no cover
+                pass
+            ret = None
+        else:
+            pins = tuple(
+                PinDatum(abspath_f, pkg_name, line, specifiers, qualifiers)
+                for pkg_name, line, specifiers, qualifiers in d_entry["pins"]
+            )
+            ret = (pins, frozenset(d_entry["c"]), frozenset(d_entry["r"]))
+            try:
+                os.utime(path_entry)
+            except OSError:  # pragma: no cover
+                pass
+
+        return ret
+
+    def put(self, key, parsed):
+        """Store a parse result.
+
+        :param key: sha256 hex digest of requirements file contents
+        :type key: str
+        :param parsed: unique pins sorted, constraints, requirements
+        :type parsed: tuple[collections.abc.Sequence[wreck.lock_datum.PinDatum], collections.abc.Set[str], collections.abc.Set[str]]
+        """
+        pins, set_constraints, set_requirements = parsed
+        d_entry = {
+            "v": _STORE_VERSION,
+            "key": key,
+            "pins": [
+                [pin.pkg_name, pin.line, pin.specifiers, pin.qualifiers] for pin in pins
+            ],
+            "c": sorted(set_constraints),
+            "r": sorted(set_requirements),
+        }
+        contents = json.dumps(d_entry, separators=(",", ":"))
+        _write_text_atomic(self._entry(key), contents)
+
+    def evict(self):
+        """Remove entries not used within max age.
+
+        :returns: Count of removed entries
+        :rtype: int
+        """
+        oldest_allowed = time.time() - self.max_seconds
+        removed = 0
+        if self.path_dir.is_dir():
+            for path_entry in self.path_dir.glob(f"*{_SUFFIX_ENTRY}"):
+                try:
+                    is_too_old = path_entry.stat().st_mtime < oldest_allowed
+                except OSError:  # pragma: no cover
+                    is_too_old = False
+                if is_too_old:
+                    path_entry.unlink(missing_ok=True)
+                    removed += 1
+                else:  # pragma: no cover
+                    pass
+        else:  # pragma: no cover
+            pass
+
+        return removed
+
+
+class _ParseCache:
+    """Per absolute path, the most recent parse result. Thread safe.
+
+    Cached pins are shared and never modified. constraints and
+    requirements are frozen, so callers copy before changing them
+
+    :ivar max_entries:
+
+       Default :py:data:`wreck.lock_parse._PARSE_MAX_ENTRIES`. Files
+       kept, at most. Least recently used evicted
+
+    :vartype max_entries: int
+    :ivar store: on disk parse results. None if not used
+    :vartype store: wreck.lock_parse.ParseStore | None
+    """
+
+    __slots__ = ("_mutex", "_entries", "max_entries", "store")
+
+    def __init__(self, max_entries=_PARSE_MAX_ENTRIES):
+        """Class constructor."""
+        self._mutex = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_entries = _check_positive_int(max_entries, _PARSE_MAX_ENTRIES)
+        self.store = None
+
+    def get(self, abspath_f):
+        """Parse result, from cache if the file is unchanged. Otherwise
+        from the on disk store, if any, when contents are unchanged.
+
+        :param abspath_f: requirements file absolute path
+        :type abspath_f: pathlib.Path
+        :returns: unique pins sorted, constraints, requirements
+        :rtype: tuple[tuple[wreck.lock_datum.PinDatum, ...], frozenset[str], frozenset[str]]
+        :raises:
+
+           - :py:exc:`wreck.exceptions.MissingRequirementsFoldersFiles` --
+             requirements file not found
+
+        """
+        dotted_path = f"{g_app_name}.lock_parse._ParseCache.get"
+        try:
+            st = abspath_f.stat()
+        except OSError as exc:
+            msg_exc = f"Requirements file not found {abspath_f!r}. Create it"
+            raise MissingRequirementsFoldersFiles(msg_exc) from exc
+        key = abspath_f.as_posix()
+        stamp = (st.st_size, st.st_mtime_ns)
+
+        with self._mutex:
+            entry = self._entries.get(key, None)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            else:  # pragma: no cover
+                pass
+            store = self.store
+
+        if entry is not None and entry[0] == stamp:
+            digest_cached = entry[1]
+            is_hit = digest_cached is None or digest_cached == _digest_file(abspath_f)
+        else:
+            is_hit = False
+
+        if is_hit:
+            ret = entry[2]
+        else:
+            # Before parsing. Changed mid parse, digest will not match
+            is_racy = time.time_ns() - st.st_mtime_ns < _RACY_NS
+            if is_racy or store is not None:
+                digest = _digest_file(abspath_f)
+            else:
+                digest = None
+
+            if store is not None and digest is not None:
+                ret = store.get(digest, abspath_f)
+            else:
+                ret = None
+
+            if ret is None:
+                pins, set_constraints, set_requirements = parse_file(abspath_f)
+                ret = (
+                    _unique_sorted(pins),
+                    frozenset(set_constraints),
+                    frozenset(set_requirements),
+                )
+                # Changed mid parse, do not store under the old digest
+                is_store = (
+                    store is not None
+                    and digest is not None
+                    and digest == _digest_file(abspath_f)
+                )
+                if is_store:
+                    store.put(digest, ret)
+                else:  # pragma: no cover
+                    pass
+                if is_module_debug:  # pragma: no cover
+                    _logger.info(f"{dotted_path} parsed {key}")
+                else:  # pragma: no cover
+                    pass
+            else:  # pragma: no cover
+                pass
+
+            with self._mutex:
+                self._entries[key] = (stamp, digest if is_racy else None, ret)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return ret
+
+    def clear(self):
+        """Forget all parse results."""
+        with self._mutex:
+            self._entries.clear()
+
+
+_cache = _ParseCache()
+
+
+def parse_file_cached(abspath_f):
+    """Parse a requirements file at most once per process, unless it changes.
+
+    :param abspath_f: requirements file absolute path
+    :type abspath_f: pathlib.Path
+    :returns:
+
+       unique pins, sorted. Shared, do not modify. constraints and
+       requirements relative paths
+
+    :rtype: tuple[tuple[wreck.lock_datum.PinDatum, ...], frozenset[str], frozenset[str]]
+    :raises:
+
+       - :py:exc:`wreck.exceptions.MissingRequirementsFoldersFiles` --
+         requirements file not found
+
+    """
+    ret = _cache.get(abspath_f)
+
+    return ret
+
+
+def clear_cache():
+    """Forget all cached parse results and the pins' shared file
+    handles. e.g. between runs or tests."""
+    _cache.clear()
+    _clear_interned()
+
+
+def set_parse_store(store):
+    """Use an on disk store of parse results. Process wide.
+
+    :param store: on disk parse results. None to stop using one
+    :type store: wreck.lock_parse.ParseStore | None
+    """
+    with _cache._mutex:
+        _cache.store = store
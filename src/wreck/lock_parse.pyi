@@ -0,0 +1,95 @@
+import logging
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import (
+    Sequence,
+    Set,
+)
+from pathlib import Path
+from typing import (
+    Any,
+    Final,
+)
+
+from pip_requirements_parser import (
+    RequirementsFile,
+)
+from typing_extensions import Self
+
+from .lock_datum import PinDatum
+from .pep518_venvs import VenvMapLoader
+
+__all__ = (
+    "PARSE_FOLDER",
+    "ParseStore",
+    "clear_cache",
+    "is_compiled",
+    "parse_file",
+    "parse_file_cached",
+    "set_parse_store",
+)
+
+_PROG_PIN: Final[re.Pattern[str]]
+_RACY_NS: Final[int]
+_PARSE_MAX_ENTRIES: Final[int]
+PARSE_FOLDER: Final[str]
+_SUFFIX_ENTRY: Final[str]
+_STORE_VERSION: Final[int]
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+def is_compiled(abspath_f: Path) -> bool: ...
+def _walk_rf(
+    rf: RequirementsFile,
+    abspath_f: Path,
+) -> tuple[list[tuple[int, PinDatum]], set[str], set[str]]: ...
+def _parse_full(
+    abspath_f: Path,
+) -> tuple[list[tuple[int, PinDatum]], set[str], set[str]]: ...
+def _parse_line(line: str, abspath_f: Path) -> PinDatum | None: ...
+def _parse_compiled(
+    abspath_f: Path,
+) -> tuple[list[tuple[int, PinDatum]], set[str], set[str]]: ...
+def parse_file(abspath_f: Path) -> tuple[list[PinDatum], set[str], set[str]]: ...
+def _unique_sorted(pins: Sequence[PinDatum]) -> tuple[PinDatum, ...]: ...
+def _is_strs(val: Any) -> bool: ...
+
+_ParsedFile = tuple[tuple[PinDatum, ...], frozenset[str], frozenset[str]]
+
+class ParseStore:
+    __slots__ = ("path_dir", "max_seconds")
+
+    path_dir: Path
+    max_seconds: int
+
+    def __init__(self, path_dir: Path, max_age: Any = ...) -> None: ...
+    @classmethod
+    def from_loader(cls, loader: VenvMapLoader) -> Self: ...
+    def _entry(self, key: str) -> Path: ...
+    def get(self, key: str, abspath_f: Path) -> _ParsedFile | None: ...
+    def put(
+        self,
+        key: str,
+        parsed: tuple[Sequence[PinDatum], Set[str], Set[str]],
+    ) -> None: ...
+    def evict(self) -> int: ...
+
+class _ParseCache:
+    __slots__ = ("_mutex", "_entries", "max_entries", "store")
+
+    _mutex: threading.Lock
+    _entries: OrderedDict[str, tuple[tuple[int, int], str | None, _ParsedFile]]
+    max_entries: int
+    store: ParseStore | None
+
+    def __init__(self, max_entries: Any = ...) -> None: ...
+    def get(self, abspath_f: Path) -> _ParsedFile: ...
+    def clear(self) -> None: ...
+
+_cache: _ParseCache
+
+def parse_file_cached(abspath_f: Path) -> _ParsedFile: ...
+def clear_cache() -> None: ...
+def set_parse_store(store: ParseStore | None) -> None: ...
@@ -0,0 +1,326 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Limit how hard concurrent compile jobs hit the package index.
+
+A self-hosted simple index can start failing when too many resolvers
+hit it at once. All compile jobs, across all worker pools, share one
+limiter. Per index host, at most ``index_max_inflight`` resolvers run
+at once, and resolvers start at most ``index_rate`` per second, in
+bursts of at most ``index_burst``. A job waits for both before it's
+resolver starts
+
+Limits, in ``[tool.wreck]``
+
+.. code-block:: text
+
+   [tool.wreck]
+   index_max_inflight = 2
+   index_rate = 0.5
+   index_burst = 2
+
+Each is optional. None set, no limit. ``index_burst`` defaults to 1
+
+The index host is from the ``.in`` include closure, the first
+``--index-url`` or ``-i`` line. Otherwise
+:py:data:`wreck.lock_ratelimit.DEFAULT_INDEX_HOST`. pip-compile is run
+``--isolated``, so pip config and environment variables do not apply
+
+Time spent waiting is recorded in telemetry, see
+:py:mod:`wreck.lock_telemetry`. The asyncio API,
+:py:func:`wreck.lock_async.acompile`, is not limited
+
+.. py:data:: DEFAULT_INDEX_HOST
+   :type: str
+   :value: "pypi.org"
+
+   Index host when the ``.in`` include closure does not choose an index
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str]
+   :value: ("DEFAULT_INDEX_HOST", "IndexLimiter", "index_host")
+
+   Module exports
+
+"""
+
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from .constants import g_app_name
+from .lock_cache import include_closure
+
+DEFAULT_INDEX_HOST = "pypi.org"
+# -i https://pypi.example.com/simple  --index-url=https://...
+_PROG_INDEX_URL = re.compile(r"^\s*(?:-i|--index-url)(?:\s*=\s*|\s+)(?P<url>\S+)")
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_ratelimit")
+
+__all__ = (
+    "DEFAULT_INDEX_HOST",
+    "IndexLimiter",
+    "index_host",
+)
+
+
+def index_host(in_abspath):
+    """Which package index host a ``.in`` file resolves against.
+
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str | pathlib.Path
+    :returns: host, with port if any. e.g. ``pypi.example.com:8080``
+    :rtype: str
+    """
+    ret = DEFAULT_INDEX_HOST
+    for abspath_f in include_closure(in_abspath):
+        try:
+            contents = abspath_f.read_text()
+        except OSError:
+            contents = ""
+
+        urls = [
+            match["url"]
+            for match in map(_PROG_INDEX_URL.match, contents.splitlines())
+            if match is not None
+        ]
+        if len(urls) != 0:
+            netloc = urlsplit(urls[0]).netloc
+            # Drop credentials. user:password@host
+            host = netloc.rpartition("@")[2]
+            ret = host if len(host) != 0 else DEFAULT_INDEX_HOST
+            break
+        else:  # pragma: no cover
+            pass
+
+    return ret
+
+
+def _check_positive(val, cls_type):
+    """Config value should be a positive number.
+
+    :param val: From ``[tool.wreck]``. Could be anything
+    :type val: typing.Any
+    :param cls_type: int, or int or float
+    :type cls_type: type | tuple[type, ...]
+    :returns: positive number. None if unset or not valid
+    :rtype: int | float | None
+    """
+    is_ng = (
+        val is None
+        or isinstance(val, bool)
+        or not isinstance(val, cls_type)
+        or val <= 0
+    )
+    ret = None if is_ng else val
+
+    return ret
+
+
+class _TokenBucket:
+    """Resolver starts per second, with bursts. Not thread safe.
+
+    Reservations may go into debt. Each caller is told how long to
+    wait, so callers start in the order they asked
+
+    :ivar rate: tokens per second
+    :vartype rate: int | float
+    :ivar burst: most tokens held
+    :vartype burst: int
+    """
+
+    __slots__ = ("rate", "burst", "_tokens", "_last")
+
+    def __init__(self, rate, burst):
+        """Class constructor. Starts full."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+
+    def reserve(self):
+        """Take one token.
+
+        :returns: seconds until the token is available. 0 if available now
+        :rtype: float
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        self._tokens -= 1
+        ret = max(0.0, -self._tokens / self.rate)
+
+        return ret
+
+
+class IndexLimiter:
+    """Per index host, limit resolvers in flight and resolver starts.
+
+    Thread safe. One limiter is shared by all compile jobs
+
+    :param max_inflight: Default None. Per host, resolvers running at once. None unlimited
+    :type max_inflight: typing.Any
+    :param rate: Default None. Per host, resolver starts per second. None unlimited
+    :type rate: typing.Any
+    :param burst: Default None. Per host, resolver starts at once. None for 1
+    :type burst: typing.Any
+    """
+
+    __slots__ = ("max_inflight", "rate", "burst", "_mutex", "_hosts", "_waiting")
+
+    def __init__(self, max_inflight=None, rate=None, burst=None):
+        """Class constructor."""
+        self.max_inflight = _check_positive(max_inflight, int)
+        self.rate = _check_positive(rate, (int, float))
+        burst = _check_positive(burst, int)
+        self.burst = 1 if burst is None else burst
+        self._mutex = threading.Lock()
+        self._hosts = {}
+        self._waiting = 0
+
+    @classmethod
+    def from_loader(cls, loader):
+        """Limits from ``[tool.wreck]``.
+
+        :param loader: Contains some paths and loaded unparsed mappings
+        :type loader: wreck.pep518_venvs.VenvMapLoader
+        :returns: index limiter
+        :rtype: wreck.lock_ratelimit.IndexLimiter
+        """
+        d_parent = loader.section_parent
+        ret = cls(
+            max_inflight=d_parent.get("index_max_inflight", None),
+            rate=d_parent.get("index_rate", None),
+            burst=d_parent.get("index_burst", None),
+        )
+
+        return ret
+
+    @property
+    def is_limited(self):
+        """Any limit set.
+
+        :returns: True if resolvers may have to wait
+        :rtype: bool
+        """
+        ret = self.max_inflight is not None or self.rate is not None
+
+        return ret
+
+    @property
+    def waiting(self):
+        """Jobs waiting right now. More than zero, the limiter is saturated.
+
+        :returns: jobs waiting for a slot or a start token
+        :rtype: int
+        """
+        with self._mutex:
+            ret = self._waiting
+
+        return ret
+
+    def _host_limits(self, host):
+        """Per host, the in flight semaphore and the token bucket.
+        Created on first use.
+
+        :param host: index host
+        :type host: str
+        :returns: semaphore and token bucket. Either None if that limit unset
+        :rtype: tuple[threading.BoundedSemaphore | None, wreck.lock_ratelimit._TokenBucket | None]
+        """
+        with self._mutex:
+            if host not in self._hosts:
+                if self.max_inflight is None:
+                    semaphore = None
+                else:
+                    semaphore = threading.BoundedSemaphore(self.max_inflight)
+                if self.rate is None:
+                    bucket = None
+                else:
+                    bucket = _TokenBucket(self.rate, self.burst)
+                self._hosts[host] = (semaphore, bucket)
+            else:  # pragma: no cover
+                pass
+            ret = self._hosts[host]
+
+        return ret
+
+    def _wait(self, semaphore, bucket):
+        """Take a slot, then a start token. Interrupted, the slot is released.
+
+        :param semaphore: None if in flight is unlimited
+        :type semaphore: threading.BoundedSemaphore | None
+        :param bucket: None if starts are unlimited
+        :type bucket: wreck.lock_ratelimit._TokenBucket | None
+        """
+        if semaphore is not None:
+            semaphore.acquire()
+        else:  # pragma: no cover
+            pass
+        try:
+            if bucket is not None:
+                with self._mutex:
+                    delay = bucket.reserve()
+                time.sleep(delay)
+            else:  # pragma: no cover
+                pass
+        except BaseException:
+            if semaphore is not None:
+                semaphore.release()
+            else:  # pragma: no cover
+                pass
+            raise
+
+    @contextmanager
+    def acquire(self, host):
+        """Wait for a free slot, then for a start token. The slot is
+        held until the context exits.
+
+        .. code-block:: text
+
+           with limiter.acquire(index_host(in_abspath)) as waited:
+               t_ret = backend.compile(...)
+
+        :param host: index host
+        :type host: str
+        :returns: context manager. Seconds spent waiting
+        :rtype: collections.abc.Iterator[float]
+        """
+        dotted_path = f"{g_app_name}.lock_ratelimit.IndexLimiter.acquire"
+        semaphore, bucket = self._host_limits(host)
+        time_start = time.monotonic()
+        with self._mutex:
+            self._waiting += 1
+        try:
+            self._wait(semaphore, bucket)
+        finally:
+            with self._mutex:
+                self._waiting -= 1
+        waited = time.monotonic() - time_start
+        if is_module_debug:  # pragma: no cover
+            _logger.info(f"{dotted_path} {host} waited {waited:.2f}s")
+        else:  # pragma: no cover
+            pass
+
+        try:
+            yield waited
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+            else:  # pragma: no cover
+                pass
@@ -0,0 +1,75 @@
+import logging
+import re
+import threading
+from contextlib import AbstractContextManager
+from pathlib import Path
+from typing import (
+    Any,
+    Final,
+)
+
+from typing_extensions import Self
+
+from .pep518_venvs import VenvMapLoader
+
+__all__ = (
+    "DEFAULT_INDEX_HOST",
+    "IndexLimiter",
+    "index_host",
+)
+
+DEFAULT_INDEX_HOST: Final[str]
+_PROG_INDEX_URL: Final[re.Pattern[str]]
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+def index_host(in_abspath: str | Path) -> str: ...
+def _check_positive(
+    val: Any,
+    cls_type: type | tuple[type, ...],
+) -> int | float | None: ...
+
+class _TokenBucket:
+    __slots__ = ("rate", "burst", "_tokens", "_last")
+
+    rate: int | float
+    burst: int
+    _tokens: float
+    _last: float
+
+    def __init__(self, rate: int | float, burst: int) -> None: ...
+    def reserve(self) -> float: ...
+
+class IndexLimiter:
+    __slots__ = ("max_inflight", "rate", "burst", "_mutex", "_hosts", "_waiting")
+
+    max_inflight: int | None
+    rate: int | float | None
+    burst: int
+    _mutex: threading.Lock
+    _hosts: dict[str, tuple[threading.BoundedSemaphore | None, _TokenBucket | None]]
+    _waiting: int
+
+    def __init__(
+        self,
+        max_inflight: Any = None,
+        rate: Any = None,
+        burst: Any = None,
+    ) -> None: ...
+    @classmethod
+    def from_loader(cls, loader: VenvMapLoader) -> Self: ...
+    @property
+    def is_limited(self) -> bool: ...
+    @property
+    def waiting(self) -> int: ...
+    def _host_limits(
+        self,
+        host: str,
+    ) -> tuple[threading.BoundedSemaphore | None, _TokenBucket | None]: ...
+    def _wait(
+        self,
+        semaphore: threading.BoundedSemaphore | None,
+        bucket: _TokenBucket | None,
+    ) -> None: ...
+    def acquire(self, host: str) -> AbstractContextManager[float]: ...
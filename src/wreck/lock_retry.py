@@ -0,0 +1,297 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Retry compile jobs which failed to connect to the package index.
+
+Under load a package index drops connections. One dropped connection
+should not cost the whole run. Jobs which failed to connect are
+re-queued, after an exponential backoff, up to a retry cap. Successful
+results are kept, never re-run. Other failures, e.g. a malformed
+``.in`` or a job over budget, are not retried
+
+Limits, in ``[tool.wreck]``
+
+.. code-block:: text
+
+   [tool.wreck]
+   retries = 3
+   retry_backoff = 1
+
+Retry ``n`` waits ``retry_backoff * 2 ** (n - 1)`` seconds, at most
+:py:data:`wreck.lock_retry.RETRY_BACKOFF_MAX`. ``retries = 0`` disables
+retrying
+
+.. py:data:: RETRIES_DEFAULT
+   :type: int
+   :value: 3
+
+   Default retry cap, per job. Override in ``[tool.wreck]`` with
+   ``retries``
+
+.. py:data:: RETRY_BACKOFF
+   :type: int
+   :value: 1
+
+   Default seconds before the first retry. Doubles each retry. Override
+   in ``[tool.wreck]`` with ``retry_backoff``
+
+.. py:data:: RETRY_BACKOFF_MAX
+   :type: int
+   :value: 30
+
+   Longest wait between retries in seconds
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str, str, str, str]
+   :value: ("RETRIES_DEFAULT", "RETRY_BACKOFF", "RETRY_BACKOFF_MAX", \
+   "RetryPolicy", "aretry_job", "retry_jobs")
+
+   Module exports
+
+"""
+
+import asyncio
+import logging
+import time
+
+from .constants import g_app_name
+
+RETRIES_DEFAULT = 3
+RETRY_BACKOFF = 1
+RETRY_BACKOFF_MAX = 30
+# _compile_after connection failure message. e.g. timeout (15s)
+_RETRYABLE_PREFIX = "timeout ("
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_retry")
+
+__all__ = (
+    "RETRIES_DEFAULT",
+    "RETRY_BACKOFF",
+    "RETRY_BACKOFF_MAX",
+    "RetryPolicy",
+    "aretry_job",
+    "retry_jobs",
+)
+
+
+def _check_non_negative_int(val, default):
+    """Config value should be an int, zero or more.
+
+    :param val: From ``[tool.wreck]`` or cli. Could be anything
+    :type val: typing.Any
+    :param default: Fallback
+    :type default: int
+    :returns: non-negative int
+    :rtype: int
+    """
+    is_ng = val is None or isinstance(val, bool) or not isinstance(val, int) or val < 0
+    ret = default if is_ng else val
+
+    return ret
+
+
+def _check_seconds(val, default):
+    """Config value should be seconds, zero or more. int or float.
+
+    :param val: From ``[tool.wreck]``. Could be anything
+    :type val: typing.Any
+    :param default: Fallback
+    :type default: int | float
+    :returns: non-negative seconds
+    :rtype: int | float
+    """
+    is_ng = (
+        val is None
+        or isinstance(val, bool)
+        or not isinstance(val, (int, float))
+        or val < 0
+    )
+    ret = default if is_ng else val
+
+    return ret
+
+
+class RetryPolicy:
+    """How many times and how long to wait before retrying a compile job.
+
+    :param retries: Default 3. Retry cap per job. 0 disables retrying
+    :type retries: typing.Any
+    :param backoff: Default 1. Seconds before the first retry. Doubles each retry
+    :type backoff: typing.Any
+    :param backoff_max: Default 30. Longest wait between retries in seconds
+    :type backoff_max: typing.Any
+    """
+
+    __slots__ = ("retries", "backoff", "backoff_max")
+
+    def __init__(
+        self,
+        retries=RETRIES_DEFAULT,
+        backoff=RETRY_BACKOFF,
+        backoff_max=RETRY_BACKOFF_MAX,
+    ):
+        """Class constructor."""
+        self.retries = _check_non_negative_int(retries, RETRIES_DEFAULT)
+        self.backoff = _check_seconds(backoff, RETRY_BACKOFF)
+        self.backoff_max = _check_seconds(backoff_max, RETRY_BACKOFF_MAX)
+
+    @classmethod
+    def from_loader(cls, loader, retries=None):
+        """Limits from ``[tool.wreck]``. cli overrides.
+
+        :param loader: Contains some paths and loaded unparsed mappings
+        :type loader: wreck.pep518_venvs.VenvMapLoader
+        :param retries: Default None. None for ``[tool.wreck]`` field ``retries``
+        :type retries: typing.Any
+        :returns: retry policy
+        :rtype: wreck.lock_retry.RetryPolicy
+        """
+        d_parent = loader.section_parent
+        if retries is None:
+            retries = d_parent.get("retries", RETRIES_DEFAULT)
+        else:  # pragma: no cover
+            pass
+        backoff = d_parent.get("retry_backoff", RETRY_BACKOFF)
+
+        return cls(retries=retries, backoff=backoff)
+
+    def delay(self, attempt):
+        """Seconds to wait before a retry.
+
+        :param attempt: 1 for the first retry
+        :type attempt: int
+        :returns: seconds. Exponential, capped
+        :rtype: int | float
+        """
+        ret = min(self.backoff * 2 ** (attempt - 1), self.backoff_max)
+
+        return ret
+
+    @staticmethod
+    def is_retryable(t_result):
+        """Job failed to connect to the package index. Retrying might help.
+        Decided by the backend result, not whether a previous ``.lock``
+        is on disk
+
+        :param t_result:
+
+           job result. venv relative path, ``.lock`` absolute path,
+           ``.lock`` Path or None, error details, cache status
+
+        :type t_result: tuple[str, str, pathlib.Path | None, str | None, str | None]
+        :returns: True if worth retrying
+        :rtype: bool
+        """
+        err_details = t_result[3]
+        ret = isinstance(err_details, str) and err_details.startswith(_RETRYABLE_PREFIX)
+
+        return ret
+
+
+def _notify(t_result, attempt, delay, on_retry):
+    """Log the retry. Pass it on to the caller.
+
+    :param t_result: failed job result
+    :type t_result: tuple[str, str, pathlib.Path | None, str | None, str | None]
+    :param attempt: 1 for the first retry
+    :type attempt: int
+    :param delay: seconds before the retry
+    :type delay: int | float
+    :param on_retry: Called with venv relative path, ``.lock`` absolute path, attempt, delay
+    :type on_retry: collections.abc.Callable[[str, str, int, int | float], typing.Any] | None
+    """
+    dotted_path = f"{g_app_name}.lock_retry"
+    venv_relpath, lock_abspath, _, err_details = t_result[:4]
+    msg_warn = (
+        f"{dotted_path} ({venv_relpath}) {err_details} retry {attempt} "
+        f"in {delay}s {lock_abspath}"
+    )
+    _logger.warning(msg_warn)
+
+    if on_retry is not None:
+        on_retry(venv_relpath, lock_abspath, attempt, delay)
+    else:  # pragma: no cover
+        pass
+
+
+def retry_jobs(t_jobs, fcn_batch, policy, on_retry=None):
+    """Run jobs. Then re-queue only the jobs which failed to connect.
+    Each round waits a longer backoff. Stops once none failed to
+    connect or at the retry cap
+
+    :param t_jobs: jobs, in submission order
+    :type t_jobs: collections.abc.Sequence[typing.Any]
+    :param fcn_batch: Runs a batch of jobs. Returns results in the same order
+    :type fcn_batch: collections.abc.Callable[[collections.abc.Sequence[typing.Any]], list[tuple[str, str, pathlib.Path | None, str | None, str | None]]]
+    :param policy: retry cap and backoff
+    :type policy: wreck.lock_retry.RetryPolicy
+    :param on_retry:
+
+       Default None. Called before each retry with venv relative path,
+       ``.lock`` absolute path, attempt, and delay
+
+    :type on_retry: collections.abc.Callable[[str, str, int, int | float], typing.Any] | None
+    :returns: results in submission order and per job index retry count
+    :rtype: tuple[list[tuple[str, str, pathlib.Path | None, str | None, str | None]], dict[int, int]]
+    """
+    results = list(fcn_batch(t_jobs))
+    retry_counts = {}
+    pending = [
+        idx for idx, t_result in enumerate(results) if policy.is_retryable(t_result)
+    ]
+    attempt = 0
+    while len(pending) != 0 and attempt < policy.retries:
+        attempt += 1
+        delay = policy.delay(attempt)
+        for idx in pending:
+            retry_counts[idx] = attempt
+            _notify(results[idx], attempt, delay, on_retry)
+        time.sleep(delay)
+
+        t_retried = fcn_batch([t_jobs[idx] for idx in pending])
+        for idx, t_result in zip(pending, t_retried):
+            results[idx] = t_result
+        pending = [idx for idx in pending if policy.is_retryable(results[idx])]
+
+    return results, retry_counts
+
+
+async def aretry_job(fcn_job, policy, on_retry=None):
+    """Run one job. If it failed to connect, wait a backoff then re-run.
+    The backoff wait does not hold a job slot
+
+    :param fcn_job: Runs the job. Called again for each retry
+    :type fcn_job: collections.abc.Callable[[], collections.abc.Awaitable[tuple[str, str, pathlib.Path | None, str | None, str | None]]]
+    :param policy: retry cap and backoff
+    :type policy: wreck.lock_retry.RetryPolicy
+    :param on_retry:
+
+       Default None. Called before each retry with venv relative path,
+       ``.lock`` absolute path, attempt, and delay
+
+    :type on_retry: collections.abc.Callable[[str, str, int, int | float], typing.Any] | None
+    :returns: job result and retry count
+    :rtype: tuple[tuple[str, str, pathlib.Path | None, str | None, str | None], int]
+    """
+    t_result = await fcn_job()
+    attempt = 0
+    while policy.is_retryable(t_result) and attempt < policy.retries:
+        attempt += 1
+        delay = policy.delay(attempt)
+        _notify(t_result, attempt, delay, on_retry)
+        await asyncio.sleep(delay)
+        t_result = await fcn_job()
+
+    return t_result, attempt
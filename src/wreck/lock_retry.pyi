@@ -0,0 +1,85 @@
+import logging
+import sys
+from collections.abc import (
+    Awaitable,
+    Callable,
+    Sequence,
+)
+from pathlib import Path
+from typing import (
+    Any,
+    Final,
+)
+
+from typing_extensions import Self
+
+from .pep518_venvs import VenvMapLoader
+
+if sys.version_info >= (3, 10):  # pragma: no cover py-gte-310-else
+    from typing import TypeAlias
+else:  # pragma: no cover py-gte-310
+    from typing_extensions import TypeAlias
+
+__all__ = (
+    "RETRIES_DEFAULT",
+    "RETRY_BACKOFF",
+    "RETRY_BACKOFF_MAX",
+    "RetryPolicy",
+    "aretry_job",
+    "retry_jobs",
+)
+
+RETRIES_DEFAULT: Final[int]
+RETRY_BACKOFF: Final[int]
+RETRY_BACKOFF_MAX: Final[int]
+_RETRYABLE_PREFIX: Final[str]
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+_JobResult: TypeAlias = tuple[str, str, Path | None, str | None, str | None]
+_OnRetry: TypeAlias = Callable[[str, str, int, int | float], Any]
+
+def _check_non_negative_int(val: Any, default: int) -> int: ...
+def _check_seconds(val: Any, default: int | float) -> int | float: ...
+
+class RetryPolicy:
+    __slots__ = ("retries", "backoff", "backoff_max")
+
+    retries: int
+    backoff: int | float
+    backoff_max: int | float
+
+    def __init__(
+        self,
+        retries: Any = ...,
+        backoff: Any = ...,
+        backoff_max: Any = ...,
+    ) -> None: ...
+    @classmethod
+    def from_loader(
+        cls,
+        loader: VenvMapLoader,
+        retries: Any = None,
+    ) -> Self: ...
+    def delay(self, attempt: int) -> int | float: ...
+    @staticmethod
+    def is_retryable(t_result: _JobResult) -> bool: ...
+
+def _notify(
+    t_result: _JobResult,
+    attempt: int,
+    delay: int | float,
+    on_retry: _OnRetry | None,
+) -> None: ...
+def retry_jobs(
+    t_jobs: Sequence[Any],
+    fcn_batch: Callable[[Sequence[Any]], list[_JobResult]],
+    policy: RetryPolicy,
+    on_retry: _OnRetry | None = None,
+) -> tuple[list[_JobResult], dict[int, int]]: ...
+async def aretry_job(
+    fcn_job: Callable[[], Awaitable[_JobResult]],
+    policy: RetryPolicy,
+    on_retry: _OnRetry | None = None,
+) -> tuple[_JobResult, int]: ...
@@ -0,0 +1,272 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Longest job first. Order compile jobs so the slowest start first.
+
+With parallel compiles, submission order decides the makespan. If the
+slowest ``.in`` starts last, the whole run waits on it. Jobs are
+ordered by predicted duration, longest first
+
+Prediction, per venv and ``.in``:
+
+- history. Mean wall time of the most recent runs, from
+  :py:mod:`wreck.lock_telemetry`
+
+- no history. Include closure size, the count of requirement lines
+  across the ``.in`` and every file it ``-c`` or ``-r`` includes.
+  Scaled into seconds by the jobs which do have history
+
+No history at all, e.g. telemetry disabled or unreadable, jobs start
+in submission order. Results are still returned in submission order.
+After the run, the predicted and actual makespan are logged
+
+.. py:data:: HISTORY_WINDOW
+   :type: int
+   :value: 5
+
+   How many of the most recent runs are averaged
+
+.. py:data:: SECONDS_PER_REQ
+   :type: float
+   :value: 1.0
+
+   No history at all. Assumed seconds per requirement line
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str, str, str]
+   :value: ("HISTORY_WINDOW", "SECONDS_PER_REQ", "JobSchedule", \
+   "closure_size", "predict_makespan")
+
+   Module exports
+
+"""
+
+import heapq
+import logging
+from pathlib import Path
+
+from .constants import g_app_name
+from .lock_cache import (
+    _PROG_INCLUDE,
+    _relpath,
+    include_closure,
+)
+
+HISTORY_WINDOW = 5
+SECONDS_PER_REQ = 1.0
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_schedule")
+
+__all__ = (
+    "HISTORY_WINDOW",
+    "SECONDS_PER_REQ",
+    "JobSchedule",
+    "closure_size",
+    "predict_makespan",
+)
+
+
+def closure_size(in_abspath):
+    """Requirement lines across a ``.in`` file's include closure.
+    Comments, blank lines and include lines are not counted
+
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str | pathlib.Path
+    :returns: requirement line count. At least 1
+    :rtype: int
+    """
+    count = 0
+    for abspath_f in include_closure(in_abspath):
+        try:
+            contents = abspath_f.read_text()
+        except OSError:
+            continue
+
+        for line in contents.splitlines():
+            line_stripped = line.strip()
+            is_req = (
+                len(line_stripped) != 0
+                and not line_stripped.startswith("#")
+                and _PROG_INCLUDE.match(line) is None
+            )
+            if is_req:
+                count += 1
+            else:  # pragma: no cover
+                pass
+
+    ret = max(count, 1)
+
+    return ret
+
+
+def predict_makespan(costs, order, workers):
+    """Simulate the thread pool. Each job goes to whichever worker
+    frees up first
+
+    :param costs: per job, predicted seconds. In submission order
+    :type costs: collections.abc.Sequence[float]
+    :param order: job indexes, in the order they are started
+    :type order: collections.abc.Iterable[int]
+    :param workers: jobs running at once
+    :type workers: int
+    :returns: seconds until the last job finishes
+    :rtype: float
+    """
+    finish = [0.0] * max(workers, 1)
+    for idx in order:
+        # earliest free worker
+        heapq.heapreplace(finish, finish[0] + costs[idx])
+
+    ret = max(finish)
+
+    return ret
+
+
+class JobSchedule:
+    """Compile job start order. Longest predicted first.
+
+    :ivar order: job indexes, in the order to start them
+    :vartype order: list[int]
+    :ivar costs: per job, predicted seconds. In submission order
+    :vartype costs: list[float]
+    :ivar predicted: predicted makespan in seconds. None if no history at all
+    :vartype predicted: float | None
+    :ivar history_count: how many jobs have history
+    :vartype history_count: int
+    """
+
+    __slots__ = ("order", "costs", "predicted", "history_count")
+
+    def __init__(self, order, costs, predicted, history_count):
+        """Class constructor."""
+        self.order = order
+        self.costs = costs
+        self.predicted = predicted
+        self.history_count = history_count
+
+    @classmethod
+    def plan(cls, t_jobs, path_cwd, workers, d_history):
+        """Predict each job's duration. Longest first.
+
+        :param t_jobs: venv relative path, ``.in`` and ``.lock`` absolute paths
+        :type t_jobs: collections.abc.Sequence[tuple[str, str, str]]
+        :param path_cwd: package base folder absolute Path
+        :type path_cwd: pathlib.Path
+        :param workers: jobs running at once
+        :type workers: int
+        :param d_history:
+
+           venv relative path and ``.in`` relative path --> per run wall
+           time etc, oldest first. From
+           :py:meth:`wreck.lock_telemetry.CompileTelemetry.history`
+
+        :type d_history: collections.abc.Mapping[tuple[str, str], collections.abc.Sequence[tuple[float, float | None, float | None, int | None]]]
+        :returns: job start order and predicted makespan
+        :rtype: wreck.lock_schedule.JobSchedule
+        """
+        sizes = []
+        estimates = []
+        for venv_relpath, in_abspath, _ in t_jobs:
+            in_relpath = _relpath(path_cwd, Path(in_abspath))
+            runs = d_history.get((venv_relpath, in_relpath), ())
+            if len(runs) == 0:
+                estimate = None
+            else:
+                walls = [t_run[0] for t_run in runs[-HISTORY_WINDOW:]]
+                estimate = sum(walls) / len(walls)
+            estimates.append(estimate)
+            sizes.append(closure_size(in_abspath))
+
+        # From jobs with history, seconds per requirement line
+        d_known = {
+            idx: estimate
+            for idx, estimate in enumerate(estimates)
+            if estimate is not None
+        }
+        size_known = sum(sizes[idx] for idx in d_known.keys())
+        if len(d_known) == 0 or size_known == 0:
+            rate = SECONDS_PER_REQ
+        else:
+            rate = sum(d_known.values()) / size_known
+
+        costs = [
+            sizes[idx] * rate if estimate is None else estimate
+            for idx, estimate in enumerate(estimates)
+        ]
+        # stable. Equal costs keep submission order
+        order = sorted(range(len(costs)), key=lambda idx: -costs[idx])
+
+        if len(d_known) == 0:
+            predicted = None
+        else:
+            predicted = predict_makespan(costs, order, workers)
+
+        return cls(order, costs, predicted, len(d_known))
+
+    @classmethod
+    def in_order(cls, count):
+        """No history at all, nothing to predict from. Submission order.
+
+        :param count: how many jobs
+        :type count: int
+        :returns: job start order, submission order. No prediction
+        :rtype: wreck.lock_schedule.JobSchedule
+        """
+        ret = cls(list(range(count)), [0.0] * count, None, 0)
+
+        return ret
+
+    def apply(self, t_jobs):
+        """Jobs in start order.
+
+        :param t_jobs: jobs in submission order
+        :type t_jobs: collections.abc.Sequence[typing.Any]
+        :returns: jobs in start order
+        :rtype: list[typing.Any]
+        """
+        ret = [t_jobs[idx] for idx in self.order]
+
+        return ret
+
+    def restore(self, results):
+        """Results back into submission order.
+
+        :param results: per job results, in start order
+        :type results: collections.abc.Sequence[typing.Any]
+        :returns: per job results, in submission order
+        :rtype: list[typing.Any]
+        """
+        ret = [None] * len(results)
+        for pos, idx in enumerate(self.order):
+            ret[idx] = results[pos]
+
+        return ret
+
+    def log_makespan(self, actual):
+        """Log predicted versus actual makespan.
+
+        :param actual: seconds from first job start to last job finish
+        :type actual: float
+        """
+        dotted_path = f"{g_app_name}.lock_schedule.JobSchedule.log_makespan"
+        if self.predicted is None:
+            str_predicted = "unknown, no history"
+        else:
+            str_predicted = f"{self.predicted:.1f}s"
+        msg_info = (
+            f"{dotted_path} {len(self.order)} jobs, {self.history_count} with "
+            f"history. makespan predicted {str_predicted} actual {actual:.1f}s"
+        )
+        _logger.info(msg_info)
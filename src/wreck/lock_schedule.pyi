@@ -0,0 +1,66 @@
+import logging
+from collections.abc import (
+    Iterable,
+    Mapping,
+    Sequence,
+)
+from pathlib import Path
+from typing import (
+    Any,
+    Final,
+)
+
+from typing_extensions import Self
+
+HISTORY_WINDOW: Final[int]
+SECONDS_PER_REQ: Final[float]
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+__all__ = (
+    "HISTORY_WINDOW",
+    "SECONDS_PER_REQ",
+    "JobSchedule",
+    "closure_size",
+    "predict_makespan",
+)
+
+def closure_size(in_abspath: str | Path) -> int: ...
+def predict_makespan(
+    costs: Sequence[float],
+    order: Iterable[int],
+    workers: int,
+) -> float: ...
+
+class JobSchedule:
+    __slots__ = ("order", "costs", "predicted", "history_count")
+
+    order: list[int]
+    costs: list[float]
+    predicted: float | None
+    history_count: int
+
+    def __init__(
+        self,
+        order: list[int],
+        costs: list[float],
+        predicted: float | None,
+        history_count: int,
+    ) -> None: ...
+    @classmethod
+    def plan(
+        cls,
+        t_jobs: Sequence[tuple[str, str, str]],
+        path_cwd: Path,
+        workers: int,
+        d_history: Mapping[
+            tuple[str, str],
+            Sequence[tuple[float, float | None, float | None, int | None]],
+        ],
+    ) -> Self: ...
+    @classmethod
+    def in_order(cls, count: int) -> Self: ...
+    def apply(self, t_jobs: Sequence[Any]) -> list[Any]: ...
+    def restore(self, results: Sequence[Any]) -> list[Any]: ...
+    def log_makespan(self, actual: float) -> None: ...
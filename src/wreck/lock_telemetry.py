@@ -0,0 +1,416 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Compile telemetry. Per job, how long the resolver took and how much
+CPU and memory it used.
+
+Every compiled ``.in`` is recorded: wall time, user and system CPU
+seconds, max resident set size, and seconds spent waiting on the
+package index limiter, see :py:mod:`wreck.lock_ratelimit`. Jobs skipped by the compile cache
+are not. Stored in a SQLite database, ``.wreck_cache/telemetry.sqlite3``,
+keyed by venv relative path and ``.in`` relative path. One row per job
+per run
+
+CPU and memory come from :py:func:`os.wait4`, so not on Windows. The
+asyncio API, :py:func:`wreck.lock_async.acompile`, records wall time
+only.
+
+Records are kept in memory during a run, then written in one
+transaction. Per venv and ``.in``, only the most recent
+:py:data:`wreck.lock_telemetry.TELEMETRY_KEEP` runs are kept
+
+Disable in ``[tool.wreck]``
+
+.. code-block:: text
+
+   [tool.wreck]
+   telemetry = false
+
+To view the slowest ``.in`` files and their trend, :command:`reqs stats`
+
+.. py:data:: TELEMETRY_NAME
+   :type: str
+   :value: "telemetry.sqlite3"
+
+   Within ``.wreck_cache`` folder, telemetry database file name
+
+.. py:data:: TELEMETRY_KEEP
+   :type: int
+   :value: 50
+
+   Per venv and ``.in``, how many of the most recent runs are kept
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str, str]
+   :value: ("TELEMETRY_KEEP", "TELEMETRY_NAME", "CompileTelemetry", \
+   "JobStats")
+
+   Module exports
+
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .constants import g_app_name
+from .lock_cache import CACHE_FOLDER
+from .lock_datum import DC_SLOTS
+
+TELEMETRY_NAME = "telemetry.sqlite3"
+TELEMETRY_KEEP = 50
+_SCHEMA_VERSION = 2
+# Schema version 1 --> 2. Index limiter wait time
+_MIGRATE_1 = "ALTER TABLE jobs ADD COLUMN wait REAL"
+_SCHEMA = """\
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    venv_relpath TEXT NOT NULL,
+    in_relpath TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    exit_code INTEGER,
+    wall REAL NOT NULL,
+    utime REAL,
+    stime REAL,
+    maxrss INTEGER,
+    wait REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (venv_relpath, in_relpath, run_id);
+"""
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_telemetry")
+
+__all__ = (
+    "TELEMETRY_KEEP",
+    "TELEMETRY_NAME",
+    "CompileTelemetry",
+    "JobStats",
+)
+
+
+@dataclass(**DC_SLOTS)
+class JobStats:
+    """One ``.in`` file compile history summary.
+
+    :ivar venv_relpath: venv relative path
+    :vartype venv_relpath: str
+    :ivar in_relpath: ``.in`` path relative to package base folder
+    :vartype in_relpath: str
+    :ivar runs: How many runs recorded
+    :vartype runs: int
+    :ivar wall: Most recent run wall time in seconds
+    :vartype wall: float
+    :ivar wall_mean: Mean wall time of the earlier runs. None if only one run
+    :vartype wall_mean: float | None
+    :ivar utime: Most recent run user CPU seconds. None if unavailable
+    :vartype utime: float | None
+    :ivar stime: Most recent run system CPU seconds. None if unavailable
+    :vartype stime: float | None
+    :ivar maxrss: Most recent run max resident set size in KiB. None if unavailable
+    :vartype maxrss: int | None
+    :ivar wait:
+
+       Most recent run seconds waiting on the package index limiter.
+       None if not recorded
+
+    :vartype wait: float | None
+    """
+
+    venv_relpath: str
+    in_relpath: str
+    runs: int
+    wall: float
+    wall_mean: float | None
+    utime: float | None
+    stime: float | None
+    maxrss: int | None
+    wait: float | None
+
+    @property
+    def trend(self):
+        """Most recent wall time versus the mean of earlier runs.
+
+        :returns: ratio minus one, e.g. 0.25 is 25% slower. None if only one run
+        :rtype: float | None
+        """
+        if self.wall_mean is None or self.wall_mean <= 0:
+            ret = None
+        else:
+            ret = self.wall / self.wall_mean - 1
+
+        return ret
+
+
+class CompileTelemetry:
+    """Per job compile wall time and resource usage. SQLite store.
+
+    Thread safe. Records are kept in memory until
+    :py:meth:`~wreck.lock_telemetry.CompileTelemetry.save`
+
+    :param path_db: database file absolute path
+    :type path_db: pathlib.Path | str
+    :param keep: Default 50. Per venv and ``.in``, how many runs are kept
+    :type keep: int
+    """
+
+    __slots__ = ("path_db", "keep", "_mutex", "_records")
+
+    def __init__(self, path_db, keep=TELEMETRY_KEEP):
+        """Class constructor."""
+        self.path_db = Path(path_db)
+        self.keep = keep
+        self._mutex = threading.Lock()
+        self._records = []
+
+    @classmethod
+    def from_loader(cls, loader):
+        """Database within ``.wreck_cache`` folder, within package base folder.
+
+        :param loader: Contains some paths and loaded unparsed mappings
+        :type loader: wreck.pep518_venvs.VenvMapLoader
+        :returns: compile telemetry
+        :rtype: wreck.lock_telemetry.CompileTelemetry
+        """
+        path_db = loader.project_base.joinpath(CACHE_FOLDER, TELEMETRY_NAME)
+
+        return cls(path_db)
+
+    def record(
+        self,
+        venv_relpath,
+        in_relpath,
+        backend,
+        wall,
+        exit_code,
+        rusage=None,
+        wait=None,
+    ):
+        """Record one compile. Not written until save.
+
+        :param venv_relpath: venv relative path
+        :type venv_relpath: str
+        :param in_relpath: ``.in`` path relative to package base folder
+        :type in_relpath: str
+        :param backend: compile backend name
+        :type backend: str
+        :param wall: wall time in seconds
+        :type wall: float
+        :param exit_code: resolver exit code. None if it did not run or was killed
+        :type exit_code: int | None
+        :param rusage:
+
+           Default None. user and system CPU seconds and max resident
+           set size in KiB. Keys ``utime`` ``stime`` ``maxrss``
+
+        :type rusage: collections.abc.Mapping[str, float | int] | None
+        :param wait:
+
+           Default None. Seconds waiting on the package index limiter,
+           not included in wall time. None if not limited
+
+        :type wait: float | None
+        """
+        if rusage is None:
+            d_rusage = {}
+        else:  # pragma: no cover
+            d_rusage = rusage
+
+        t_record = (
+            venv_relpath,
+            in_relpath,
+            backend,
+            exit_code,
+            wall,
+            d_rusage.get("utime", None),
+            d_rusage.get("stime", None),
+            d_rusage.get("maxrss", None),
+            wait,
+        )
+        with self._mutex:
+            self._records.append(t_record)
+
+    def _connect(self):
+        """Open the database. Create the tables if need be.
+
+        :returns: database connection
+        :rtype: sqlite3.Connection
+        """
+        self.path_db.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path_db, timeout=30)
+        user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if user_version != _SCHEMA_VERSION:
+            with conn:
+                if user_version == 1:
+                    conn.execute(_MIGRATE_1)
+                else:  # pragma: no cover
+                    pass
+                conn.executescript(_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION:d}")
+        else:  # pragma: no cover
+            pass
+
+        return conn
+
+    def save(self):
+        """Write this run's records in one transaction. Then per venv
+        and ``.in``, drop all but the most recent runs
+
+        :returns: run id. None if nothing recorded or database unavailable
+        :rtype: int | None
+        """
+        dotted_path = f"{g_app_name}.lock_telemetry.CompileTelemetry.save"
+        with self._mutex:
+            records = self._records
+            self._records = []
+
+        if len(records) == 0:
+            ret = None
+        else:
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        cur = conn.execute(
+                            "INSERT INTO runs (started) VALUES (?)",
+                            (time.time(),),
+                        )
+                        run_id = cur.lastrowid
+                        conn.executemany(
+                            "INSERT INTO jobs (run_id, venv_relpath, in_relpath, "
+                            "backend, exit_code, wall, utime, stime, maxrss, wait) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            [(run_id, *t_record) for t_record in records],
+                        )
+                        self._prune(conn)
+                finally:
+                    conn.close()
+            except (OSError, sqlite3.Error) as exc:  # pragma: no cover
+                # Telemetry is not worth failing the run over
+                msg_warn = f"{dotted_path} telemetry not saved. {exc}"
+                _logger.warning(msg_warn)
+                ret = None
+            else:
+                ret = run_id
+
+        return ret
+
+    def _prune(self, conn):
+        """Per venv and ``.in``, keep only the most recent runs. Then
+        drop runs without jobs
+
+        :param conn: database connection, within a transaction
+        :type conn: sqlite3.Connection
+        """
+        conn.execute(
+            "DELETE FROM jobs WHERE rowid IN ("
+            "SELECT rowid FROM ("
+            "SELECT rowid, ROW_NUMBER() OVER ("
+            "PARTITION BY venv_relpath, in_relpath ORDER BY run_id DESC"
+            ") AS rank FROM jobs"
+            ") WHERE rank > ?)",
+            (self.keep,),
+        )
+        conn.execute(
+            "DELETE FROM runs WHERE run_id NOT IN (SELECT DISTINCT run_id FROM jobs)"
+        )
+
+    def history(self, venv_relpath=None):
+        """Per venv and ``.in``, the recorded runs, oldest first.
+
+        :param venv_relpath: Default None. Limit to one venv. None for all venvs
+        :type venv_relpath: str | None
+        :returns:
+
+           venv relative path and ``.in`` relative path --> per run wall
+           time, user and system CPU seconds, max RSS in KiB, index
+           limiter wait seconds. Empty if database unavailable
+
+        :rtype: dict[tuple[str, str], list[tuple[float, float | None, float | None, int | None, float | None]]]
+        """
+        dotted_path = f"{g_app_name}.lock_telemetry.CompileTelemetry.history"
+        sql = (
+            "SELECT venv_relpath, in_relpath, wall, utime, stime, maxrss, wait "
+            "FROM jobs"
+        )
+        if not self.path_db.exists():
+            rows = []
+        else:
+            try:
+                conn = self._connect()
+                try:
+                    if venv_relpath is None:
+                        rows = conn.execute(f"{sql} ORDER BY run_id").fetchall()
+                    else:
+                        rows = conn.execute(
+                            f"{sql} WHERE venv_relpath = ? ORDER BY run_id",
+                            (venv_relpath,),
+                        ).fetchall()
+                finally:
+                    conn.close()
+            except (OSError, sqlite3.Error) as exc:
+                # Corrupt or locked. Telemetry is not worth failing the run over
+                msg_warn = f"{dotted_path} telemetry unreadable {self.path_db!s}. {exc}"
+                _logger.warning(msg_warn)
+                rows = []
+
+        ret = {}
+        for row in rows:
+            key = (row[0], row[1])
+            ret.setdefault(key, []).append(tuple(row[2:]))
+
+        return ret
+
+    def slowest(self, limit=10, venv_relpath=None):
+        """The slowest ``.in`` files by most recent wall time, and their trend.
+
+        :param limit: Default 10. How many to return
+        :type limit: int
+        :param venv_relpath: Default None. Limit to one venv. None for all venvs
+        :type venv_relpath: str | None
+        :returns: slowest first. Empty if database unavailable
+        :rtype: list[wreck.lock_telemetry.JobStats]
+        """
+        stats = []
+        for key, runs in self.history(venv_relpath=venv_relpath).items():
+            wall, utime, stime, maxrss, wait = runs[-1]
+            if len(runs) > 1:
+                earlier = [t_run[0] for t_run in runs[:-1]]
+                wall_mean = sum(earlier) / len(earlier)
+            else:
+                wall_mean = None
+            job_stats = JobStats(
+                venv_relpath=key[0],
+                in_relpath=key[1],
+                runs=len(runs),
+                wall=wall,
+                wall_mean=wall_mean,
+                utime=utime,
+                stime=stime,
+                maxrss=maxrss,
+                wait=wait,
+            )
+            stats.append(job_stats)
+
+        stats.sort(key=lambda job_stats: job_stats.wall, reverse=True)
+        ret = stats[:limit]
+
+        return ret
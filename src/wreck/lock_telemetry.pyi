@@ -0,0 +1,92 @@
+import logging
+import sqlite3
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Final
+
+from typing_extensions import Self
+
+from .lock_datum import DC_SLOTS
+from .pep518_venvs import VenvMapLoader
+
+__all__ = (
+    "TELEMETRY_KEEP",
+    "TELEMETRY_NAME",
+    "CompileTelemetry",
+    "JobStats",
+)
+
+TELEMETRY_NAME: Final[str]
+TELEMETRY_KEEP: Final[int]
+_SCHEMA_VERSION: Final[int]
+_MIGRATE_1: Final[str]
+_SCHEMA: Final[str]
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+@dataclass(**DC_SLOTS)
+class JobStats:
+    venv_relpath: str
+    in_relpath: str
+    runs: int
+    wall: float
+    wall_mean: float | None
+    utime: float | None
+    stime: float | None
+    maxrss: int | None
+    wait: float | None
+
+    @property
+    def trend(self) -> float | None: ...
+
+class CompileTelemetry:
+    __slots__ = ("path_db", "keep", "_mutex", "_records")
+
+    path_db: Path
+    keep: int
+    _mutex: threading.Lock
+    _records: list[
+        tuple[
+            str,
+            str,
+            str,
+            int | None,
+            float,
+            float | int | None,
+            float | int | None,
+            float | int | None,
+            float | None,
+        ]
+    ]
+
+    def __init__(self, path_db: Path | str, keep: int = ...) -> None: ...
+    @classmethod
+    def from_loader(cls, loader: VenvMapLoader) -> Self: ...
+    def record(
+        self,
+        venv_relpath: str,
+        in_relpath: str,
+        backend: str,
+        wall: float,
+        exit_code: int | None,
+        rusage: Mapping[str, float | int] | None = None,
+        wait: float | None = None,
+    ) -> None: ...
+    def _connect(self) -> sqlite3.Connection: ...
+    def save(self) -> int | None: ...
+    def _prune(self, conn: sqlite3.Connection) -> None: ...
+    def history(
+        self,
+        venv_relpath: str | None = None,
+    ) -> dict[
+        tuple[str, str],
+        list[tuple[float, float | None, float | None, int | None, float | None]],
+    ]: ...
+    def slowest(
+        self,
+        limit: int = 10,
+        venv_relpath: str | None = None,
+    ) -> list[JobStats]: ...
@@ -0,0 +1,351 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Unified resolve. All of a venv's top level ``.in`` files, one resolver
+run. Then split back into per ``.in`` ``.lock`` files.
+
+Compiling each ``.in`` separately, without coordination, lets the same
+package resolve to different versions in different ``.lock`` files.
+:py:class:`wreck.lock_fixing.Fixing` repairs that after the fact. A
+unified resolve is consistent by construction. One network resolve per
+venv, rather than one per ``.in``, and nothing for Fixing to nudge
+
+Per venv, a generated ``.in`` within ``.wreck_cache/unified`` ``-r``
+includes every top level ``.in``. It's ``.lock`` is kept, so the next
+resolve keeps existing pins
+
+Splitting uses the resolver's ``# via`` annotations. A package belongs
+to a ``.in`` if it's required by that ``.in``, or a file it ``-r``
+includes, or by a package which belongs. Per ``.in``, annotations only
+mention that ``.in``'s sources. The unsafe packages trailing comment
+is not reproduced
+
+Turn on in ``[tool.wreck]`` or :code:`reqs fix --unified`
+
+.. code-block:: text
+
+   [tool.wreck]
+   unified = true
+
+.. py:data:: UNIFIED_FOLDER
+   :type: str
+   :value: "unified"
+
+   Within ``.wreck_cache`` folder, folder containing the per venv
+   generated ``.in`` and it's ``.lock``
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str, str, str]
+   :value: ("UNIFIED_FOLDER", "LockEntry", "parse_lock_entries", \
+   "split_lock", "unified_units")
+
+   Module exports
+
+"""
+
+import hashlib
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from .constants import (
+    SUFFIX_LOCKED,
+    g_app_name,
+)
+from .lock_cache import (
+    CACHE_FOLDER,
+    _relpath,
+    _write_text_atomic,
+    include_closure,
+)
+from .lock_datum import DC_SLOTS
+from .lock_util import replace_suffixes_last
+
+UNIFIED_FOLDER = "unified"
+_PROG_NAME = re.compile(r"^\s*(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)")
+_VIA = "    # via"
+_VIA_MORE = "    #   "
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_unified")
+
+__all__ = (
+    "UNIFIED_FOLDER",
+    "LockEntry",
+    "parse_lock_entries",
+    "split_lock",
+    "unified_units",
+)
+
+
+def _canonical(name):
+    """Package name, normalized. Same as :pep:`503`.
+
+    :param name: package name
+    :type name: str
+    :returns: lower case, runs of ``-`` ``_`` ``.`` become ``-``
+    :rtype: str
+    """
+    ret = re.sub(r"[-_.]+", "-", name).lower()
+
+    return ret
+
+
+def _source_package(source):
+    """From an annotation source, the package name.
+
+    :param source: ``-r`` or ``-c`` and a path, or a package name
+    :type source: str
+    :returns: package name, normalized. None if ``-r`` or ``-c``
+    :rtype: str | None
+    """
+    match = _PROG_NAME.match(source)
+    if source.startswith("-") or match is None:
+        ret = None
+    else:
+        ret = _canonical(match["name"])
+
+    return ret
+
+
+@dataclass(**DC_SLOTS)
+class LockEntry:
+    """One pinned package within a ``.lock``.
+
+    :ivar name: package name, normalized
+    :vartype name: str
+    :ivar line: requirement line, without line ending
+    :vartype line: str
+    :ivar via: annotation sources. ``-r`` or ``-c`` and a path, or a package name
+    :vartype via: tuple[str, ...]
+    :ivar extra: other indented lines, e.g. hashes. Without line endings
+    :vartype extra: tuple[str, ...]
+    """
+
+    name: str
+    line: str
+    via: tuple[str, ...]
+    extra: tuple[str, ...]
+
+    def parents(self):
+        """Packages which require this package.
+
+        :returns: package names, normalized
+        :rtype: set[str]
+        """
+        ret = {_source_package(source) for source in self.via}
+        ret.discard(None)
+
+        return ret
+
+    def to_lines(self, via):
+        """Requirement line then annotation. Same format as pip-compile.
+
+        :param via: annotation sources to keep
+        :type via: collections.abc.Sequence[str]
+        :returns: lines, without line endings
+        :rtype: list[str]
+        """
+        ret = [self.line]
+        if len(via) == 1:
+            ret.append(f"{_VIA} {via[0]}")
+        elif len(via) > 1:
+            ret.append(_VIA)
+            ret.extend(f"{_VIA_MORE}{source}" for source in via)
+        else:  # pragma: no cover
+            pass
+        ret.extend(self.extra)
+
+        return ret
+
+
+def parse_lock_entries(contents):
+    """Parse a ``.lock``. Requirement lines and their ``# via`` annotations.
+    Top level comments and blank lines are skipped
+
+    :param contents: ``.lock`` contents. Absolute paths already relative
+    :type contents: str
+    :returns: entries, in file order
+    :rtype: list[wreck.lock_unified.LockEntry]
+    """
+    raw = []
+    d_current = None
+    for line in contents.splitlines():
+        is_indented = line.startswith((" ", "\t"))
+        if is_indented and d_current is not None:
+            if line == _VIA:
+                pass
+            elif line.startswith(f"{_VIA} "):
+                d_current["via"].append(line[len(_VIA) + 1 :].strip())
+            elif line.startswith(_VIA_MORE):
+                d_current["via"].append(line[len(_VIA_MORE) :].strip())
+            else:
+                d_current["extra"].append(line)
+        elif is_indented or len(line.strip()) == 0 or line.startswith("#"):
+            d_current = None
+        else:
+            match = _PROG_NAME.match(line)
+            name = line.strip() if match is None else match["name"]
+            d_current = {"name": _canonical(name), "line": line, "via": [], "extra": []}
+            raw.append(d_current)
+
+    ret = [
+        LockEntry(
+            name=d_entry["name"],
+            line=d_entry["line"],
+            via=tuple(d_entry["via"]),
+            extra=tuple(d_entry["extra"]),
+        )
+        for d_entry in raw
+    ]
+
+    return ret
+
+
+def _sources(path_cwd, in_abspath):
+    """``-r`` and ``-c`` annotation sources belonging to a ``.in``.
+
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str
+    :returns: ``-r`` sources, then ``-c`` sources
+    :rtype: tuple[set[str], set[str]]
+    """
+    # The .in, then everything it -r includes. -c files only constrain
+    requires = set()
+    constrains = set()
+    for abspath_f in include_closure(in_abspath):
+        relpath = _relpath(path_cwd, abspath_f)
+        requires.add(f"-r {relpath}")
+        constrains.add(f"-c {relpath}")
+
+    return requires, constrains
+
+
+def split_lock(contents, path_cwd, in_abspath):
+    """From a unified ``.lock``, the ``.lock`` of one ``.in``.
+
+    :param contents: unified ``.lock`` contents. Absolute paths already relative
+    :type contents: str
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param in_abspath: ``.in`` file absolute path
+    :type in_abspath: str
+    :returns: ``.lock`` contents. Empty if the ``.in`` requires nothing
+    :rtype: str
+    """
+    entries = parse_lock_entries(contents)
+    requires, constrains = _sources(path_cwd, in_abspath)
+
+    # Required directly, then by packages which belong. Until no more
+    members = {
+        entry.name for entry in entries if len(requires.intersection(entry.via)) != 0
+    }
+    is_grew = True
+    while is_grew:
+        is_grew = False
+        for entry in entries:
+            is_member = entry.name not in members and (
+                len(members.intersection(entry.parents())) != 0
+            )
+            if is_member:
+                members.add(entry.name)
+                is_grew = True
+            else:  # pragma: no cover
+                pass
+
+    lines = []
+    for entry in entries:
+        if entry.name in members:
+            via = [
+                source
+                for source in entry.via
+                if source in requires
+                or source in constrains
+                or _source_package(source) in members
+            ]
+            lines.extend(entry.to_lines(via))
+        else:  # pragma: no cover
+            pass
+
+    if len(lines) == 0:
+        ret = ""
+    else:
+        ret = f"{os.linesep.join(lines)}{os.linesep}"
+
+    return ret
+
+
+def _venv_slug(venv_relpath):
+    """venv relative path as a file stem. Readable part then a short
+    digest, so e.g. ``.venv`` and ``venv`` do not share a file
+
+    :param venv_relpath: venv relative path
+    :type venv_relpath: str
+    :returns: e.g. ``.doc/.venv`` --> ``doc-venv-`` then 8 hex digits
+    :rtype: str
+    """
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", venv_relpath).strip("-")
+    if len(slug) == 0:
+        slug = "venv"
+    else:  # pragma: no cover
+        pass
+    digest = hashlib.sha256(venv_relpath.encode()).hexdigest()[:8]
+    ret = f"{slug}-{digest}"
+
+    return ret
+
+
+def unified_units(path_cwd, t_jobs):
+    """Per venv, write the generated ``.in``. It ``-r`` includes every
+    top level ``.in`` of that venv. Written only if changed
+
+    :param path_cwd: package base folder absolute Path
+    :type path_cwd: pathlib.Path
+    :param t_jobs: venv relative path, ``.in`` and ``.lock`` absolute paths
+    :type t_jobs: collections.abc.Sequence[tuple[str, str, str]]
+    :returns:
+
+       Per venv, in order of first appearance, a job. venv relative
+       path, generated ``.in`` and it's ``.lock`` absolute paths
+
+    :rtype: list[tuple[str, str, str]]
+    """
+    path_dir = Path(path_cwd).joinpath(CACHE_FOLDER, UNIFIED_FOLDER)
+    d_ins = {}
+    for venv_relpath, in_abspath, _ in t_jobs:
+        d_ins.setdefault(venv_relpath, []).append(in_abspath)
+
+    ret = []
+    for venv_relpath, in_abspaths in d_ins.items():
+        abspath_in = path_dir.joinpath(f"{_venv_slug(venv_relpath)}.in")
+        lines = [f"# Generated by {g_app_name}. venv {venv_relpath}. Do not edit"]
+        lines.extend(f"-r {in_abspath}" for in_abspath in in_abspaths)
+        contents = f"{os.linesep.join(lines)}{os.linesep}"
+        try:
+            is_same = abspath_in.read_text() == contents
+        except OSError:
+            is_same = False
+        if not is_same:
+            _write_text_atomic(abspath_in, contents)
+        else:  # pragma: no cover
+            pass
+
+        abspath_lock = replace_suffixes_last(abspath_in, SUFFIX_LOCKED)
+        ret.append((venv_relpath, str(abspath_in), str(abspath_lock)))
+
+    return ret
@@ -0,0 +1,45 @@
+import logging
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Final
+
+from .lock_datum import DC_SLOTS
+
+UNIFIED_FOLDER: Final[str]
+_PROG_NAME: Final[re.Pattern[str]]
+_VIA: Final[str]
+_VIA_MORE: Final[str]
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+__all__ = (
+    "UNIFIED_FOLDER",
+    "LockEntry",
+    "parse_lock_entries",
+    "split_lock",
+    "unified_units",
+)
+
+def _canonical(name: str) -> str: ...
+def _source_package(source: str) -> str | None: ...
+@dataclass(**DC_SLOTS)
+class LockEntry:
+    name: str
+    line: str
+    via: tuple[str, ...]
+    extra: tuple[str, ...]
+
+    def parents(self) -> set[str]: ...
+    def to_lines(self, via: Sequence[str]) -> list[str]: ...
+
+def parse_lock_entries(contents: str) -> list[LockEntry]: ...
+def _sources(path_cwd: Path, in_abspath: str) -> tuple[set[str], set[str]]: ...
+def split_lock(contents: str, path_cwd: Path, in_abspath: str) -> str: ...
+def _venv_slug(venv_relpath: str) -> str: ...
+def unified_units(
+    path_cwd: Path,
+    t_jobs: Sequence[tuple[str, str, str]],
+) -> list[tuple[str, str, str]]: ...
@@ -0,0 +1,145 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Warm start. Give the resolver preferred versions, so a re-lock which
+barely changes converges almost immediately.
+
+The resolver writes to a staging file seeded with the existing
+``.lock``. Both :command:`pip-compile` and :command:`uv pip compile`
+treat pins already in the output file as preferences, not constraints.
+A pin which no longer fits is dropped, a package no longer required is
+dropped
+
+Warm start seeds the staging file with the existing ``.lock`` plus the
+pins from every other ``.lock`` of that venv. A package new to this
+``.lock``, but already pinned elsewhere in the venv, gets the same
+version. Where ``.lock`` files disagree, the first in ``reqs`` order wins
+
+If the warm resolve fails, for any reason other than a connection
+error or an exceeded budget, it's redone cold. No preferences at all
+
+Turn on in ``[tool.wreck]`` or :code:`reqs fix --warm-start`
+
+.. code-block:: text
+
+   [tool.wreck]
+   warm_start = true
+
+.. py:data:: is_module_debug
+   :type: bool
+   :value: False
+
+   Flag to turn on module level logging. Should be off in production
+
+.. py:data:: _logger
+   :type: logging.Logger
+
+   Module level logger
+
+.. py:data:: __all__
+   :type: tuple[str, str, str]
+   :value: ("lock_pins", "venv_preferences", "warm_seed")
+
+   Module exports
+
+"""
+
+import logging
+import os
+from pathlib import Path
+
+from .constants import g_app_name
+from .lock_unified import parse_lock_entries
+
+is_module_debug = False
+_logger = logging.getLogger(f"{g_app_name}.lock_warm")
+
+__all__ = (
+    "lock_pins",
+    "venv_preferences",
+    "warm_seed",
+)
+
+
+def lock_pins(contents):
+    """From ``.lock`` contents, each package's requirement line.
+    Annotations and hashes are dropped
+
+    :param contents: ``.lock`` contents
+    :type contents: str
+    :returns: package name, normalized --> requirement line
+    :rtype: dict[str, str]
+    """
+    ret = {}
+    for entry in parse_lock_entries(contents):
+        # urllib3==2.2.3 \  hashes continue on the next line
+        line = entry.line.rstrip().removesuffix("\\").rstrip()
+        ret.setdefault(entry.name, line)
+
+    return ret
+
+
+def _read_pins(lock_abspath):
+    """Pins of one ``.lock``.
+
+    :param lock_abspath: ``.lock`` absolute path
+    :type lock_abspath: str
+    :returns: package name, normalized --> requirement line. Empty if no ``.lock``
+    :rtype: dict[str, str]
+    """
+    try:
+        contents = Path(lock_abspath).read_text()
+    except OSError:
+        ret = {}
+    else:
+        ret = lock_pins(contents)
+
+    return ret
+
+
+def venv_preferences(t_jobs):
+    """Per venv, the union of pins across it's ``.lock`` files. Read
+    before any compiling
+
+    :param t_jobs: venv relative path, ``.in`` and ``.lock`` absolute paths
+    :type t_jobs: collections.abc.Sequence[tuple[str, str, str]]
+    :returns: venv relative path --> package name --> requirement line
+    :rtype: dict[str, dict[str, str]]
+    """
+    ret = {}
+    for venv_relpath, _, lock_abspath in t_jobs:
+        d_pins = ret.setdefault(venv_relpath, {})
+        for name, line in _read_pins(lock_abspath).items():
+            d_pins.setdefault(name, line)
+
+    return ret
+
+
+def warm_seed(lock_abspath, d_pins):
+    """Staging file contents. The existing ``.lock``, then pins from
+    the venv's other ``.lock`` files it lacks
+
+    :param lock_abspath: ``.lock`` absolute path
+    :type lock_abspath: str
+    :param d_pins: venv's union of pins. From :py:func:`wreck.lock_warm.venv_preferences`
+    :type d_pins: collections.abc.Mapping[str, str]
+    :returns: preferred versions, in ``.lock`` format
+    :rtype: str
+    """
+    try:
+        contents = Path(lock_abspath).read_text()
+    except OSError:
+        contents = ""
+    d_own = lock_pins(contents)
+
+    lines = [line for name, line in d_pins.items() if name not in d_own]
+    if len(lines) == 0:
+        ret = contents
+    else:
+        if len(contents) != 0 and not contents.endswith(("\n", "\r")):
+            contents = f"{contents}{os.linesep}"
+        else:  # pragma: no cover
+            pass
+        ret = f"{contents}{os.linesep.join(lines)}{os.linesep}"
+
+    return ret
@@ -0,0 +1,22 @@
+import logging
+from collections.abc import (
+    Mapping,
+    Sequence,
+)
+from typing import Final
+
+is_module_debug: Final[bool]
+_logger: logging.Logger
+
+__all__ = (
+    "lock_pins",
+    "venv_preferences",
+    "warm_seed",
+)
+
+def lock_pins(contents: str) -> dict[str, str]: ...
+def _read_pins(lock_abspath: str) -> dict[str, str]: ...
+def venv_preferences(
+    t_jobs: Sequence[tuple[str, str, str]],
+) -> dict[str, dict[str, str]]: ...
+def warm_seed(lock_abspath: str, d_pins: Mapping[str, str]) -> str: ...
@@ -20,6 +20,10 @@ import pytest
 
 from wreck._run_cmd import run_cmd
 from wreck._safe_path import resolve_path
+from wreck.lock_parse import (
+    clear_cache,
+    set_parse_store,
+)
 
 from .wd_wrapper import WorkDir
 
@@ -106,6 +110,17 @@ class FileRegression:
         return data
 
 
+@pytest.fixture(autouse=True)
+def parse_cache_cleared() -> "Generator[None, None, None]":
+    """Parsed requirements files are cached process wide. Each test
+    starts, and ends, with an empty cache and no on disk store."""
+    clear_cache()
+    set_parse_store(None)
+    yield
+    clear_cache()
+    set_parse_store(None)
+
+
 @pytest.fixture()
 def file_regression(file_regression: "FileRegression") -> FileRegression:
     """Comparison files will need updating.
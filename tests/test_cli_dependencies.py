@@ -350,6 +350,17 @@ def test_lock_unlock_docs_venv(
                         )
                         actual_exit_code = result.exit_code
                         assert actual_exit_code == 10
+                    # Fake a job over budget
+                    with patch(
+                        f"{g_app_name}.cli_dependencies.is_budget_exceeded",
+                        return_value=True,
+                    ):
+                        result = runner.invoke(
+                            fcn,
+                            cast("Union[str, Sequence[str], None]", cmd),
+                        )
+                        actual_exit_code = result.exit_code
+                        assert actual_exit_code == 13
             else:
                 # Timeout occurred, do not have to fake one
                 pass
@@ -735,12 +746,36 @@ testdata_lock_compile_valueerror = (
         [],
         12,
     ),
+    (
+        requirements_fix_v2,
+        Path("_bad_files").joinpath("keys-wrong-data-type.pyproject_toml"),
+        None,
+        (
+            "docs/pip-tools",
+            "requirements/pins.shared",
+        ),
+        ["--all-venvs"],
+        8,
+    ),
+    (
+        requirements_fix_v2,
+        Path("_bad_files").joinpath("keys-wrong-data-type.pyproject_toml"),
+        ".venv",
+        (
+            "docs/pip-tools",
+            "requirements/pins.shared",
+        ),
+        ["--all-venvs"],
+        2,
+    ),
 )
 ids_lock_compile_valueerror = (
     "lock expecting tool.wreck.venvs.reqs to be a sequence verbose",
     "lock expecting tool.wreck.venvs.reqs to be a sequence not verbose",
     "unlock expecting tool.wreck.venvs.reqs to be a sequence",
     "venv_relpath not provided",
+    "all venvs expecting tool.wreck.venvs.reqs to be a sequence",
+    "both venv_relpath and all venvs",
 )
 
 
@@ -0,0 +1,53 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_compile_worker.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck._compile_worker' -m pytest \
+   --showlocals tests/test_compile_worker.py && coverage report \
+   --data-file=.coverage --include="**/_compile_worker.py"
+
+"""
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from wreck._compile_worker import compile_in_process
+from wreck._package_installed import is_package_installed
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_compile_in_process_usage_error(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Usage errors are reported as a nonzero exit code, not raised."""
+    # pytest -vv --showlocals --log-level INFO -k "test_compile_in_process_usage_error" tests
+    # compile_in_process changes the working directory. Restored afterwards
+    monkeypatch.chdir(tmp_path)
+    out, err, exit_code, exc = compile_in_process(
+        ["--no-such-option", "missing.in"],
+        str(tmp_path),
+    )
+    assert exit_code == 2
+    assert err is not None and "--no-such-option" in err
+    assert exc is None
+
+    out, err, exit_code, exc = compile_in_process(["missing.in"], str(tmp_path))
+    assert exit_code == 2
+    assert err is not None and "missing.in" in err
@@ -0,0 +1,271 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_async.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_async' -m pytest \
+   --showlocals tests/test_lock_async.py && coverage report \
+   --data-file=.coverage --include="**/lock_async.py"
+
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+import wreck
+from wreck import (
+    acompile,
+    afix,
+    lock_async,
+)
+from wreck._package_installed import is_package_installed
+from wreck.constants import g_app_name
+from wreck.lock_compile import lock_compile
+from wreck.pep518_venvs import VenvMapLoader
+
+if TYPE_CHECKING:
+    from typing import Any
+
+PYPROJECT_TOML_ASYNC = """\
+[[tool.wreck.venvs]]
+venv_base_path = '.venv'
+reqs = [
+    'requirements/aaa',
+    'requirements/bbb',
+    'requirements/ccc',
+]
+[[tool.wreck.venvs]]
+venv_base_path = '.tools'
+reqs = [
+    'requirements/ccc',
+]
+"""
+# Seconds. Later submitted jobs finish first
+DELAYS = {"aaa": 0.3, "bbb": 0.2, "ccc": 0.0}
+
+
+def _prepare(path_dir: "Path") -> VenvMapLoader:
+    """pyproject.toml, venv folders and .in files."""
+    path_f = path_dir.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_ASYNC)
+    for create_relpath in (".venv", ".tools", "requirements"):
+        path_dir.joinpath(create_relpath).mkdir(parents=True, exist_ok=True)
+    for stem in DELAYS.keys():
+        path_dir.joinpath("requirements", f"{stem}.in").write_text(
+            f"{stem}{os.linesep}"
+        )
+    loader = VenvMapLoader(path_f.as_posix())
+
+    return loader
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_acompile_streams(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Yields in completion order. afix result same as lock_compile."""
+    # pytest -vv --showlocals --log-level INFO -k "test_acompile_streams" tests
+    loader = _prepare(tmp_path)
+
+    async def fake_acompile_one(
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: "Path",
+        venv_relpath: str,
+        timeout: int,
+        backend: "Any",
+        telemetry: "Any" = None,
+    ) -> "tuple[Path, None]":
+        stem = Path(in_abspath).stem
+        await asyncio.sleep(DELAYS[stem])
+        Path(lock_abspath).write_text(f"{stem}==1.0{os.linesep}")
+        return Path(lock_abspath), None
+
+    monkeypatch.setattr(f"{g_app_name}.lock_async._acompile_one", fake_acompile_one)
+
+    async def collect() -> "list[Any]":
+        return [
+            t_result
+            async for t_result in acompile(loader, None, jobs=4, use_cache=False)
+        ]
+
+    results = asyncio.run(collect())
+    stems = [Path(t_result[1]).stem for t_result in results]
+    assert stems[-1] == "aaa"
+    assert sorted(stems) == ["aaa", "bbb", "ccc", "ccc"]
+    assert all(t_result[2] is not None for t_result in results)
+
+    # sync compile, same fake output
+    def fake_compile_one(
+        in_abspath,
+        lock_abspath,
+        ep_path,
+        path_cwd,
+        venv_relpath,
+        timeout=15,
+        backend=None,
+        telemetry=None,
+        prefer=None,
+        limiter=None,
+        on_result=None,
+    ):
+        stem = Path(in_abspath).stem
+        Path(lock_abspath).write_text(f"{stem}==1.0{os.linesep}")
+        return Path(lock_abspath), None
+
+    monkeypatch.setattr(f"{g_app_name}.lock_compile._compile_one", fake_compile_one)
+    t_expected = lock_compile(loader, ".venv", jobs=4, use_cache=False)
+
+    streamed = []
+    t_compiled, t_failures, fixings = asyncio.run(
+        afix(loader, ".venv", jobs=4, use_cache=False, on_result=streamed.append)
+    )
+    assert len(streamed) == 3
+    assert len(t_failures) == 0
+    # submission order, not completion order
+    assert (t_compiled, t_failures) == t_expected
+    assert len(fixings) == 1
+    assert fixings[0]._venv_relpath == ".venv"
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_acompile_cancel(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Cancelling stops running jobs. Does not hang."""
+    # pytest -vv --showlocals --log-level INFO -k "test_acompile_cancel" tests
+    loader = _prepare(tmp_path)
+    cancelled = []
+
+    async def fake_acompile_one(
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: "Path",
+        venv_relpath: str,
+        timeout: int,
+        backend: "Any",
+        telemetry: "Any" = None,
+    ) -> "tuple[Path, None]":
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(in_abspath)
+            raise
+        return Path(lock_abspath), None
+
+    monkeypatch.setattr(f"{g_app_name}.lock_async._acompile_one", fake_acompile_one)
+
+    async def main() -> None:
+        task = asyncio.create_task(afix(loader, None, jobs=2, use_cache=False))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(asyncio.wait_for(main(), timeout=10))
+    # jobs=2. Only two were running
+    assert len(cancelled) == 2
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_acompile_off_loop(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Cache keys, manifest and .lock staging do not block the event loop."""
+    # pytest -vv --showlocals --log-level INFO -k "test_acompile_off_loop" tests
+    loader = _prepare(tmp_path)
+    d_threads: "dict[str, set[int]]" = {}
+
+    async def fake_acompile(
+        self: "Any",
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: "Path",
+        venv_python: str,
+        timeout: int,
+    ) -> "tuple[str | None, str | None, int | None, str | None, None]":
+        stem = Path(in_abspath).stem
+        Path(lock_abspath).write_text(f"{stem}==1.0{os.linesep}")
+        return (None, None, 0, None, None)
+
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_backend.PipCompileBackend.acompile",
+        fake_acompile,
+    )
+    for name in (
+        "_compile_after",
+        "_compile_before",
+        "_job_lookup",
+        "_job_store",
+        "_save_caches",
+    ):
+        fcn_orig = getattr(lock_async, name)
+
+        def fcn_spy(
+            *args: "Any", fcn: "Any" = fcn_orig, key: str = name, **kwargs: "Any"
+        ) -> "Any":
+            d_threads.setdefault(key, set()).add(threading.get_ident())
+            return fcn(*args, **kwargs)
+
+        monkeypatch.setattr(f"{g_app_name}.lock_async.{name}", fcn_spy)
+
+    async def main() -> "tuple[Any, ...]":
+        d_threads["loop"] = {threading.get_ident()}
+        ret = await afix(loader, None, jobs=2)
+        return ret
+
+    t_compiled, t_failures, fixings = asyncio.run(main())
+    assert len(t_compiled) == 4
+    assert len(t_failures) == 0
+    ident_loop = d_threads.pop("loop")
+    assert sorted(d_threads.keys()) == [
+        "_compile_after",
+        "_compile_before",
+        "_job_lookup",
+        "_job_store",
+        "_save_caches",
+    ]
+    for idents in d_threads.values():
+        assert idents.isdisjoint(ident_loop)
+
+
+def test_import_lazy() -> None:
+    """import wreck does not import the asyncio API until accessed."""
+    # pytest -vv --showlocals --log-level INFO -k "test_import_lazy" tests
+    code = (
+        "import sys, wreck; "
+        "assert 'wreck.lock_async' not in sys.modules; "
+        "assert wreck.afix is wreck.lock_async.afix"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], check=False)
+    assert proc.returncode == 0
+
+    with pytest.raises(AttributeError):
+        getattr(wreck, "not_an_attribute")
@@ -0,0 +1,313 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_autojobs.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_autojobs' -m pytest \
+   --showlocals tests/test_lock_autojobs.py && coverage report \
+   --data-file=.coverage --include="**/lock_autojobs.py"
+
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import click
+import pytest
+
+from wreck._package_installed import is_package_installed
+from wreck.cli_dependencies import JobsParamType
+from wreck.constants import g_app_name
+from wreck.lock_autojobs import (
+    JOBS_AUTO,
+    RSS_DEFAULT,
+    AutoJobs,
+    _read_fields,
+    cpu_count,
+    job_rss,
+    mem_available,
+)
+from wreck.lock_cache import CACHE_FOLDER
+from wreck.lock_compile import lock_compile
+from wreck.lock_ratelimit import IndexLimiter
+from wreck.lock_telemetry import TELEMETRY_NAME
+from wreck.pep518_venvs import VenvMapLoader
+
+if TYPE_CHECKING:
+    from typing import Any
+
+PYPROJECT_TOML_AUTO = """\
+[[tool.wreck.venvs]]
+venv_base_path = '.venv'
+reqs = [
+    'requirements/aaa',
+    'requirements/bbb',
+    'requirements/ccc',
+]
+"""
+
+
+def test_machine(tmp_path: "Path") -> None:
+    """CPU count at least 1. /proc style fields. Unreadable, empty."""
+    # pytest -vv --showlocals --log-level INFO -k "test_machine" tests
+    assert cpu_count() >= 1
+    mem = mem_available()
+    assert mem is None or mem > 0
+
+    path_f = tmp_path.joinpath("meminfo")
+    path_f.write_text(
+        f"MemTotal:       16314412 kB{os.linesep}"
+        f"MemAvailable:    9437184 kB{os.linesep}"
+        f"pswpin 12{os.linesep}"
+        f"garbage{os.linesep}"
+    )
+    d_fields = _read_fields(str(path_f))
+    assert d_fields == {"MemTotal": 16314412, "MemAvailable": 9437184, "pswpin": 12}
+    assert _read_fields(str(tmp_path.joinpath("nonexistent"))) == {}
+
+
+def test_job_rss() -> None:
+    """Largest most recent max RSS. None recorded, the default."""
+    # pytest -vv --showlocals --log-level INFO -k "test_job_rss" tests
+    d_history = {
+        (".venv", "aaa.in"): [
+            (1.0, 0.5, 0.1, 900000, None),
+            (1.0, 0.5, 0.1, 400000, None),
+        ],
+        (".venv", "bbb.in"): [(1.0, 0.5, 0.1, 300000, None)],
+        (".venv", "ccc.in"): [(1.0, None, None, None, None)],
+    }
+    assert job_rss(d_history) == 400000
+    assert job_rss({(".venv", "ccc.in"): [(1.0, None, None, None, None)]}) == (
+        RSS_DEFAULT
+    )
+    assert job_rss({}) == RSS_DEFAULT
+
+
+testdata_plan = (
+    (8, 10, None, 8),
+    (8, 3, None, 3),
+    (8, 10, 4 * RSS_DEFAULT, 4),
+    (8, 10, RSS_DEFAULT // 2, 1),
+)
+ids_plan = (
+    "not Linux. CPU count",
+    "fewer jobs than CPUs",
+    "memory for 4 jobs",
+    "memory for none. Still 1",
+)
+
+
+@pytest.mark.parametrize(
+    "cpus, job_count, mem, expected",
+    testdata_plan,
+    ids=ids_plan,
+)
+def test_auto_jobs_plan(
+    cpus: int,
+    job_count: int,
+    mem: "int | None",
+    expected: int,
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Start size. Smallest of CPUs, memory over per job RSS, and jobs."""
+    # pytest -vv --showlocals --log-level INFO -k "test_auto_jobs_plan" tests
+    monkeypatch.setattr(f"{g_app_name}.lock_autojobs.cpu_count", lambda: cpus)
+    monkeypatch.setattr(f"{g_app_name}.lock_autojobs.mem_available", lambda: mem)
+    auto = AutoJobs.plan(job_count)
+    assert auto.limit == expected
+    assert auto.ceiling == min(cpus, job_count)
+    assert auto.rss == RSS_DEFAULT
+
+
+def test_auto_jobs_adjust(monkeypatch: "pytest.MonkeyPatch") -> None:
+    """Lowered when swapping, memory low, or index limiter saturated.
+    Otherwise raised, up to the ceiling."""
+    # pytest -vv --showlocals --log-level INFO -k "test_auto_jobs_adjust" tests
+    d_machine: "dict[str, int | None]" = {"swap": 100, "mem": 8 * RSS_DEFAULT}
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_autojobs._swap_pages",
+        lambda: d_machine["swap"],
+    )
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_autojobs.mem_available",
+        lambda: d_machine["mem"],
+    )
+    limiter = IndexLimiter(max_inflight=1)
+    auto = AutoJobs(2, 3, RSS_DEFAULT, limiter=limiter)
+
+    def fcn(t_job: "tuple[str, str]") -> str:
+        return t_job[1]
+
+    # headroom. Raised, not beyond the ceiling
+    assert auto.run(fcn, (".venv", "aaa")) == "aaa"
+    assert auto.limit == 3
+    auto.run(fcn, (".venv", "aaa"))
+    assert auto.limit == 3
+
+    # swapping
+    d_machine["swap"] = 150
+    auto.run(fcn, (".venv", "aaa"))
+    assert auto.limit == 2
+    # swapping stopped. Memory for one job, not two. Unchanged
+    d_machine["mem"] = RSS_DEFAULT
+    auto.run(fcn, (".venv", "aaa"))
+    assert auto.limit == 2
+    # memory low
+    d_machine["mem"] = RSS_DEFAULT // 2
+    auto.run(fcn, (".venv", "aaa"))
+    assert auto.limit == 1
+    auto.run(fcn, (".venv", "aaa"))
+    assert auto.limit == 1
+
+    # index limiter saturated. Not Linux, memory unknown
+    d_machine["mem"] = None
+    d_machine["swap"] = None
+    auto.limit = 3
+    # A job waiting on the limiter
+    limiter._waiting = 1
+    auto.run(fcn, (".venv", "aaa"))
+    assert auto.limit == 2
+    limiter._waiting = 0
+    auto.run(fcn, (".venv", "aaa"))
+    assert auto.limit == 3
+
+
+def test_auto_jobs_run() -> None:
+    """At most limit jobs at once. An exception still frees the slot."""
+    # pytest -vv --showlocals --log-level INFO -k "test_auto_jobs_run" tests
+    auto = AutoJobs(2, 2, RSS_DEFAULT)
+    mutex = threading.Lock()
+    d_running = {"now": 0, "most": 0}
+
+    def fcn(t_job: "tuple[str, str]") -> str:
+        with mutex:
+            d_running["now"] += 1
+            d_running["most"] = max(d_running["most"], d_running["now"])
+        time.sleep(0.05)
+        with mutex:
+            d_running["now"] -= 1
+        return t_job[1]
+
+    threads = [
+        threading.Thread(target=auto.run, args=(fcn, (".venv", f"job{idx}")))
+        for idx in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert d_running["most"] == 2
+
+    def fcn_raise(t_job: "tuple[str, str]") -> str:
+        raise ValueError(t_job[1])
+
+    with pytest.raises(ValueError):
+        auto.run(fcn_raise, (".venv", "aaa"))
+    assert auto._running == 0
+
+
+testdata_jobs_param_type = (
+    ("auto", JOBS_AUTO),
+    ("4", 4),
+    (1, 1),
+)
+
+
+@pytest.mark.parametrize("value, expected", testdata_jobs_param_type)
+def test_jobs_param_type(value: "Any", expected: "int | str") -> None:
+    """--jobs positive int or auto."""
+    # pytest -vv --showlocals --log-level INFO -k "test_jobs_param_type" tests
+    param_type = JobsParamType()
+    assert param_type.convert(value, None, None) == expected
+    for value_ng in ("0", "-2", "many", None):
+        with pytest.raises(click.BadParameter):
+            param_type.convert(value_ng, None, None)
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_auto(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """jobs auto. Memory for two jobs, so at most two at once."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_auto" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_AUTO)
+    for create_relpath in (".venv", "requirements"):
+        tmp_path.joinpath(create_relpath).mkdir(parents=True, exist_ok=True)
+    for stem in ("aaa", "bbb", "ccc"):
+        tmp_path.joinpath("requirements", f"{stem}.in").write_text(
+            f"{stem}{os.linesep}"
+        )
+    monkeypatch.setattr(f"{g_app_name}.lock_autojobs.cpu_count", lambda: 8)
+    # Two jobs fit. Never headroom for a third
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_autojobs.mem_available",
+        lambda: 2 * RSS_DEFAULT,
+    )
+    monkeypatch.setattr(f"{g_app_name}.lock_autojobs._swap_pages", lambda: None)
+    mutex = threading.Lock()
+    d_running = {"now": 0, "most": 0}
+
+    def fake_compile(
+        self: "Any",
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: "Path",
+        venv_python: str,
+        timeout: int,
+    ) -> "tuple[str | None, str | None, int | None, str | None, None]":
+        with mutex:
+            d_running["now"] += 1
+            d_running["most"] = max(d_running["most"], d_running["now"])
+        time.sleep(0.05)
+        stem = Path(in_abspath).stem
+        Path(lock_abspath).write_text(f"{stem}==1.0{os.linesep}")
+        with mutex:
+            d_running["now"] -= 1
+        return (None, None, 0, None, None)
+
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_backend.PipCompileBackend.compile",
+        fake_compile,
+    )
+
+    loader = VenvMapLoader(path_f.as_posix())
+    t_compiled, t_failures = lock_compile(
+        loader,
+        ".venv",
+        jobs=JOBS_AUTO,
+        use_cache=False,
+    )
+    assert len(t_compiled) == 3
+    assert len(t_failures) == 0
+    assert d_running["most"] == 2
+
+    # telemetry database corrupt. No history, default plan
+    path_db = tmp_path.joinpath(CACHE_FOLDER, TELEMETRY_NAME)
+    path_db.write_bytes(b"not a database" * 128)
+    d_running["most"] = 0
+    t_compiled, t_failures = lock_compile(
+        loader,
+        ".venv",
+        jobs=JOBS_AUTO,
+        use_cache=False,
+    )
+    assert len(t_compiled) == 3
+    assert len(t_failures) == 0
+    assert d_running["most"] == 2
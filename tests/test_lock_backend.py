@@ -0,0 +1,307 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_backend.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_backend' -m pytest \
+   --showlocals tests/test_lock_backend.py && coverage report \
+   --data-file=.coverage --include="**/lock_backend.py"
+
+"""
+
+import asyncio
+import os
+import shutil
+from contextlib import nullcontext as does_not_raise
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from wreck._package_installed import is_package_installed
+from wreck._run_cmd import CANCELLED
+from wreck.lock_backend import (
+    BACKEND_DEFAULT,
+    CompileBackend,
+    PipCompileBackend,
+    PipCompileWorkerBackend,
+    UvBackend,
+    get_backend,
+    get_backend_class,
+)
+from wreck.lock_compile import _compile_one
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from tests.typing_only import DOES_NOT_OR_DOES
+
+testdata_get_backend = (
+    (None, PipCompileBackend, does_not_raise()),
+    ("pip-compile", PipCompileBackend, does_not_raise()),
+    ("pip-compile-worker", PipCompileWorkerBackend, does_not_raise()),
+    ("pipenv", None, pytest.raises(ValueError)),
+)
+ids_get_backend = (
+    "default",
+    "pip-compile subprocess",
+    "pip-compile long-lived worker",
+    "no such backend",
+)
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+@pytest.mark.parametrize(
+    "name, cls_expected, expectation",
+    testdata_get_backend,
+    ids=ids_get_backend,
+)
+def test_get_backend(
+    name: "str | None",
+    cls_expected: "type[CompileBackend] | None",
+    expectation: "DOES_NOT_OR_DOES",
+) -> None:
+    """Choose backend by name."""
+    # pytest -vv --showlocals --log-level INFO -k "test_get_backend" tests
+    with expectation:
+        backend = get_backend(name)
+    if isinstance(expectation, does_not_raise):
+        assert cls_expected is not None
+        assert isinstance(backend, cls_expected)
+        assert isinstance(backend, CompileBackend)
+        assert backend.name in (name, BACKEND_DEFAULT)
+        # Same output --> same compile cache key
+        assert backend.options() == PipCompileBackend().options()
+        with backend:
+            pass
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_worker_same_output(tmp_path: "Path") -> None:
+    """Worker output is the same as pip-compile subprocess. Worker is reused."""
+    # pytest -vv --showlocals --log-level INFO -k "test_worker_same_output" tests
+    path_reqs = tmp_path.joinpath("requirements")
+    path_reqs.mkdir()
+    path_pins = path_reqs.joinpath("pins.in")
+    path_pins.write_text(f"six<2{os.linesep}")
+    path_in = path_reqs.joinpath("six.in")
+    path_in.write_text(f"-c pins.in{os.linesep}six{os.linesep}")
+    in_abspath = str(path_in)
+
+    backend_sub = PipCompileBackend()
+    lock_sub = str(path_reqs.joinpath("six-sub.lock"))
+    out, err, exit_code, exc, rusage = backend_sub.compile(
+        in_abspath, lock_sub, tmp_path, "", 15
+    )
+    if exit_code != 0 and "Failed to establish a new connection" in str(err):
+        pytest.skip("pip-compile requires a web connection")
+    assert exit_code == 0
+    assert rusage is not None
+    assert rusage["maxrss"] > 0
+
+    lock_worker = str(path_reqs.joinpath("six-worker.lock"))
+    with PipCompileWorkerBackend() as backend_worker:
+        for _ in range(2):
+            out, err, exit_code, exc, rusage = backend_worker.compile(
+                in_abspath, lock_worker, tmp_path, "", 15
+            )
+            assert exit_code == 0
+            assert exc is None
+            assert rusage is not None
+            assert rusage["utime"] + rusage["stime"] > 0
+        assert len(backend_worker._workers) == 1
+        proc = backend_worker._workers[0]
+
+        # malformed .in. Worker survives
+        path_bad = path_reqs.joinpath("bad.in")
+        path_bad.write_text(f"-c missing.in{os.linesep}six{os.linesep}")
+        out, err, exit_code, exc, rusage = backend_worker.compile(
+            str(path_bad), str(path_reqs.joinpath("bad.lock")), tmp_path, "", 15
+        )
+        assert exit_code != 0
+        assert err is not None
+        assert backend_worker._idle == [proc]
+
+        # worker died. Reported as a failure, then replaced
+        proc.kill()
+        proc.wait()
+        out, err, exit_code, exc, rusage = backend_worker.compile(
+            in_abspath, lock_worker, tmp_path, "", 15
+        )
+        assert exit_code is None
+        assert exc is not None and "worker exited" in exc
+        assert rusage is None
+        out, err, exit_code, exc, rusage = backend_worker.compile(
+            in_abspath, lock_worker, tmp_path, "", 15
+        )
+        assert exit_code == 0
+    assert proc.poll() is not None
+    assert len(backend_worker._workers) == 0
+
+    contents_sub = path_reqs.joinpath("six-sub.lock").read_text()
+    contents_worker = path_reqs.joinpath("six-worker.lock").read_text()
+    assert contents_sub == contents_worker.replace("six-worker", "six-sub")
+
+
+testdata_get_backend_class = (
+    (None, PipCompileBackend, does_not_raise()),
+    ("uv", UvBackend, does_not_raise()),
+    (["uv"], None, pytest.raises(ValueError)),
+    (1, None, pytest.raises(ValueError)),
+)
+ids_get_backend_class = (
+    "default",
+    "uv",
+    "unhashable",
+    "not a str",
+)
+
+
+@pytest.mark.parametrize(
+    "name, cls_expected, expectation",
+    testdata_get_backend_class,
+    ids=ids_get_backend_class,
+)
+def test_get_backend_class(
+    name: "Any",
+    cls_expected: "type[CompileBackend] | None",
+    expectation: "DOES_NOT_OR_DOES",
+) -> None:
+    """[tool.wreck] backend can be anything. Not instantiated."""
+    # pytest -vv --showlocals --log-level INFO -k "test_get_backend_class" tests
+    with expectation:
+        cls = get_backend_class(name)
+    if isinstance(expectation, does_not_raise):
+        assert cls is cls_expected
+
+
+def test_is_connection_error() -> None:
+    """Each backend recognizes it's own connection failure message."""
+    # pytest -vv --showlocals --log-level INFO -k "test_is_connection_error" tests
+    err_pip = (
+        "WARNING: Retrying (Retry(total=4, connect=None, read=None, "
+        "redirect=None, status=None)) after connection broken by "
+        "'NewConnectionError(': Failed to establish a new connection: "
+        "[Errno -3] Temporary failure in name resolution')': /simple/six/"
+    )
+    err_uv = (
+        f"error: Request failed after 3 retries{os.linesep}"
+        f"  cause: Failed to fetch: https://pypi.org/simple/six/{os.linesep}"
+        f"  cause: client error (Connect){os.linesep}"
+    )
+    backend_pip = PipCompileBackend(ep_path="pip-compile")
+    backend_uv = UvBackend(ep_path="uv")
+    assert backend_pip.is_connection_error(1, err_pip) is True
+    assert backend_pip.is_connection_error(2, err_pip) is False
+    assert backend_pip.is_connection_error(1, err_uv) is False
+    assert backend_uv.is_connection_error(2, err_uv) is True
+    assert backend_uv.is_connection_error(None, err_uv) is False
+    assert backend_uv.is_connection_error(2, err_pip) is False
+
+
+def test_backend_cancel(tmp_path: "Path") -> None:
+    """Once cancelled, jobs are not started. Stays cancelled."""
+    # pytest -vv --showlocals --log-level INFO -k "test_backend_cancel" tests
+    in_abspath = str(tmp_path.joinpath("aaa.in"))
+    lock_abspath = str(tmp_path.joinpath("aaa.lock"))
+    for backend in (
+        PipCompileBackend(ep_path="pip-compile"),
+        PipCompileWorkerBackend(ep_path="pip-compile"),
+        UvBackend(ep_path="uv"),
+    ):
+        with backend:
+            assert backend.is_cancelled is False
+            backend.cancel()
+            assert backend.is_cancelled is True
+            t_ret = backend.compile(in_abspath, lock_abspath, tmp_path, "", 15)
+            assert t_ret == (None, None, None, CANCELLED, None)
+        assert backend.is_cancelled is True
+
+
+@pytest.mark.skipif(
+    shutil.which("uv") is None,
+    reason="uv executable is required",
+)
+def test_uv_backend(tmp_path: "Path") -> None:
+    """uv output post-processed same as pip-compile. Separate cache entries."""
+    # pytest -vv --showlocals --log-level INFO -k "test_uv_backend" tests
+    backend = get_backend("uv")
+    assert isinstance(backend, UvBackend)
+    t_options = backend.options()
+    assert t_options[0].startswith("uv==")
+    assert len(t_options[0]) > len("uv==")
+    assert t_options != PipCompileBackend(ep_path="pip-compile").options()
+
+    path_reqs = tmp_path.joinpath("requirements")
+    path_reqs.mkdir()
+    path_pins = path_reqs.joinpath("pins.in")
+    path_pins.write_text(f"six<2{os.linesep}")
+    path_in = path_reqs.joinpath("six.in")
+    path_in.write_text(f"-c pins.in{os.linesep}six{os.linesep}pip{os.linesep}")
+    path_lock = path_reqs.joinpath("six.lock")
+
+    optabspath_lock, err_details = _compile_one(
+        str(path_in),
+        str(path_lock),
+        "",
+        tmp_path,
+        ".venv",
+        timeout=15,
+        backend=backend,
+    )
+    if err_details is not None and "timeout" in err_details:
+        pytest.skip("uv requires a web connection")
+    assert err_details is None
+    assert optabspath_lock == path_lock
+    contents = path_lock.read_text()
+    assert "six==" in contents
+    # unsafe packages are not pinned
+    assert "pip==" not in contents
+    # absolute paths --> relative paths
+    assert str(tmp_path) not in contents
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_acompile_same_output(tmp_path: "Path") -> None:
+    """acompile, both asyncio subprocess and thread, same as compile."""
+    # pytest -vv --showlocals --log-level INFO -k "test_acompile_same_output" tests
+    path_in = tmp_path.joinpath("six.in")
+    path_in.write_text(f"six<2{os.linesep}")
+    in_abspath = str(path_in)
+
+    backend = PipCompileBackend()
+    lock_sync = str(tmp_path.joinpath("six-sync.lock"))
+    t_ret = backend.compile(in_abspath, lock_sync, tmp_path, "", 15)
+    if t_ret[2] != 0 and backend.is_connection_error(t_ret[2], str(t_ret[1])):
+        pytest.skip("pip-compile requires a web connection")
+    assert t_ret[2] == 0
+
+    contents_sync = Path(lock_sync).read_text()
+    for backend_async in (backend, PipCompileWorkerBackend()):
+        lock_async = str(tmp_path.joinpath(f"six-{backend_async.name}.lock"))
+        with backend_async:
+            t_ret = asyncio.run(
+                backend_async.acompile(in_abspath, lock_async, tmp_path, "", 15)
+            )
+        assert t_ret[2] == 0
+        contents_async = Path(lock_async).read_text()
+        assert contents_async.replace(f"six-{backend_async.name}", "six-sync") == (
+            contents_sync
+        )
@@ -0,0 +1,265 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_cache.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_cache' -m pytest \
+   --showlocals tests/test_lock_cache.py && coverage report \
+   --data-file=.coverage --include="**/lock_cache.py"
+
+"""
+
+import os
+import sys
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from wreck.lock_cache import (
+    CACHE_FOLDER,
+    CompileCache,
+    CompileManifest,
+    _check_positive_int,
+    closure_digests,
+    compile_key,
+    include_closure,
+)
+from wreck.pep518_venvs import VenvMapLoader
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any
+
+
+def test_include_closure(tmp_path: "Path") -> None:
+    """Follow -c and -r, transitively. Cycles and missing files are ok."""
+    # pytest -vv --showlocals --log-level INFO -k "test_include_closure" tests
+    path_reqs = tmp_path.joinpath("requirements")
+    path_docs = tmp_path.joinpath("docs")
+    path_reqs.mkdir()
+    path_docs.mkdir()
+    path_pins = path_reqs.joinpath("pins.shared.in")
+    path_pins.write_text(f"-c pins-cffi.in{os.linesep}pip<25{os.linesep}")
+    path_cffi = path_reqs.joinpath("pins-cffi.in")
+    path_cffi.write_text(f"--constraint=pins.shared.in{os.linesep}")
+    path_prod = path_reqs.joinpath("prod.shared.in")
+    path_prod.write_text(f"click{os.linesep}")
+    path_in = path_docs.joinpath("pip-tools.in")
+    path_in.write_text(
+        f"-c ../requirements/pins.shared.in{os.linesep}"
+        f"-r ../requirements/prod.shared.in{os.linesep}"
+        f"--requirement ../requirements/missing.in{os.linesep}"
+        f"# -c not-an-include.in{os.linesep}"
+        f"pip-tools{os.linesep}"
+    )
+
+    t_closure = include_closure(str(path_in))
+    assert t_closure == (
+        path_in,
+        path_pins,
+        path_prod,
+        path_reqs.joinpath("missing.in"),
+        path_cffi,
+    )
+
+
+def test_compile_key(tmp_path: "Path") -> None:
+    """Any input changing changes the key. Package base folder does not."""
+    # pytest -vv --showlocals --log-level INFO -k "test_compile_key" tests
+    path_pins = tmp_path.joinpath("pins.in")
+    path_pins.write_text(f"pip<25{os.linesep}")
+    path_in = tmp_path.joinpath("pip.in")
+    path_in.write_text(f"-c pins.in{os.linesep}pip{os.linesep}")
+    path_lock = tmp_path.joinpath("pip.lock")
+    options = ("--no-header",)
+    in_abspath = str(path_in)
+    lock_abspath = str(path_lock)
+
+    def key(**kwargs: "Any") -> str:
+        d_args = {
+            "path_cwd": tmp_path,
+            "in_abspath": in_abspath,
+            "lock_abspath": lock_abspath,
+            "venv_python": None,
+            "options": options,
+        }
+        d_args.update(kwargs)
+        return compile_key(**d_args)
+
+    key_0 = key()
+    assert key_0 == key()
+    assert key_0 == key(venv_python="")
+
+    # options
+    assert key_0 != key(options=("--no-header", "--strip-extras"))
+    # interpreter
+    assert key_0 != key(venv_python=os.path.realpath(sys.executable))
+    # warm start seed
+    assert key_0 != key(seed="")
+    assert key(seed=f"pip==24.3.1{os.linesep}") != key(seed="")
+    assert key(seed="") == key(seed="")
+
+    # existing .lock. pip-compile prefers existing pins
+    path_lock.write_text(f"pip==24.3.1{os.linesep}")
+    key_1 = key()
+    assert key_0 != key_1
+
+    # included file
+    path_pins.write_text(f"pip<24{os.linesep}")
+    key_2 = key()
+    assert key_1 != key_2
+
+    # same contents, different package base folder
+    path_other = tmp_path.joinpath("other")
+    path_other.mkdir()
+    for path_f in (path_pins, path_in, path_lock):
+        path_other.joinpath(path_f.name).write_text(path_f.read_text())
+    key_other = key(
+        path_cwd=path_other,
+        in_abspath=str(path_other.joinpath(path_in.name)),
+        lock_abspath=str(path_other.joinpath(path_lock.name)),
+    )
+    assert key_other == key_2
+
+
+testdata_check_positive_int = (
+    (None, 7),
+    (True, 7),
+    ("5", 7),
+    (0, 7),
+    (5, 5),
+)
+ids_check_positive_int = (
+    "None",
+    "bool",
+    "str",
+    "zero",
+    "positive int",
+)
+
+
+@pytest.mark.parametrize(
+    "val, expected",
+    testdata_check_positive_int,
+    ids=ids_check_positive_int,
+)
+def test_check_positive_int(val: "Any", expected: int) -> None:
+    """Config values from [tool.wreck] fallback to defaults."""
+    # pytest -vv --showlocals --log-level INFO -k "test_check_positive_int" tests
+    assert _check_positive_int(val, 7) == expected
+
+
+def test_compile_cache(tmp_path: "Path") -> None:
+    """get put and eviction by age then size."""
+    # pytest -vv --showlocals --log-level INFO -k "test_compile_cache" tests
+    path_dir = tmp_path.joinpath(CACHE_FOLDER, "compile")
+    cache = CompileCache(path_dir, max_size=1, max_age=1)
+    assert cache.max_bytes == 1024 * 1024
+    assert cache.max_seconds == 24 * 60 * 60
+
+    # folder does not exist yet
+    assert cache.get("aaa") is None
+    assert cache.evict() == 0
+
+    cache.put("aaa", f"pip==24.3.1{os.linesep}")
+    assert cache.get("aaa") == f"pip==24.3.1{os.linesep}"
+    cache.put("bbb", f"click==8.1.8{os.linesep}")
+    cache.put("ccc", "x" * (1024 * 1024))
+    # no leftover tempfiles
+    assert sorted(path_f.name for path_f in path_dir.iterdir()) == [
+        "aaa.lock",
+        "bbb.lock",
+        "ccc.lock",
+    ]
+
+    # aaa too old
+    two_days_ago = time.time() - 2 * 24 * 60 * 60
+    os.utime(path_dir.joinpath("aaa.lock"), (two_days_ago, two_days_ago))
+    # bbb least recently used. A get refreshes ccc
+    an_hour_ago = time.time() - 60 * 60
+    os.utime(path_dir.joinpath("bbb.lock"), (an_hour_ago, an_hour_ago))
+    os.utime(path_dir.joinpath("ccc.lock"), (an_hour_ago - 1, an_hour_ago - 1))
+    assert cache.get("ccc") is not None
+
+    removed = cache.evict()
+    assert removed == 2
+    assert cache.get("aaa") is None
+    assert cache.get("bbb") is None
+    assert cache.get("ccc") is not None
+
+
+def test_compile_cache_from_loader(tmp_path: "Path") -> None:
+    """Limits from [tool.wreck]. Cache folder within package base folder."""
+    # pytest -vv --showlocals --log-level INFO -k "test_compile_cache_from_loader" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(
+        "[tool.wreck]\n"
+        "compile_cache_max_size = 2\n"
+        "compile_cache_max_age = 3\n"
+        "\n"
+        "[[tool.wreck.venvs]]\n"
+        "venv_base_path = '.venv'\n"
+        "reqs = [\n"
+        "    'requirements/prod',\n"
+        "]\n"
+    )
+    loader = VenvMapLoader(path_f.as_posix())
+    cache = CompileCache.from_loader(loader)
+    assert cache.path_dir == tmp_path.joinpath(CACHE_FOLDER, "compile")
+    assert cache.max_bytes == 2 * 1024 * 1024
+    assert cache.max_seconds == 3 * 24 * 60 * 60
+
+
+def test_compile_manifest(tmp_path: "Path") -> None:
+    """Record, persist, and report changed include closure files."""
+    # pytest -vv --showlocals --log-level INFO -k "test_compile_manifest" tests
+    path_reqs = tmp_path.joinpath("requirements")
+    path_reqs.mkdir()
+    path_pins = path_reqs.joinpath("pins-tox.in")
+    path_pins.write_text(f"tox<5{os.linesep}")
+    path_in = path_reqs.joinpath("tox.in")
+    path_in.write_text(f"-c pins-tox.in{os.linesep}tox{os.linesep}")
+    inputs = closure_digests(tmp_path, path_in)
+    assert list(inputs.keys()) == [
+        "requirements/tox.in",
+        "requirements/pins-tox.in",
+    ]
+
+    path_f = tmp_path.joinpath(CACHE_FOLDER, "manifest.json")
+    manifest = CompileManifest(path_f)
+    lock_relpath = "requirements/tox.lock"
+    assert manifest.is_fresh(".venv", lock_relpath, "aaa") is False
+    assert manifest.changed(".venv", lock_relpath, inputs) is None
+    # nothing to save
+    assert manifest.save() is False
+
+    manifest.record(".venv", lock_relpath, "aaa", inputs)
+    assert manifest.save() is True
+    assert manifest.save() is False
+
+    # reload
+    manifest = CompileManifest(path_f)
+    assert manifest.is_fresh(".venv", lock_relpath, "aaa") is True
+    assert manifest.is_fresh(".venv", lock_relpath, "bbb") is False
+    assert manifest.is_fresh(".tools", lock_relpath, "aaa") is False
+    assert manifest.changed(".venv", lock_relpath, inputs) == []
+
+    path_pins.write_text(f"tox<4{os.linesep}")
+    inputs = closure_digests(tmp_path, path_in)
+    assert manifest.changed(".venv", lock_relpath, inputs) == [
+        "requirements/pins-tox.in",
+    ]
+
+    # unreadable manifest starts empty
+    path_f.write_text("not json")
+    manifest = CompileManifest(path_f)
+    assert manifest.is_fresh(".venv", lock_relpath, "aaa") is False
@@ -19,6 +19,8 @@ With coverage
 
 import os
 import shutil
+import threading
+import time
 from collections.abc import Generator
 from contextlib import nullcontext as does_not_raise
 from pathlib import (
@@ -33,21 +35,34 @@ from typing import (
 import pytest
 
 from wreck._package_installed import is_package_installed
-from wreck._run_cmd import run_cmd
+from wreck._run_cmd import (
+    CANCELLED,
+    budget_msg,
+    run_cmd,
+)
 from wreck._safe_path import (
     resolve_joinpath,
     resolve_path,
 )
 from wreck.constants import g_app_name
 from wreck.exceptions import MissingRequirementsFoldersFiles
+from wreck.lock_backend import PipCompileBackend
+from wreck.lock_cache import CACHE_FOLDER
 from wreck.lock_compile import (
+    _check_jobs,
     _compile_one,
     _empty_in_empty_out,
     _postprocess_abspath_to_relpath,
+    is_budget_exceeded,
+    is_cancelled,
     is_timeout,
     lock_compile,
     prepare_pairs,
 )
+from wreck.lock_telemetry import (
+    TELEMETRY_NAME,
+    CompileTelemetry,
+)
 from wreck.pep518_venvs import (
     VenvMapLoader,
     get_reqs,
@@ -722,3 +737,600 @@ def test_is_timeout(msg: str, timeout_expected: bool) -> None:
     t_failure = (t_three,)
     timeout_actual = is_timeout(t_failure)
     assert timeout_actual is timeout_expected
+
+
+testdata_check_jobs = (
+    (None, 1),
+    (True, 1),
+    ("4", 1),
+    (0, 1),
+    (-2, 1),
+    (1, 1),
+    (4, 4),
+)
+ids_check_jobs = (
+    "None",
+    "bool is not a worker count",
+    "str not coerced",
+    "zero",
+    "negative",
+    "serial",
+    "four workers",
+)
+
+
+@pytest.mark.parametrize(
+    "jobs, expected",
+    testdata_check_jobs,
+    ids=ids_check_jobs,
+)
+def test_check_jobs(jobs: "Any", expected: int) -> None:
+    """Coerce jobs into a positive int."""
+    # pytest -vv --showlocals --log-level INFO -k "test_check_jobs" tests
+    actual = _check_jobs(jobs)
+    assert actual == expected
+
+
+PYPROJECT_TOML_JOBS = """\
+[[tool.wreck.venvs]]
+venv_base_path = '.venv'
+reqs = [
+    'requirements/aaa',
+    'requirements/bbb',
+    'requirements/ccc',
+    'requirements/ddd',
+]
+[[tool.wreck.venvs]]
+venv_base_path = '.tools'
+reqs = [
+    'requirements/ddd',
+]
+"""
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_jobs(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Results order does not depend on jobs. Jobs sharing a .lock are serialized."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_jobs" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_JOBS)
+    for create_relpath in (".venv", ".tools", "requirements"):
+        tmp_path.joinpath(create_relpath).mkdir(parents=True, exist_ok=True)
+    stems = ("aaa", "bbb", "ccc", "ddd")
+    for stem in stems:
+        tmp_path.joinpath("requirements", f"{stem}.in").write_text(
+            f"{stem}{os.linesep}"
+        )
+
+    # slowest first, so completion order differs from submission order
+    delays = {stem: 0.05 * (len(stems) - idx) for idx, stem in enumerate(stems)}
+    in_flight = {}
+    thread_names = set()
+    mutex = threading.Lock()
+
+    def fake_compile_one(
+        in_abspath,
+        lock_abspath,
+        ep_path,
+        path_cwd,
+        venv_relpath,
+        timeout=15,
+        backend=None,
+        telemetry=None,
+        prefer=None,
+        limiter=None,
+        on_result=None,
+    ):
+        with mutex:
+            in_flight[lock_abspath] = in_flight.get(lock_abspath, 0) + 1
+            assert in_flight[lock_abspath] == 1
+            thread_names.add(threading.current_thread().name)
+        time.sleep(delays[Path(in_abspath).stem])
+        Path(lock_abspath).write_text(f"{Path(in_abspath).stem}==1.0{os.linesep}")
+        with mutex:
+            in_flight[lock_abspath] -= 1
+        return Path(lock_abspath), None
+
+    monkeypatch.setattr(f"{g_app_name}.lock_compile._compile_one", fake_compile_one)
+
+    loader = VenvMapLoader(path_f.as_posix())
+    # serial
+    t_compiled_serial, t_failures = lock_compile(
+        loader,
+        None,
+        jobs=1,
+        use_cache=False,
+    )
+    assert len(t_failures) == 0
+    assert len(t_compiled_serial) == 5
+    assert thread_names == {threading.main_thread().name}
+
+    # concurrent
+    thread_names.clear()
+    t_compiled, t_failures = lock_compile(loader, None, jobs=3, use_cache=False)
+    assert len(t_failures) == 0
+    assert t_compiled == t_compiled_serial
+    assert len(thread_names) != 0
+    assert threading.main_thread().name not in thread_names
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_cache(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+    caplog: "pytest.LogCaptureFixture",
+) -> None:
+    """Up to date .lock are skipped. Changed include recompiles only dependents."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_cache" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_JOBS)
+    for create_relpath in (".venv", ".tools", "requirements"):
+        tmp_path.joinpath(create_relpath).mkdir(parents=True, exist_ok=True)
+    stems = ("aaa", "bbb", "ccc", "ddd")
+    for stem in stems:
+        tmp_path.joinpath("requirements", f"{stem}.in").write_text(
+            f"{stem}{os.linesep}"
+        )
+    # aaa.in includes pins.in
+    path_pins = tmp_path.joinpath("requirements", "pins.in")
+    path_pins.write_text(f"aaa<2{os.linesep}")
+    path_aaa = tmp_path.joinpath("requirements", "aaa.in")
+    path_aaa.write_text(f"-c pins.in{os.linesep}aaa{os.linesep}")
+
+    calls = []
+
+    def fake_compile_one(
+        in_abspath,
+        lock_abspath,
+        ep_path,
+        path_cwd,
+        venv_relpath,
+        timeout=15,
+        backend=None,
+        telemetry=None,
+        prefer=None,
+        limiter=None,
+        on_result=None,
+    ):
+        calls.append(Path(in_abspath).stem)
+        Path(lock_abspath).write_text(f"{Path(in_abspath).stem}==1.0{os.linesep}")
+        return Path(lock_abspath), None
+
+    monkeypatch.setattr(f"{g_app_name}.lock_compile._compile_one", fake_compile_one)
+    loader = VenvMapLoader(path_f.as_posix())
+
+    # cold. ddd.lock is in two venvs, same interpreter. Compiled once
+    t_compiled_cold, t_failures = lock_compile(loader, None)
+    assert len(t_failures) == 0
+    assert sorted(calls) == sorted(stems)
+    assert tmp_path.joinpath(".wreck_cache", "compile").is_dir()
+
+    assert tmp_path.joinpath(".wreck_cache", "manifest.json").is_file()
+
+    # warm. No changes, no pip-compile, no cache lookups
+    calls.clear()
+    with caplog.at_level("INFO", logger=f"{g_app_name}.lock_compile"):
+        t_compiled, t_failures = lock_compile(loader, None)
+    assert len(calls) == 0
+    assert t_compiled == t_compiled_cold
+    assert "up to date 4 cache hits 0 misses 0 reused 1" in caplog.text
+
+    # A lock lost. Same inputs as the cold run. Restored from the cache
+    path_lock_bbb = tmp_path.joinpath("requirements", "bbb.lock")
+    contents_bbb = path_lock_bbb.read_text()
+    path_lock_bbb.unlink()
+    lock_compile(loader, None)
+    assert len(calls) == 0
+    assert path_lock_bbb.read_text() == contents_bbb
+
+    # changed include file. Only the includer recompiles
+    calls.clear()
+    path_pins.write_text(f"aaa<3{os.linesep}")
+    caplog.clear()
+    with caplog.at_level("INFO", logger=f"{g_app_name}.lock_compile"):
+        lock_compile(loader, None)
+    assert calls == ["aaa"]
+    assert "up to date 3 cache hits 0 misses 1 reused 1" in caplog.text
+
+    # manifest lost. Cache still has every .lock
+    calls.clear()
+    tmp_path.joinpath(".wreck_cache", "manifest.json").unlink()
+    caplog.clear()
+    with caplog.at_level("INFO", logger=f"{g_app_name}.lock_compile"):
+        lock_compile(loader, None)
+    assert len(calls) == 0
+    assert "up to date 0 cache hits 4 misses 0 reused 1" in caplog.text
+
+    # cache disabled. ddd still compiled once
+    calls.clear()
+    lock_compile(loader, None, use_cache=False)
+    assert sorted(calls) == sorted(stems)
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_backend(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Chosen backend is passed to every job and closed afterwards."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_backend" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_JOBS)
+    for create_relpath in (".venv", ".tools", "requirements"):
+        tmp_path.joinpath(create_relpath).mkdir(parents=True, exist_ok=True)
+    for stem in ("aaa", "bbb", "ccc", "ddd"):
+        tmp_path.joinpath("requirements", f"{stem}.in").write_text(
+            f"{stem}{os.linesep}"
+        )
+    loader = VenvMapLoader(path_f.as_posix())
+
+    with pytest.raises(ValueError):
+        lock_compile(loader, None, backend="pipenv")
+
+    backend_names = set()
+
+    def fake_compile_one(
+        in_abspath,
+        lock_abspath,
+        ep_path,
+        path_cwd,
+        venv_relpath,
+        timeout=15,
+        backend=None,
+        telemetry=None,
+        prefer=None,
+        limiter=None,
+        on_result=None,
+    ):
+        backend_names.add(backend.name)
+        Path(lock_abspath).write_text(f"{Path(in_abspath).stem}==1.0{os.linesep}")
+        return Path(lock_abspath), None
+
+    monkeypatch.setattr(f"{g_app_name}.lock_compile._compile_one", fake_compile_one)
+    t_compiled, t_failures = lock_compile(
+        loader,
+        None,
+        jobs=2,
+        use_cache=False,
+        backend="pip-compile-worker",
+    )
+    assert len(t_failures) == 0
+    assert len(t_compiled) == 5
+    assert backend_names == {"pip-compile-worker"}
+
+    # [tool.wreck] backend. cli overrides it
+    path_f.write_text(
+        f"[tool.wreck]\nbackend = 'pip-compile-worker'\n\n{PYPROJECT_TOML_JOBS}"
+    )
+    loader = VenvMapLoader(path_f.as_posix())
+    backend_names.clear()
+    lock_compile(loader, None, use_cache=False)
+    assert backend_names == {"pip-compile-worker"}
+    backend_names.clear()
+    lock_compile(loader, None, use_cache=False, backend="pip-compile")
+    assert backend_names == {"pip-compile"}
+
+    path_f.write_text(f"[tool.wreck]\nbackend = 'pipenv'\n\n{PYPROJECT_TOML_JOBS}")
+    loader = VenvMapLoader(path_f.as_posix())
+    with pytest.raises(ValueError):
+        lock_compile(loader, None, use_cache=False)
+
+
+testdata_is_budget_exceeded = (
+    (
+        budget_msg("wall", 300),
+        True,
+        False,
+    ),
+    (
+        budget_msg("cpu", 60),
+        True,
+        False,
+    ),
+    (
+        "timeout (15s)",
+        False,
+        True,
+    ),
+    (
+        "blah blah blah budget exceeded blah blah blah",
+        False,
+        False,
+    ),
+)
+ids_is_budget_exceeded = (
+    "wall-clock budget",
+    "cpu budget",
+    "connection timeout is not a budget",
+    "only a prefix counts",
+)
+
+
+@pytest.mark.parametrize(
+    "msg, budget_expected, timeout_expected",
+    testdata_is_budget_exceeded,
+    ids=ids_is_budget_exceeded,
+)
+def test_is_budget_exceeded(
+    msg: str,
+    budget_expected: bool,
+    timeout_expected: bool,
+) -> None:
+    """Budget failures are distinct from timeout failures."""
+    # pytest -vv --showlocals --log-level INFO -k "test_is_budget_exceeded" tests
+    t_failure = ((None, None, msg),)
+    assert is_budget_exceeded(t_failure) is budget_expected
+    assert is_timeout(t_failure) is timeout_expected
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_budget(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """A job over budget fails. Other jobs complete."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_budget" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(
+        f"[tool.wreck]\nwall_budget = 300\ncpu_budget = 60\n\n{PYPROJECT_TOML_JOBS}"
+    )
+    for create_relpath in (".venv", ".tools", "requirements"):
+        tmp_path.joinpath(create_relpath).mkdir(parents=True, exist_ok=True)
+    for stem in ("aaa", "bbb", "ccc", "ddd"):
+        tmp_path.joinpath("requirements", f"{stem}.in").write_text(
+            f"{stem}{os.linesep}"
+        )
+    loader = VenvMapLoader(path_f.as_posix())
+    budgets = set()
+
+    def fake_compile(
+        self: "Any",
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: "Path",
+        venv_python: str,
+        timeout: int,
+    ) -> "tuple[str | None, str | None, int | None, str | None, None]":
+        budgets.add((self._wall_budget, self._cpu_budget))
+        if Path(in_abspath).stem == "bbb":
+            ret = (None, None, None, budget_msg("wall", self._wall_budget), None)
+        else:
+            Path(lock_abspath).write_text(f"{Path(in_abspath).stem}==1.0{os.linesep}")
+            ret = (None, None, 0, None, None)
+        return ret
+
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_backend.PipCompileBackend.compile",
+        fake_compile,
+    )
+
+    # [tool.wreck] budgets
+    t_compiled, t_failures = lock_compile(loader, None, jobs=2, use_cache=False)
+    assert budgets == {(300, 60)}
+    assert len(t_compiled) == 4
+    assert len(t_failures) == 1
+    assert t_failures[0][2] == budget_msg("wall", 300)
+    assert is_budget_exceeded(t_failures)
+    assert not is_timeout(t_failures)
+
+    # Previous .lock on disk. Stale, so still a failure
+    path_lock_bbb = tmp_path.joinpath("requirements", "bbb.lock")
+    path_lock_bbb.write_text(f"bbb==0.1{os.linesep}")
+    t_compiled, t_failures = lock_compile(loader, None, jobs=2, use_cache=False)
+    assert len(t_compiled) == 4
+    assert path_lock_bbb.as_posix() not in t_compiled
+    assert len(t_failures) == 1
+    assert t_failures[0][1] == path_lock_bbb
+    assert is_budget_exceeded(t_failures)
+    assert path_lock_bbb.read_text() == f"bbb==0.1{os.linesep}"
+    path_lock_bbb.unlink()
+
+    # cli overrides [tool.wreck] budgets
+    budgets.clear()
+    lock_compile(loader, None, use_cache=False, wall_budget=5, cpu_budget=2)
+    assert budgets == {(5, 2)}
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_fail_fast(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """First failure cancels the others. Running killed, queued skipped."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_fail_fast" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(f"[tool.wreck]\nfail_fast = true\n\n{PYPROJECT_TOML_JOBS}")
+    for create_relpath in (".venv", ".tools", "requirements"):
+        tmp_path.joinpath(create_relpath).mkdir(parents=True, exist_ok=True)
+    for stem in ("aaa", "ccc", "ddd"):
+        tmp_path.joinpath("requirements", f"{stem}.in").write_text(
+            f"{stem}{os.linesep}"
+        )
+    tmp_path.joinpath("requirements", "bbb.in").write_text(
+        os.linesep.join(f"bbb{idx}" for idx in range(10))
+    )
+    # Longest predicted, by history. Starts first
+    telemetry = CompileTelemetry(tmp_path.joinpath(CACHE_FOLDER, TELEMETRY_NAME))
+    telemetry.record(".venv", "requirements/bbb.in", "pip-compile", 100.0, 1)
+    telemetry.save()
+    loader = VenvMapLoader(path_f.as_posix())
+    d_mode = {"is_wait": True}
+    is_running = threading.Event()
+
+    def fake_compile(
+        self: "Any",
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: "Path",
+        venv_python: str,
+        timeout: int,
+    ) -> "tuple[str | None, str | None, int | None, str | None, None]":
+        if Path(in_abspath).stem == "bbb":
+            # Fails while another job is running
+            is_running.wait(10)
+            ret = (None, "ResolutionImpossible", 1, None, None)
+        elif d_mode["is_wait"]:
+            is_running.set()
+            # killed
+            self._cancel.wait(10)
+            ret = (None, None, None, CANCELLED, None)
+        else:
+            Path(lock_abspath).write_text(f"{Path(in_abspath).stem}==1.0{os.linesep}")
+            ret = (None, None, 0, None, None)
+        return ret
+
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_backend.PipCompileBackend.compile",
+        fake_compile,
+    )
+
+    time_start = time.monotonic()
+    t_compiled, t_failures = lock_compile(loader, None, jobs=2, use_cache=False)
+    assert time.monotonic() - time_start < 10
+    assert len(t_compiled) == 0
+    # ddd in both venvs
+    assert len(t_failures) == 5
+    assert is_cancelled(t_failures)
+    msgs = [t_three[2] for t_three in t_failures]
+    causes = [t_three for t_three in t_failures if not t_three[2].startswith(CANCELLED)]
+    assert len(causes) == 1
+    assert causes[0][1].name == "bbb.lock"
+    assert CANCELLED in msgs
+    assert f"{CANCELLED} (not started)" in msgs
+
+    # Previous bbb.lock on disk. Failed refresh is still fatal
+    is_running.clear()
+    path_lock_bbb = tmp_path.joinpath("requirements", "bbb.lock")
+    path_lock_bbb.write_text(f"bbb0==0.1{os.linesep}")
+    time_start = time.monotonic()
+    t_compiled, t_failures = lock_compile(loader, None, jobs=2, use_cache=False)
+    assert time.monotonic() - time_start < 10
+    assert len(t_compiled) == 0
+    assert is_cancelled(t_failures)
+    causes = [t_three for t_three in t_failures if not t_three[2].startswith(CANCELLED)]
+    assert len(causes) == 1
+    assert causes[0][1] == path_lock_bbb
+    path_lock_bbb.unlink()
+
+    # cli overrides [tool.wreck]. All run
+    d_mode["is_wait"] = False
+    t_compiled, t_failures = lock_compile(
+        loader,
+        None,
+        jobs=2,
+        use_cache=False,
+        fail_fast=False,
+    )
+    assert len(t_compiled) == 4
+    assert len(t_failures) == 1
+    assert not is_cancelled(t_failures)
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_compile_one_write_once(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Resolver sees existing pins. .lock replaced only if changed."""
+    # pytest -vv --showlocals --log-level INFO -k "test_compile_one_write_once" tests
+    path_reqs = tmp_path.joinpath("requirements")
+    path_reqs.mkdir()
+    path_in = path_reqs.joinpath("aaa.in")
+    path_in.write_text(f"aaa{os.linesep}")
+    path_lock = path_reqs.joinpath("aaa.lock")
+    in_abspath = str(path_in)
+    lock_abspath = str(path_lock)
+    d_result = {"exit_code": 0, "pin": "aaa==1.0"}
+    seen = []
+
+    def fake_compile(
+        self: "Any",
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: "Path",
+        venv_python: str,
+        timeout: int,
+    ) -> "tuple[str | None, str | None, int | None, str | None, None]":
+        # Not the .lock. A staging file, seeded with the existing .lock
+        path_staging = Path(lock_abspath)
+        assert path_staging != path_lock
+        assert path_staging.parent == path_lock.parent
+        seen.append(path_staging.read_text())
+        if d_result["exit_code"] == 0:
+            path_staging.write_text(
+                f"{d_result['pin']}{os.linesep}    # via -r {in_abspath}{os.linesep}"
+            )
+        else:
+            # killed mid-write
+            path_staging.write_text("aaa==")
+        return (None, "boom", d_result["exit_code"], None, None)
+
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_backend.PipCompileBackend.compile",
+        fake_compile,
+    )
+    backend = PipCompileBackend()
+    expected = f"aaa==1.0{os.linesep}    # via -r requirements/aaa.in{os.linesep}"
+
+    def compile_aaa() -> "tuple[Path | None, str | None]":
+        return _compile_one(
+            in_abspath,
+            lock_abspath,
+            "",
+            tmp_path,
+            ".venv",
+            backend=backend,
+        )
+
+    # new. abspath --> relpath. Not owner only
+    optabspath_lock, err_details = compile_aaa()
+    assert optabspath_lock == path_lock
+    assert seen == [""]
+    assert path_lock.read_text() == expected
+    assert path_lock.stat().st_mode & 0o044 == 0o044
+
+    # unchanged. .lock not rewritten
+    path_lock.chmod(0o640)
+    ino_before = path_lock.stat().st_ino
+    mtime_before = path_lock.stat().st_mtime_ns
+    optabspath_lock, err_details = compile_aaa()
+    assert seen[-1] == expected
+    assert path_lock.stat().st_ino == ino_before
+    assert path_lock.stat().st_mtime_ns == mtime_before
+
+    # changed. Replaced, permissions kept
+    d_result["pin"] = "aaa==2.0"
+    compile_aaa()
+    assert path_lock.read_text().startswith("aaa==2.0")
+    assert path_lock.stat().st_ino != ino_before
+    assert path_lock.stat().st_mode & 0o777 == 0o640
+
+    # failed. .lock untouched
+    d_result["exit_code"] = 2
+    optabspath_lock, err_details = compile_aaa()
+    assert path_lock.read_text().startswith("aaa==2.0")
+    assert err_details is not None
+
+    # no staging files left behind
+    assert sorted(path.name for path in path_reqs.iterdir()) == ["aaa.in", "aaa.lock"]
@@ -19,6 +19,7 @@ With Coverage
 
 from __future__ import annotations
 
+import dataclasses
 import shutil
 from contextlib import nullcontext as does_not_raise
 from pathlib import Path
@@ -40,6 +41,8 @@ from wreck.lock_datum import (
     InFileType,
     OutLastSuffix,
     PinDatum,
+    _clear_interned,
+    _files,
     _hash_pindatum,
     has_qualifiers,
     in_generic,
@@ -448,6 +451,76 @@ def test_is_pin(
         assert actual_is_pin is expected_is_pin
 
 
+def test_pindatum_compact(tmp_path: Path) -> None:
+    """Immutable. Tuples. Pins from one file share one Path. Hash and
+    sort key computed once."""
+    # pytest -vv --showlocals --log-level INFO -k "test_pindatum_compact" tests
+    path_f = tmp_path.joinpath("prod.lock")
+    line = 'colorama==0.4.6 ; sys_platform == "win32"'
+    pin_0 = PinDatum(
+        path_f,
+        "colorama",
+        line,
+        ["==0.4.6"],
+        ['sys_platform == "win32"'],
+    )
+    # An equal, not identical, Path and package name
+    pin_1 = PinDatum(
+        Path(path_f.as_posix()),
+        "".join(["color", "ama"]),
+        line,
+        ("==0.4.6",),
+        ('sys_platform == "win32"',),
+    )
+    assert pin_0.specifiers == ("==0.4.6",)
+    assert pin_0.qualifiers == ('sys_platform == "win32"',)
+    assert pin_0.file_abspath is pin_1.file_abspath
+    assert pin_0.pkg_name is pin_1.pkg_name
+    assert pin_0 == pin_1
+    assert hash(pin_0) == hash(pin_1)
+    assert hash(pin_0) == _hash_pindatum(path_f, "colorama", pin_0.qualifiers)
+    assert len({pin_0, pin_1}) == 1
+    assert "_hash" not in repr(pin_0)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        pin_0.line = "colorama"  # type: ignore[misc]
+
+    # qualifiers differ. Then package names
+    pin_2 = PinDatum(path_f, "colorama", "colorama", [], [])
+    pin_3 = PinDatum(path_f, "attrs", "attrs", [], [])
+    assert sorted([pin_0, pin_2, pin_3]) == [pin_3, pin_2, pin_0]
+    assert pin_0 != pin_2
+    assert pin_0 != "colorama"
+
+
+def test_intern_path_bounded(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Shared file handles are bounded. Least recently used evicted."""
+    # pytest -vv --showlocals --log-level INFO -k "test_intern_path_bounded" tests
+    monkeypatch.setattr("wreck.lock_datum._FILES_MAX", 2)
+    _clear_interned()
+    paths = [tmp_path.joinpath(f"{stem}.lock") for stem in ("aaa", "bbb", "ccc")]
+    pin_aaa = PinDatum(paths[0], "attrs", "attrs", [], [])
+    PinDatum(paths[1], "attrs", "attrs", [], [])
+    # aaa used. bbb least recently used
+    PinDatum(Path(paths[0].as_posix()), "attrs", "attrs", [], [])
+    PinDatum(paths[2], "attrs", "attrs", [], [])
+    assert list(_files.keys()) == [paths[0].as_posix(), paths[2].as_posix()]
+
+    # aaa kept
+    pin_aaa_1 = PinDatum(Path(paths[0].as_posix()), "attrs", "attrs", [], [])
+    assert pin_aaa_1.file_abspath is pin_aaa.file_abspath
+    # Reset. Still equal
+    _clear_interned()
+    assert len(_files) == 0
+    pin_aaa_2 = PinDatum(Path(paths[0].as_posix()), "attrs", "attrs", [], [])
+    assert pin_aaa_2.file_abspath is not pin_aaa.file_abspath
+    assert pin_aaa_2 == pin_aaa
+    _clear_interned()
+
+
 testdata_outlastsuffix = (
     (
         OutLastSuffix.LOCK,
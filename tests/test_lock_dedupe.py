@@ -0,0 +1,158 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_dedupe.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_dedupe' -m pytest \
+   --showlocals tests/test_lock_dedupe.py && coverage report \
+   --data-file=.coverage --include="**/lock_dedupe.py"
+
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from wreck._package_installed import is_package_installed
+from wreck.constants import g_app_name
+from wreck.lock_compile import lock_compile
+from wreck.lock_dedupe import (
+    JobDedupe,
+    job_key,
+)
+from wreck.pep518_venvs import VenvMapLoader
+
+PYPROJECT_TOML_DEDUPE = """\
+[[tool.wreck.venvs]]
+venv_base_path = '.venv'
+reqs = [
+    'requirements/prod',
+    'requirements/dev',
+]
+
+[[tool.wreck.venvs]]
+venv_base_path = '.doc/.venv'
+reqs = [
+    'requirements/prod',
+    'docs/requirements',
+]
+"""
+
+
+def test_job_key(tmp_path: "Path") -> None:
+    """Markers, options, and include closure contents change the key."""
+    # pytest -vv --showlocals --log-level INFO -k "test_job_key" tests
+    path_reqs = tmp_path.joinpath("requirements")
+    path_reqs.mkdir()
+    path_in = path_reqs.joinpath("prod.in")
+    path_in.write_text(f"requests{os.linesep}")
+    in_abspath = str(path_in)
+    lock_abspath = str(path_reqs.joinpath("prod.lock"))
+    d_markers = {"python_version": "3.11", "sys_platform": "linux"}
+    options = ("pip-compile", "--no-header")
+
+    key = job_key(tmp_path, in_abspath, lock_abspath, d_markers, options)
+    assert key is not None
+    assert key == job_key(tmp_path, in_abspath, lock_abspath, dict(d_markers), options)
+
+    d_other = {"python_version": "3.12", "sys_platform": "linux"}
+    assert key != job_key(tmp_path, in_abspath, lock_abspath, d_other, options)
+    assert key != job_key(tmp_path, in_abspath, lock_abspath, d_markers, ("uv",))
+    assert job_key(tmp_path, in_abspath, lock_abspath, None, options) is None
+
+    path_in.write_text(f"requests<3{os.linesep}")
+    assert key != job_key(tmp_path, in_abspath, lock_abspath, d_markers, options)
+
+
+def test_job_dedupe() -> None:
+    """First of each key runs. Duplicates get the owner's result."""
+    # pytest -vv --showlocals --log-level INFO -k "test_job_dedupe" tests
+    t_jobs = [
+        (".venv", "prod.in", "prod.lock"),
+        (".venv", "dev.in", "dev.lock"),
+        (".doc/.venv", "prod.in", "prod.lock"),
+        (".doc/.venv", "dev.in", "dev.lock"),
+    ]
+    # dev markers unknown. Never deduplicated
+    dedupe = JobDedupe.plan(["aaa", None, "aaa", None])
+    assert dedupe.owner == [0, 1, 0, 3]
+    assert dedupe.unique == [0, 1, 3]
+    assert dedupe.duplicates == 1
+    assert dedupe.apply(t_jobs) == [t_jobs[0], t_jobs[1], t_jobs[3]]
+
+    results = [
+        (".venv", "prod.lock", Path("prod.lock"), None, "miss"),
+        (".venv", "dev.lock", None, "boom", None),
+        (".doc/.venv", "dev.lock", Path("dev.lock"), None, "hit"),
+    ]
+    t_results = dedupe.restore(t_jobs, results)
+    assert t_results[2] == (".doc/.venv", "prod.lock", Path("prod.lock"), None, "dedup")
+    assert t_results[:2] == results[:2]
+    assert t_results[3] == results[2]
+
+    dedupe = JobDedupe.plan([])
+    assert dedupe.duplicates == 0
+    assert dedupe.restore([], []) == []
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_dedupe(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """A .in in two venvs, same interpreter, compiled once."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_dedupe" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_DEDUPE)
+    tmp_path.joinpath(".venv").mkdir()
+    tmp_path.joinpath(".doc", ".venv").mkdir(parents=True)
+    for relpath in ("requirements/prod", "requirements/dev", "docs/requirements"):
+        path_in = tmp_path.joinpath(f"{relpath}.in")
+        path_in.parent.mkdir(parents=True, exist_ok=True)
+        path_in.write_text(f"{path_in.stem}{os.linesep}")
+    loader = VenvMapLoader(path_f.as_posix())
+    compiled = []
+
+    def fake_compile_one(
+        in_abspath,
+        lock_abspath,
+        ep_path,
+        path_cwd,
+        venv_relpath,
+        timeout=15,
+        backend=None,
+        telemetry=None,
+        prefer=None,
+        limiter=None,
+        on_result=None,
+    ):
+        compiled.append((venv_relpath, Path(in_abspath).stem))
+        Path(lock_abspath).write_text(f"{Path(in_abspath).stem}==1.0{os.linesep}")
+        return Path(lock_abspath), None
+
+    monkeypatch.setattr(f"{g_app_name}.lock_compile._compile_one", fake_compile_one)
+
+    t_compiled, t_failures = lock_compile(loader, None, use_cache=False)
+    # Neither venv has an interpreter. Both fall back to the current one
+    assert sorted(compiled) == [
+        (".doc/.venv", "requirements"),
+        (".venv", "dev"),
+        (".venv", "prod"),
+    ]
+    assert len(t_failures) == 0
+    # every venv still reports it's .lock
+    prod_lock = str(tmp_path.joinpath("requirements", "prod.lock"))
+    assert t_compiled.count(prod_lock) == 2
+    assert len(t_compiled) == 4
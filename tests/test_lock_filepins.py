@@ -394,3 +394,53 @@ def test_filepins_resolve(
 
     # nonsense singular --> 'constraint'
     fpins_0.resolve(constraint_relpath, singular="dogfood")
+
+
+def test_filepins_indexes(tmp_path: "Path") -> None:
+    """Duplicates dropped. Membership, by package, and notable are indexed."""
+    # pytest -vv --showlocals --log-level INFO -k "test_filepins_indexes" tests
+    abspath_f = tmp_path.joinpath("prod.lock")
+    abspath_f.write_text(
+        "attrs==23.1.0\n"
+        'colorama==0.4.6 ; sys_platform == "win32"\n'
+        "colorama\n"
+        "attrs==23.1.0\n"
+        "zope\n"
+    )
+    fpins = FilePins(abspath_f)
+    assert [pin.pkg_name for pin in fpins._pins] == [
+        "attrs",
+        "colorama",
+        "colorama",
+        "zope",
+    ]
+    assert len(fpins) == 4
+
+    pin_attrs = PinDatum(abspath_f, "attrs", "attrs==23.1.0", ["==23.1.0"], [])
+    assert pin_attrs in fpins
+    pin_other = PinDatum(abspath_f, "attrs", "attrs", [], ['python_version < "4"'])
+    assert pin_other not in fpins
+
+    assert len(fpins.by_pkg("colorama")) == 2
+    assert fpins.by_pkg("nonexistent") == []
+    # Caller owns the list
+    fpins.by_pkg("colorama").clear()
+    assert len(fpins.by_pkg("colorama")) == 2
+
+    lst_notable = list(fpins.by_pin_or_qualifier())
+    assert [pin.line for pin in lst_notable] == [
+        "attrs==23.1.0",
+        'colorama==0.4.6 ; sys_platform == "win32"',
+    ]
+
+    # Caller owns the list. Pins unchanged
+    fpins._pins.clear()
+    assert len(fpins) == 4
+
+    # Replacing the pins, indexes follow
+    fpins._pins = [pin for pin in fpins._pins if pin.pkg_name != "colorama"]
+    assert len(fpins) == 2
+    assert fpins.by_pkg("colorama") == []
+    assert [pin.line for pin in fpins.by_pin_or_qualifier()] == ["attrs==23.1.0"]
+    assert pin_attrs in fpins
+    assert [pin.pkg_name for pin in fpins] == ["attrs", "zope"]
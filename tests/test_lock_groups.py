@@ -0,0 +1,153 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_groups.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_groups' -m pytest \
+   --showlocals tests/test_lock_groups.py && coverage report \
+   --data-file=.coverage --include="**/lock_groups.py"
+
+"""
+
+import threading
+import time
+
+import pytest
+
+from wreck.lock_groups import (
+    InterpreterGroups,
+    interpreter_key,
+    share_workers,
+)
+from wreck.lock_interpreter import VenvInterpreter
+
+
+def _interpreter(venv_relpath: str, version: str) -> "VenvInterpreter":
+    """venv interpreter with known markers. Empty version, unknown."""
+    if len(version) == 0:
+        d_markers = None
+    else:
+        d_markers = {
+            "platform_python_implementation": "CPython",
+            "python_full_version": version,
+        }
+    ret = VenvInterpreter(
+        venv_relpath=venv_relpath,
+        python="",
+        pyvenv_cfg={},
+        markers=d_markers,
+    )
+    return ret
+
+
+testdata_share_workers = (
+    ([4, 1], 4, [3, 1]),
+    ([4, 4], 4, [2, 2]),
+    ([2, 1], 8, [2, 1]),
+    ([1, 1, 1], 2, [1, 1, 1]),
+    ([0, 3], 2, [0, 2]),
+    ([5], 1, [1]),
+    ([], 4, []),
+)
+ids_share_workers = (
+    "spare to the group with more jobs",
+    "even split",
+    "never more workers than jobs",
+    "more groups than jobs. One each",
+    "group without jobs",
+    "one group",
+    "no groups",
+)
+
+
+@pytest.mark.parametrize(
+    "sizes, jobs, expected",
+    testdata_share_workers,
+    ids=ids_share_workers,
+)
+def test_share_workers(sizes: "list[int]", jobs: int, expected: "list[int]") -> None:
+    """Jobs limit split between groups by job count."""
+    # pytest -vv --showlocals --log-level INFO -k "test_share_workers" tests
+    assert share_workers(sizes, jobs) == expected
+
+
+def test_interpreter_groups() -> None:
+    """Same version, same group. Regardless of interpreter path."""
+    # pytest -vv --showlocals --log-level INFO -k "test_interpreter_groups" tests
+    interpreters = {
+        ".venv": _interpreter(".venv", "3.12.4"),
+        ".rst2html5": _interpreter(".rst2html5", "3.9.7"),
+        ".doc/.venv": _interpreter(".doc/.venv", "3.12.4"),
+        ".broken": _interpreter(".broken", ""),
+    }
+    assert interpreter_key(interpreters[".venv"]) == "CPython 3.12.4"
+    assert interpreter_key(interpreters[".broken"]) == "unknown"
+
+    groups = InterpreterGroups.plan(interpreters)
+    assert groups.keys == ["CPython 3.12.4", "CPython 3.9.7", "unknown"]
+    assert groups.group_of(".venv") == groups.group_of(".doc/.venv") == 0
+    assert groups.group_of(".rst2html5") == 1
+    assert groups.group_of(".not-planned") == 3
+    assert str(groups) == (
+        "CPython 3.12.4 (.venv, .doc/.venv); CPython 3.9.7 (.rst2html5); "
+        "unknown (.broken)"
+    )
+
+
+def test_interpreter_groups_run() -> None:
+    """Groups run at once. At most jobs at once. Results in batch order."""
+    # pytest -vv --showlocals --log-level INFO -k "test_interpreter_groups_run" tests
+    interpreters = {
+        ".venv": _interpreter(".venv", "3.12.4"),
+        ".doc/.venv": _interpreter(".doc/.venv", "3.12.4"),
+        ".rst2html5": _interpreter(".rst2html5", "3.9.7"),
+        ".pypy": _interpreter(".pypy", "3.10.14"),
+    }
+    groups = InterpreterGroups.plan(interpreters)
+    t_batch = [
+        (".venv", "prod"),
+        (".rst2html5", "docs"),
+        (".doc/.venv", "prod"),
+        (".pypy", "prod"),
+        (".venv", "dev"),
+    ]
+    mutex = threading.Lock()
+    d_running = {"now": 0, "most": 0}
+    thread_names = set()
+
+    def fcn(t_job: "tuple[str, str]") -> str:
+        with mutex:
+            d_running["now"] += 1
+            d_running["most"] = max(d_running["most"], d_running["now"])
+            thread_names.add(threading.current_thread().name)
+        time.sleep(0.05)
+        with mutex:
+            d_running["now"] -= 1
+        return f"{t_job[0]} {t_job[1]}"
+
+    expected = [f"{venv_relpath} {stem}" for venv_relpath, stem in t_batch]
+
+    # 3 groups, 2 jobs. Limit holds
+    assert groups.run(t_batch, fcn, 2) == expected
+    assert d_running["most"] == 2
+
+    # Each group it's own pool
+    d_running["most"] = 0
+    assert groups.run(t_batch, fcn, 4) == expected
+    assert 2 < d_running["most"] <= 4
+
+    # One job at a time. Current thread
+    d_running["most"] = 0
+    thread_names.clear()
+    assert groups.run(t_batch, fcn, 1) == expected
+    assert d_running["most"] == 1
+    assert thread_names == {threading.current_thread().name}
+    assert groups.run([], fcn, 4) == []
@@ -0,0 +1,191 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_interpreter.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_interpreter' -m pytest \
+   --showlocals tests/test_lock_interpreter.py && coverage report \
+   --data-file=.coverage --include="**/lock_interpreter.py"
+
+"""
+
+import json
+import os
+import platform
+import sys
+from pathlib import Path
+
+import pytest
+
+from wreck._safe_path import is_win
+from wreck.constants import g_app_name
+from wreck.lock_cache import CACHE_FOLDER
+from wreck.lock_interpreter import (
+    MARKERS_NAME,
+    MarkerCache,
+    VenvInterpreter,
+    probe_markers,
+    venv_interpreters,
+)
+from wreck.pep518_venvs import VenvMapLoader
+
+PYPROJECT_TOML_VENVS = """\
+[[tool.wreck.venvs]]
+venv_base_path = '.venv'
+reqs = [
+    'requirements/prod',
+]
+"""
+
+
+def test_probe_markers(tmp_path: "Path") -> None:
+    """Current interpreter markers. A broken interpreter, unknown."""
+    # pytest -vv --showlocals --log-level INFO -k "test_probe_markers" tests
+    d_markers = probe_markers(sys.executable)
+    assert d_markers is not None
+    assert d_markers["python_full_version"] == platform.python_version()
+    assert d_markers["sys_platform"] == sys.platform
+
+    path_python = tmp_path.joinpath("python")
+    path_python.write_text(f"#!/bin/sh{os.linesep}exit 1{os.linesep}")
+    path_python.chmod(0o755)
+    assert probe_markers(str(path_python)) is None
+    assert probe_markers(str(tmp_path.joinpath("nonexistent"))) is None
+
+
+def test_marker_cache(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Asked once per binary. Persisted. A changed binary is asked again."""
+    # pytest -vv --showlocals --log-level INFO -k "test_marker_cache" tests
+    path_f = tmp_path.joinpath(CACHE_FOLDER, MARKERS_NAME)
+    path_python = tmp_path.joinpath("python3.12")
+    path_python.write_text("")
+    python_abspath = str(path_python)
+    d_markers = {"python_full_version": "3.12.4", "sys_platform": "linux"}
+    asked = []
+
+    def fake_probe(python_abspath: str) -> "dict[str, str] | None":
+        asked.append(python_abspath)
+        return None if "broken" in python_abspath else dict(d_markers)
+
+    monkeypatch.setattr(f"{g_app_name}.lock_interpreter.probe_markers", fake_probe)
+
+    marker_cache = MarkerCache(path_f)
+    assert marker_cache.get(python_abspath) == d_markers
+    assert marker_cache.get(python_abspath) == d_markers
+    assert asked == [python_abspath]
+    assert marker_cache.save() is True
+    # Unchanged. Not rewritten
+    assert marker_cache.save() is False
+    d_cache = json.loads(path_f.read_text())
+    assert str(path_python.resolve()) in d_cache["interpreters"]
+
+    # Another process. From the file, no interpreter started
+    path_toml = tmp_path.joinpath("pyproject.toml")
+    path_toml.write_text(PYPROJECT_TOML_VENVS)
+    marker_cache = MarkerCache.from_loader(VenvMapLoader(path_toml.as_posix()))
+    assert marker_cache.path_f == path_f
+    assert marker_cache.get(python_abspath) == d_markers
+    assert len(asked) == 1
+
+    # Interpreter recreated. Asked again
+    os.utime(path_python, ns=(0, 0))
+    assert marker_cache.get(python_abspath) == d_markers
+    assert len(asked) == 2
+
+    # Failed interpreter asked once. Not persisted. Missing binary not asked
+    path_broken = tmp_path.joinpath("broken")
+    path_broken.write_text("")
+    asked.clear()
+    assert marker_cache.get(str(path_broken)) is None
+    assert marker_cache.get(str(path_broken)) is None
+    assert marker_cache.get(str(tmp_path.joinpath("nonexistent"))) is None
+    assert asked == [str(path_broken)]
+    marker_cache.save()
+    assert str(path_broken) not in json.loads(path_f.read_text())["interpreters"]
+
+    # Unreadable or other version cache file. Start empty
+    path_f.write_text("not json")
+    assert MarkerCache(path_f).get(python_abspath) == d_markers
+    path_f.write_text(json.dumps({"version": 0, "interpreters": {}}))
+    asked.clear()
+    assert MarkerCache(path_f).get(python_abspath) == d_markers
+    assert len(asked) == 1
+
+
+def test_venv_interpreter() -> None:
+    """Version, qualifier evaluation, and run report line."""
+    # pytest -vv --showlocals --log-level INFO -k "test_venv_interpreter" tests
+    d_markers = {
+        "platform_python_implementation": "CPython",
+        "python_full_version": "3.12.4",
+        "python_version": "3.12",
+        "sys_platform": "linux",
+    }
+    interpreter = VenvInterpreter(
+        venv_relpath=".venv",
+        python="/tmp/.venv/bin/python",
+        pyvenv_cfg={"version_info": "3.12.4.final.0"},
+        markers=d_markers,
+    )
+    assert interpreter.version == "3.12.4"
+    assert interpreter.describe() == "CPython 3.12.4 (/tmp/.venv/bin/python)"
+    assert interpreter.evaluate('; python_version < "3.13"') is True
+    assert interpreter.evaluate('sys_platform == "win32"') is False
+    assert interpreter.evaluate("") is True
+    assert interpreter.evaluate("python_version <") is None
+    assert interpreter.evaluate('python_version < "nonsense"') is False
+
+    unknown = VenvInterpreter(
+        venv_relpath=".venv",
+        python="",
+        pyvenv_cfg={"version": "3.9.7"},
+        markers=None,
+    )
+    assert unknown.version == "3.9.7"
+    assert unknown.evaluate('python_version < "3.13"') is None
+    assert unknown.describe() == "unknown interpreter (current interpreter)"
+
+
+@pytest.mark.skipif(is_win(), reason="venv layout bin/ is posix")
+def test_venv_interpreters(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Once per venv. No interpreter, the current one."""
+    # pytest -vv --showlocals --log-level INFO -k "test_venv_interpreters" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_VENVS)
+    tmp_path.joinpath(".venv", "bin").mkdir(parents=True)
+    tmp_path.joinpath(".venv", "pyvenv.cfg").write_text(f"version = 3.9.7{os.linesep}")
+    loader = VenvMapLoader(path_f.as_posix())
+    asked = []
+
+    def fake_probe(python_abspath: str) -> "dict[str, str] | None":
+        asked.append(python_abspath)
+        return {"python_full_version": platform.python_version()}
+
+    monkeypatch.setattr(f"{g_app_name}.lock_interpreter.probe_markers", fake_probe)
+
+    interpreters = venv_interpreters(
+        loader.project_base,
+        [".venv", ".venv"],
+        marker_cache=MarkerCache.from_loader(loader),
+    )
+    assert list(interpreters.keys()) == [".venv"]
+    interpreter = interpreters[".venv"]
+    # bin/python missing. pip-compile runs with the current interpreter
+    assert interpreter.python == ""
+    assert interpreter.pyvenv_cfg == {"version": "3.9.7"}
+    assert interpreter.version == platform.python_version()
+    assert asked == [sys.executable]
@@ -0,0 +1,360 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_parse.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_parse' -m pytest \
+   --showlocals tests/test_lock_parse.py && coverage report \
+   --data-file=.coverage --include="**/lock_parse.py"
+
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from wreck import lock_parse
+from wreck.cli_dependencies import requirements_fix_v2
+from wreck.constants import g_app_name
+from wreck.exceptions import MissingRequirementsFoldersFiles
+from wreck.lock_filepins import FilePins
+from wreck.lock_parse import (
+    PARSE_FOLDER,
+    ParseStore,
+    _parse_compiled,
+    _parse_full,
+    _ParseCache,
+    clear_cache,
+    is_compiled,
+    parse_file,
+    parse_file_cached,
+    set_parse_store,
+)
+
+if TYPE_CHECKING:
+    from typing import Any
+
+LOCK_SIMPLE = """\
+#
+# This file is autogenerated by pip-compile with Python 3.11
+#
+attrs==23.1.0
+    # via pytest
+Foo_Bar.baz==  2.0 ; python_version < "3.11"
+    # via -r requirements/prod.in
+colorama==0.4.6 ; sys_platform == "win32"
+weird===1.0.post1
+rel < 3.0
+simple
+"""
+
+LOCK_MIXED = """\
+--index-url https://pypi.example.com/simple
+-c pins.shared.in
+attrs==23.1.0
+colorama==0.4.6 ; sys_platform == "win32"  # inline comment
+requests[socks]==2.31.0
+typing-extensions>=4.0,<5
+pip @ https://example.com/pip-24.0-py3-none-any.whl
+bad==1.0 ; ; python_version
+-r prod.shared.in
+zope-interface==6.1
+"""
+
+LOCK_CONTINUATION = """\
+attrs==23.1.0 \\
+    --hash=sha256:1f28b4522cdc2fb4256ac1a020c78acf9cba2c6b41a0b4ebd4e6ee3f5e0c3a6b
+colorama==0.4.6
+"""
+
+testdata_parse_compiled = (
+    (LOCK_SIMPLE, 6, set(), set()),
+    (LOCK_MIXED, 6, {"pins.shared.in"}, {"prod.shared.in"}),
+    (LOCK_CONTINUATION, 2, set(), set()),
+    ("", 0, set(), set()),
+)
+ids_parse_compiled = (
+    "comments and simple pins only",
+    "options extras urls and inline comments. Parsed in full",
+    "line continuation. Whole file parsed in full",
+    "empty file. No pins, parsed in full",
+)
+
+
+@pytest.mark.parametrize(
+    "contents, pin_count, constraints, requirements",
+    testdata_parse_compiled,
+    ids=ids_parse_compiled,
+)
+def test_parse_compiled(
+    contents: str,
+    pin_count: int,
+    constraints: "set[str]",
+    requirements: "set[str]",
+    tmp_path: "Path",
+) -> None:
+    """Fast path result identical to pip_requirements_parser."""
+    # pytest -vv --showlocals --log-level INFO -k "test_parse_compiled" tests
+    path_f = tmp_path.joinpath("prod.lock")
+    path_f.write_text(contents)
+    assert is_compiled(path_f)
+
+    pins_fast, constraints_fast, requirements_fast = _parse_compiled(path_f)
+    pins_full, constraints_full, requirements_full = _parse_full(path_f)
+    assert len(pins_fast) == pin_count
+    assert constraints_fast == constraints_full == constraints
+    assert requirements_fast == requirements_full == requirements
+    # same line numbers, in file order
+    assert [num for num, _ in pins_fast] == [num for num, _ in pins_full]
+    for (_, pin_fast), (_, pin_full) in zip(pins_fast, pins_full):
+        assert pin_fast.file_abspath == pin_full.file_abspath
+        assert pin_fast.pkg_name == pin_full.pkg_name
+        assert pin_fast.line == pin_full.line
+        assert pin_fast.specifiers == pin_full.specifiers
+        assert pin_fast.qualifiers == pin_full.qualifiers
+
+    # parse_file. pins only, in file order
+    pins, constraints_file, requirements_file = parse_file(path_f)
+    assert pins == [pin for _, pin in pins_fast]
+    assert constraints_file == constraints
+    assert requirements_file == requirements
+
+
+def test_parse_file_dispatch(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """.in files are parsed in full. Missing file, an exception."""
+    # pytest -vv --showlocals --log-level INFO -k "test_parse_file_dispatch" tests
+    path_in = tmp_path.joinpath("prod.in")
+    path_in.write_text(f"-c pins.in{os.linesep}attrs{os.linesep}")
+    path_unlock = tmp_path.joinpath("prod.unlock")
+    path_unlock.write_text(f"attrs{os.linesep}")
+    assert not is_compiled(path_in)
+    assert is_compiled(path_unlock)
+
+    def fake_parse_compiled(abspath_f: "Path") -> None:
+        raise AssertionError(f"fast path taken {abspath_f!s}")
+
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_parse._parse_compiled",
+        fake_parse_compiled,
+    )
+    pins, constraints, requirements = parse_file(path_in)
+    assert [pin.pkg_name for pin in pins] == ["attrs"]
+    assert constraints == {"pins.in"}
+    assert len(requirements) == 0
+    monkeypatch.undo()
+
+    for suffix in (".in", ".lock"):
+        path_missing = tmp_path.joinpath(f"missing{suffix}")
+        with pytest.raises(MissingRequirementsFoldersFiles):
+            parse_file(path_missing)
+
+
+def test_parse_file_cached(tmp_path: "Path") -> None:
+    """Parsed once, until the file changes. FilePins share pins, not
+    resolution state."""
+    # pytest -vv --showlocals --log-level INFO -k "test_parse_file_cached" tests
+    path_f = tmp_path.joinpath("prod.in")
+    path_f.write_text(f"-c pins.in{os.linesep}zope{os.linesep}attrs{os.linesep}")
+
+    with patch(
+        f"{g_app_name}.lock_parse.parse_file",
+        side_effect=parse_file,
+    ) as mock_parse:
+        pins, constraints, requirements = parse_file_cached(path_f)
+        assert [pin.pkg_name for pin in pins] == ["attrs", "zope"]
+        assert constraints == frozenset({"pins.in"})
+        assert len(requirements) == 0
+
+        fpins_0 = FilePins(path_f)
+        fpins_1 = FilePins(path_f)
+        assert mock_parse.call_count == 1
+        assert fpins_0._pins[0] is fpins_1._pins[0]
+
+        # copy on construct. Resolving one does not affect the other
+        fpins_0.resolve("pins.in")
+        assert fpins_0.depth == 0
+        assert fpins_1.depth == 1
+        assert parse_file_cached(path_f)[1] == frozenset({"pins.in"})
+
+        # Same size, same mtime. Contents changed. Recent, so digest differs
+        st = path_f.stat()
+        path_f.write_text(f"-c pins.in{os.linesep}zope{os.linesep}attr2{os.linesep}")
+        os.utime(path_f, ns=(st.st_atime_ns, st.st_mtime_ns))
+        pins, _, _ = parse_file_cached(path_f)
+        assert mock_parse.call_count == 2
+        assert [pin.pkg_name for pin in pins] == ["attr2", "zope"]
+
+        # Not recent. size and mtime alone are trusted
+        mtime_old = st.st_mtime_ns - 60_000_000_000
+        os.utime(path_f, ns=(mtime_old, mtime_old))
+        parse_file_cached(path_f)
+        parse_file_cached(path_f)
+        assert mock_parse.call_count == 3
+
+        clear_cache()
+        parse_file_cached(path_f)
+        assert mock_parse.call_count == 4
+
+    path_f.unlink()
+    with pytest.raises(MissingRequirementsFoldersFiles):
+        parse_file_cached(path_f)
+
+
+def test_parse_cache_bounded(tmp_path: "Path") -> None:
+    """Parse results kept are bounded. Least recently used evicted."""
+    # pytest -vv --showlocals --log-level INFO -k "test_parse_cache_bounded" tests
+    cache = _ParseCache(max_entries=2)
+    assert _ParseCache(max_entries=0).max_entries == 1024
+    paths = []
+    for stem in ("aaa", "bbb", "ccc"):
+        path_f = tmp_path.joinpath(f"{stem}.in")
+        path_f.write_text(f"{stem}{os.linesep}")
+        # Not recent. size and mtime alone are trusted
+        mtime_old = path_f.stat().st_mtime_ns - 60_000_000_000
+        os.utime(path_f, ns=(mtime_old, mtime_old))
+        paths.append(path_f)
+
+    with patch(
+        f"{g_app_name}.lock_parse.parse_file",
+        side_effect=parse_file,
+    ) as mock_parse:
+        cache.get(paths[0])
+        cache.get(paths[1])
+        # aaa used. bbb least recently used
+        cache.get(paths[0])
+        assert mock_parse.call_count == 2
+        cache.get(paths[2])
+        assert list(cache._entries.keys()) == [
+            paths[0].as_posix(),
+            paths[2].as_posix(),
+        ]
+        cache.get(paths[0])
+        assert mock_parse.call_count == 3
+        cache.get(paths[1])
+        assert mock_parse.call_count == 4
+        assert len(cache._entries) == 2
+
+
+def test_parse_store(tmp_path: "Path") -> None:
+    """Warm start skips parsing. Invalid entries are misses. Evicted by age."""
+    # pytest -vv --showlocals --log-level INFO -k "test_parse_store" tests
+    path_dir = tmp_path.joinpath(".wreck_cache", PARSE_FOLDER)
+    store = ParseStore(path_dir, max_age="nonsense")
+    assert store.max_seconds == 14 * 24 * 60 * 60
+    path_f = tmp_path.joinpath("prod.lock")
+    path_f.write_text(LOCK_MIXED)
+    set_parse_store(store)
+
+    with patch(
+        f"{g_app_name}.lock_parse.parse_file",
+        side_effect=parse_file,
+    ) as mock_parse:
+        # cold
+        t_cold = parse_file_cached(path_f)
+        assert mock_parse.call_count == 1
+        entries = list(path_dir.glob("*.json"))
+        assert len(entries) == 1
+        path_entry = entries[0]
+
+        # warm. Another run, in process cache empty
+        clear_cache()
+        t_warm = parse_file_cached(path_f)
+        assert mock_parse.call_count == 1
+        assert t_warm[1:] == t_cold[1:]
+        for pin_warm, pin_cold in zip(t_warm[0], t_cold[0], strict=True):
+            assert pin_warm.file_abspath == pin_cold.file_abspath
+            assert pin_warm.line == pin_cold.line
+            assert pin_warm.specifiers == pin_cold.specifiers
+            assert pin_warm.qualifiers == pin_cold.qualifiers
+
+        # Same contents, another file. Pins belong to that file
+        path_other = tmp_path.joinpath("dev.lock")
+        path_other.write_text(LOCK_MIXED)
+        pins_other, _, _ = parse_file_cached(path_other)
+        assert mock_parse.call_count == 1
+        assert all(pin.file_abspath == path_other for pin in pins_other)
+
+        # Invalid entries are misses. Then replaced
+        d_entry = json.loads(path_entry.read_text())
+        d_entry_ng = dict(d_entry)
+        d_entry_ng["pins"] = [["attrs", "attrs==23.1.0", "==23.1.0", []]]
+        for contents_ng in (
+            "{not json",
+            json.dumps(dict(d_entry, v=0)),
+            json.dumps(dict(d_entry, key="0" * 64)),
+            json.dumps(d_entry_ng),
+        ):
+            path_entry.write_text(contents_ng)
+            clear_cache()
+            parse_file_cached(path_f)
+        assert mock_parse.call_count == 5
+        assert json.loads(path_entry.read_text()) == d_entry
+
+    # Not used within max age
+    assert store.evict() == 0
+    mtime_old = time.time() - store.max_seconds - 60
+    os.utime(path_entry, (mtime_old, mtime_old))
+    assert store.evict() == 1
+    assert not path_entry.exists()
+
+
+PYPROJECT_TOML_STORE = """\
+[[tool.wreck.venvs]]
+venv_base_path = '.venv'
+reqs = [
+    'requirements/prod',
+]
+"""
+
+
+def test_parse_store_cli(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """reqs fix store is process wide only during the run. --no-cache, none."""
+    # pytest -vv --showlocals --log-level INFO -k "test_parse_store_cli" tests
+    tmp_path.joinpath("pyproject.toml").write_text(PYPROJECT_TOML_STORE)
+    tmp_path.joinpath(".venv").mkdir()
+    stores = []
+
+    def fake_lock_compile(
+        loader: "Any", venv_relpath: "Any", *args: "Any", **kwargs: "Any"
+    ) -> "Any":
+        stores.append(lock_parse._cache.store)
+        raise KeyError("No such venv")
+
+    monkeypatch.setattr(
+        f"{g_app_name}.cli_dependencies.lock_compile",
+        fake_lock_compile,
+    )
+    runner = CliRunner()
+    args = ["--path", str(tmp_path), "--venv-relpath", ".venv"]
+
+    result = runner.invoke(requirements_fix_v2, args)
+    assert result.exit_code == 9
+    assert isinstance(stores[0], ParseStore)
+    assert lock_parse._cache.store is None
+
+    # An earlier store left behind. Not used
+    set_parse_store(stores[0])
+    result = runner.invoke(requirements_fix_v2, [*args, "--no-cache"])
+    assert result.exit_code == 9
+    assert stores[1] is None
+    assert lock_parse._cache.store is None
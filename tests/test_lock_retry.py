@@ -0,0 +1,331 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_retry.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_retry' -m pytest \
+   --showlocals tests/test_lock_retry.py && coverage report \
+   --data-file=.coverage --include="**/lock_retry.py"
+
+"""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from wreck._package_installed import is_package_installed
+from wreck.constants import g_app_name
+from wreck.lock_async import acompile
+from wreck.lock_compile import (
+    is_timeout,
+    lock_compile,
+)
+from wreck.lock_retry import (
+    RETRIES_DEFAULT,
+    RETRY_BACKOFF,
+    RETRY_BACKOFF_MAX,
+    RetryPolicy,
+    aretry_job,
+    retry_jobs,
+)
+from wreck.pep518_venvs import VenvMapLoader
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import Any
+
+testdata_retry_policy = (
+    ({}, RETRIES_DEFAULT, RETRY_BACKOFF),
+    ({"retries": 0, "backoff": 0}, 0, 0),
+    ({"retries": 5, "backoff": 0.5}, 5, 0.5),
+    ({"retries": -1, "backoff": -1}, RETRIES_DEFAULT, RETRY_BACKOFF),
+    ({"retries": True, "backoff": "2"}, RETRIES_DEFAULT, RETRY_BACKOFF),
+    ({"retries": "5", "backoff": None}, RETRIES_DEFAULT, RETRY_BACKOFF),
+)
+ids_retry_policy = (
+    "defaults",
+    "zero disables retrying. no wait",
+    "float backoff",
+    "negative",
+    "bool and str",
+    "str not coerced",
+)
+
+
+@pytest.mark.parametrize(
+    "kwargs, retries_expected, backoff_expected",
+    testdata_retry_policy,
+    ids=ids_retry_policy,
+)
+def test_retry_policy(
+    kwargs: "dict[str, Any]",
+    retries_expected: int,
+    backoff_expected: "int | float",
+) -> None:
+    """Coerce config values. Backoff doubles, up to a cap."""
+    # pytest -vv --showlocals --log-level INFO -k "test_retry_policy" tests
+    policy = RetryPolicy(**kwargs)
+    assert policy.retries == retries_expected
+    assert policy.backoff == backoff_expected
+    assert policy.delay(1) == min(backoff_expected, RETRY_BACKOFF_MAX)
+    assert policy.delay(2) == min(backoff_expected * 2, RETRY_BACKOFF_MAX)
+    assert policy.delay(20) == min(backoff_expected * 2**19, RETRY_BACKOFF_MAX)
+
+
+testdata_is_retryable = (
+    (("v", "a.lock", None, "timeout (15s)", None), True),
+    (("v", "a.lock", Path("a.lock"), None, None), False),
+    (("v", "a.lock", Path("a.lock"), "timeout (15s)", None), True),
+    (("v", "a.lock", None, "budget exceeded (wall 5s)", None), False),
+    (("v", "a.lock", None, "malformed .in file", None), False),
+    (("v", "a.lock", None, None, None), False),
+)
+ids_is_retryable = (
+    "failed to connect",
+    "success",
+    "failed to connect. Previous .lock on disk",
+    "over budget",
+    "other failure",
+    "no error details",
+)
+
+
+@pytest.mark.parametrize(
+    "t_result, expected",
+    testdata_is_retryable,
+    ids=ids_is_retryable,
+)
+def test_is_retryable(t_result: "Any", expected: bool) -> None:
+    """Only connection failures are retried."""
+    # pytest -vv --showlocals --log-level INFO -k "test_is_retryable" tests
+    assert RetryPolicy.is_retryable(t_result) is expected
+
+
+def test_retry_jobs() -> None:
+    """Only failed jobs are re-queued. Results kept in submission order."""
+    # pytest -vv --showlocals --log-level INFO -k "test_retry_jobs" tests
+    # job --> how many attempts fail to connect
+    d_fails = {"aaa": 0, "bbb": 2, "ccc": 1, "ddd": 9}
+    batches = []
+    notified = []
+
+    def fcn_batch(t_batch: "Sequence[str]") -> "list[Any]":
+        batches.append(list(t_batch))
+        ret = []
+        for job in t_batch:
+            if d_fails[job] > 0:
+                d_fails[job] -= 1
+                ret.append((".venv", job, None, "timeout (15s)", None))
+            else:
+                ret.append((".venv", job, Path(job), None, None))
+        return ret
+
+    def on_retry(venv_relpath: str, lock_abspath: str, attempt: int, delay: float):
+        notified.append((lock_abspath, attempt))
+
+    policy = RetryPolicy(retries=3, backoff=0)
+    t_jobs = ("aaa", "bbb", "ccc", "ddd")
+    results, retry_counts = retry_jobs(t_jobs, fcn_batch, policy, on_retry=on_retry)
+    assert batches == [
+        ["aaa", "bbb", "ccc", "ddd"],
+        ["bbb", "ccc", "ddd"],
+        ["bbb", "ddd"],
+        ["ddd"],
+    ]
+    assert [t_result[1] for t_result in results] == list(t_jobs)
+    assert [t_result[2] is not None for t_result in results] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert retry_counts == {1: 2, 2: 1, 3: 3}
+    assert len(notified) == sum(retry_counts.values())
+    assert is_timeout([(None, None, results[3][3])])
+
+    # retrying disabled
+    d_fails["bbb"] = 1
+    batches.clear()
+    results, retry_counts = retry_jobs(("bbb",), fcn_batch, RetryPolicy(retries=0))
+    assert batches == [["bbb"]]
+    assert retry_counts == {}
+    assert results[0][2] is None
+
+
+def test_aretry_job() -> None:
+    """Retry one job within an event loop."""
+    # pytest -vv --showlocals --log-level INFO -k "test_aretry_job" tests
+    attempts = []
+
+    async def fcn_job() -> "Any":
+        attempts.append(1)
+        if len(attempts) < 3:
+            ret = (".venv", "a.lock", None, "timeout (15s)", None)
+        else:
+            ret = (".venv", "a.lock", Path("a.lock"), None, None)
+        return ret
+
+    policy = RetryPolicy(retries=5, backoff=0)
+    t_result, retry_count = asyncio.run(aretry_job(fcn_job, policy))
+    assert retry_count == 2
+    assert t_result[2] is not None
+
+    attempts.clear()
+    policy = RetryPolicy(retries=1, backoff=0)
+    t_result, retry_count = asyncio.run(aretry_job(fcn_job, policy))
+    assert retry_count == 1
+    assert t_result[2] is None
+
+
+PYPROJECT_TOML_RETRY = """\
+[tool.wreck]
+retry_backoff = 0
+
+[[tool.wreck.venvs]]
+venv_base_path = '.venv'
+reqs = [
+    'requirements/aaa',
+    'requirements/bbb',
+    'requirements/ccc',
+]
+"""
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_retry(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Dropped connection is retried. Successful .lock are not recompiled."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_retry" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_RETRY)
+    for create_relpath in (".venv", "requirements"):
+        tmp_path.joinpath(create_relpath).mkdir(parents=True, exist_ok=True)
+    for stem in ("aaa", "bbb", "ccc"):
+        tmp_path.joinpath("requirements", f"{stem}.in").write_text(
+            f"{stem}{os.linesep}"
+        )
+    loader = VenvMapLoader(path_f.as_posix())
+    d_fails = {}
+    compiled = []
+
+    def fake_compile(
+        self: "Any",
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: "Path",
+        venv_python: str,
+        timeout: int,
+    ) -> "tuple[str | None, str | None, int | None, str | None, None]":
+        stem = Path(in_abspath).stem
+        compiled.append(stem)
+        if d_fails.get(stem, 0) > 0:
+            d_fails[stem] -= 1
+            ret = (None, "Failed to establish a new connection", 1, None, None)
+        else:
+            Path(lock_abspath).write_text(f"{stem}==1.0{os.linesep}")
+            ret = (None, None, 0, None, None)
+        return ret
+
+    async def fake_acompile(
+        self: "Any",
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: "Path",
+        venv_python: str,
+        timeout: int,
+    ) -> "tuple[str | None, str | None, int | None, str | None, None]":
+        return fake_compile(
+            self,
+            in_abspath,
+            lock_abspath,
+            path_cwd,
+            venv_python,
+            timeout,
+        )
+
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_backend.PipCompileBackend.compile",
+        fake_compile,
+    )
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_backend.PipCompileBackend.acompile",
+        fake_acompile,
+    )
+
+    # recovers
+    d_fails.update({"bbb": 2})
+    retried = []
+    t_compiled, t_failures = lock_compile(
+        loader,
+        None,
+        jobs=2,
+        use_cache=False,
+        on_retry=lambda *args: retried.append(args),
+    )
+    assert len(t_compiled) == 3
+    assert len(t_failures) == 0
+    assert sorted(compiled) == ["aaa", "bbb", "bbb", "bbb", "ccc"]
+    assert [t_retry[2] for t_retry in retried] == [1, 2]
+    assert all(Path(t_retry[1]).stem == "bbb" for t_retry in retried)
+
+    # gives up. Other .lock kept
+    compiled.clear()
+    tmp_path.joinpath("requirements", "ccc.lock").unlink()
+    d_fails.update({"ccc": 9})
+    t_compiled, t_failures = lock_compile(loader, None, use_cache=False, retries=1)
+    assert len(t_compiled) == 2
+    assert len(t_failures) == 1
+    assert is_timeout(t_failures)
+    assert compiled.count("ccc") == 2
+
+    # refresh a previous .lock. Also retried
+    compiled.clear()
+    d_fails.update({"ccc": 9})
+    path_lock_ccc = tmp_path.joinpath("requirements", "ccc.lock")
+    path_lock_ccc.write_text(f"ccc==0.1{os.linesep}")
+    t_compiled, t_failures = lock_compile(loader, None, use_cache=False, retries=2)
+    assert len(t_compiled) == 2
+    assert len(t_failures) == 1
+    assert t_failures[0][1] == path_lock_ccc
+    assert is_timeout(t_failures)
+    assert compiled.count("ccc") == 3
+
+    # async, same retries
+    compiled.clear()
+    d_fails.clear()
+    d_fails.update({"aaa": 1})
+    tmp_path.joinpath("requirements", "aaa.lock").unlink()
+    retried.clear()
+
+    async def collect() -> "list[Any]":
+        return [
+            t_result
+            async for t_result in acompile(
+                loader,
+                ".venv",
+                jobs=2,
+                use_cache=False,
+                on_retry=lambda *args: retried.append(args),
+            )
+        ]
+
+    results = asyncio.run(collect())
+    assert all(t_result[2] is not None for t_result in results)
+    assert len(retried) == 1
+    assert compiled.count("aaa") == 2
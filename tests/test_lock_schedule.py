@@ -0,0 +1,225 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_schedule.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_schedule' -m pytest \
+   --showlocals tests/test_lock_schedule.py && coverage report \
+   --data-file=.coverage --include="**/lock_schedule.py"
+
+"""
+
+import logging
+import os
+from pathlib import Path
+
+import pytest
+
+from wreck._package_installed import is_package_installed
+from wreck.constants import g_app_name
+from wreck.lock_cache import CACHE_FOLDER
+from wreck.lock_compile import lock_compile
+from wreck.lock_schedule import (
+    SECONDS_PER_REQ,
+    JobSchedule,
+    closure_size,
+    predict_makespan,
+)
+from wreck.lock_telemetry import (
+    TELEMETRY_NAME,
+    CompileTelemetry,
+)
+from wreck.pep518_venvs import VenvMapLoader
+
+
+def _write_reqs(path_reqs: "Path") -> None:
+    """aaa is small. bbb includes pins. ccc is big."""
+    path_reqs.mkdir(parents=True, exist_ok=True)
+    nl = os.linesep
+    path_reqs.joinpath("pins.in").write_text(f"# pins{nl}six<2{nl}attrs{nl}")
+    path_reqs.joinpath("aaa.in").write_text(f"aaa{nl}")
+    path_reqs.joinpath("bbb.in").write_text(f"-c pins.in{nl}{nl}bbb{nl}")
+    path_reqs.joinpath("ccc.in").write_text(nl.join(f"ccc{idx}" for idx in range(6)))
+
+
+def test_closure_size(tmp_path: "Path") -> None:
+    """Requirement lines, following includes. Comments not counted."""
+    # pytest -vv --showlocals --log-level INFO -k "test_closure_size" tests
+    path_reqs = tmp_path.joinpath("requirements")
+    _write_reqs(path_reqs)
+    assert closure_size(path_reqs.joinpath("aaa.in")) == 1
+    assert closure_size(path_reqs.joinpath("bbb.in")) == 3
+    assert closure_size(path_reqs.joinpath("ccc.in")) == 6
+    # missing or empty. Still a job
+    assert closure_size(path_reqs.joinpath("missing.in")) == 1
+
+
+testdata_predict_makespan = (
+    ((4.0, 3.0, 3.0, 2.0), (0, 1, 2, 3), 2, 6.0),
+    ((2.0, 3.0, 3.0, 4.0), (0, 1, 2, 3), 2, 7.0),
+    ((2.0, 3.0, 3.0, 4.0), (3, 1, 2, 0), 2, 6.0),
+    ((2.0, 3.0), (0, 1), 1, 5.0),
+    ((2.0, 3.0), (0, 1), 8, 3.0),
+    ((), (), 2, 0.0),
+)
+ids_predict_makespan = (
+    "longest first",
+    "longest last",
+    "longest first reordered",
+    "serial",
+    "more workers than jobs",
+    "no jobs",
+)
+
+
+@pytest.mark.parametrize(
+    "costs, order, workers, expected",
+    testdata_predict_makespan,
+    ids=ids_predict_makespan,
+)
+def test_predict_makespan(
+    costs: "tuple[float, ...]",
+    order: "tuple[int, ...]",
+    workers: int,
+    expected: float,
+) -> None:
+    """Thread pool simulation. Start order changes the makespan."""
+    # pytest -vv --showlocals --log-level INFO -k "test_predict_makespan" tests
+    assert predict_makespan(costs, order, workers) == expected
+
+
+def test_job_schedule(
+    tmp_path: "Path",
+    caplog: "pytest.LogCaptureFixture",
+) -> None:
+    """History first. Otherwise closure size, scaled by history."""
+    # pytest -vv --showlocals --log-level INFO -k "test_job_schedule" tests
+    path_reqs = tmp_path.joinpath("requirements")
+    _write_reqs(path_reqs)
+    t_jobs = [
+        (".venv", str(path_reqs.joinpath(f"{stem}.in")), f"{stem}.lock")
+        for stem in ("aaa", "bbb", "ccc")
+    ]
+
+    # no history. closure size
+    schedule = JobSchedule.plan(t_jobs, tmp_path, 2, {})
+    assert schedule.order == [2, 1, 0]
+    assert schedule.costs == [SECONDS_PER_REQ, 3 * SECONDS_PER_REQ, 6.0]
+    assert schedule.predicted is None
+    assert schedule.history_count == 0
+
+    # history. aaa is slow. Only the most recent runs count
+    d_history = {
+        (".venv", "requirements/aaa.in"): [
+            (1000.0, None, None, None),
+            *[(20.0, 1.0, 0.1, 1024)] * 5,
+        ],
+        (".venv", "requirements/bbb.in"): [(6.0, None, None, None)],
+    }
+    schedule = JobSchedule.plan(t_jobs, tmp_path, 2, d_history)
+    assert schedule.history_count == 2
+    # ccc no history. (20 + 6) / (1 + 3) seconds per requirement line
+    assert schedule.costs == [20.0, 6.0, 6 * 6.5]
+    assert schedule.order == [2, 0, 1]
+    assert schedule.predicted == 39.0
+
+    # start order, then back into submission order
+    t_started = schedule.apply(t_jobs)
+    assert [Path(t_job[1]).stem for t_job in t_started] == ["ccc", "aaa", "bbb"]
+    assert schedule.restore(t_started) == t_jobs
+
+    with caplog.at_level(logging.INFO, logger=f"{g_app_name}.lock_schedule"):
+        schedule.log_makespan(41.5)
+        JobSchedule.plan(t_jobs, tmp_path, 2, {}).log_makespan(1.0)
+    assert "predicted 39.0s actual 41.5s" in caplog.text
+    assert "unknown, no history" in caplog.text
+
+    # nothing to predict from. Submission order
+    schedule = JobSchedule.in_order(len(t_jobs))
+    assert schedule.order == [0, 1, 2]
+    assert schedule.predicted is None
+    assert schedule.history_count == 0
+    assert schedule.apply(t_jobs) == t_jobs
+
+
+PYPROJECT_TOML_SCHEDULE = """\
+[[tool.wreck.venvs]]
+venv_base_path = '.venv'
+reqs = [
+    'requirements/aaa',
+    'requirements/bbb',
+    'requirements/ccc',
+]
+"""
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_schedule(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Slowest by history starts first. Results in submission order."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_schedule" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_SCHEDULE)
+    tmp_path.joinpath(".venv").mkdir()
+    _write_reqs(tmp_path.joinpath("requirements"))
+    loader = VenvMapLoader(path_f.as_posix())
+    started = []
+
+    def fake_compile_one(
+        in_abspath,
+        lock_abspath,
+        ep_path,
+        path_cwd,
+        venv_relpath,
+        timeout=15,
+        backend=None,
+        telemetry=None,
+        prefer=None,
+        limiter=None,
+        on_result=None,
+    ):
+        started.append(Path(in_abspath).stem)
+        Path(lock_abspath).write_text(f"{Path(in_abspath).stem}==1.0{os.linesep}")
+        return Path(lock_abspath), None
+
+    monkeypatch.setattr(f"{g_app_name}.lock_compile._compile_one", fake_compile_one)
+
+    # no history. Submission order
+    t_compiled, t_failures = lock_compile(loader, ".venv", jobs=1, use_cache=False)
+    assert started == [Path(lock_abspath).stem for lock_abspath in t_compiled]
+    assert len(t_compiled) == 3
+    t_expected = t_compiled
+
+    # history says aaa is slowest
+    telemetry = CompileTelemetry(tmp_path.joinpath(CACHE_FOLDER, TELEMETRY_NAME))
+    for stem, wall in (("aaa", 90.0), ("bbb", 5.0), ("ccc", 30.0)):
+        telemetry.record(".venv", f"requirements/{stem}.in", "pip-compile", wall, 0)
+    telemetry.save()
+
+    started.clear()
+    t_compiled, t_failures = lock_compile(loader, ".venv", jobs=1, use_cache=False)
+    assert started == ["aaa", "ccc", "bbb"]
+    # submission order, regardless of start order
+    assert t_compiled == t_expected
+    assert len(t_failures) == 0
+
+    # telemetry database corrupt. No history, not a failure
+    telemetry.path_db.write_bytes(b"not a database" * 128)
+    started.clear()
+    t_compiled, t_failures = lock_compile(loader, ".venv", jobs=1, use_cache=False)
+    assert started == [Path(lock_abspath).stem for lock_abspath in t_compiled]
+    assert t_compiled == t_expected
+    assert len(t_failures) == 0
@@ -0,0 +1,271 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_telemetry.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_telemetry' -m pytest \
+   --showlocals tests/test_lock_telemetry.py && coverage report \
+   --data-file=.coverage --include="**/lock_telemetry.py"
+
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from click.testing import CliRunner
+
+from wreck._package_installed import is_package_installed
+from wreck.cli_dependencies import requirements_stats
+from wreck.constants import g_app_name
+from wreck.lock_cache import CACHE_FOLDER
+from wreck.lock_compile import lock_compile
+from wreck.lock_telemetry import (
+    TELEMETRY_NAME,
+    CompileTelemetry,
+    JobStats,
+)
+from wreck.pep518_venvs import VenvMapLoader
+
+if TYPE_CHECKING:
+    from typing import Any
+
+
+def test_telemetry_save(tmp_path: "Path") -> None:
+    """Records written once per run. History oldest first. Pruned."""
+    # pytest -vv --showlocals --log-level INFO -k "test_telemetry_save" tests
+    path_db = tmp_path.joinpath(CACHE_FOLDER, TELEMETRY_NAME)
+    telemetry = CompileTelemetry(path_db, keep=3)
+
+    # nothing recorded
+    assert telemetry.history() == {}
+    assert telemetry.save() is None
+    assert not path_db.exists()
+
+    rusage = {"utime": 1.5, "stime": 0.25, "maxrss": 2048}
+    for wall in (1.0, 2.0, 3.0, 4.0):
+        telemetry.record(".venv", "requirements/aaa.in", "pip-compile", wall, 0, rusage)
+        telemetry.record(
+            ".venv",
+            "requirements/bbb.in",
+            "pip-compile",
+            wall * 10,
+            0,
+            wait=0.5,
+        )
+        telemetry.record(".doc/.venv", "docs/ccc.in", "uv", 0.5, 1)
+        run_id = telemetry.save()
+        assert isinstance(run_id, int)
+
+    d_history = telemetry.history()
+    assert len(d_history) == 3
+    # keep 3 most recent
+    assert [t_run[0] for t_run in d_history[(".venv", "requirements/aaa.in")]] == [
+        2.0,
+        3.0,
+        4.0,
+    ]
+    assert d_history[(".venv", "requirements/aaa.in")][-1] == (
+        4.0,
+        1.5,
+        0.25,
+        2048,
+        None,
+    )
+    assert d_history[(".venv", "requirements/bbb.in")][-1] == (
+        40.0,
+        None,
+        None,
+        None,
+        0.5,
+    )
+
+    d_history = telemetry.history(venv_relpath=".doc/.venv")
+    assert list(d_history.keys()) == [(".doc/.venv", "docs/ccc.in")]
+
+    # runs without jobs are dropped
+    with sqlite3.connect(path_db) as conn:
+        run_count = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    conn.close()
+    assert run_count == 3
+
+
+def test_telemetry_slowest(tmp_path: "Path") -> None:
+    """Slowest by most recent wall time. Trend versus earlier runs."""
+    # pytest -vv --showlocals --log-level INFO -k "test_telemetry_slowest" tests
+    telemetry = CompileTelemetry(tmp_path.joinpath(TELEMETRY_NAME))
+    for wall in (2.0, 4.0, 9.0):
+        telemetry.record(".venv", "aaa.in", "pip-compile", wall, 0)
+        telemetry.record(".venv", "bbb.in", "pip-compile", 5.0, 0)
+        telemetry.save()
+    telemetry.record(".venv", "ccc.in", "pip-compile", 1.0, 0)
+    telemetry.save()
+
+    stats = telemetry.slowest()
+    assert [job_stats.in_relpath for job_stats in stats] == [
+        "aaa.in",
+        "bbb.in",
+        "ccc.in",
+    ]
+    assert stats[0].runs == 3
+    assert stats[0].wall_mean == 3.0
+    assert stats[0].trend == pytest.approx(2.0)
+    assert stats[1].trend == pytest.approx(0.0)
+    # one run. No trend
+    assert stats[2].wall_mean is None
+    assert stats[2].trend is None
+
+    assert len(telemetry.slowest(limit=1)) == 1
+    assert telemetry.slowest(venv_relpath=".doc/.venv") == []
+
+    job_stats = JobStats(".venv", "a.in", 2, 1.0, 0.0, None, None, None, None)
+    assert job_stats.trend is None
+
+
+def test_telemetry_migrate(tmp_path: "Path") -> None:
+    """Schema version 1 database gains the wait column. Rows kept."""
+    # pytest -vv --showlocals --log-level INFO -k "test_telemetry_migrate" tests
+    path_db = tmp_path.joinpath(TELEMETRY_NAME)
+    with sqlite3.connect(path_db) as conn:
+        conn.executescript(
+            "CREATE TABLE runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "started REAL NOT NULL);"
+            "CREATE TABLE jobs (run_id INTEGER NOT NULL, venv_relpath TEXT NOT NULL, "
+            "in_relpath TEXT NOT NULL, backend TEXT NOT NULL, exit_code INTEGER, "
+            "wall REAL NOT NULL, utime REAL, stime REAL, maxrss INTEGER);"
+            "INSERT INTO runs (started) VALUES (0);"
+            "INSERT INTO jobs VALUES (1, '.venv', 'aaa.in', 'uv', 0, 2.0, "
+            "NULL, NULL, NULL);"
+            "PRAGMA user_version = 1;"
+        )
+    conn.close()
+
+    telemetry = CompileTelemetry(path_db)
+    telemetry.record(".venv", "aaa.in", "uv", 3.0, 0, wait=1.25)
+    assert isinstance(telemetry.save(), int)
+    runs = telemetry.history()[(".venv", "aaa.in")]
+    assert runs == [(2.0, None, None, None, None), (3.0, None, None, None, 1.25)]
+    assert telemetry.slowest()[0].wait == 1.25
+
+
+PYPROJECT_TOML_TELEMETRY = """\
+[tool.wreck]
+{}
+
+[[tool.wreck.venvs]]
+venv_base_path = '.venv'
+reqs = [
+    'requirements/aaa',
+    'requirements/bbb',
+]
+"""
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_telemetry(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Compiles recorded, with resource usage. reqs stats shows them."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_telemetry" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_TELEMETRY.format(""))
+    for create_relpath in (".venv", "requirements"):
+        tmp_path.joinpath(create_relpath).mkdir(parents=True, exist_ok=True)
+    for stem in ("aaa", "bbb"):
+        tmp_path.joinpath("requirements", f"{stem}.in").write_text(
+            f"{stem}{os.linesep}"
+        )
+    path_db = tmp_path.joinpath(CACHE_FOLDER, TELEMETRY_NAME)
+
+    def fake_compile(
+        self: "Any",
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: "Path",
+        venv_python: str,
+        timeout: int,
+    ) -> "tuple[str | None, str | None, int | None, str | None, dict[str, Any]]":
+        stem = Path(in_abspath).stem
+        Path(lock_abspath).write_text(f"{stem}==1.0{os.linesep}")
+        return (None, None, 0, None, {"utime": 0.5, "stime": 0.1, "maxrss": 4096})
+
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_backend.PipCompileBackend.compile",
+        fake_compile,
+    )
+
+    loader = VenvMapLoader(path_f.as_posix())
+    t_compiled, t_failures = lock_compile(loader, ".venv", jobs=2, use_cache=False)
+    assert len(t_compiled) == 2
+    d_history = CompileTelemetry(path_db).history()
+    assert sorted(d_history.keys()) == [
+        (".venv", "requirements/aaa.in"),
+        (".venv", "requirements/bbb.in"),
+    ]
+    t_run = d_history[(".venv", "requirements/aaa.in")][0]
+    assert t_run[0] >= 0
+    # Not limited. No wait
+    assert t_run[1:] == (0.5, 0.1, 4096, None)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        requirements_stats,
+        ["--path", str(tmp_path), "--limit", "1"],
+        catch_exceptions=True,
+    )
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert len(lines) == 2
+    assert "requirements/" in lines[1]
+    assert "4.0" in lines[1]
+
+    # disabled
+    path_db.unlink()
+    path_f.write_text(PYPROJECT_TOML_TELEMETRY.format("telemetry = false"))
+    loader = VenvMapLoader(path_f.as_posix())
+    lock_compile(loader, ".venv", use_cache=False)
+    assert not path_db.exists()
+
+    result = runner.invoke(requirements_stats, ["--path", str(tmp_path)])
+    assert result.exit_code == 0
+    assert "No compile telemetry recorded" in result.output
+
+
+def test_telemetry_corrupt(
+    tmp_path: "Path",
+    caplog: "pytest.LogCaptureFixture",
+) -> None:
+    """Database file not a database. Nothing to show, no traceback."""
+    # pytest -vv --showlocals --log-level INFO -k "test_telemetry_corrupt" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_TELEMETRY.format(""))
+    tmp_path.joinpath(".venv").mkdir()
+    path_db = tmp_path.joinpath(CACHE_FOLDER, TELEMETRY_NAME)
+    path_db.parent.mkdir()
+    path_db.write_bytes(b"not a database" * 128)
+
+    telemetry = CompileTelemetry(path_db)
+    assert telemetry.history() == {}
+    assert telemetry.history(venv_relpath=".venv") == {}
+    assert telemetry.slowest() == []
+    assert "telemetry unreadable" in caplog.text
+
+    runner = CliRunner()
+    result = runner.invoke(requirements_stats, ["--path", str(tmp_path)])
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+    assert result.exit_code == 0
+    assert "No compile telemetry recorded" in result.output
@@ -0,0 +1,268 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_unified.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_unified' -m pytest \
+   --showlocals tests/test_lock_unified.py && coverage report \
+   --data-file=.coverage --include="**/lock_unified.py"
+
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from wreck._package_installed import is_package_installed
+from wreck.constants import g_app_name
+from wreck.lock_cache import CACHE_FOLDER
+from wreck.lock_compile import lock_compile
+from wreck.lock_unified import (
+    UNIFIED_FOLDER,
+    _venv_slug,
+    parse_lock_entries,
+    split_lock,
+    unified_units,
+)
+from wreck.pep518_venvs import VenvMapLoader
+
+UNIFIED_LOCK = """\
+#
+# This file is autogenerated by pip-compile with Python 3.11
+#
+certifi==2024.8.30
+    # via requests
+click==8.1.7
+    # via
+    #   -c requirements/pins.in
+    #   -r requirements/aaa.in
+idna==3.10
+    # via requests
+requests==2.32.3
+    # via -r requirements/bbb.in
+urllib3==2.2.3 \\
+    --hash=sha256:ca899ca043dcb1bafa3e262d73aa25c465bfb49e0bd9dd5d59f1d0acba2f8fac
+    # via requests
+"""
+
+PYPROJECT_TOML_UNIFIED = """\
+[tool.wreck]
+unified = true
+
+[[tool.wreck.venvs]]
+venv_base_path = '.venv'
+reqs = [
+    'requirements/aaa',
+    'requirements/bbb',
+]
+
+[[tool.wreck.venvs]]
+venv_base_path = '.doc/.venv'
+reqs = [
+    'requirements/ccc',
+]
+"""
+
+
+def _write_reqs(path_reqs: "Path") -> None:
+    """aaa constrained by pins. bbb unconstrained. ccc empty."""
+    path_reqs.mkdir(parents=True, exist_ok=True)
+    nl = os.linesep
+    path_reqs.joinpath("pins.in").write_text(f"click<9{nl}")
+    path_reqs.joinpath("aaa.in").write_text(f"-c pins.in{nl}{nl}click{nl}")
+    path_reqs.joinpath("bbb.in").write_text(f"requests{nl}")
+    path_reqs.joinpath("ccc.in").write_text(f"# nothing{nl}")
+
+
+def test_parse_lock_entries() -> None:
+    """Requirement lines, annotations, and other indented lines."""
+    # pytest -vv --showlocals --log-level INFO -k "test_parse_lock_entries" tests
+    entries = parse_lock_entries(UNIFIED_LOCK)
+    assert [entry.name for entry in entries] == [
+        "certifi",
+        "click",
+        "idna",
+        "requests",
+        "urllib3",
+    ]
+    click = entries[1]
+    assert click.via == ("-c requirements/pins.in", "-r requirements/aaa.in")
+    assert click.parents() == set()
+    urllib3 = entries[-1]
+    assert urllib3.parents() == {"requests"}
+    assert len(urllib3.extra) == 1
+    assert urllib3.to_lines(["requests"]) == [
+        urllib3.line,
+        "    # via requests",
+        *urllib3.extra,
+    ]
+
+    assert parse_lock_entries("") == []
+
+
+def test_split_lock(tmp_path: "Path") -> None:
+    """Each .in gets what it requires, transitively. Annotations filtered."""
+    # pytest -vv --showlocals --log-level INFO -k "test_split_lock" tests
+    path_reqs = tmp_path.joinpath("requirements")
+    _write_reqs(path_reqs)
+    nl = os.linesep
+
+    contents = split_lock(UNIFIED_LOCK, tmp_path, str(path_reqs.joinpath("aaa.in")))
+    expected = (
+        f"click==8.1.7{nl}"
+        f"    # via{nl}"
+        f"    #   -c requirements/pins.in{nl}"
+        f"    #   -r requirements/aaa.in{nl}"
+    )
+    assert contents == expected
+
+    contents = split_lock(UNIFIED_LOCK, tmp_path, str(path_reqs.joinpath("bbb.in")))
+    names = [entry.name for entry in parse_lock_entries(contents)]
+    assert names == ["certifi", "idna", "requests", "urllib3"]
+    assert "click" not in contents
+    assert "--hash=sha256:" in contents
+
+    # requires nothing
+    contents = split_lock(UNIFIED_LOCK, tmp_path, str(path_reqs.joinpath("ccc.in")))
+    assert contents == ""
+
+
+def test_unified_units(tmp_path: "Path") -> None:
+    """Per venv, one generated .in. Rewritten only if changed."""
+    # pytest -vv --showlocals --log-level INFO -k "test_unified_units" tests
+    path_reqs = tmp_path.joinpath("requirements")
+    _write_reqs(path_reqs)
+    t_jobs = [
+        (venv_relpath, str(path_reqs.joinpath(f"{stem}.in")), f"{stem}.lock")
+        for venv_relpath, stem in (
+            (".venv", "aaa"),
+            (".doc/.venv", "ccc"),
+            (".venv", "bbb"),
+        )
+    ]
+    units = unified_units(tmp_path, t_jobs)
+    path_dir = tmp_path.joinpath(CACHE_FOLDER, UNIFIED_FOLDER)
+    stem_venv = _venv_slug(".venv")
+    stem_doc = _venv_slug(".doc/.venv")
+    assert stem_venv.startswith("venv-")
+    assert stem_doc.startswith("doc-venv-")
+    assert units == [
+        (
+            ".venv",
+            str(path_dir.joinpath(f"{stem_venv}.in")),
+            str(path_dir.joinpath(f"{stem_venv}.lock")),
+        ),
+        (
+            ".doc/.venv",
+            str(path_dir.joinpath(f"{stem_doc}.in")),
+            str(path_dir.joinpath(f"{stem_doc}.lock")),
+        ),
+    ]
+    path_in = path_dir.joinpath(f"{stem_venv}.in")
+    contents = path_in.read_text()
+    assert f"-r {path_reqs.joinpath('aaa.in')!s}" in contents
+    assert f"-r {path_reqs.joinpath('bbb.in')!s}" in contents
+    assert "ccc.in" not in contents
+
+    # unchanged. Not rewritten
+    mtime_ns = path_in.stat().st_mtime_ns
+    os.utime(path_in, ns=(0, 0))
+    unified_units(tmp_path, t_jobs)
+    assert path_in.stat().st_mtime_ns == 0
+    assert mtime_ns != 0
+
+    # Same readable part. Still separate files
+    t_jobs = [
+        (venv_relpath, str(path_reqs.joinpath(f"{stem}.in")), f"{stem}.lock")
+        for venv_relpath, stem in (
+            (".venv", "aaa"),
+            ("venv", "bbb"),
+            ("_venv", "ccc"),
+        )
+    ]
+    units = unified_units(tmp_path, t_jobs)
+    assert len({t_unit[1] for t_unit in units}) == 3
+    assert len({t_unit[2] for t_unit in units}) == 3
+    for venv_relpath, in_abspath, _ in units:
+        contents = Path(in_abspath).read_text()
+        assert f"venv {venv_relpath}." in contents
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_unified(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """One resolve per venv. Split into per .in .lock files."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_unified" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_UNIFIED)
+    tmp_path.joinpath(".venv").mkdir()
+    tmp_path.joinpath(".doc", ".venv").mkdir(parents=True)
+    path_reqs = tmp_path.joinpath("requirements")
+    _write_reqs(path_reqs)
+    loader = VenvMapLoader(path_f.as_posix())
+    compiled = []
+    d_mode = {"is_fail": False}
+
+    def fake_compile_one(
+        in_abspath,
+        lock_abspath,
+        ep_path,
+        path_cwd,
+        venv_relpath,
+        timeout=15,
+        backend=None,
+        telemetry=None,
+        prefer=None,
+        limiter=None,
+        on_result=None,
+    ):
+        compiled.append((venv_relpath, Path(in_abspath).name))
+        if d_mode["is_fail"]:
+            # unified lock from the previous run is left on disk
+            ret = None, "ResolutionImpossible"
+        else:
+            Path(lock_abspath).write_text(UNIFIED_LOCK)
+            ret = Path(lock_abspath), None
+        return ret
+
+    monkeypatch.setattr(f"{g_app_name}.lock_compile._compile_one", fake_compile_one)
+
+    t_compiled, t_failures = lock_compile(loader, None, use_cache=False)
+    assert sorted(compiled) == [
+        (".doc/.venv", f"{_venv_slug('.doc/.venv')}.in"),
+        (".venv", f"{_venv_slug('.venv')}.in"),
+    ]
+    assert len(t_failures) == 0
+    assert len(t_compiled) == 3
+    assert "requests" not in path_reqs.joinpath("aaa.lock").read_text()
+    assert "click" not in path_reqs.joinpath("bbb.lock").read_text()
+    assert path_reqs.joinpath("ccc.lock").read_text() == ""
+
+    # unified resolve fails. Stale unified lock is not split
+    d_mode["is_fail"] = True
+    path_reqs.joinpath("aaa.lock").write_text("")
+    t_compiled, t_failures = lock_compile(loader, ".venv", use_cache=False)
+    assert len(t_compiled) == 0
+    assert len(t_failures) == 2
+    assert all(t_three[2] == "ResolutionImpossible" for t_three in t_failures)
+    assert path_reqs.joinpath("aaa.lock").read_text() == ""
+    d_mode["is_fail"] = False
+
+    # cli overrides [tool.wreck]. Per .in
+    compiled.clear()
+    lock_compile(loader, ".venv", use_cache=False, unified=False)
+    assert sorted(compiled) == [(".venv", "aaa.in"), (".venv", "bbb.in")]
@@ -0,0 +1,260 @@
+"""
+.. moduleauthor:: Dave Faulkmore <https://mastodon.social/@msftcangoblowme>
+
+Without coverage
+
+.. code-block:: shell
+
+   python -m pytest -vv --showlocals tests/test_lock_warm.py
+
+With coverage
+
+.. code-block:: shell
+
+   python -m coverage run --source='wreck.lock_warm' -m pytest \
+   --showlocals tests/test_lock_warm.py && coverage report \
+   --data-file=.coverage --include="**/lock_warm.py"
+
+"""
+
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from wreck._package_installed import is_package_installed
+from wreck.constants import g_app_name
+from wreck.lock_backend import PipCompileBackend
+from wreck.lock_compile import (
+    _compile_one,
+    lock_compile,
+)
+from wreck.lock_warm import (
+    lock_pins,
+    venv_preferences,
+    warm_seed,
+)
+from wreck.pep518_venvs import VenvMapLoader
+
+LOCK_AAA = """\
+#
+# This file is autogenerated by pip-compile with Python 3.11
+#
+click==8.1.7
+    # via -r requirements/aaa.in
+urllib3==2.2.3 \\
+    --hash=sha256:ca899ca043dcb1bafa3e262d73aa25c465bfb49e0bd9dd5d59f1d0acba2f8fac
+    # via -r requirements/aaa.in
+"""
+
+LOCK_BBB = """\
+click==8.0.0
+    # via -r requirements/bbb.in
+idna==3.10
+    # via -r requirements/bbb.in
+"""
+
+PYPROJECT_TOML_WARM = """\
+[tool.wreck]
+warm_start = true
+
+[[tool.wreck.venvs]]
+venv_base_path = '.venv'
+reqs = [
+    'requirements/aaa',
+    'requirements/bbb',
+]
+"""
+
+
+def _write_reqs(path_reqs: "Path") -> None:
+    """aaa and bbb, with existing .lock files."""
+    path_reqs.mkdir(parents=True, exist_ok=True)
+    path_reqs.joinpath("aaa.in").write_text(f"click{os.linesep}urllib3{os.linesep}")
+    path_reqs.joinpath("bbb.in").write_text(f"click{os.linesep}idna{os.linesep}")
+    path_reqs.joinpath("aaa.lock").write_text(LOCK_AAA)
+    path_reqs.joinpath("bbb.lock").write_text(LOCK_BBB)
+
+
+def test_lock_pins() -> None:
+    """Requirement lines only. No annotations, no hashes."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_pins" tests
+    assert lock_pins(LOCK_AAA) == {
+        "click": "click==8.1.7",
+        "urllib3": "urllib3==2.2.3",
+    }
+    assert lock_pins("") == {}
+
+
+def test_warm_seed(tmp_path: "Path") -> None:
+    """Existing .lock, then the venv's other pins it lacks. First wins."""
+    # pytest -vv --showlocals --log-level INFO -k "test_warm_seed" tests
+    path_reqs = tmp_path.joinpath("requirements")
+    _write_reqs(path_reqs)
+    lock_aaa = str(path_reqs.joinpath("aaa.lock"))
+    lock_bbb = str(path_reqs.joinpath("bbb.lock"))
+    lock_ccc = str(path_reqs.joinpath("ccc.lock"))
+    t_jobs = [
+        (".venv", "aaa.in", lock_aaa),
+        (".venv", "bbb.in", lock_bbb),
+        (".venv", "ccc.in", lock_ccc),
+        (".doc/.venv", "bbb.in", lock_bbb),
+    ]
+    d_prefs = venv_preferences(t_jobs)
+    assert d_prefs[".venv"] == {
+        "click": "click==8.1.7",
+        "urllib3": "urllib3==2.2.3",
+        "idna": "idna==3.10",
+    }
+    assert d_prefs[".doc/.venv"] == lock_pins(LOCK_BBB)
+
+    nl = os.linesep
+    # Has everything. Unchanged
+    d_aaa = {key: val for key, val in d_prefs[".venv"].items() if key != "idna"}
+    assert warm_seed(lock_aaa, d_aaa) == LOCK_AAA
+    # Lacks urllib3. It's own click pin kept
+    assert warm_seed(lock_bbb, d_prefs[".venv"]) == f"{LOCK_BBB}urllib3==2.2.3{nl}"
+    # No .lock yet
+    assert warm_seed(lock_ccc, d_prefs[".venv"]) == (
+        f"click==8.1.7{nl}urllib3==2.2.3{nl}idna==3.10{nl}"
+    )
+
+
+def test_compile_one_warm_fallback(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Warm resolve fails, redone cold. Connection errors are not."""
+    # pytest -vv --showlocals --log-level INFO -k "test_compile_one_warm_fallback" tests
+    path_reqs = tmp_path.joinpath("requirements")
+    _write_reqs(path_reqs)
+    in_abspath = str(path_reqs.joinpath("bbb.in"))
+    lock_abspath = str(path_reqs.joinpath("bbb.lock"))
+    prefer = f"{LOCK_BBB}urllib3==2.2.3{os.linesep}"
+    d_result = {"errs": []}
+    seen = []
+
+    def fake_compile(
+        self: "Any",
+        in_abspath: str,
+        lock_abspath: str,
+        path_cwd: "Path",
+        venv_python: str,
+        timeout: int,
+    ) -> "tuple[str | None, str | None, int | None, str | None, None]":
+        seen.append(Path(lock_abspath).read_text())
+        err = d_result["errs"].pop(0)
+        if err is None:
+            Path(lock_abspath).write_text(f"click==8.1.8{os.linesep}")
+            ret = (None, None, 0, None, None)
+        else:
+            ret = (None, err, 1, None, None)
+        return ret
+
+    monkeypatch.setattr(
+        f"{g_app_name}.lock_backend.PipCompileBackend.compile",
+        fake_compile,
+    )
+    backend = PipCompileBackend()
+
+    # warm fails, cold succeeds
+    d_result["errs"] = ["ResolutionImpossible", None]
+    optabspath_lock, err_details = _compile_one(
+        in_abspath,
+        lock_abspath,
+        "",
+        tmp_path,
+        ".venv",
+        backend=backend,
+        prefer=prefer,
+    )
+    assert seen == [prefer, ""]
+    assert err_details is None
+    assert Path(lock_abspath).read_text() == f"click==8.1.8{os.linesep}"
+
+    # connection error. Not redone cold, that's for retries
+    seen.clear()
+    d_result["errs"] = ["TimeoutError: read timed out"]
+    monkeypatch.setattr(
+        PipCompileBackend,
+        "is_connection_error",
+        lambda self, exit_code, err: "TimeoutError" in err,
+    )
+    optabspath_lock, err_details = _compile_one(
+        in_abspath,
+        lock_abspath,
+        "",
+        tmp_path,
+        ".venv",
+        backend=backend,
+        prefer=prefer,
+    )
+    assert len(seen) == 1
+    assert err_details is not None
+
+    # not warm. Seeded with the existing .lock. Not redone
+    seen.clear()
+    d_result["errs"] = ["ResolutionImpossible"]
+    _compile_one(in_abspath, lock_abspath, "", tmp_path, ".venv", backend=backend)
+    assert seen == [f"click==8.1.8{os.linesep}"]
+    assert len(list(path_reqs.glob(".bbb.*"))) == 0
+
+
+@pytest.mark.xfail(
+    not is_package_installed("pip-tools"),
+    reason="dependency package pip-tools is required",
+)
+def test_lock_compile_warm_start(
+    tmp_path: "Path",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    """Each job is given the venv's union of pins. cli overrides."""
+    # pytest -vv --showlocals --log-level INFO -k "test_lock_compile_warm_start" tests
+    path_f = tmp_path.joinpath("pyproject.toml")
+    path_f.write_text(PYPROJECT_TOML_WARM)
+    tmp_path.joinpath(".venv").mkdir()
+    path_reqs = tmp_path.joinpath("requirements")
+    _write_reqs(path_reqs)
+    loader = VenvMapLoader(path_f.as_posix())
+    d_prefer = {}
+
+    def fake_compile_one(
+        in_abspath,
+        lock_abspath,
+        ep_path,
+        path_cwd,
+        venv_relpath,
+        timeout=15,
+        backend=None,
+        telemetry=None,
+        prefer=None,
+        limiter=None,
+        on_result=None,
+    ):
+        d_prefer[Path(in_abspath).stem] = prefer
+        return Path(lock_abspath), None
+
+    monkeypatch.setattr(f"{g_app_name}.lock_compile._compile_one", fake_compile_one)
+
+    lock_compile(loader, ".venv", use_cache=False)
+    assert d_prefer["aaa"] == f"{LOCK_AAA}idna==3.10{os.linesep}"
+    assert d_prefer["bbb"] == f"{LOCK_BBB}urllib3==2.2.3{os.linesep}"
+
+    lock_compile(loader, ".venv", use_cache=False, warm_start=False)
+    assert d_prefer == {"aaa": None, "bbb": None}
+
+    # Cold result cached. warm start seed differs, so not up to date
+    d_prefer.clear()
+    lock_compile(loader, ".venv", use_cache=True, warm_start=False)
+    assert d_prefer == {"aaa": None, "bbb": None}
+    d_prefer.clear()
+    lock_compile(loader, ".venv", use_cache=True, warm_start=False)
+    assert d_prefer == {}
+    lock_compile(loader, ".venv", use_cache=True)
+    assert d_prefer["aaa"] == f"{LOCK_AAA}idna==3.10{os.linesep}"
+    assert d_prefer["bbb"] == f"{LOCK_BBB}urllib3==2.2.3{os.linesep}"
+    # Same seed. Up to date
+    d_prefer.clear()
+    lock_compile(loader, ".venv", use_cache=True)
+    assert d_prefer == {}
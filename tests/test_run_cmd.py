@@ -13,13 +13,25 @@ Unit test -- Module
 
 """
 
+import asyncio
 import os
+import signal
 import sys
+import threading
+import time
 from typing import TYPE_CHECKING
 
 import pytest
 
-from wreck._run_cmd import run_cmd
+from wreck._run_cmd import (
+    BUDGET_EXCEEDED,
+    CANCELLED,
+    arun_cmd,
+    budget_msg,
+    is_cpu_exceeded,
+    run_cmd,
+    run_cmd_rusage,
+)
 from wreck._safe_path import (
     is_win,
     resolve_path,
@@ -115,3 +127,201 @@ def test_run_cmd(
         assert exit_code == 0
         assert out is not None
         assert len(out.strip()) != 0
+
+
+def test_arun_cmd(tmp_path: "Path") -> None:
+    """Same results as run_cmd. Cancelling kills the subprocess."""
+    # pytest --showlocals --log-level INFO -k "test_arun_cmd" tests
+    with pytest.raises(TypeError):
+        asyncio.run(arun_cmd(0.1234))  # type: ignore[arg-type]
+
+    # executable path is incorrect
+    out, err, exit_code, str_exc = asyncio.run(arun_cmd(("bin/true",)))
+    assert exit_code is None
+    assert str_exc is not None
+
+    cmd = (sys.executable, "-V")
+    t_ret = asyncio.run(arun_cmd(cmd, cwd=tmp_path, env=os.environ))
+    assert t_ret == run_cmd(cmd, cwd=tmp_path, env=os.environ)
+    assert t_ret[2] == 0
+
+    # environment mapping
+    env = os.environ.copy()
+    env["WRECK_TEST_ENV"] = "wreck"
+    path_script = tmp_path.joinpath("print_env.py")
+    path_script.write_text("import os\nprint(os.environ['WRECK_TEST_ENV'])\n")
+    cmd_env = (sys.executable, str(path_script))
+    t_ret = asyncio.run(arun_cmd(cmd_env, env=env))
+    assert t_ret[0] == "wreck"
+    assert run_cmd(cmd_env, env=env) == t_ret
+
+    async def cancel_sleep() -> None:
+        path_sleep = tmp_path.joinpath("sleep.py")
+        path_sleep.write_text("import time\ntime.sleep(30)\n")
+        cmd_sleep = (sys.executable, str(path_sleep))
+        await asyncio.wait_for(arun_cmd(cmd_sleep), timeout=0.5)
+
+    time_start = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(cancel_sleep())
+    assert time.monotonic() - time_start < 10
+
+
+SCRIPT_SPIN = """\
+import subprocess
+import sys
+subprocess.Popen((sys.executable, "-c", "import time; time.sleep(60)"))
+while True:
+    pass
+"""
+
+
+@pytest.mark.skipif(is_win(), reason="process group kill is posix only")
+def test_run_cmd_budget(tmp_path: "Path") -> None:
+    """Exceeding budget kills the process group. Grandchild holding the
+    pipes does not keep the job alive."""
+    # pytest --showlocals --log-level INFO -k "test_run_cmd_budget" tests
+    path_script = tmp_path.joinpath("spin.py")
+    path_script.write_text(SCRIPT_SPIN)
+    cmd = (sys.executable, str(path_script))
+
+    # within budget. Same as without a budget
+    cmd_version = (sys.executable, "-V")
+    t_ret = run_cmd(cmd_version, wall=30, cpu=30)
+    assert t_ret == run_cmd(cmd_version)
+    assert asyncio.run(arun_cmd(cmd_version, wall=30, cpu=30)) == t_ret
+
+    # wall-clock
+    time_start = time.monotonic()
+    out, err, exit_code, str_exc = run_cmd(cmd, wall=1)
+    assert time.monotonic() - time_start < 10
+    assert exit_code is None
+    assert str_exc == budget_msg("wall", 1)
+
+    time_start = time.monotonic()
+    t_ret = asyncio.run(arun_cmd(cmd, wall=1))
+    assert time.monotonic() - time_start < 10
+    assert t_ret[2] is None
+    assert t_ret[3] == budget_msg("wall", 1)
+
+    # cpu. Needs resource.prlimit
+    resource = pytest.importorskip("resource")
+    if not hasattr(resource, "prlimit"):  # pragma: no cover
+        pytest.skip("resource.prlimit is Linux only")
+    else:  # pragma: no cover
+        pass
+
+    time_start = time.monotonic()
+    t_ret = run_cmd(cmd, cpu=1)
+    assert time.monotonic() - time_start < 10
+    assert t_ret[3] == budget_msg("cpu", 1)
+
+    t_ret = asyncio.run(arun_cmd(cmd, cpu=1))
+    assert t_ret[3] is not None
+    assert t_ret[3].startswith(BUDGET_EXCEEDED)
+
+
+_SIG_XCPU = getattr(signal, "SIGXCPU", 24)
+_SIG_KILL = getattr(signal, "SIGKILL", 9)
+_RUSAGE_SPENT = {"utime": 1.5, "stime": 0.6, "maxrss": 1024}
+_RUSAGE_IDLE = {"utime": 0.01, "stime": 0.0, "maxrss": 1024}
+testdata_is_cpu_exceeded = (
+    (-_SIG_XCPU, 2, None, True),
+    (-_SIG_XCPU, None, None, False),
+    (-_SIG_KILL, 2, _RUSAGE_SPENT, True),
+    (-_SIG_KILL, 2, _RUSAGE_IDLE, False),
+    (-_SIG_KILL, 2, None, False),
+    (-_SIG_KILL, None, _RUSAGE_SPENT, False),
+    (0, 2, _RUSAGE_SPENT, False),
+    (None, 2, _RUSAGE_SPENT, False),
+)
+ids_is_cpu_exceeded = (
+    "SIGXCPU",
+    "SIGXCPU no budget",
+    "SIGKILL budget spent",
+    "SIGKILL from elsewhere",
+    "SIGKILL not measured",
+    "SIGKILL no budget",
+    "exited normally",
+    "not started",
+)
+
+
+@pytest.mark.skipif(is_win(), reason="SIGXCPU is posix only")
+@pytest.mark.parametrize(
+    "returncode, cpu, rusage, expected",
+    testdata_is_cpu_exceeded,
+    ids=ids_is_cpu_exceeded,
+)
+def test_is_cpu_exceeded(
+    returncode: "int | None",
+    cpu: "int | None",
+    rusage: "dict[str, float | int] | None",
+    expected: bool,
+) -> None:
+    """Only SIGXCPU or SIGKILL after spending the CPU budget."""
+    # pytest --showlocals --log-level INFO -k "test_is_cpu_exceeded" tests
+    assert is_cpu_exceeded(returncode, cpu, rusage=rusage) is expected
+
+
+def test_run_cmd_cancel(tmp_path: "Path") -> None:
+    """Cancel event kills the process group. Already set, not started."""
+    # pytest --showlocals --log-level INFO -k "test_run_cmd_cancel" tests
+    path_script = tmp_path.joinpath("spin.py")
+    path_script.write_text(SCRIPT_SPIN)
+    cmd = (sys.executable, str(path_script))
+
+    # Never set. Same as without
+    cancel = threading.Event()
+    cmd_version = (sys.executable, "-V")
+    assert run_cmd(cmd_version, cancel=cancel) == run_cmd(cmd_version)
+
+    timer = threading.Timer(0.5, cancel.set)
+    timer.start()
+    time_start = time.monotonic()
+    t_ret = run_cmd_rusage(cmd, cancel=cancel)
+    assert time.monotonic() - time_start < 10
+    assert t_ret[2] is None
+    assert t_ret[3] == CANCELLED
+
+    # Already set. Not started
+    t_ret = run_cmd_rusage(cmd, cancel=cancel)
+    assert t_ret == (None, None, None, CANCELLED, None)
+
+
+SCRIPT_BUSY = """\
+total = 0
+for idx in range(3000000):
+    total += idx
+buf = bytearray(32 * 1024 * 1024)
+"""
+
+
+@pytest.mark.skipif(is_win(), reason="os.wait4 is posix only")
+def test_run_cmd_rusage(tmp_path: "Path") -> None:
+    """Child user and system CPU and max RSS. Same result as run_cmd."""
+    # pytest --showlocals --log-level INFO -k "test_run_cmd_rusage" tests
+    path_script = tmp_path.joinpath("busy.py")
+    path_script.write_text(SCRIPT_BUSY)
+    cmd = (sys.executable, str(path_script))
+
+    t_ret = run_cmd_rusage(cmd)
+    assert t_ret[:4] == run_cmd(cmd)
+    assert t_ret[2] == 0
+    d_rusage = t_ret[4]
+    assert d_rusage is not None
+    assert set(d_rusage.keys()) == {"utime", "stime", "maxrss"}
+    assert d_rusage["utime"] > 0
+    # KiB. At least the 32 MiB buffer
+    assert d_rusage["maxrss"] >= 32 * 1024
+
+    # over budget. Killed, still reaped
+    path_spin = tmp_path.joinpath("spin.py")
+    path_spin.write_text(SCRIPT_SPIN)
+    t_ret = run_cmd_rusage((sys.executable, str(path_spin)), wall=1)
+    assert t_ret[3] == budget_msg("wall", 1)
+    assert t_ret[4] is not None
+
+    # executable not found
+    t_ret = run_cmd_rusage((str(tmp_path.joinpath("nonexistent")),))
+    assert t_ret[4] is None
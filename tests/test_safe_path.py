@@ -27,10 +27,12 @@ from typing import (
 import pytest
 
 from wreck._safe_path import (
+    PYVENV_CFG,
     get_venv_python_abspath,
     is_linux,
     is_macos,
     is_win,
+    read_pyvenv_cfg,
     replace_suffixes,
     resolve_joinpath,
     resolve_path,
@@ -243,3 +245,28 @@ def test_get_venv_python_abspath(
                 None,  # type: ignore[arg-type]
                 venv_relpath_1,
             )
+
+
+@pytest.mark.skipif(is_win(), reason="venv layout bin/ is posix")
+def test_venv_python_pyvenv_cfg(tmp_path: "Path") -> None:
+    """Only a versioned interpreter. Found via pyvenv.cfg."""
+    # pytest --showlocals --log-level INFO -k "test_venv_python_pyvenv_cfg" tests
+    path_venv = tmp_path.joinpath(".venv")
+    path_venv.joinpath("bin").mkdir(parents=True)
+    # No pyvenv.cfg
+    assert read_pyvenv_cfg(path_venv) == {}
+    expected = str(path_venv.joinpath("bin", "python"))
+    assert get_venv_python_abspath(tmp_path, ".venv") == expected
+
+    path_venv.joinpath(PYVENV_CFG).write_text(
+        "home = /usr/bin\n"
+        "include-system-site-packages = false\n"
+        "Version_Info = 3.12.4.final.0\n"
+    )
+    d_cfg = read_pyvenv_cfg(path_venv)
+    assert d_cfg["home"] == "/usr/bin"
+    assert d_cfg["version_info"] == "3.12.4.final.0"
+
+    path_python = path_venv.joinpath("bin", "python3.12")
+    path_python.write_text("")
+    assert get_venv_python_abspath(tmp_path, ".venv") == str(path_python)